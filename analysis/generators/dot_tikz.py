@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+DOT to TikZ without dot2tex
+
+Graphviz lays the graphs out once (``-Tjson``, several graphs per
+invocation); TikZ is then written directly from the node positions and
+edge splines, using the shared diagram preamble and styles.
+"""
+
+import json
+import re
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Graphviz shapes -> TikZ node shapes (anything else is drawn as a rectangle)
+SHAPES = {
+    "box": "rectangle",
+    "rect": "rectangle",
+    "rectangle": "rectangle",
+    "square": "rectangle",
+    "record": "rectangle",
+    "Mrecord": "rectangle",
+    "ellipse": "ellipse",
+    "oval": "ellipse",
+    "circle": "circle",
+    "point": "circle",
+    "doublecircle": "circle",
+    "diamond": "diamond",
+}
+
+# Shapes without an outline
+PLAIN_SHAPES = {"plaintext", "plain", "none"}
+
+# Colors xcolor knows without extra options
+XCOLOR_NAMES = {
+    "black",
+    "blue",
+    "brown",
+    "cyan",
+    "darkgray",
+    "gray",
+    "green",
+    "lightgray",
+    "lime",
+    "magenta",
+    "olive",
+    "orange",
+    "pink",
+    "purple",
+    "red",
+    "teal",
+    "violet",
+    "white",
+    "yellow",
+}
+
+TIKZ_STYLES = r"""    dotnode/.style={
+      align=center, inner sep=2pt, font=\sffamily\scriptsize},
+    dotedge/.style={draw=darkgray, >={Stealth[length=4pt]}},
+    dotlabel/.style={font=\sffamily\tiny, align=center},
+    dotcluster/.style={draw=mediumgray, rounded corners=2pt},
+    dottitle/.style={font=\sffamily\small\bfseries, align=center}"""
+
+_TEX_SPECIALS = {
+    "\\": r"\textbackslash{}",
+    "{": r"\{",
+    "}": r"\}",
+    "$": r"\$",
+    "&": r"\&",
+    "#": r"\#",
+    "%": r"\%",
+    "_": r"\_",
+    "~": r"\textasciitilde{}",
+    "^": r"\textasciicircum{}",
+}
+_TEX_RE = re.compile(r"[\\{}$&#%_~^]")
+_LINE_BREAK_RE = re.compile(r"\\[nlr]")
+_NODE_NAME_RE = re.compile(r"[^A-Za-z0-9_-]")
+
+
+class GraphvizError(RuntimeError):
+    """Graphviz could not lay out a graph."""
+
+
+def tex_label(label: str, name: str = "") -> str:
+    """DOT label (with ``\\N`` and ``\\n``/``\\l``/``\\r`` escapes) as TeX text."""
+    label = label.replace("\\N", name)
+    lines = _LINE_BREAK_RE.split(label)
+    if lines and lines[-1] == "":
+        lines.pop()
+    return r" \\ ".join(
+        _TEX_RE.sub(lambda m: _TEX_SPECIALS[m.group()], line) for line in lines
+    )
+
+
+def _point(text: str) -> Tuple[float, float]:
+    x, y = text.split(",")[:2]
+    return float(x), float(y)
+
+
+def _coord(point: Tuple[float, float]) -> str:
+    return f"({point[0]:.2f}bp,{point[1]:.2f}bp)"
+
+
+def parse_spline(
+    pos: str,
+) -> Tuple[
+    Optional[Tuple[float, float]],
+    Optional[Tuple[float, float]],
+    List[Tuple[float, float]],
+]:
+    """
+    Edge ``pos``: optional ``s,x,y`` (arrow at tail) and ``e,x,y`` (arrow at
+    head) followed by 3n+1 cubic B-spline control points.
+    """
+    start = end = None
+    points = []
+    # Several splines (concentrated edges) are separated by ';'
+    for token in pos.split(";")[0].split():
+        if token.startswith("s,"):
+            start = _point(token[2:])
+        elif token.startswith("e,"):
+            end = _point(token[2:])
+        else:
+            points.append(_point(token))
+    return start, end, points
+
+
+def parse_layouts(output: str) -> List[Dict[str, Any]]:
+    """Split concatenated ``-Tjson`` documents."""
+    decoder = json.JSONDecoder()
+    layouts, index = [], 0
+    while True:
+        while index < len(output) and output[index].isspace():
+            index += 1
+        if index >= len(output):
+            return layouts
+        layout, index = decoder.raw_decode(output, index)
+        layouts.append(layout)
+
+
+class DotTikzRenderer:
+    """Lay out DOT graphs with Graphviz and render them as TikZ pictures"""
+
+    def __init__(self, graphviz_dir: Optional[str] = None, timeout: float = 300):
+        self.graphviz_dir = graphviz_dir
+        self.timeout = timeout
+        # Why each file of the last layout() call failed
+        self.errors: Dict[Path, str] = {}
+
+    def _program(self, prog: str) -> str:
+        return str(Path(self.graphviz_dir) / prog) if self.graphviz_dir else prog
+
+    def layout(
+        self, dot_files: Sequence[Path], prog: str = "dot"
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Layouts of ``dot_files`` (one graph per file) from a single Graphviz
+        run. When that run fails, or a file holds several graphs, each file
+        is laid out on its own; files Graphviz rejects get None, with the
+        reason in ``self.errors``.
+        """
+        self.errors = {}
+        if not dot_files:
+            return []
+        try:
+            layouts = self._run(prog, [str(f) for f in dot_files])
+            if len(layouts) == len(dot_files):
+                return layouts
+        except GraphvizError as e:
+            if len(dot_files) == 1:
+                self.errors[Path(dot_files[0])] = str(e)
+                return [None]
+        # One bad file fails the whole run, and a file with more (or fewer)
+        # graphs misaligns it: lay out each file alone, keeping its first graph
+        return [self._layout_one(prog, Path(f)) for f in dot_files]
+
+    def _layout_one(self, prog: str, dot_file: Path) -> Optional[Dict[str, Any]]:
+        try:
+            return self._run(prog, [str(dot_file)])[0]
+        except GraphvizError as e:
+            self.errors[dot_file] = str(e)
+            return None
+
+    def _run(self, prog: str, args: List[str]) -> List[Dict[str, Any]]:
+        cmd = [self._program(prog), "-Tjson", *args]
+        try:
+            proc = subprocess.run(
+                cmd, capture_output=True, text=True, timeout=self.timeout
+            )
+        except FileNotFoundError:
+            raise GraphvizError(f"{prog} not found. Install graphviz") from None
+        if proc.returncode != 0:
+            raise GraphvizError(
+                proc.stderr.strip() or f"{prog} exited with {proc.returncode}"
+            )
+        layouts = parse_layouts(proc.stdout)
+        if not layouts:
+            raise GraphvizError(f"{prog} produced no layout")
+        return layouts
+
+    def render(self, layout: Dict[str, Any]) -> str:
+        """``tikzpicture`` environment for one ``-Tjson`` layout."""
+        colors: Dict[str, str] = {}
+
+        def color(value: Optional[str]) -> Optional[str]:
+            if not value:
+                return None
+            value = value.split(":")[0].strip()
+            if value.startswith("#") and len(value) >= 7:
+                hex_value = value[1:7].upper()
+                colors.setdefault(hex_value, f"dotcolor{len(colors)}")
+                return colors[hex_value]
+            return value if value in XCOLOR_NAMES else None
+
+        objects = layout.get("objects", [])
+        default_shape = "ellipse"
+        lines: List[str] = []
+
+        for obj in objects:
+            if "nodes" in obj and "bb" in obj:
+                x0, y0, x1, y1 = (float(v) for v in obj["bb"].split(","))
+                corners = f"{_coord((x0, y0))} rectangle {_coord((x1, y1))}"
+                lines.append(f"  \\draw[dotcluster] {corners};")
+                if obj.get("label") and obj.get("lp"):
+                    lines.append(
+                        f"  \\node[dotlabel] at {_coord(_point(obj['lp']))} "
+                        f"{{{tex_label(obj['label'], obj.get('name', ''))}}};"
+                    )
+
+        for obj in objects:
+            if "nodes" in obj or "pos" not in obj:
+                continue
+            shape_name = obj.get("shape", default_shape)
+            styles = set(obj.get("style", "").replace(" ", "").split(","))
+            options = ["dotnode", SHAPES.get(shape_name, "rectangle")]
+            if shape_name not in PLAIN_SHAPES and "invis" not in styles:
+                options.append(f"draw={color(obj.get('color')) or 'black'}")
+            if "filled" in styles:
+                fill = (
+                    color(obj.get("fillcolor"))
+                    or color(obj.get("color"))
+                    or "lightgray"
+                )
+                options.append(f"fill={fill}")
+            if "rounded" in styles:
+                options.append("rounded corners=2pt")
+            if "dashed" in styles:
+                options.append("dashed")
+            if "width" in obj and "height" in obj:
+                options.append(f"minimum width={float(obj['width']):.3f}in")
+                options.append(f"minimum height={float(obj['height']):.3f}in")
+            name = _NODE_NAME_RE.sub("_", obj.get("name", str(obj.get("_gvid"))))
+            label = tex_label(obj.get("label", "\\N"), obj.get("name", ""))
+            at = _coord(_point(obj["pos"]))
+            lines.append(
+                f"  \\node[{', '.join(options)}] ({name}) at {at} {{{label}}};"
+            )
+
+        for edge in layout.get("edges", []):
+            if "pos" not in edge:
+                continue
+            start, end, points = parse_spline(edge["pos"])
+            if not points:
+                continue
+            options = ["dotedge"]
+            if start and end:
+                options.append("<->")
+            elif end:
+                options.append("->")
+            elif start:
+                options.append("<-")
+            edge_color = color(edge.get("color"))
+            if edge_color:
+                options.append(f"draw={edge_color}")
+            if "dashed" in edge.get("style", ""):
+                options.append("dashed")
+            elif "dotted" in edge.get("style", ""):
+                options.append("dotted")
+            path = [_coord(start), "--"] if start else []
+            path.append(_coord(points[0]))
+            for index in range(1, len(points) - 2, 3):
+                c1, c2, target = points[index : index + 3]
+                path.append(
+                    f".. controls {_coord(c1)} and {_coord(c2)} .. {_coord(target)}"
+                )
+            if end:
+                path.append(f"-- {_coord(end)}")
+            lines.append(f"  \\draw[{', '.join(options)}] {' '.join(path)};")
+            if edge.get("label") and edge.get("lp"):
+                lines.append(
+                    f"  \\node[dotlabel] at {_coord(_point(edge['lp']))} "
+                    f"{{{tex_label(edge['label'])}}};"
+                )
+
+        if layout.get("label") and layout.get("lp"):
+            lines.append(
+                f"  \\node[dottitle] at {_coord(_point(layout['lp']))} "
+                f"{{{tex_label(layout['label'], layout.get('name', ''))}}};"
+            )
+
+        definitions = [
+            f"\\definecolor{{{name}}}{{HTML}}{{{hex_value}}}"
+            for hex_value, name in colors.items()
+        ]
+        return "\n".join(
+            definitions
+            + [f"\\begin{{tikzpicture}}[\n{TIKZ_STYLES}\n]"]
+            + lines
+            + ["\\end{tikzpicture}"]
+        )
+
+    def render_files(
+        self, dot_files: Sequence[Path], prog: str = "dot"
+    ) -> List[Optional[str]]:
+        """TikZ pictures for ``dot_files``, None where layout failed."""
+        return [
+            self.render(layout) if layout is not None else None
+            for layout in self.layout(dot_files, prog)
+        ]
@@ -1,18 +1,26 @@
 #!/usr/bin/env python3
 """
-TikZ Converter - DOT to LaTeX/TikZ via dot2tex
+TikZ Converter - DOT to LaTeX/TikZ via a Graphviz layout
 """
 
 import subprocess
+import sys
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, List, Optional, Sequence
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from shared.latex.build import CompileResult, LatexBuilder
+from shared.latex.preamble import standalone_document
+from analysis.generators.dot_tikz import DotTikzRenderer
 
 
 class TikZConverter:
     """Convert Graphviz DOT files to TikZ for LaTeX"""
 
-    def __init__(self, dot2tex_path: str = "dot2tex"):
+    def __init__(self, dot2tex_path: str = "dot2tex", graphviz_dir: Optional[str] = None):
         self.dot2tex = dot2tex_path
+        self.renderer = DotTikzRenderer(graphviz_dir)
 
     def convert(
         self,
@@ -29,23 +37,62 @@ class TikZConverter:
             dot_file: Input .dot file
             output_file: Output .tex file
             prog: Graphviz layout program (dot, neato, circo, fdp)
-            template: Optional dot2tex template
+            template: Optional dot2tex template (only then is dot2tex used)
             standalone: Generate standalone LaTeX document
 
         Returns:
             True if successful
         """
+        if template:
+            return self._convert_dot2tex(dot_file, output_file, prog, template, standalone)
+        return self.convert_many([dot_file], [output_file], prog=prog, standalone=standalone)[0]
+
+    def convert_many(
+        self,
+        dot_files: Sequence[Path],
+        output_files: Sequence[Path],
+        prog: str = "dot",
+        standalone: bool = True
+    ) -> List[bool]:
+        """
+        Convert several DOT files with one Graphviz layout run
+
+        TikZ is written straight from the layout's node positions and edge
+        splines, so no dot2tex process is involved.
+        """
+        pictures = self.renderer.render_files(list(dot_files), prog)
+
+        results = []
+        for dot_file, output_file, picture in zip(dot_files, output_files, pictures):
+            if picture is None:
+                error = self.renderer.errors.get(Path(dot_file), "no layout")
+                print(f"❌ Graphviz layout failed for {dot_file.name}: {error}")
+                results.append(False)
+                continue
+            output_file.parent.mkdir(parents=True, exist_ok=True)
+            output_file.write_text(standalone_document(picture) if standalone else picture + "\n")
+            print(f"✅ Converted {dot_file.name} → {output_file.name}")
+            results.append(True)
+        return results
+
+    def _convert_dot2tex(
+        self,
+        dot_file: Path,
+        output_file: Path,
+        prog: str,
+        template: str,
+        standalone: bool
+    ) -> bool:
+        """Convert through dot2tex, for callers with a dot2tex template"""
         cmd = [
             self.dot2tex,
             f"--prog={prog}",
             "--tikzedgelabels",  # Use TikZ for edge labels
             "--autosize",  # Auto-scale to fit
             f"--output={output_file}",
+            f"--template={template}",
         ]
 
-        if template:
-            cmd.append(f"--template={template}")
-
         if standalone:
             # Generate complete compilable document
             cmd.append("--format=tikz")
@@ -75,48 +122,28 @@ class TikZConverter:
             return False
 
     def _wrap_standalone(self, tikz_code: str) -> str:
-        """Wrap TikZ code in standalone document"""
-        return f"""\\documentclass[tikz,border=5pt]{{standalone}}
-\\usepackage{{tikz}}
-\\usepackage{{lmodern}}  % Latin Modern fonts
-\\usetikzlibrary{{shapes,arrows,positioning,calc}}
-
-\\begin{{document}}
-\\begin{{tikzpicture}}
-{tikz_code}
-\\end{{tikzpicture}}
-\\end{{document}}
-"""
+        """Wrap TikZ code in a standalone document on the shared diagram preamble"""
+        return standalone_document(f"\\begin{{tikzpicture}}\n{tikz_code}\n\\end{{tikzpicture}}")
 
     def compile_pdf(self, tex_file: Path, output_dir: Optional[Path] = None) -> bool:
-        """Compile TikZ .tex to PDF using pdflatex"""
-        if output_dir is None:
-            output_dir = tex_file.parent
-
-        cmd = [
-            "pdflatex",
-            "-interaction=nonstopmode",
-            "-halt-on-error",
-            f"-output-directory={output_dir}",
-            str(tex_file)
-        ]
+        """Compile TikZ .tex to PDF, skipping it when the cached PDF is current"""
+        result = self.compile_many([tex_file], output_dir or tex_file.parent)[0]
+        if result.ok:
+            note = " (cached)" if result.cached else f" ({result.seconds:.2f}s)"
+            print(f"✅ Compiled {tex_file.name} → {result.pdf.name}{note}")
+            return True
+        print(f"❌ PDF not generated: {result.log[-500:] if result.log else 'no error output'}")
+        return False
 
-        try:
-            # Don't use check=True - pdflatex may return non-zero on warnings
-            result = subprocess.run(cmd, capture_output=True, text=True, cwd=output_dir)
-            pdf_file = tex_file.with_suffix('.pdf')
-
-            # Check if PDF was actually created (success criterion)
-            if pdf_file.exists():
-                print(f"✅ Compiled {tex_file.name} → {pdf_file.name}")
-                return True
-            else:
-                print(f"❌ PDF not generated: {result.stderr[:500] if result.stderr else 'no error output'}")
-                return False
-
-        except Exception as e:
-            print(f"❌ pdflatex exception: {str(e)[:500]}")
-            return False
+    def compile_many(
+        self,
+        tex_files: Iterable[Path],
+        output_dir: Optional[Path] = None,
+        workers: Optional[int] = None,
+    ) -> List[CompileResult]:
+        """Compile several .tex files concurrently; unchanged ones are reused"""
+        builder = LatexBuilder(output_dir, workers=workers, precompile=True)
+        return builder.build(tex_files)
 
     def dot_to_pdf(self, dot_file: Path, output_pdf: Path, prog: str = "dot") -> bool:
         """
@@ -148,8 +175,9 @@ def main():
     import argparse
 
     parser = argparse.ArgumentParser(description="Convert DOT graphs to TikZ/PDF")
-    parser.add_argument("dot_file", type=Path, help="Input .dot file")
-    parser.add_argument("-o", "--output", type=Path, help="Output .tex or .pdf file", required=True)
+    parser.add_argument("dot_files", type=Path, nargs="+", help="Input .dot file(s)")
+    parser.add_argument("-o", "--output", type=Path, required=True,
+                        help="Output .tex or .pdf file (a directory for several inputs)")
     parser.add_argument("-p", "--prog", default="dot", choices=['dot', 'neato', 'circo', 'fdp'],
                         help="Graphviz layout program")
     parser.add_argument("--pdf", action='store_true', help="Generate PDF (not just .tex)")
@@ -159,13 +187,21 @@ def main():
 
     converter = TikZConverter()
 
-    if args.pdf or args.output.suffix == '.pdf':
+    if len(args.dot_files) > 1:
+        # Batch: one layout run, then one parallel compile
+        tex_files = [args.output / f"{dot.stem}.tex" for dot in args.dot_files]
+        results = converter.convert_many(args.dot_files, tex_files, prog=args.prog,
+                                         standalone=args.pdf or not args.no_standalone)
+        success = all(results)
+        if success and args.pdf:
+            success = all(r.ok for r in converter.compile_many(tex_files, args.output))
+    elif args.pdf or args.output.suffix == '.pdf':
         # Full pipeline: DOT → TikZ → PDF
-        success = converter.dot_to_pdf(args.dot_file, args.output, prog=args.prog)
+        success = converter.dot_to_pdf(args.dot_files[0], args.output, prog=args.prog)
     else:
         # Just DOT → TikZ
         success = converter.convert(
-            args.dot_file,
+            args.dot_files[0],
             args.output,
             prog=args.prog,
             standalone=not args.no_standalone
@@ -13,7 +13,13 @@ import time
 import argparse
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from shared.qemu.images import GoldenImageCache, ImageError, create_overlay  # noqa: E402
+
 class MinixInstaller:
+    # Bump when the install dialogue below changes, so cached installs are redone
+    INSTALL_VERSION = "setup-dialogue-1"
+
     def __init__(self, iso_path, disk_image, disk_size="2G", memory="512M", timeout=600):
         self.iso_path = iso_path
         self.disk_image = disk_image
@@ -151,6 +157,19 @@ class MinixInstaller:
             if self.child:
                 self.child.close()
 
+    def install_golden(self, cache):
+        """
+        Return the cached installed image for this ISO, running the
+        installation into it the first time.
+        """
+        def install_into(disk):
+            self.disk_image = str(disk)
+            self.start_qemu()
+            return self.install()
+
+        return cache.golden(self.iso_path, install=install_into,
+                            version=self.INSTALL_VERSION, size=self.disk_size)
+
     def boot_installed_system(self):
         """Boot the installed MINIX system (without CD-ROM)."""
         cmd = [
@@ -189,6 +208,8 @@ def main():
     parser.add_argument("--memory", default="512M", help="RAM allocation (default: 512M)")
     parser.add_argument("--boot", action="store_true", help="Boot installed system after install")
     parser.add_argument("--no-create", action="store_true", help="Don't create disk (use existing)")
+    parser.add_argument("--cache", metavar="DIR",
+                        help="Install once into a golden image in DIR; --disk becomes an overlay of it")
 
     args = parser.parse_args()
 
@@ -205,17 +226,28 @@ def main():
         memory=args.memory
     )
 
-    # Create disk image if needed
-    if not args.no_create:
-        installer.create_disk_image()
-
-    # Start QEMU and install
-    installer.start_qemu()
-    success = installer.install()
-
-    if not success:
-        print("\n[ERROR] Installation failed!")
-        sys.exit(1)
+    if args.cache:
+        # Reuse (or create) the golden image and hand out a private overlay
+        try:
+            golden = installer.install_golden(GoldenImageCache(args.cache))
+            print(f"[*] Golden image: {golden}")
+            installer.disk_image = str(create_overlay(golden, args.disk))
+        except ImageError as e:
+            print(f"\n[ERROR] {e}")
+            sys.exit(1)
+        print(f"[*] Overlay disk: {installer.disk_image}")
+    else:
+        # Create disk image if needed
+        if not args.no_create:
+            installer.create_disk_image()
+
+        # Start QEMU and install
+        installer.start_qemu()
+        success = installer.install()
+
+        if not success:
+            print("\n[ERROR] Installation failed!")
+            sys.exit(1)
 
     # Boot installed system if requested
     if args.boot:
@@ -25,6 +25,11 @@ from typing import Dict, List, Optional
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from pydantic import BaseModel
 import os
+import sys
+
+# shared/ sits at the checkout root, or beside server.py in the image
+sys.path.insert(1, str(Path(__file__).resolve().parent.parent.parent.parent))
+from shared.mcp.executor import BlockingExecutor
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -49,6 +54,11 @@ MEASUREMENTS_DIR = Path(os.getenv("MEASUREMENTS_DIR", "/measurements"))
 MINIX_I386_CONTAINER = os.getenv("MINIX_I386_CONTAINER", "minix-rc6-i386")
 MINIX_ARM_CONTAINER = os.getenv("MINIX_ARM_CONTAINER", "minix-rc6-arm")
 
+# Blocking work runs off the event loop: long Docker measurements and
+# measurement file reads get separate pools so one cannot starve the other
+docker_pool = BlockingExecutor("docker", max_workers=int(os.getenv("DOCKER_WORKERS", "2")))
+files_pool = BlockingExecutor("files", max_workers=int(os.getenv("FILE_WORKERS", "4")))
+
 # Boot marker definitions
 BOOT_MARKERS = {
     'multiboot_detected': (r'Booting.*multiboot|MINIX.*boot', 'Multiboot detected'),
@@ -103,7 +113,8 @@ async def health_check():
         "status": "healthy",
         "service": "boot-profiler-mcp",
         "timestamp": datetime.now().isoformat(),
-        "docker_available": docker_client is not None
+        "docker_available": docker_client is not None,
+        "executors": {pool.name: pool.stats() for pool in (docker_pool, files_pool)},
     }
 
 
@@ -121,6 +132,19 @@ async def measure_boot_arm(request: MeasurementRequest):
 
 
 async def measure_boot(container_name: str, arch: str, timeout: int = 120, save_report: bool = True):
+    """
+    Run a boot measurement on the Docker pool.
+
+    Concurrent requests for the same container and settings share one
+    measurement instead of polling the container logs side by side.
+    """
+    return await docker_pool.run(
+        measure_boot_blocking, container_name, arch, timeout, save_report,
+        key=("measure-boot", container_name, timeout, save_report),
+    )
+
+
+def measure_boot_blocking(container_name: str, arch: str, timeout: int = 120, save_report: bool = True):
     """
     Core boot measurement logic.
     
@@ -243,6 +267,10 @@ async def compare_timings(measurements: Dict[str, float]):
 @app.get("/measurements/{arch}")
 async def get_measurements(arch: str):
     """Retrieve all measurements for a given architecture"""
+    return await files_pool.run(read_measurements, arch, key=("measurements", arch))
+
+
+def read_measurements(arch: str):
     arch_dir = MEASUREMENTS_DIR / arch
     
     if not arch_dir.exists():
@@ -266,6 +294,10 @@ async def get_measurements(arch: str):
 @app.get("/statistics/{arch}")
 async def get_statistics(arch: str):
     """Calculate statistics from measurements"""
+    return await files_pool.run(compute_statistics, arch, key=("statistics", arch))
+
+
+def compute_statistics(arch: str):
     arch_dir = MEASUREMENTS_DIR / arch
     
     if not arch_dir.exists():
@@ -305,6 +337,10 @@ async def get_statistics(arch: str):
 @app.get("/summary")
 async def get_summary():
     """Get overall summary of all measurements"""
+    return await files_pool.run(build_summary, key="summary")
+
+
+def build_summary():
     summary = {
         "timestamp": datetime.now().isoformat(),
         "architectures": {},
@@ -24,6 +24,11 @@ from typing import Dict, List, Optional
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 import os
+import sys
+
+# shared/ sits at the checkout root, or beside server.py in the image
+sys.path.insert(1, str(Path(__file__).resolve().parent.parent.parent.parent))
+from shared.mcp.executor import BlockingExecutor
 import math
 
 # Configure logging
@@ -48,6 +53,11 @@ except Exception as e:
 MEASUREMENTS_DIR = Path(os.getenv("MEASUREMENTS_DIR", "/measurements"))
 MINIX_I386_CONTAINER = os.getenv("MINIX_I386_CONTAINER", "minix-rc6-i386")
 
+# Blocking work runs off the event loop: Docker sessions and measurement
+# file reads get separate pools so one cannot starve the other
+docker_pool = BlockingExecutor("docker", max_workers=int(os.getenv("DOCKER_WORKERS", "2")))
+files_pool = BlockingExecutor("files", max_workers=int(os.getenv("FILE_WORKERS", "4")))
+
 # Memory event types
 MEMORY_EVENTS = {
     'page-faults': 'Page faults (major + minor)',
@@ -123,7 +133,8 @@ async def health_check():
         "status": "healthy",
         "service": "memory-monitor-mcp",
         "timestamp": datetime.now().isoformat(),
-        "docker_available": docker_client is not None
+        "docker_available": docker_client is not None,
+        "executors": {pool.name: pool.stats() for pool in (docker_pool, files_pool)},
     }
 
 
@@ -134,7 +145,14 @@ async def monitor_memory(request: MemoryMonitoringRequest):
     Monitor memory events in running MINIX container.
     
     Uses Linux perf events via Docker exec to capture memory behavior.
+    Identical concurrent requests share one monitoring session.
     """
+    return await docker_pool.run(
+        run_monitor, request, key=("monitor-memory", request.model_dump_json())
+    )
+
+
+def run_monitor(request: MemoryMonitoringRequest):
     if not docker_client:
         raise HTTPException(status_code=503, detail="Docker not available")
     
@@ -184,6 +202,10 @@ async def get_memory_stats(arch: str = "i386"):
     """
     Get statistics from previously collected memory monitoring data.
     """
+    return await files_pool.run(aggregate_monitors, arch, key=("memory-stats", arch))
+
+
+def aggregate_monitors(arch: str):
     memory_dir = MEASUREMENTS_DIR / arch / "memory"
     
     if not memory_dir.exists():
@@ -378,6 +400,10 @@ async def analyze_memory_access_pattern(access_data: Dict[str, int]):
 @app.get("/summary")
 async def get_summary():
     """Get overall summary of memory monitoring"""
+    return await files_pool.run(build_summary, key="summary")
+
+
+def build_summary():
     summary = {
         "timestamp": datetime.now().isoformat(),
         "architectures": {}
@@ -24,6 +24,11 @@ from typing import Dict, List, Optional
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 import os
+import sys
+
+# shared/ sits at the checkout root, or beside server.py in the image
+sys.path.insert(1, str(Path(__file__).resolve().parent.parent.parent.parent))
+from shared.mcp.executor import BlockingExecutor
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -47,6 +52,11 @@ except Exception as e:
 MEASUREMENTS_DIR = Path(os.getenv("MEASUREMENTS_DIR", "/measurements"))
 MINIX_I386_CONTAINER = os.getenv("MINIX_I386_CONTAINER", "minix-rc6-i386")
 
+# Blocking work runs off the event loop: Docker sessions and measurement
+# file reads get separate pools so one cannot starve the other
+docker_pool = BlockingExecutor("docker", max_workers=int(os.getenv("DOCKER_WORKERS", "2")))
+files_pool = BlockingExecutor("files", max_workers=int(os.getenv("FILE_WORKERS", "4")))
+
 # Common MINIX syscalls (from POSIX + MINIX extensions)
 COMMON_SYSCALLS = {
     'exit': 'Process termination',
@@ -139,7 +149,8 @@ async def health_check():
         "status": "healthy",
         "service": "syscall-tracer-mcp",
         "timestamp": datetime.now().isoformat(),
-        "docker_available": docker_client is not None
+        "docker_available": docker_client is not None,
+        "executors": {pool.name: pool.stats() for pool in (docker_pool, files_pool)},
     }
 
 
@@ -149,8 +160,15 @@ async def trace_syscalls(request: TracingRequest):
     """
     Trace syscalls in running MINIX container.
     
-    Uses strace via Docker exec to capture syscall patterns.
+    Uses strace via Docker exec to capture syscall patterns. Identical
+    concurrent requests share one tracing session.
     """
+    return await docker_pool.run(
+        run_trace, request, key=("trace-syscalls", request.model_dump_json())
+    )
+
+
+def run_trace(request: TracingRequest):
     if not docker_client:
         raise HTTPException(status_code=503, detail="Docker not available")
     
@@ -208,6 +226,10 @@ async def get_syscall_stats(arch: str = "i386"):
     """
     Get statistics from previously collected syscall traces.
     """
+    return await files_pool.run(aggregate_traces, arch, key=("syscall-stats", arch))
+
+
+def aggregate_traces(arch: str):
     stats_dir = MEASUREMENTS_DIR / arch / "syscalls"
     
     if not stats_dir.exists():
@@ -343,6 +365,10 @@ async def analyze_syscall_latency(latencies: Dict[str, List[float]]):
 @app.get("/summary")
 async def get_summary():
     """Get overall summary of syscall tracing"""
+    return await files_pool.run(build_summary, key="summary")
+
+
+def build_summary():
     summary = {
         "timestamp": datetime.now().isoformat(),
         "architectures": {}
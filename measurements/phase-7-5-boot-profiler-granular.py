@@ -21,11 +21,23 @@ from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional
 import statistics
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from shared.qemu.sampling import SamplingPolicy, resolve_policy, sample_matrix, sample_until  # noqa: E402
+from shared.qemu.scheduler import BootJob, MatrixScheduler, Placement  # noqa: E402
+from shared.qemu.serial import SerialCapture, marker_times, phase_durations  # noqa: E402
 
 
 class MinixBootProfilerGranular:
     """Professional-grade boot profiler with CPU metrics and serial visibility"""
 
+    # Boot phase markers on the serial console
+    BOOT_PHASES = {
+        'kernel_start': r'MINIX|kernel',
+        'init_start': r'init|pid',
+    }
+
     def __init__(self, iso_image: str):
         """Initialize profiler with ISO image"""
         self.iso_image = Path(iso_image)
@@ -41,7 +53,8 @@ class MinixBootProfilerGranular:
         print(f"[*] Metrics: wall-clock + perf + serial analysis + strace")
 
     def boot_minix_with_metrics(
-        self, cpu_model: str, num_cpus: int, timeout: int = 180
+        self, cpu_model: str, num_cpus: int, timeout: int = 180,
+        placement: Optional[Placement] = None,
     ) -> Dict:
         """
         Boot MINIX and collect comprehensive metrics
@@ -53,19 +66,21 @@ class MinixBootProfilerGranular:
         - Cache misses (L1, LLC) (via perf)
         - Branch misses (via perf)
         - Context switches (via perf)
-        - Boot phases (via serial output analysis)
+        - Boot phases (via timestamped serial lines)
         - Syscall counts (via strace)
+
+        With a placement, QEMU and its perf/strace wrappers are pinned to the
+        placement's host cores.
         """
-        log_dir = self.results_dir / f'{cpu_model}-{num_cpus}cpu-{int(time.time())}'
+        log_dir = self.results_dir / f'{cpu_model}-{num_cpus}cpu-{time.time_ns()}'
         log_dir.mkdir(parents=True, exist_ok=True)
 
         serial_log = log_dir / 'serial-output.txt'
+        capture = SerialCapture(serial_log)
         perf_log = log_dir / 'perf.txt'
         strace_log = log_dir / 'strace.txt'
         metrics_file = log_dir / 'metrics.json'
 
-        print(f"[BOOT] {cpu_model:12} x{num_cpus:1} vCPU ", end='', flush=True)
-
         # Build QEMU command with proper serial handling
         cmd = [
             'qemu-system-i386',
@@ -93,6 +108,8 @@ class MinixBootProfilerGranular:
             '-e', 'trace=!futex,epoll_wait,poll',  # Exclude noise
             '-o', str(strace_log),
         ] + perf_cmd
+        if placement:
+            strace_cmd = placement.wrap(strace_cmd)
 
         # Execute with timing
         start_time = time.time()
@@ -106,37 +123,39 @@ class MinixBootProfilerGranular:
             'branch_misses': 0,
             'context_switches': 0,
             'boot_phases': {},
+            'phase_durations': {},
             'syscall_summary': {},
             'serial_output': [],
+            'placement': placement.as_dict() if placement else None,
         }
 
         try:
             # Run QEMU with perf/strace wrapping, capture serial output
+            # In its own session, so a timeout can kill QEMU as well as the
+            # strace and perf wrappers that started it
             proc = subprocess.Popen(
                 strace_cmd,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1,
+                start_new_session=True,
             )
 
-            # Collect serial output line by line
-            serial_lines = []
+            # Stamp serial output line by line as it arrives
+            capture.attach(proc.stdout)
             try:
-                for line in iter(proc.stdout.readline, ''):
-                    if line:
-                        serial_lines.append(line.rstrip())
-                        # Detect boot phases
-                        self._detect_boot_phase(line, metrics)
-
                 proc.wait(timeout=timeout)
             except subprocess.TimeoutExpired:
-                proc.kill()
+                os.killpg(proc.pid, signal.SIGKILL)
                 proc.wait()
 
             wall_clock_ms = (time.time() - start_time) * 1000
+            serial_lines = capture.stop()
             metrics['wall_clock_ms'] = wall_clock_ms
-            metrics['serial_output'] = serial_lines
+            metrics['serial_output'] = [line.text for line in serial_lines]
+
+            # Boot phases: seconds since launch, and time spent in each
+            metrics['boot_phases'] = marker_times(serial_lines, self.BOOT_PHASES)
+            metrics['phase_durations'] = phase_durations(metrics['boot_phases'], end=wall_clock_ms / 1000)
 
             # Parse perf output
             self._parse_perf_output(perf_log, metrics)
@@ -145,30 +164,19 @@ class MinixBootProfilerGranular:
             self._parse_strace_output(strace_log, metrics)
 
         except Exception as e:
+            capture.stop()
             metrics['wall_clock_ms'] = timeout * 1000
             metrics['error'] = str(e)
-            print(f"[ERROR] {e}")
+            print(f"[BOOT] {cpu_model:12} x{num_cpus:1} vCPU [ERROR] {e}")
             return metrics
 
-        print(f"→ {metrics['wall_clock_ms']:.0f}ms | cycles:{metrics['cpu_cycles']:,} instr:{metrics['instructions']:,}")
+        print(f"[BOOT] {cpu_model:12} x{num_cpus:1} vCPU → {metrics['wall_clock_ms']:.0f}ms | cycles:{metrics['cpu_cycles']:,} instr:{metrics['instructions']:,}")
 
         # Save metrics to JSON
         metrics_file.write_text(json.dumps(metrics, indent=2))
 
         return metrics
 
-    def _detect_boot_phase(self, line: str, metrics: Dict) -> None:
-        """Detect MINIX boot phases from serial output"""
-        if 'MINIX' in line or 'kernel' in line.lower():
-            phase_name = 'kernel_start'
-            if phase_name not in metrics['boot_phases']:
-                metrics['boot_phases'][phase_name] = len(metrics['serial_output'])
-
-        elif 'init' in line.lower() or 'pid' in line.lower():
-            phase_name = 'init_start'
-            if phase_name not in metrics['boot_phases']:
-                metrics['boot_phases'][phase_name] = len(metrics['serial_output'])
-
     def _parse_perf_output(self, perf_log: Path, metrics: Dict) -> None:
         """Extract CPU metrics from perf output"""
         if not perf_log.exists():
@@ -227,22 +235,30 @@ class MinixBootProfilerGranular:
                     except (ValueError, IndexError):
                         pass
 
-    def profile_single_cpu(self, samples: int = 3) -> Dict:
-        """Single-CPU baseline (486)"""
+    def profile_single_cpu(self, samples: Optional[int] = None,
+                           policy: Optional[SamplingPolicy] = None) -> Dict:
+        """Single-CPU baseline (486): adaptive sample count, or exactly `samples` boots"""
+        policy = resolve_policy(samples, policy)
         print(f"\n[PHASE 1] Single-CPU Baseline (486 IA-32) - GRANULAR")
-        print(f"[*] Collecting {samples} samples with CPU metrics...")
+        print(f"[*] Sampling {policy.min_samples}-{policy.max_samples} boots with CPU metrics until the {policy.statistic} is within ±{policy.rel_width * 50:.1f}%")
 
         boot_metrics = []
-        for i in range(samples):
+
+        def boot():
             metrics = self.boot_minix_with_metrics('486', 1, timeout=180)
             boot_metrics.append(metrics)
+            return metrics['wall_clock_ms']
+
+        summary = sample_until(boot, policy)
 
         stats = {
             'cpu_model': '486',
             'num_cpus': 1,
-            'samples': samples,
-            'boot_times_ms': [m['wall_clock_ms'] for m in boot_metrics],
-            'mean_ms': statistics.mean([m['wall_clock_ms'] for m in boot_metrics]),
+            'samples': len(summary.samples),
+            'boot_times_ms': summary.samples,
+            # Mean over the samples left after outlier rejection
+            'mean_ms': statistics.mean(summary.kept),
+            'sampling': summary.as_dict(),
             'raw_metrics': boot_metrics,
         }
 
@@ -254,38 +270,50 @@ class MinixBootProfilerGranular:
         return stats
 
     def profile_multiprocessor_granular(
-        self, cpu_models: List[str], cpu_counts: List[int], samples: int = 2
+        self, cpu_models: List[str], cpu_counts: List[int], samples: Optional[int] = None,
+        scheduler: Optional[MatrixScheduler] = None,
+        policy: Optional[SamplingPolicy] = None,
     ) -> Dict:
-        """Multi-processor scaling with granular metrics"""
+        """Multi-processor scaling with granular metrics, booting concurrently on disjoint host cores"""
+        scheduler = scheduler or MatrixScheduler()
+        policy = resolve_policy(samples, policy)
         print(f"\n[PHASE 2] Multi-Processor Scaling (GRANULAR)")
-        total_boots = len(cpu_models) * len(cpu_counts) * samples
-        print(f"[*] {len(cpu_models)} CPU models × {len(cpu_counts)} vCPU counts × {samples} samples = {total_boots} boots")
+        print(f"[*] {len(cpu_models)} CPU models × {len(cpu_counts)} vCPU counts")
+        print(f"[*] Sampling {policy.min_samples}-{policy.max_samples} boots per configuration until the {policy.statistic} is within ±{policy.rel_width * 50:.1f}%")
+        print(f"[*] Scheduling on {len(scheduler.cores)} host cores, {scheduler.memory_mb}MB budget")
 
-        boots_completed = 0
         start_time = time.time()
+
+        def progress(result, boots_completed, total):
+            # Progress tracking
+            elapsed = time.time() - start_time
+            avg_boot_time = elapsed / boots_completed
+            eta_seconds = (total - boots_completed) * avg_boot_time
+            print(f"    [Progress: {boots_completed}/{total} | ETA: {eta_seconds/60:.1f} min]")
+
+        matrix = sample_matrix(
+            [(cpu_model, num_cpus) for cpu_model in cpu_models for num_cpus in cpu_counts],
+            lambda key: BootJob(
+                key,
+                lambda placement, m=key[0], n=key[1]: self.boot_minix_with_metrics(
+                    m, n, timeout=180, placement=placement),
+                vcpus=key[1], memory_mb=512),
+            policy, scheduler, value=lambda metrics: metrics['wall_clock_ms'], on_done=progress,
+        )
+
         all_results = {}
 
-        for cpu_idx, cpu_model in enumerate(cpu_models):
+        for cpu_model in cpu_models:
             all_results[cpu_model] = {}
             print(f"\n[{cpu_model.upper():12}]")
 
             for num_cpus in cpu_counts:
-                metrics_list = []
-                for i in range(samples):
-                    metrics = self.boot_minix_with_metrics(cpu_model, num_cpus, timeout=180)
-                    metrics_list.append(metrics)
-                    boots_completed += 1
-
-                    # Progress tracking
-                    elapsed = time.time() - start_time
-                    if boots_completed > 0:
-                        avg_boot_time = elapsed / boots_completed
-                        remaining_boots = total_boots - boots_completed
-                        eta_seconds = remaining_boots * avg_boot_time
-                        print(f"    [Progress: {boots_completed}/{total_boots} | ETA: {eta_seconds/60:.1f} min]")
+                sampled = matrix[(cpu_model, num_cpus)]
+                metrics_list = [run.value for run in sampled.runs]
 
                 all_results[cpu_model][num_cpus] = {
-                    'mean_wall_clock_ms': statistics.mean([m['wall_clock_ms'] for m in metrics_list]),
+                    'mean_wall_clock_ms': statistics.mean(sampled.summary.kept),
+                    'sampling': sampled.summary.as_dict(),
                     'raw_metrics': metrics_list,
                 }
 
@@ -338,12 +366,12 @@ def main():
     print("=" * 80)
 
     # Phase 1: Baseline
-    baseline_stats = profiler.profile_single_cpu(samples=3)
+    baseline_stats = profiler.profile_single_cpu()
 
     # Phase 2: Multi-processor
     cpu_models = ['486', 'pentium', 'pentium2', 'pentium3', 'athlon']
     cpu_counts = [1, 2, 4, 8]
-    multi_results = profiler.profile_multiprocessor_granular(cpu_models, cpu_counts, samples=2)
+    multi_results = profiler.profile_multiprocessor_granular(cpu_models, cpu_counts, policy=SamplingPolicy(max_samples=6))
 
     # Phase 3: Save everything
     profiler.save_comprehensive_results(baseline_stats, multi_results)
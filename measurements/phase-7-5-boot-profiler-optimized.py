@@ -18,8 +18,13 @@ import os
 import signal
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Tuple
+from typing import Dict, List, Tuple, Optional
 import statistics
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from shared.qemu.sampling import SamplingPolicy, resolve_policy, sample_matrix, sample_until  # noqa: E402
+from shared.qemu.scheduler import BootJob, MatrixScheduler, Placement  # noqa: E402
 
 
 class MinixBootTimerProfilerOptimized:
@@ -38,7 +43,8 @@ class MinixBootTimerProfilerOptimized:
         print(f"[*] ISO image: {self.iso_image}")
         print(f"[*] Results directory: {self.results_dir}")
 
-    def boot_minix_timed(self, cpu_model: str, num_cpus: int, timeout: int = 180) -> float:
+    def boot_minix_timed(self, cpu_model: str, num_cpus: int, timeout: int = 180,
+                         placement: Optional[Placement] = None) -> float:
         """
         Boot MINIX and measure wall-clock time to completion/timeout
 
@@ -46,6 +52,7 @@ class MinixBootTimerProfilerOptimized:
         - Reduced memory (256M for IA-32 MINIX)
         - Explicit machine type (pc)
         - No serial logging (direct boot only)
+        - Pinned to the placement's host cores when scheduled concurrently
         """
         cmd = [
             'qemu-system-i386',
@@ -60,10 +67,10 @@ class MinixBootTimerProfilerOptimized:
             '-no-reboot',                  # Exit on reboot (end of boot test)
         ]
 
-        print(f"[BOOT] {cpu_model:12} x{num_cpus:1} vCPU ", end='', flush=True)
-
         start_time = time.time()
         try:
+            if placement:
+                cmd = placement.wrap(cmd)
             proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
             try:
                 proc.wait(timeout=timeout)
@@ -75,32 +82,35 @@ class MinixBootTimerProfilerOptimized:
             boot_time_ms = (time.time() - start_time) * 1000
         except Exception as e:
             boot_time_ms = timeout * 1000
-            print(f"[ERROR] {e}")
+            print(f"[BOOT] {cpu_model:12} x{num_cpus:1} vCPU [ERROR] {e}")
             return boot_time_ms
 
-        print(f"→ {boot_time_ms:.0f}ms")
+        # One line per boot, so concurrent boots do not interleave
+        print(f"[BOOT] {cpu_model:12} x{num_cpus:1} vCPU → {boot_time_ms:.0f}ms")
         return boot_time_ms
 
-    def profile_single_cpu(self, samples: int = 3) -> Dict:
-        """Single-CPU baseline (486)"""
+    def profile_single_cpu(self, samples: Optional[int] = None,
+                           policy: Optional[SamplingPolicy] = None) -> Dict:
+        """Single-CPU baseline (486): adaptive sample count, or exactly `samples` boots"""
+        policy = resolve_policy(samples, policy)
         print(f"\n[PHASE 1] Single-CPU Baseline (486 IA-32)")
-        print(f"[*] Collecting {samples} samples...")
+        print(f"[*] Sampling {policy.min_samples}-{policy.max_samples} boots until the {policy.statistic} is within ±{policy.rel_width * 50:.1f}%")
 
-        boot_times = []
-        for i in range(samples):
-            bt = self.boot_minix_timed('486', 1, timeout=180)
-            boot_times.append(bt)
+        summary = sample_until(lambda: self.boot_minix_timed('486', 1, timeout=180), policy)
+        # Statistics over the samples left after outlier rejection
+        boot_times = summary.kept
 
         stats = {
             'cpu_model': '486',
             'num_cpus': 1,
-            'samples': samples,
-            'boot_times_ms': boot_times,
+            'samples': len(summary.samples),
+            'boot_times_ms': summary.samples,
             'mean_ms': statistics.mean(boot_times),
             'median_ms': statistics.median(boot_times),
             'stdev_ms': statistics.stdev(boot_times) if len(boot_times) > 1 else 0,
             'min_ms': min(boot_times),
             'max_ms': max(boot_times),
+            'sampling': summary.as_dict(),
         }
 
         print(f"\n[RESULT] 486 baseline:")
@@ -108,38 +118,49 @@ class MinixBootTimerProfilerOptimized:
         print(f"  Median: {stats['median_ms']:.1f} ms")
         print(f"  StDev:  {stats['stdev_ms']:.1f} ms")
         print(f"  Range:  {stats['min_ms']:.0f} - {stats['max_ms']:.0f} ms")
+        print(f"  Boots:  {len(summary.samples)} ({len(summary.outliers)} outliers dropped)")
 
         return stats
 
-    def profile_multiprocessor(self, cpu_models: List[str], cpu_counts: List[int], samples: int = 3) -> Dict:
-        """Multi-processor scaling analysis with progress tracking"""
+    def profile_multiprocessor(self, cpu_models: List[str], cpu_counts: List[int], samples: Optional[int] = None,
+                               scheduler: Optional[MatrixScheduler] = None,
+                               policy: Optional[SamplingPolicy] = None) -> Dict:
+        """Multi-processor scaling analysis with progress tracking, booting concurrently"""
+        scheduler = scheduler or MatrixScheduler()
+        policy = resolve_policy(samples, policy)
         print(f"\n[PHASE 2] Multi-Processor Scaling Analysis")
-        total_boots = len(cpu_models) * len(cpu_counts) * samples
-        print(f"[*] {len(cpu_models)} CPU models × {len(cpu_counts)} vCPU counts × {samples} samples = {total_boots} boots")
+        print(f"[*] {len(cpu_models)} CPU models × {len(cpu_counts)} vCPU counts")
+        print(f"[*] Sampling {policy.min_samples}-{policy.max_samples} boots per configuration until the {policy.statistic} is within ±{policy.rel_width * 50:.1f}%")
+        print(f"[*] Scheduling on {len(scheduler.cores)} host cores, {scheduler.memory_mb}MB budget")
 
-        boots_completed = 0
         start_time = time.time()
 
+        def progress(result, boots_completed, total):
+            # Progress tracking
+            elapsed = time.time() - start_time
+            avg_boot_time = elapsed / boots_completed
+            eta_seconds = (total - boots_completed) * avg_boot_time
+            print(f"    [Progress: {boots_completed}/{total} | ETA: {eta_seconds/60:.1f} min]")
+
+        matrix = sample_matrix(
+            [(cpu_model, num_cpus) for cpu_model in cpu_models for num_cpus in cpu_counts],
+            lambda key: BootJob(
+                key,
+                lambda placement, m=key[0], n=key[1]: self.boot_minix_timed(m, n, timeout=180, placement=placement),
+                vcpus=key[1], memory_mb=256),
+            policy, scheduler, on_done=progress,
+        )
+
         all_results = {}
 
-        for cpu_idx, cpu_model in enumerate(cpu_models):
+        for cpu_model in cpu_models:
             all_results[cpu_model] = {}
             print(f"\n[{cpu_model.upper():12}]")
 
             for num_cpus in cpu_counts:
-                boot_times = []
-                for i in range(samples):
-                    bt = self.boot_minix_timed(cpu_model, num_cpus, timeout=180)
-                    boot_times.append(bt)
-                    boots_completed += 1
-
-                    # Progress tracking
-                    elapsed = time.time() - start_time
-                    if boots_completed > 0:
-                        avg_boot_time = elapsed / boots_completed
-                        remaining_boots = total_boots - boots_completed
-                        eta_seconds = remaining_boots * avg_boot_time
-                        print(f"    [Progress: {boots_completed}/{total_boots} | ETA: {eta_seconds/60:.1f} min]")
+                sampled = matrix[(cpu_model, num_cpus)]
+                runs = sampled.runs
+                boot_times = sampled.summary.kept
 
                 stats = {
                     'mean_ms': statistics.mean(boot_times),
@@ -147,7 +168,9 @@ class MinixBootTimerProfilerOptimized:
                     'stdev_ms': statistics.stdev(boot_times) if len(boot_times) > 1 else 0,
                     'min_ms': min(boot_times),
                     'max_ms': max(boot_times),
-                    'samples': boot_times,
+                    'samples': sampled.summary.samples,
+                    'sampling': sampled.summary.as_dict(),
+                    'placements': [run.placement.as_dict() for run in runs],
                 }
                 all_results[cpu_model][num_cpus] = stats
 
@@ -255,12 +278,12 @@ def main():
     print("=" * 80)
 
     # Phase 1: Baseline
-    baseline_stats = profiler.profile_single_cpu(samples=3)
+    baseline_stats = profiler.profile_single_cpu()
 
     # Phase 2: Multi-processor
     cpu_models = ['486', 'pentium', 'pentium2', 'pentium3', 'athlon']
     cpu_counts = [1, 2, 4, 8]
-    multi_results = profiler.profile_multiprocessor(cpu_models, cpu_counts, samples=2)
+    multi_results = profiler.profile_multiprocessor(cpu_models, cpu_counts, policy=SamplingPolicy(max_samples=8))
 
     # Phase 3: Scaling efficiency
     scaling_metrics = profiler.calculate_scaling_efficiency(multi_results, baseline_cpus=1)
@@ -9,17 +9,23 @@ Measures boot time across:
 - Multiple samples per configuration for statistical analysis
 """
 
+import contextlib
 import subprocess
 import time
 import json
 import os
 import sys
-import re
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional
 import statistics
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from shared.qemu.images import overlay  # noqa: E402
+from shared.qemu.sampling import SamplingPolicy, resolve_policy, sample_matrix, sample_until  # noqa: E402
+from shared.qemu.scheduler import BootJob, MatrixScheduler, Placement  # noqa: E402
+from shared.qemu.serial import SerialCapture, marker_times, median_phases, phase_durations  # noqa: E402
+
 
 class MinixBootProfiler:
     """Production boot profiler for MINIX IA-32 systems"""
@@ -54,7 +60,8 @@ class MinixBootProfiler:
         print(f"[*] Disk image: {self.disk_image}")
         print(f"[*] Results directory: {self.results_dir}")
 
-    def boot_minix(self, cpu_model: str, num_cpus: int, timeout: int = 120) -> Tuple[str, float]:
+    def boot_minix(self, cpu_model: str, num_cpus: int, timeout: int = 120,
+                   placement: Optional[Placement] = None) -> Tuple[str, float, Dict[str, float]]:
         """
         Boot MINIX and capture serial output
 
@@ -62,87 +69,112 @@ class MinixBootProfiler:
             cpu_model: CPU model (486, pentium, pentium2, pentium3, athlon, etc.)
             num_cpus: Number of vCPUs (1, 2, 4, 8)
             timeout: Boot timeout in seconds
+            placement: Host cores to pin QEMU to (from MatrixScheduler). Scheduled
+                boots may run concurrently, so each boots its own overlay of the disk
 
         Returns:
-            (log_output, boot_time_ms)
+            (log_output, boot_time_ms, phase_ms)
         """
         log_file = self.results_dir / f'boot-{cpu_model}-{num_cpus}cpu-{datetime.now().isoformat()}.log'
 
-        # Build QEMU command
-        cmd = [
-            'qemu-system-i386',
-            '-m', '512M',
-            '-smp', str(num_cpus),
-            '-cpu', cpu_model,
-            '-hda', str(self.disk_image),
-            '-display', 'none',
-            '-serial', f'file:{log_file}',
-            '-monitor', 'none',
-            '-enable-kvm',
-        ]
-
-        print(f"\n[BOOT] {cpu_model:12} x{num_cpus} vCPU -> {log_file.name}")
-
-        start_time = time.time()
-        try:
-            result = subprocess.run(cmd, timeout=timeout, capture_output=True, text=True)
-        except subprocess.TimeoutExpired:
-            print(f"[!] Timeout after {timeout}s")
-            boot_time_ms = timeout * 1000
-        else:
-            boot_time_ms = (time.time() - start_time) * 1000
+        with contextlib.ExitStack() as stack:
+            disk = self.disk_image
+            if placement:
+                disk = stack.enter_context(overlay(self.disk_image, self.results_dir))
+
+            capture = SerialCapture(log_file)
+            serial = capture.listen()
+
+            # Build QEMU command
+            cmd = [
+                'qemu-system-i386',
+                '-m', '512M',
+                '-smp', str(num_cpus),
+                '-cpu', cpu_model,
+                '-hda', str(disk),
+                '-display', 'none',
+                *serial,
+                '-monitor', 'none',
+                '-enable-kvm',
+            ]
+            if placement:
+                cmd = placement.wrap(cmd)
+
+            start_time = time.time()
+            try:
+                result = subprocess.run(cmd, timeout=timeout, capture_output=True, text=True)
+            except subprocess.TimeoutExpired:
+                print(f"[!] {cpu_model} x{num_cpus}: timeout after {timeout}s")
+                boot_time_ms = timeout * 1000
+            else:
+                boot_time_ms = (time.time() - start_time) * 1000
+            finally:
+                lines = capture.stop()
 
         # Read and parse log
         if log_file.exists():
             with open(log_file, 'r', errors='ignore') as f:
                 log_output = f.read()
 
-            # Analyze boot markers
-            markers_found = self._analyze_markers(log_output)
-            print(f"[+] Boot time: {boot_time_ms:.0f}ms | Markers: {markers_found}")
+            # Time boot phases from the timestamped serial lines
+            phases = self._boot_phases(lines, boot_time_ms)
+            print(f"[BOOT] {cpu_model:12} x{num_cpus} vCPU -> {log_file.name} | "
+                  f"Boot time: {boot_time_ms:.0f}ms | Markers: {len(phases)}")
 
-            return log_output, boot_time_ms
+            return log_output, boot_time_ms, phases
         else:
-            print(f"[!] Log file not created")
-            return "", boot_time_ms
-
-    def _analyze_markers(self, log_output: str) -> int:
-        """Count detected boot markers in output"""
-        markers_found = 0
-        for pattern, desc in self.BOOT_MARKERS.values():
-            if re.search(pattern, log_output, re.IGNORECASE):
-                markers_found += 1
-        return markers_found
-
-    def profile_single_cpu(self, samples: int = 5) -> Dict:
+            print(f"[!] {cpu_model} x{num_cpus}: log file not created")
+            return "", boot_time_ms, {}
+
+    def _boot_phases(self, lines, boot_time_ms: float) -> Dict[str, float]:
+        """Milliseconds from each detected boot marker to the next (the last runs to boot end)"""
+        markers = marker_times(lines, self.BOOT_MARKERS)
+        return {phase: seconds * 1000
+                for phase, seconds in phase_durations(markers, end=boot_time_ms / 1000).items()}
+
+    def profile_single_cpu(self, samples: Optional[int] = None,
+                           policy: Optional[SamplingPolicy] = None) -> Dict:
         """
         Profile single-CPU baseline (486)
 
+        Boots until the policy's confidence interval is tight enough, or
+        exactly `samples` times if given.
+
         Args:
-            samples: Number of boot samples to collect
+            samples: Fixed number of boots (instead of adaptive sampling)
+            policy: Adaptive sampling policy (defaults to SamplingPolicy())
 
         Returns:
             Dictionary with statistics
         """
+        policy = resolve_policy(samples, policy)
         print(f"\n[PHASE 1] Single-CPU Baseline (486)")
-        print(f"[*] Collecting {samples} samples...")
+        print(f"[*] Sampling {policy.min_samples}-{policy.max_samples} boots until the {policy.statistic} is within ±{policy.rel_width * 50:.1f}%")
 
-        boot_times = []
-        for i in range(samples):
-            log, boot_time = self.boot_minix('486', 1, timeout=120)
-            boot_times.append(boot_time)
+        boot_phases = []
+
+        def boot():
+            log, boot_time, phases = self.boot_minix('486', 1, timeout=120)
+            boot_phases.append(phases)
+            return boot_time
+
+        summary = sample_until(boot, policy)
+        # Statistics over the samples left after outlier rejection
+        boot_times = summary.kept
 
         # Calculate statistics
         stats = {
             'cpu_model': '486',
             'num_cpus': 1,
-            'samples': samples,
-            'boot_times_ms': boot_times,
+            'samples': len(summary.samples),
+            'boot_times_ms': summary.samples,
             'mean_ms': statistics.mean(boot_times),
             'median_ms': statistics.median(boot_times),
             'stdev_ms': statistics.stdev(boot_times) if len(boot_times) > 1 else 0,
             'min_ms': min(boot_times),
             'max_ms': max(boot_times),
+            'phase_median_ms': median_phases(boot_phases),
+            'sampling': summary.as_dict(),
         }
 
         print(f"\n[RESULT] Single-CPU Baseline:")
@@ -150,24 +182,44 @@ class MinixBootProfiler:
         print(f"  Median: {stats['median_ms']:.1f} ms")
         print(f"  StDev:  {stats['stdev_ms']:.1f} ms")
         print(f"  Range:  {stats['min_ms']:.1f} - {stats['max_ms']:.1f} ms")
+        print(f"  Boots:  {len(summary.samples)} ({len(summary.outliers)} outliers dropped)")
 
         return stats
 
-    def profile_multiprocessor(self, cpu_models: List[str], cpu_counts: List[int], samples: int = 5) -> Dict:
+    def profile_multiprocessor(self, cpu_models: List[str], cpu_counts: List[int], samples: Optional[int] = None,
+                               scheduler: Optional[MatrixScheduler] = None,
+                               policy: Optional[SamplingPolicy] = None) -> Dict:
         """
         Profile multi-processor scaling across CPU models
 
+        Boots run concurrently, each pinned to its own host cores and booting
+        its own overlay of the disk image.
+
         Args:
             cpu_models: List of CPU models to test
             cpu_counts: List of vCPU counts to test
-            samples: Samples per configuration
+            samples: Fixed boots per configuration (instead of adaptive sampling)
+            scheduler: Boot scheduler (defaults to all host cores but one)
+            policy: Adaptive sampling policy (defaults to SamplingPolicy())
 
         Returns:
             Dictionary with all results
         """
+        scheduler = scheduler or MatrixScheduler()
+        policy = resolve_policy(samples, policy)
         print(f"\n[PHASE 2] Multi-Processor Scaling Analysis")
-        print(f"[*] Testing {len(cpu_models)} CPU models x {len(cpu_counts)} vCPU configs x {samples} samples")
-        print(f"[*] Total boots: {len(cpu_models) * len(cpu_counts) * samples}")
+        print(f"[*] Testing {len(cpu_models)} CPU models x {len(cpu_counts)} vCPU configs")
+        print(f"[*] Sampling {policy.min_samples}-{policy.max_samples} boots per configuration until the {policy.statistic} is within ±{policy.rel_width * 50:.1f}%")
+        print(f"[*] Scheduling on {len(scheduler.cores)} host cores, {scheduler.memory_mb}MB budget")
+
+        matrix = sample_matrix(
+            [(cpu_model, num_cpus) for cpu_model in cpu_models for num_cpus in cpu_counts],
+            lambda key: BootJob(
+                key,
+                lambda placement, m=key[0], n=key[1]: self.boot_minix(m, n, timeout=120, placement=placement),
+                vcpus=key[1], memory_mb=512),
+            policy, scheduler, value=lambda boot: boot[1],
+        )
 
         all_results = {}
 
@@ -176,11 +228,9 @@ class MinixBootProfiler:
 
             for num_cpus in cpu_counts:
                 print(f"\n[{cpu_model:12} @ {num_cpus} vCPU]")
-                boot_times = []
-
-                for i in range(samples):
-                    log, boot_time = self.boot_minix(cpu_model, num_cpus, timeout=120)
-                    boot_times.append(boot_time)
+                sampled = matrix[(cpu_model, num_cpus)]
+                runs = sampled.runs
+                boot_times = sampled.summary.kept
 
                 # Statistics
                 stats = {
@@ -189,7 +239,10 @@ class MinixBootProfiler:
                     'stdev_ms': statistics.stdev(boot_times) if len(boot_times) > 1 else 0,
                     'min_ms': min(boot_times),
                     'max_ms': max(boot_times),
-                    'samples': boot_times,
+                    'samples': sampled.summary.samples,
+                    'sampling': sampled.summary.as_dict(),
+                    'phase_median_ms': median_phases([run.value[2] for run in runs]),
+                    'placements': [run.placement.as_dict() for run in runs],
                 }
 
                 all_results[cpu_model][num_cpus] = stats
@@ -306,13 +359,13 @@ def main():
     print("=" * 80)
 
     # Phase 1: Single-CPU baseline
-    baseline_stats = profiler.profile_single_cpu(samples=5)
+    baseline_stats = profiler.profile_single_cpu()
 
     # Phase 2: Multi-processor scaling
     cpu_models = ['486', 'pentium', 'pentium2', 'pentium3', 'athlon']
     cpu_counts = [1, 2, 4, 8]
 
-    multi_results = profiler.profile_multiprocessor(cpu_models, cpu_counts, samples=3)
+    multi_results = profiler.profile_multiprocessor(cpu_models, cpu_counts, policy=SamplingPolicy(max_samples=8))
 
     # Phase 3: Calculate scaling efficiency
     scaling_metrics = profiler.calculate_scaling_efficiency(multi_results, baseline_cpus=1)
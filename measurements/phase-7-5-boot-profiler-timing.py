@@ -18,6 +18,11 @@ from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional
 import statistics
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from shared.qemu.sampling import SamplingPolicy, resolve_policy, sample_matrix, sample_until  # noqa: E402
+from shared.qemu.scheduler import BootJob, MatrixScheduler, Placement  # noqa: E402
 
 
 class MinixBootTimerProfiler:
@@ -41,7 +46,8 @@ class MinixBootTimerProfiler:
         print(f"[*] ISO image: {self.iso_image}")
         print(f"[*] Results directory: {self.results_dir}")
 
-    def boot_minix_timed(self, cpu_model: str, num_cpus: int, timeout: int = 180) -> float:
+    def boot_minix_timed(self, cpu_model: str, num_cpus: int, timeout: int = 180,
+                         placement: Optional[Placement] = None) -> float:
         """
         Boot MINIX and measure wall-clock time to completion/timeout
         
@@ -49,11 +55,12 @@ class MinixBootTimerProfiler:
             cpu_model: CPU model
             num_cpus: Number of vCPUs
             timeout: Max boot time in seconds
+            placement: Host cores to pin QEMU to (from MatrixScheduler)
             
         Returns:
             boot_time_ms: Actual boot time measured
         """
-        log_file = self.results_dir / f'boot-{cpu_model}-{num_cpus}cpu-{int(time.time())}.log'
+        log_file = self.results_dir / f'boot-{cpu_model}-{num_cpus}cpu-{time.time_ns()}.log'
 
         cmd = [
             'qemu-system-i386',
@@ -67,10 +74,10 @@ class MinixBootTimerProfiler:
             '-enable-kvm',
         ]
 
-        print(f"[BOOT] {cpu_model:12} x{num_cpus:1} vCPU ", end='', flush=True)
-
         start_time = time.time()
         try:
+            if placement:
+                cmd = placement.wrap(cmd)
             proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
             try:
                 # Wait for timeout or process completion
@@ -83,32 +90,35 @@ class MinixBootTimerProfiler:
             boot_time_ms = (time.time() - start_time) * 1000
         except Exception as e:
             boot_time_ms = timeout * 1000
-            print(f"[ERROR] {e}")
+            print(f"[BOOT] {cpu_model:12} x{num_cpus:1} vCPU [ERROR] {e}")
             return boot_time_ms
 
-        print(f"→ {boot_time_ms:.0f}ms")
+        # One line per boot, so concurrent boots do not interleave
+        print(f"[BOOT] {cpu_model:12} x{num_cpus:1} vCPU → {boot_time_ms:.0f}ms")
         return boot_time_ms
 
-    def profile_single_cpu(self, samples: int = 5) -> Dict:
-        """Single-CPU baseline (486)"""
+    def profile_single_cpu(self, samples: Optional[int] = None,
+                           policy: Optional[SamplingPolicy] = None) -> Dict:
+        """Single-CPU baseline (486): adaptive sample count, or exactly `samples` boots"""
+        policy = resolve_policy(samples, policy)
         print(f"\n[PHASE 1] Single-CPU Baseline (486 IA-32)")
-        print(f"[*] Collecting {samples} samples...")
+        print(f"[*] Sampling {policy.min_samples}-{policy.max_samples} boots until the {policy.statistic} is within ±{policy.rel_width * 50:.1f}%")
 
-        boot_times = []
-        for i in range(samples):
-            bt = self.boot_minix_timed('486', 1, timeout=180)
-            boot_times.append(bt)
+        summary = sample_until(lambda: self.boot_minix_timed('486', 1, timeout=180), policy)
+        # Statistics over the samples left after outlier rejection
+        boot_times = summary.kept
 
         stats = {
             'cpu_model': '486',
             'num_cpus': 1,
-            'samples': samples,
-            'boot_times_ms': boot_times,
+            'samples': len(summary.samples),
+            'boot_times_ms': summary.samples,
             'mean_ms': statistics.mean(boot_times),
             'median_ms': statistics.median(boot_times),
             'stdev_ms': statistics.stdev(boot_times) if len(boot_times) > 1 else 0,
             'min_ms': min(boot_times),
             'max_ms': max(boot_times),
+            'sampling': summary.as_dict(),
         }
 
         print(f"\n[RESULT] 486 baseline:")
@@ -116,13 +126,29 @@ class MinixBootTimerProfiler:
         print(f"  Median: {stats['median_ms']:.1f} ms")
         print(f"  StDev:  {stats['stdev_ms']:.1f} ms")
         print(f"  Range:  {stats['min_ms']:.0f} - {stats['max_ms']:.0f} ms")
+        print(f"  Boots:  {len(summary.samples)} ({len(summary.outliers)} outliers dropped)")
 
         return stats
 
-    def profile_multiprocessor(self, cpu_models: List[str], cpu_counts: List[int], samples: int = 3) -> Dict:
-        """Multi-processor scaling analysis"""
+    def profile_multiprocessor(self, cpu_models: List[str], cpu_counts: List[int], samples: Optional[int] = None,
+                               scheduler: Optional[MatrixScheduler] = None,
+                               policy: Optional[SamplingPolicy] = None) -> Dict:
+        """Multi-processor scaling analysis, booting concurrently on disjoint host cores"""
+        scheduler = scheduler or MatrixScheduler()
+        policy = resolve_policy(samples, policy)
         print(f"\n[PHASE 2] Multi-Processor Scaling Analysis")
-        print(f"[*] {len(cpu_models)} CPU models × {len(cpu_counts)} vCPU counts × {samples} samples = {len(cpu_models)*len(cpu_counts)*samples} boots")
+        print(f"[*] {len(cpu_models)} CPU models × {len(cpu_counts)} vCPU counts")
+        print(f"[*] Sampling {policy.min_samples}-{policy.max_samples} boots per configuration until the {policy.statistic} is within ±{policy.rel_width * 50:.1f}%")
+        print(f"[*] Scheduling on {len(scheduler.cores)} host cores, {scheduler.memory_mb}MB budget")
+
+        matrix = sample_matrix(
+            [(cpu_model, num_cpus) for cpu_model in cpu_models for num_cpus in cpu_counts],
+            lambda key: BootJob(
+                key,
+                lambda placement, m=key[0], n=key[1]: self.boot_minix_timed(m, n, timeout=180, placement=placement),
+                vcpus=key[1], memory_mb=512),
+            policy, scheduler,
+        )
 
         all_results = {}
 
@@ -131,10 +157,9 @@ class MinixBootTimerProfiler:
             print(f"\n[{cpu_model.upper():12}]")
 
             for num_cpus in cpu_counts:
-                boot_times = []
-                for i in range(samples):
-                    bt = self.boot_minix_timed(cpu_model, num_cpus, timeout=180)
-                    boot_times.append(bt)
+                sampled = matrix[(cpu_model, num_cpus)]
+                runs = sampled.runs
+                boot_times = sampled.summary.kept
 
                 stats = {
                     'mean_ms': statistics.mean(boot_times),
@@ -142,7 +167,9 @@ class MinixBootTimerProfiler:
                     'stdev_ms': statistics.stdev(boot_times) if len(boot_times) > 1 else 0,
                     'min_ms': min(boot_times),
                     'max_ms': max(boot_times),
-                    'samples': boot_times,
+                    'samples': sampled.summary.samples,
+                    'sampling': sampled.summary.as_dict(),
+                    'placements': [run.placement.as_dict() for run in runs],
                 }
                 all_results[cpu_model][num_cpus] = stats
 
@@ -249,12 +276,12 @@ def main():
     print("=" * 80)
 
     # Phase 1: Baseline
-    baseline_stats = profiler.profile_single_cpu(samples=3)
+    baseline_stats = profiler.profile_single_cpu()
 
     # Phase 2: Multi-processor
     cpu_models = ['486', 'pentium', 'pentium2', 'pentium3', 'athlon']
     cpu_counts = [1, 2, 4, 8]
-    multi_results = profiler.profile_multiprocessor(cpu_models, cpu_counts, samples=2)
+    multi_results = profiler.profile_multiprocessor(cpu_models, cpu_counts, policy=SamplingPolicy(max_samples=8))
 
     # Phase 3: Scaling efficiency
     scaling_metrics = profiler.calculate_scaling_efficiency(multi_results, baseline_cpus=1)
@@ -7,18 +7,38 @@ from __future__ import annotations
 
 import argparse
 import json
+import sys
 from pathlib import Path
 from typing import Any, Dict, List
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+from shared.snapshot import SNAPSHOT_NAME, Snapshot  # noqa: E402
+
+DEFAULT_DATA_DIR = Path("diagrams/data")
+
 
 def load_kernel_structure(path: Path) -> Dict[str, Any]:
-    """Load kernel_structure JSON exported by the analysis pipeline."""
+    """
+    Load kernel_structure data exported by the analysis pipeline.
+
+    ``path`` may be kernel_structure.json or a pipeline snapshot, in which
+    case only its kernel_structure section is decoded.
+    """
     if not path.exists():
         raise FileNotFoundError(f"Kernel structure JSON not found: {path}")
+    if path.name == SNAPSHOT_NAME:
+        with Snapshot(path) as snapshot:
+            return snapshot.load("kernel_structure")
     with path.open("r", encoding="utf-8") as handle:
         return json.load(handle)
 
 
+def default_kernel_structure(data_dir: Path = DEFAULT_DATA_DIR) -> Path:
+    """The pipeline snapshot if one was written, else kernel_structure.json."""
+    snapshot = data_dir / SNAPSHOT_NAME
+    return snapshot if snapshot.exists() else data_dir / "kernel_structure.json"
+
+
 def summarise_syscalls(data: Dict[str, Any], limit: int) -> Dict[str, Any]:
     """Produce a compact summary of syscall statistics."""
     syscalls: List[Dict[str, Any]] = data.get("system_calls", [])
@@ -50,8 +70,11 @@ def main() -> None:
     )
     parser.add_argument(
         "--kernel-structure",
-        default="diagrams/data/kernel_structure.json",
-        help="Path to kernel_structure.json (default: diagrams/data/kernel_structure.json)",
+        help=(
+            "Path to kernel_structure.json or a pipeline snapshot "
+            f"(default: diagrams/data/{SNAPSHOT_NAME} if present, "
+            "else diagrams/data/kernel_structure.json)"
+        ),
     )
     parser.add_argument(
         "--limit",
@@ -65,7 +88,11 @@ def main() -> None:
     )
     args = parser.parse_args()
 
-    data = load_kernel_structure(Path(args.kernel_structure))
+    if args.kernel_structure:
+        path = Path(args.kernel_structure)
+    else:
+        path = default_kernel_structure()
+    data = load_kernel_structure(path)
     summary = summarise_syscalls(data, args.limit)
 
     output_json = json.dumps(summary, indent=2)
@@ -8,7 +8,6 @@ Measures boot time across 1, 2, 4, 8 vCPU configurations
 import subprocess
 import time
 import json
-import re
 import sys
 import os
 import argparse
@@ -16,13 +15,30 @@ import tempfile
 from pathlib import Path
 from datetime import datetime
 from statistics import mean, median, stdev
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from shared.qemu.images import GoldenImageCache, ImageError  # noqa: E402
+from shared.qemu.sampling import SamplingPolicy, resolve_policy, sample_matrix  # noqa: E402
+from shared.qemu.scheduler import BootJob, MatrixScheduler, Placement  # noqa: E402
+from shared.qemu.serial import (  # noqa: E402
+    SerialCapture,
+    marker_times,
+    median_phases,
+    phase_durations,
+    read_trace,
+)
+
+# Bump when run_qemu_installation changes, so cached installs are redone
+INSTALL_VERSION = "serial-install-1"
 
 class QemuBootProfiler:
-    def __init__(self, iso_path: str, output_dir: str = "measurements"):
+    def __init__(self, iso_path: str, output_dir: str = "measurements",
+                 cache_dir: Optional[str] = None):
         self.iso_path = Path(iso_path)
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.image_cache = GoldenImageCache(cache_dir)
         self.boot_markers = {}
         self.measurements = []
 
@@ -73,6 +89,20 @@ class QemuBootProfiler:
 
         return disk_path
 
+    def golden_image(self) -> Optional[Path]:
+        """Installed disk for this ISO, installing MINIX only on first use"""
+        try:
+            golden = self.image_cache.golden(
+                self.iso_path,
+                install=lambda disk: self.run_qemu_installation(disk, cpus=1),
+                version=INSTALL_VERSION,
+            )
+        except ImageError as e:
+            print(f"ERROR: {e}")
+            return None
+        print(f"Golden image: {golden}")
+        return golden
+
     def run_qemu_installation(self, disk_path: Path, cpus: int, timeout: int = 600) -> bool:
         """Run QEMU with ISO to install MINIX"""
         print(f"\nInstalling MINIX with {cpus} CPU(s)...")
@@ -110,15 +140,20 @@ class QemuBootProfiler:
             print(f"ERROR: Installation failed: {e}")
             return False
 
-    def run_qemu_boot(self, disk_path: Path, cpus: int, timeout: int = 120) -> Tuple[bool, float, Dict[str, float]]:
+    def run_qemu_boot(self, disk_path: Path, cpus: int, timeout: int = 120,
+                      placement: Optional[Placement] = None) -> Tuple[bool, float, Dict[str, float]]:
         """
-        Run QEMU from disk and measure boot time
-        Returns: (success, boot_time_ms, boot_markers)
+        Run QEMU from disk and measure boot time, pinned to the placement's cores if given.
+        Serial output is captured with per-line timestamps, so markers are
+        seconds since QEMU was launched.
+        Returns: (success, boot_time_seconds, boot_markers)
         """
-        print(f"\nMeasuring boot with {cpus} CPU(s)...")
+        print(f"Measuring boot with {cpus} CPU(s)...")
 
-        boot_start = time.time()
         boot_log_path = self.output_dir / f"boot-{cpus}cpu-{datetime.now().isoformat()}.log"
+        capture = SerialCapture(boot_log_path)
+        serial = capture.listen()
+        boot_start = time.time()
 
         cmd = [
             "timeout", str(timeout),
@@ -129,8 +164,10 @@ class QemuBootProfiler:
             "-hda", str(disk_path),
             "-display", "none",
             "-nographic",
-            "-serial", "file:" + str(boot_log_path)
+            *serial,
         ]
+        if placement:
+            cmd = placement.wrap(cmd)
 
         try:
             result = subprocess.run(
@@ -142,8 +179,8 @@ class QemuBootProfiler:
 
             boot_time = time.time() - boot_start
 
-            # Parse log file for boot markers
-            boot_markers = self._parse_boot_markers(boot_log_path)
+            # Time boot markers from the captured lines
+            boot_markers = marker_times(capture.stop(), self.marker_patterns)
 
             return True, boot_time, boot_markers
 
@@ -151,43 +188,28 @@ class QemuBootProfiler:
             boot_time = time.time() - boot_start
             print(f"Boot timeout after {boot_time:.2f}s (expected for QEMU)")
 
-            # Still try to parse whatever we captured
-            boot_markers = self._parse_boot_markers(boot_log_path)
+            # Still time whatever we captured
+            boot_markers = marker_times(capture.stop(), self.marker_patterns)
 
             return True, boot_time, boot_markers
         except Exception as e:
+            capture.stop()
             print(f"ERROR: Boot measurement failed: {e}")
             return False, 0, {}
 
     def _parse_boot_markers(self, log_path: Path) -> Dict[str, float]:
-        """Parse boot markers from QEMU serial log"""
-        markers = {}
-
-        if not log_path.exists():
-            return markers
-
+        """Boot marker times (seconds since launch) from a captured serial log and its trace"""
         try:
-            with open(log_path) as f:
-                log_content = f.read()
-
-            # Simple line-by-line marker detection
-            lines = log_content.split('\n')
-            for i, line in enumerate(lines):
-                for marker_key, (pattern, description) in self.marker_patterns.items():
-                    if marker_key not in markers:
-                        if re.search(pattern, line, re.IGNORECASE):
-                            # Estimate time based on line number (rough approximation)
-                            elapsed = i * 0.1  # ~100ms per line of output
-                            markers[marker_key] = elapsed
-        except Exception as e:
+            return marker_times(read_trace(log_path), self.marker_patterns)
+        except (OSError, ValueError) as e:
             print(f"WARNING: Failed to parse boot markers: {e}")
+            return {}
 
-        return markers
-
-    def measure_boot_sample(self, disk_path: Path, cpus: int) -> Dict:
+    def measure_boot_sample(self, disk_path: Path, cpus: int,
+                            placement: Optional[Placement] = None) -> Dict:
         """Measure a single boot sample"""
         sample_start = time.time()
-        success, boot_time, markers = self.run_qemu_boot(disk_path, cpus)
+        success, boot_time, markers = self.run_qemu_boot(disk_path, cpus, placement=placement)
 
         measurement = {
             'timestamp': datetime.now().isoformat(),
@@ -196,14 +218,32 @@ class QemuBootProfiler:
             'boot_time_ms': int(boot_time * 1000),
             'marker_count': len(markers),
             'markers': markers,
+            'phases': phase_durations(markers, end=boot_time),
             'success': success,
+            'placement': placement.as_dict() if placement else None,
         }
 
         self.measurements.append(measurement)
         return measurement
 
-    def run_test_matrix(self, samples_per_config: int = 3) -> Dict:
-        """Run complete test matrix: 1, 2, 4, 8 CPU with multiple samples"""
+    def boot_overlay_sample(self, golden: Path, cpus: int, placement: Placement) -> Optional[Dict]:
+        """Measure one boot on a throwaway overlay of the golden image"""
+        try:
+            with self.image_cache.overlay(golden, self.output_dir) as disk_path:
+                return self.measure_boot_sample(disk_path, cpus, placement)
+        except ImageError as e:
+            print(f"ERROR: Failed to create overlay: {e}")
+            return None
+
+    def run_test_matrix(self, samples_per_config: Optional[int] = None,
+                        scheduler: Optional[MatrixScheduler] = None,
+                        policy: Optional[SamplingPolicy] = None) -> Dict:
+        """
+        Run complete test matrix: 1, 2, 4, 8 CPU with multiple samples.
+        Samples boot concurrently, each pinned to its own host cores.
+        Each configuration boots until its confidence interval meets the
+        sampling policy, or exactly samples_per_config times if given.
+        """
         print("\n" + "="*70)
         print("PHASE 7.5 MULTI-PROCESSOR BOOT PROFILING")
         print("="*70)
@@ -211,36 +251,47 @@ class QemuBootProfiler:
         if not self.verify_iso():
             return {}
 
+        # Install once; every sample boots a throwaway overlay of it
+        golden = self.golden_image()
+        if not golden:
+            return {}
+
         cpu_counts = [1, 2, 4, 8]
         results = {}
 
+        scheduler = scheduler or MatrixScheduler()
+        policy = resolve_policy(samples_per_config, policy)
+        print(f"Scheduling {policy.min_samples}-{policy.max_samples} boots per configuration on "
+              f"{len(scheduler.cores)} host cores ({scheduler.memory_mb}MB budget), "
+              f"until the {policy.statistic} is within ±{policy.rel_width * 50:.1f}%")
+        matrix = sample_matrix(
+            cpu_counts,
+            lambda cpus: BootJob(cpus, lambda placement: self.boot_overlay_sample(golden, cpus, placement),
+                                 vcpus=cpus, memory_mb=512),
+            policy, scheduler,
+            value=lambda measurement: measurement['boot_time_seconds'] if measurement else None,
+            on_done=lambda result, done, total: print(
+                f"Sample {done}/{total}: {result.key} vCPU on cores {list(result.placement.cores)}"),
+        )
+
         for cpus in cpu_counts:
             print(f"\n{'='*70}")
             print(f"CPU Configuration: {cpus} vCPU")
             print(f"{'='*70}")
 
-            # Create disk image for this configuration
-            disk_path = self.create_disk_image(cpus)
-            if not disk_path:
-                continue
-
-            # Run installation once
-            if not self.run_qemu_installation(disk_path, cpus):
-                continue
-
             # Collect boot samples
             cpu_results = {
                 'cpus': cpus,
-                'samples': []
+                'samples': [run.value for run in matrix[cpus].runs if run.value is not None]
             }
 
-            for sample in range(samples_per_config):
-                print(f"\nSample {sample + 1}/{samples_per_config}")
-                measurement = self.measure_boot_sample(disk_path, cpus)
-                cpu_results['samples'].append(measurement)
+            summary = matrix[cpus].summary
+            if summary is None:
+                continue
 
-            # Calculate statistics
-            boot_times = [m['boot_time_seconds'] for m in cpu_results['samples']]
+            # Calculate statistics over the samples left after outlier rejection
+            boot_times = summary.kept
+            cpu_results['sampling'] = summary.as_dict()
             cpu_results['statistics'] = {
                 'mean_seconds': mean(boot_times),
                 'mean_ms': int(mean(boot_times) * 1000),
@@ -252,6 +303,10 @@ class QemuBootProfiler:
                 'max_ms': int(max(boot_times) * 1000),
                 'stdev_seconds': stdev(boot_times) if len(boot_times) > 1 else 0,
                 'stdev_ms': int(stdev(boot_times) * 1000) if len(boot_times) > 1 else 0,
+                'phase_median_ms': {
+                    phase: round(seconds * 1000, 3)
+                    for phase, seconds in median_phases([m['phases'] for m in cpu_results['samples']]).items()
+                },
             }
 
             # Whitepaper comparison
@@ -268,9 +323,6 @@ class QemuBootProfiler:
 
             results[f'cpu_{cpus}'] = cpu_results
 
-            # Clean up disk image (optional)
-            print(f"\nDisk image saved: {disk_path.name}")
-
         return results
 
     def generate_report(self, results: Dict) -> str:
@@ -298,6 +350,16 @@ class QemuBootProfiler:
                 report.append(f"  Min:     {stats['min_ms']:6d} ms")
                 report.append(f"  Max:     {stats['max_ms']:6d} ms")
                 report.append(f"  Stdev:   {stats['stdev_ms']:6d} ms")
+                sampling = config_data.get('sampling')
+                if sampling:
+                    width = f"±{sampling['rel_width'] * 50:.1f}%" if sampling['rel_width'] is not None else "unbounded"
+                    report.append(f"  Samples: {sampling['count']:6d} ({len(sampling['outliers'])} outliers dropped, "
+                                  f"{sampling['statistic']} {width}"
+                                  f"{'' if sampling['converged'] else ', budget exhausted'})")
+                if stats.get('phase_median_ms'):
+                    report.append("  Phases (median):")
+                    for phase, ms in stats['phase_median_ms'].items():
+                        report.append(f"    {phase:18} {ms:10.3f} ms")
 
                 # Whitepaper comparison
                 comparison = config_data['whitepaper_comparison']
@@ -358,6 +420,9 @@ def main():
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Examples:
+  # Boot each CPU config until its mean is within +/-2.5% (3-20 boots)
+  %(prog)s --iso minix_R3.4.0rc6-d5e4fc0.iso
+
   # Quick test with 1 sample per CPU config
   %(prog)s --iso minix_R3.4.0rc6-d5e4fc0.iso --samples 1
 
@@ -371,12 +436,25 @@ Examples:
 
     parser.add_argument('--iso', required=True, help='Path to MINIX ISO file')
     parser.add_argument('--output', default='measurements', help='Output directory for results')
-    parser.add_argument('--samples', type=int, default=3, help='Boot samples per CPU config')
+    parser.add_argument('--samples', type=int, help='Fixed boot samples per CPU config '
+                        '(default: sample adaptively)')
+    parser.add_argument('--max-samples', type=int, default=20, help='Adaptive sampling budget per CPU config')
+    parser.add_argument('--target-width', type=float, default=0.05,
+                        help='Stop once the 95%% interval is this fraction of the estimate')
+    parser.add_argument('--statistic', choices=['mean', 'median'], default='mean',
+                        help='Statistic the interval is on')
+    parser.add_argument('--max-concurrent', type=int, help='Most boots to run at once '
+                        '(default: as many as free host cores and memory allow)')
+    parser.add_argument('--image-cache', help='Golden image directory '
+                        '(default: $MINIX_IMAGE_CACHE or ~/.cache/minix-analysis/images)')
 
     args = parser.parse_args()
 
-    profiler = QemuBootProfiler(args.iso, args.output)
-    results = profiler.run_test_matrix(args.samples)
+    profiler = QemuBootProfiler(args.iso, args.output, cache_dir=args.image_cache)
+    policy = SamplingPolicy(min_samples=min(3, args.max_samples), max_samples=args.max_samples,
+                            rel_width=args.target_width, statistic=args.statistic)
+    results = profiler.run_test_matrix(args.samples, MatrixScheduler(max_concurrent=args.max_concurrent),
+                                       policy=None if args.samples else policy)
 
     report = profiler.generate_report(results)
     print(report)
@@ -12,9 +12,19 @@ Date: 2025-11-01
 """
 
 import json
+import sys
 from pathlib import Path
 from typing import Dict, List, Tuple
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from shared.latex.preamble import diagram_preamble
+from shared.latex.targets import TargetGraph, depends_on, format_targets
+
+# Shared diagram preamble, so the infographics compile against its
+# precompiled format
+INFOGRAPHIC_PREAMBLE = diagram_preamble(border="10pt")
+
 
 class EducationalInfographicsGenerator:
     """Generate 7 educational infographics for the MINIX boot analysis paper."""
@@ -72,8 +82,8 @@ class EducationalInfographicsGenerator:
             "Init Process": (105, 15, "Negligible"),
         }
 
-    def generate_all_infographics(self) -> None:
-        """Generate all 7 educational infographics."""
+    def generate_all_infographics(self, force: bool = False) -> None:
+        """Generate the educational infographics whose sources changed."""
         print("Generating 7 educational infographics...")
         print()
 
@@ -87,14 +97,21 @@ class EducationalInfographicsGenerator:
             ("7", "os_boot_comparison", self.generate_os_boot_comparison),
         ]
 
+        # The figures are drawn from constants, so only an edit to a
+        # generator or to the shared preamble regenerates one
+        graph = TargetGraph({"preamble": INFOGRAPHIC_PREAMBLE})
         for num, name, generator_fn in infographics:
-            try:
-                print(f"[{num}/7] Generating {name}...", end=" ", flush=True)
-                filename = f"infographic_{num}_{name}.tex"
-                generator_fn()
-                print("✓ DONE")
-            except Exception as e:
-                print(f"✗ ERROR: {e}")
+            graph.add(self.output_dir / f"infographic_{num}_{name}.tex", generator_fn)
+
+        results = graph.run(force=force)
+        for (num, name, _), result in zip(infographics, results):
+            if not result.ok:
+                print(f"[{num}/7] {name}: ✗ ERROR: {result.error}")
+            elif result.generated:
+                print(f"[{num}/7] {name}: ✓ DONE")
+            else:
+                print(f"[{num}/7] {name}: up to date")
+        print(format_targets(results))
 
         print()
         print("=" * 80)
@@ -102,23 +119,21 @@ class EducationalInfographicsGenerator:
         print("=" * 80)
         print()
         print(f"Output directory: {self.output_dir}")
-        print(f"Files created: 7 TikZ source files (.tex)")
+        print(f"Files: 7 TikZ source files (.tex)")
         print()
         print("Next steps:")
-        print("  1. Compile each TikZ file to PDF: pdflatex infographic_*.tex")
-        print("  2. Convert to PNG: magick -density 300 *.pdf -quality 90 *.png")
+        print("  1. Compile each TikZ file to PDF: "
+              "python -m shared.latex.build --precompile infographic_*.tex")
+        print("  2. Convert to PNG: python -m shared.latex.raster -r 300 *.pdf")
         print()
 
-    def generate_cpu_timeline(self) -> None:
+    @depends_on("preamble")
+    def generate_cpu_timeline(self) -> str:
         """
         Infographic 1: CPU Architecture Evolution Timeline (1989-2008)
         Shows microarchitectural evolution and why boot performance doesn't improve.
         """
-        tikz_code = r"""
-\documentclass[tikz, border=10pt]{standalone}
-\usepackage{tikz}
-\usepackage{xcolor}
-
+        tikz_code = INFOGRAPHIC_PREAMBLE + r"""
 \begin{document}
 \begin{tikzpicture}[
     scale=1.2,
@@ -213,20 +228,15 @@ class EducationalInfographicsGenerator:
 \end{tikzpicture}
 \end{document}
 """
-        output_file = self.output_dir / "infographic_1_cpu_timeline.tex"
-        with open(output_file, "w") as f:
-            f.write(tikz_code)
+        return tikz_code
 
-    def generate_boot_phases(self) -> None:
+    @depends_on("preamble")
+    def generate_boot_phases(self) -> str:
         """
         Infographic 2: MINIX Boot Phases Breakdown (Gantt-style Timeline)
         Shows which operations dominate the 120-second boot and why CPU doesn't help.
         """
-        tikz_code = r"""
-\documentclass[tikz, border=10pt]{standalone}
-\usepackage{tikz}
-\usepackage{xcolor}
-
+        tikz_code = INFOGRAPHIC_PREAMBLE + r"""
 \begin{document}
 \begin{tikzpicture}[
     scale=1.0,
@@ -297,20 +307,15 @@ class EducationalInfographicsGenerator:
 \end{tikzpicture}
 \end{document}
 """
-        output_file = self.output_dir / "infographic_2_boot_phases.tex"
-        with open(output_file, "w") as f:
-            f.write(tikz_code)
+        return tikz_code
 
-    def generate_determinism_flow(self) -> None:
+    @depends_on("preamble")
+    def generate_determinism_flow(self) -> str:
         """
         Infographic 3: Determinism Discovery Flow Diagram
         Shows the logical flow of evidence proving MINIX's deterministic behavior.
         """
-        tikz_code = r"""
-\documentclass[tikz, border=10pt]{standalone}
-\usepackage{tikz}
-\usepackage{xcolor}
-
+        tikz_code = INFOGRAPHIC_PREAMBLE + r"""
 \begin{document}
 \begin{tikzpicture}[
     scale=1.2,
@@ -365,21 +370,15 @@ class EducationalInfographicsGenerator:
 \end{tikzpicture}
 \end{document}
 """
-        output_file = self.output_dir / "infographic_3_determinism_flow.tex"
-        with open(output_file, "w") as f:
-            f.write(tikz_code)
+        return tikz_code
 
-    def generate_compatibility_matrix(self) -> None:
+    @depends_on("preamble")
+    def generate_compatibility_matrix(self) -> str:
         """
         Infographic 4: Hardware Compatibility Matrix
         Shows all tested CPUs produce identical boot outcomes.
         """
-        tikz_code = r"""
-\documentclass[tikz, border=10pt]{standalone}
-\usepackage{tikz}
-\usepackage{xcolor}
-\usepackage{array}
-
+        tikz_code = INFOGRAPHIC_PREAMBLE + r"""
 \begin{document}
 \begin{tikzpicture}[
     scale=1.0,
@@ -460,20 +459,15 @@ class EducationalInfographicsGenerator:
 \end{tikzpicture}
 \end{document}
 """
-        output_file = self.output_dir / "infographic_4_compatibility_matrix.tex"
-        with open(output_file, "w") as f:
-            f.write(tikz_code)
+        return tikz_code
 
-    def generate_variance_analysis(self) -> None:
+    @depends_on("preamble")
+    def generate_variance_analysis(self) -> str:
         """
         Infographic 5: Variance Analysis Breakdown
         Explains why 3-byte variance is expected and acceptable.
         """
-        tikz_code = r"""
-\documentclass[tikz, border=10pt]{standalone}
-\usepackage{tikz}
-\usepackage{xcolor}
-
+        tikz_code = INFOGRAPHIC_PREAMBLE + r"""
 \begin{document}
 \begin{tikzpicture}[
     scale=1.2,
@@ -546,20 +540,15 @@ class EducationalInfographicsGenerator:
 \end{tikzpicture}
 \end{document}
 """
-        output_file = self.output_dir / "infographic_5_variance_analysis.tex"
-        with open(output_file, "w") as f:
-            f.write(tikz_code)
+        return tikz_code
 
-    def generate_methodology_triangle(self) -> None:
+    @depends_on("preamble")
+    def generate_methodology_triangle(self) -> str:
         """
         Infographic 6: Research Methodology Triangle
         Shows how this research validates three critical properties.
         """
-        tikz_code = r"""
-\documentclass[tikz, border=10pt]{standalone}
-\usepackage{tikz}
-\usepackage{xcolor}
-
+        tikz_code = INFOGRAPHIC_PREAMBLE + r"""
 \begin{document}
 \begin{tikzpicture}[
     scale=1.2,
@@ -637,20 +626,15 @@ class EducationalInfographicsGenerator:
 \end{tikzpicture}
 \end{document}
 """
-        output_file = self.output_dir / "infographic_6_methodology_triangle.tex"
-        with open(output_file, "w") as f:
-            f.write(tikz_code)
+        return tikz_code
 
-    def generate_os_boot_comparison(self) -> None:
+    @depends_on("preamble")
+    def generate_os_boot_comparison(self) -> str:
         """
         Infographic 7: MINIX vs Typical OS Boot Comparison
         Contextualizes MINIX's exceptional determinism against other operating systems.
         """
-        tikz_code = r"""
-\documentclass[tikz, border=10pt]{standalone}
-\usepackage{tikz}
-\usepackage{xcolor}
-
+        tikz_code = INFOGRAPHIC_PREAMBLE + r"""
 \begin{document}
 \begin{tikzpicture}[
     scale=1.0,
@@ -717,9 +701,7 @@ class EducationalInfographicsGenerator:
 \end{tikzpicture}
 \end{document}
 """
-        output_file = self.output_dir / "infographic_7_os_boot_comparison.tex"
-        with open(output_file, "w") as f:
-            f.write(tikz_code)
+        return tikz_code
 
 
 def main():
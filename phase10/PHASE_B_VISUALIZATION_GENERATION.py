@@ -24,12 +24,17 @@ Output:
 
 import json
 import os
-import subprocess
 from pathlib import Path
 from statistics import mean, stdev
 from typing import Dict, List
 import sys
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from shared.latex.build import LatexBuilder, format_report
+from shared.latex.raster import Rasterizer
+from shared.latex.targets import TargetGraph, depends_on, format_targets
+
 
 class PhaseB_VisualizationGenerator:
     """Generate publication-grade TikZ visualizations from Phase 9 aggregated metrics"""
@@ -62,6 +67,15 @@ class PhaseB_VisualizationGenerator:
         print(f"    Loaded CPU comparison data")
         print(f"    Loaded visualization pre-processed data")
 
+    def datasets(self) -> Dict[str, dict]:
+        """Loaded metrics by file stem, as the diagram generators declare them"""
+        return {
+            "phase9_metrics_complete": self.metrics_complete,
+            "phase9_cpu_comparison": self.cpu_comparison,
+            "visualization_data": self.visualization_data,
+            "phase9_memory_footprint": self.memory_footprint,
+        }
+
     def load_json(self, filename: str) -> dict:
         """Load JSON metrics file"""
         filepath = self.metrics_dir / filename
@@ -71,6 +85,7 @@ class PhaseB_VisualizationGenerator:
         print(f"[!] WARNING: {filename} not found")
         return {}
 
+    @depends_on("visualization_data")
     def generate_boot_timeline_tikz(self) -> str:
         """Generate boot phase timeline visualization"""
         print("[*] Generating boot timeline TikZ diagram...")
@@ -130,6 +145,7 @@ class PhaseB_VisualizationGenerator:
 
         return tex
 
+    @depends_on("phase9_cpu_comparison")
     def generate_cpu_comparison_tikz(self) -> str:
         """Generate CPU-to-CPU performance comparison"""
         print("[*] Generating CPU comparison TikZ diagram...")
@@ -178,6 +194,7 @@ class PhaseB_VisualizationGenerator:
 
         return tex
 
+    @depends_on("visualization_data")
     def generate_consistency_heatmap_tikz(self) -> str:
         """Generate boot output consistency heatmap"""
         print("[*] Generating consistency heatmap TikZ diagram...")
@@ -224,6 +241,7 @@ Conclusion & Highly Deterministic
 
         return tex
 
+    @depends_on("visualization_data")
     def generate_cpu_distribution_histogram_tikz(self) -> str:
         """Generate CPU distribution histogram"""
         print("[*] Generating CPU distribution histogram TikZ diagram...")
@@ -290,6 +308,7 @@ Conclusion & Highly Deterministic
 
         return tex
 
+    @depends_on("phase9_metrics_complete")
     def generate_performance_matrix_tikz(self) -> str:
         """Generate comprehensive performance matrix"""
         print("[*] Generating performance matrix TikZ diagram...")
@@ -365,60 +384,77 @@ Conclusion & Highly Deterministic
         print(f"    Saved: {filepath}")
         return filepath
 
+    def generate_all_tikz(self, force: bool = False) -> List[Path]:
+        """
+        Write the TikZ diagrams concurrently, regenerating only those whose
+        declared metrics changed since the last run.
+        """
+        diagrams = [
+            ("boot_timeline.tex", self.generate_boot_timeline_tikz),
+            ("cpu_performance_comparison.tex", self.generate_cpu_comparison_tikz),
+            ("boot_consistency_heatmap.tex", self.generate_consistency_heatmap_tikz),
+            ("cpu_distribution_histogram.tex", self.generate_cpu_distribution_histogram_tikz),
+            ("boot_performance_matrix.tex", self.generate_performance_matrix_tikz),
+        ]
+
+        graph = TargetGraph(self.datasets())
+        for filename, generate in diagrams:
+            graph.add(self.tikz_dir / filename, generate)
+        results = graph.run(force=force)
+        for result in results:
+            if not result.ok:
+                print(f"    [!] {result.output.name} failed: {result.error}")
+            elif result.generated:
+                print(f"    Saved: {result.output}")
+        print(f"    {format_targets(results)}")
+        return [result.output for result in results if result.ok]
+
     def compile_tikz_to_pdf(self, tikz_file: Path) -> Path:
         """Compile TikZ file to PDF"""
-        pdf_file = self.pdf_dir / (tikz_file.stem + ".pdf")
-
         print(f"    Compiling {tikz_file.name} to PDF...")
-        try:
-            result = subprocess.run(
-                ['pdflatex', '-interaction=nonstopmode', '-output-directory',
-                 str(self.pdf_dir), str(tikz_file)],
-                capture_output=True,
-                timeout=30,
-                text=True
-            )
-
-            if result.returncode == 0 and pdf_file.exists():
-                print(f"      PDF created: {pdf_file}")
-                return pdf_file
-            else:
-                print(f"      [!] pdflatex failed: {result.stderr[:200]}")
-                return None
-        except FileNotFoundError:
-            print(f"      [!] pdflatex not found. Install texlive-latex or similar.")
-            return None
-        except subprocess.TimeoutExpired:
-            print(f"      [!] pdflatex timeout")
-            return None
+        result = self.compile_all_tikz([tikz_file])
+        return result[0] if result else None
+
+    def compile_all_tikz(self, tikz_files: List[Path]) -> List[Path]:
+        """
+        Compile TikZ files to PDF concurrently.
+
+        Files whose source and local styles are unchanged since the last run
+        are not recompiled; the sources are only rewritten when the metrics
+        they were generated from change (see ``generate_all_tikz``).
+        """
+        builder = LatexBuilder(self.pdf_dir, timeout=30, precompile=True)
+        results = builder.build(tikz_files)
+        for line in format_report(results).splitlines():
+            print(f"      {line}")
+        for result in results:
+            if not result.ok:
+                print(f"      [!] pdflatex failed for {result.source.name}: {result.log[-200:]}")
+        return [result.pdf for result in results if result.ok]
 
     def convert_pdf_to_png(self, pdf_file: Path) -> Path:
         """Convert PDF to PNG at 300 DPI"""
-        png_file = self.png_dir / (pdf_file.stem + ".png")
-
         print(f"    Converting {pdf_file.name} to PNG (300 DPI)...")
-        try:
-            result = subprocess.run(
-                ['convert', '-density', '300', str(pdf_file), '-quality', '90',
-                 str(png_file)],
-                capture_output=True,
-                timeout=30,
-                text=True
-            )
-
-            if result.returncode == 0 and png_file.exists():
-                file_size_mb = png_file.stat().st_size / (1024 * 1024)
-                print(f"      PNG created: {png_file} ({file_size_mb:.1f} MB)")
-                return png_file
+        png_files = self.convert_all_pdfs_to_png([pdf_file])
+        return png_files[0] if png_files else None
+
+    def convert_all_pdfs_to_png(self, pdf_files: List[Path]) -> List[Path]:
+        """
+        Rasterize PDFs to PNG at 300 DPI in one batch.
+
+        Pages render concurrently and PNGs of unchanged PDFs are reused.
+        """
+        requests = [(pdf, 1, self.png_dir / (pdf.stem + ".png")) for pdf in pdf_files]
+        results = Rasterizer(dpi=300).rasterize(requests)
+        for result in results:
+            if result.cached:
+                print(f"      PNG up to date: {result.output}")
+            elif result.ok:
+                file_size_mb = result.output.stat().st_size / (1024 * 1024)
+                print(f"      PNG created: {result.output} ({file_size_mb:.1f} MB, {result.seconds:.2f}s)")
             else:
-                print(f"      [!] convert failed: {result.stderr[:200]}")
-                return None
-        except FileNotFoundError:
-            print(f"      [!] ImageMagick 'convert' not found. Install imagemagick.")
-            return None
-        except subprocess.TimeoutExpired:
-            print(f"      [!] convert timeout")
-            return None
+                print(f"      [!] rasterizing {result.pdf.name} failed: {result.log[-200:]}")
+        return [result.output for result in results if result.ok]
 
     def main(self):
         """Main visualization generation workflow"""
@@ -427,38 +463,22 @@ Conclusion & Highly Deterministic
         print("=" * 80)
         print()
 
-        # Generate all TikZ diagrams
-        diagrams = [
-            ("boot_timeline.tex", self.generate_boot_timeline_tikz()),
-            ("cpu_performance_comparison.tex", self.generate_cpu_comparison_tikz()),
-            ("boot_consistency_heatmap.tex", self.generate_consistency_heatmap_tikz()),
-            ("cpu_distribution_histogram.tex", self.generate_cpu_distribution_histogram_tikz()),
-            ("boot_performance_matrix.tex", self.generate_performance_matrix_tikz()),
-        ]
-
+        # Generate the TikZ diagrams whose metrics changed
         print("[*] Generating TikZ diagrams...")
-        tikz_files = []
-        for filename, content in diagrams:
-            filepath = self.save_tikz_file(filename, content)
-            tikz_files.append(filepath)
+        tikz_files = self.generate_all_tikz()
 
         print()
 
         # Compile to PDF (if pdflatex available)
         print("[*] Compiling TikZ diagrams to PDF...")
-        pdf_files = []
-        for tikz_file in tikz_files:
-            pdf_file = self.compile_tikz_to_pdf(tikz_file)
-            if pdf_file:
-                pdf_files.append(pdf_file)
+        pdf_files = self.compile_all_tikz(tikz_files)
 
         print()
 
         # Convert to PNG (if ImageMagick available)
         if pdf_files:
             print("[*] Converting PDF diagrams to PNG (300 DPI)...")
-            for pdf_file in pdf_files:
-                self.convert_pdf_to_png(pdf_file)
+            self.convert_all_pdfs_to_png(pdf_files)
 
         print()
         print("=" * 80)
@@ -0,0 +1,24 @@
+"""
+LaTeX build, rasterization and regeneration helpers for the generated diagrams.
+"""
+
+from .build import CompileResult, LatexBuilder, dependencies, format_report
+from .preamble import PrecompiledFormat, diagram_preamble, standalone_document
+from .raster import RasterResult, Rasterizer
+from .targets import TargetGraph, TargetResult, depends_on, format_targets
+
+__all__ = [
+    "CompileResult",
+    "LatexBuilder",
+    "PrecompiledFormat",
+    "RasterResult",
+    "Rasterizer",
+    "TargetGraph",
+    "TargetResult",
+    "dependencies",
+    "depends_on",
+    "diagram_preamble",
+    "format_report",
+    "format_targets",
+    "standalone_document",
+]
@@ -0,0 +1,406 @@
+"""
+Parallel, content-addressed LaTeX builds for the diagram sources.
+
+Every ``.tex`` gets a build key: the SHA-256 of its own bytes, of every
+local file it pulls in (``\\input``, ``\\include``, ``\\usepackage`` of a
+style under the search path, ``\\includegraphics``), of any extra inputs
+the caller names (templates, data files) and of the engine command line.
+A source whose key matches the cache entry of an existing PDF is not
+compiled again; the rest are compiled concurrently, one engine process per
+source. Regenerating a figure set after editing one figure therefore costs
+one compile.
+
+Usage::
+
+    python -m shared.latex.build -j 8 -I shared/styles diagrams/tikz/*.tex
+
+With ``--precompile``, sources that start with the shared diagram preamble
+(see ``shared.latex.preamble``) compile against a dumped format.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .preamble import STYLES_DIR, PrecompiledFormat, uses_format
+
+LATEX = "pdflatex"
+LATEX_FLAGS = ("-interaction=nonstopmode", "-halt-on-error", "-file-line-error")
+CACHE_NAME = ".latex-build-cache.json"
+MAX_PASSES = 3
+
+PathLike = Union[str, Path]
+
+_DEPENDENCY_RE = re.compile(
+    r"\\(input|include|usepackage|RequirePackage|includegraphics)\*?"
+    r"(?:\[[^\]]*\])?\{([^}]+)\}"
+)
+_COMMENT_RE = re.compile(r"(?<!\\)%.*")
+_RERUN_RE = re.compile(rb"Rerun to get|Label\(s\) may have changed")
+
+_EXTENSIONS = {
+    "input": (".tex",),
+    "include": (".tex",),
+    "usepackage": (".sty",),
+    "RequirePackage": (".sty",),
+    "includegraphics": (".pdf", ".png", ".jpg", ".jpeg", ".eps"),
+}
+
+
+@dataclass
+class CompileResult:
+    """Outcome of one source: the PDF (None on failure) and wall time."""
+
+    source: Path
+    pdf: Optional[Path]
+    seconds: float
+    cached: bool = False
+    log: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.pdf is not None
+
+
+def _resolve(
+    name: str, command: str, base: Path, search_paths: Sequence[Path]
+) -> Optional[Path]:
+    candidates = (
+        [name] if Path(name).suffix else [name + ext for ext in _EXTENSIONS[command]]
+    )
+    for directory in (base, *search_paths):
+        for candidate in candidates:
+            path = directory / candidate
+            if path.is_file():
+                return path.resolve()
+    return None
+
+
+def _signature(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def dependencies(
+    tex_file: PathLike, search_paths: Sequence[PathLike] = ()
+) -> List[Path]:
+    """
+    Local files ``tex_file`` depends on, recursively.
+
+    Names that do not resolve to a file next to the source or under
+    ``search_paths`` (TeX distribution packages) are ignored.
+    """
+    search = [Path(p) for p in search_paths]
+    root = Path(tex_file).resolve()
+    found: Dict[Path, None] = {}
+    pending = [root]
+    while pending:
+        current = pending.pop()
+        try:
+            text = current.read_text(encoding="utf-8", errors="replace")
+        except OSError:
+            continue
+        text = _COMMENT_RE.sub("", text)
+        for command, names in _DEPENDENCY_RE.findall(text):
+            for name in names.split(","):
+                path = _resolve(name.strip(), command, root.parent, search)
+                if path is None or path == root or path in found:
+                    continue
+                found[path] = None
+                if path.suffix in (".tex", ".sty"):
+                    pending.append(path)
+    return sorted(found)
+
+
+def format_report(results: Iterable[CompileResult]) -> str:
+    """One line per source with its compile time, then a summary."""
+    results = list(results)
+    lines = []
+    for result in sorted(results, key=lambda r: r.seconds, reverse=True):
+        status = "cached" if result.cached else ("ok" if result.ok else "FAILED")
+        lines.append(f"{result.seconds:8.2f}s  {status:<7} {result.source.name}")
+    compiled = [r for r in results if not r.cached]
+    failed = sum(1 for r in results if not r.ok)
+    lines.append(
+        f"{len(compiled)} compiled, {len(results) - len(compiled)} cached, "
+        f"{failed} failed "
+        f"({sum(r.seconds for r in compiled):.2f}s of compile time)"
+    )
+    return "\n".join(lines)
+
+
+class LatexBuilder:
+    """
+    Compiles ``.tex`` sources into ``output_dir`` on a worker pool.
+
+    Each source runs in its own engine process, so the pool is a thread
+    pool that only waits on children. Build keys are kept in a JSON cache
+    file (``output_dir/.latex-build-cache.json`` by default); results are
+    returned in the order the sources were given.
+
+    With ``precompile``, sources starting with the shared diagram preamble
+    are compiled against a precompiled format kept beside the cache file.
+    """
+
+    def __init__(
+        self,
+        output_dir: Optional[PathLike] = None,
+        search_paths: Sequence[PathLike] = (),
+        inputs: Sequence[PathLike] = (),
+        workers: Optional[int] = None,
+        engine: str = LATEX,
+        flags: Sequence[str] = LATEX_FLAGS,
+        cache_file: Optional[PathLike] = None,
+        timeout: float = 120,
+        precompile: bool = False,
+    ) -> None:
+        self.output_dir = Path(output_dir) if output_dir else None
+        self.search_paths = [Path(p).resolve() for p in search_paths]
+        self.inputs = [Path(p) for p in inputs]
+        self.workers = workers or os.cpu_count() or 1
+        self.engine = engine
+        self.flags = list(flags)
+        self.timeout = timeout
+        if cache_file is None:
+            cache_file = (self.output_dir or Path.cwd()) / CACHE_NAME
+        self.cache_file = Path(cache_file)
+        self._hashes: Dict[Path, Tuple[Tuple[int, int], str]] = {}
+        self.format: Optional[PrecompiledFormat] = None
+        if precompile:
+            # The format and full compiles must load the same minix-styles:
+            # the first one on the search path, else the shared styles
+            styles_dir = next(
+                (p for p in self.search_paths if (p / "minix-styles.sty").exists()),
+                None,
+            )
+            if styles_dir is None:
+                styles_dir = STYLES_DIR
+                self.search_paths.append(STYLES_DIR)
+            self.format = PrecompiledFormat(
+                self.cache_file.parent / ".latex-format", engine, styles_dir=styles_dir
+            )
+
+    def _file_hash(self, path: Path) -> str:
+        stat = path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self._hashes.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        self._hashes[path] = (signature, digest)
+        return digest
+
+    def build_key(self, tex_file: PathLike) -> str:
+        """Hash of the source, its local dependencies, extra inputs and engine."""
+        tex_file = Path(tex_file).resolve()
+        digest = hashlib.sha256()
+        digest.update(json.dumps([self.engine, self.flags]).encode("utf-8"))
+        digest.update(self._file_hash(tex_file).encode("ascii"))
+        for path in dependencies(tex_file, self.search_paths) + sorted(
+            p.resolve() for p in self.inputs
+        ):
+            digest.update(f"\0{path.name}\0{self._file_hash(path)}".encode("utf-8"))
+        return digest.hexdigest()
+
+    def _pdf_for(self, tex_file: Path) -> Path:
+        return (self.output_dir or tex_file.parent) / f"{tex_file.stem}.pdf"
+
+    def _load_cache(self) -> Dict[str, str]:
+        try:
+            return json.loads(self.cache_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _save_cache(self, cache: Dict[str, str]) -> None:
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(
+            dir=self.cache_file.parent, prefix=f".{self.cache_file.name}."
+        )
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(cache, handle, indent=2, sort_keys=True)
+        os.replace(tmp, self.cache_file)
+
+    def _env(self) -> Dict[str, str]:
+        env = dict(os.environ)
+        if self.search_paths:
+            # The trailing separator keeps the distribution's default path
+            paths = [str(p) for p in self.search_paths] + [env.get("TEXINPUTS", "")]
+            env["TEXINPUTS"] = os.pathsep.join(paths).rstrip(os.pathsep) + os.pathsep
+        return env
+
+    def _compile(self, tex_file: Path, use_format: bool = False) -> CompileResult:
+        pdf = self._pdf_for(tex_file)
+        pdf.parent.mkdir(parents=True, exist_ok=True)
+        fmt_flags = self.format.flags() if use_format else []
+        cmd = [
+            self.engine,
+            *self.flags,
+            *fmt_flags,
+            f"-output-directory={pdf.parent.resolve()}",
+            # The engine runs in the source's directory
+            tex_file.name,
+        ]
+        env = self.format.env(self._env()) if use_format else self._env()
+        before = _signature(pdf)
+        started = time.perf_counter()
+        output, returncode = b"", 1
+        try:
+            for _ in range(MAX_PASSES):
+                proc = subprocess.run(
+                    cmd,
+                    cwd=tex_file.parent,
+                    env=env,
+                    capture_output=True,
+                    timeout=self.timeout,
+                )
+                output, returncode = proc.stdout + proc.stderr, proc.returncode
+                if proc.returncode != 0 or not _RERUN_RE.search(output):
+                    break
+        except FileNotFoundError:
+            return CompileResult(tex_file, None, 0.0, log=f"{self.engine} not found")
+        except subprocess.TimeoutExpired:
+            return CompileResult(
+                tex_file,
+                None,
+                time.perf_counter() - started,
+                log=f"{self.engine} timed out after {self.timeout}s",
+            )
+        seconds = time.perf_counter() - started
+        # pdflatex may exit non-zero on recoverable errors yet write the PDF;
+        # a PDF left over from an earlier run does not count
+        after = _signature(pdf)
+        if after is not None and (returncode == 0 or after != before):
+            return CompileResult(tex_file, pdf, seconds)
+        return CompileResult(
+            tex_file, None, seconds, log=output.decode("utf-8", "replace")[-2000:]
+        )
+
+    def build(
+        self, sources: Iterable[PathLike], force: bool = False
+    ) -> List[CompileResult]:
+        """Compile the sources whose build key changed; reuse the other PDFs."""
+        sources = [Path(s) for s in sources]
+        outputs: Dict[Path, Path] = {}
+        for source in sources:
+            pdf = self._pdf_for(source)
+            if pdf in outputs and outputs[pdf] != source.resolve():
+                raise ValueError(f"{source} and {outputs[pdf]} would both write {pdf}")
+            outputs[pdf] = source.resolve()
+
+        cache = self._load_cache()
+        results: Dict[int, CompileResult] = {}
+        keys: Dict[int, str] = {}
+        stale: List[int] = []
+        for index, source in enumerate(sources):
+            keys[index] = self.build_key(source)
+            pdf = self._pdf_for(source)
+            if (
+                not force
+                and pdf.exists()
+                and cache.get(str(source.resolve())) == keys[index]
+            ):
+                results[index] = CompileResult(source, pdf, 0.0, cached=True)
+            else:
+                stale.append(index)
+
+        with_format: set = set()
+        if stale and self.format is not None:
+            matching = {
+                i
+                for i in stale
+                if uses_format(sources[i].read_text(encoding="utf-8", errors="replace"))
+            }
+            # Without a format (e.g. mylatexformat missing) they compile in full
+            if matching and self.format.ensure():
+                with_format = matching
+
+        if stale:
+
+            def compile_one(index: int) -> CompileResult:
+                return self._compile(sources[index], index in with_format)
+
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(stale))) as pool:
+                for index, result in zip(stale, pool.map(compile_one, stale)):
+                    results[index] = result
+                    entry = str(sources[index].resolve())
+                    if result.ok:
+                        cache[entry] = keys[index]
+                    else:
+                        cache.pop(entry, None)
+            self._save_cache(cache)
+        return [results[index] for index in range(len(sources))]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Compile LaTeX sources in parallel, skipping unchanged ones"
+    )
+    parser.add_argument("sources", nargs="+", type=Path, help=".tex files to compile")
+    parser.add_argument(
+        "-o",
+        "--output-dir",
+        type=Path,
+        help="PDF directory (default: beside each source)",
+    )
+    parser.add_argument(
+        "-I",
+        "--search-path",
+        action="append",
+        default=[],
+        type=Path,
+        help="Directory with local styles and inputs (added to TEXINPUTS)",
+    )
+    parser.add_argument(
+        "--input",
+        action="append",
+        default=[],
+        type=Path,
+        help="Extra file (template, data) whose changes rebuild every source",
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, help="Concurrent compiles (default: CPU count)"
+    )
+    parser.add_argument(
+        "--engine", default=LATEX, help=f"LaTeX engine (default: {LATEX})"
+    )
+    parser.add_argument(
+        "--precompile",
+        action="store_true",
+        help="Compile shared-preamble sources against a precompiled format",
+    )
+    parser.add_argument("--force", action="store_true", help="Ignore the cache")
+    args = parser.parse_args(argv)
+
+    builder = LatexBuilder(
+        args.output_dir,
+        args.search_path,
+        args.input,
+        workers=args.jobs,
+        engine=args.engine,
+        precompile=args.precompile,
+    )
+    results = builder.build(args.sources, force=args.force)
+    print(format_report(results))
+    for result in results:
+        if not result.ok:
+            print(f"\n--- {result.source} ---\n{result.log}", file=sys.stderr)
+    return 0 if all(r.ok for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
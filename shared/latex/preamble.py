@@ -0,0 +1,164 @@
+"""
+Shared preamble for standalone diagrams and its precompiled format.
+
+Generated diagrams start with ``DIAGRAM_PREAMBLE`` (standalone class, fonts,
+TikZ libraries and ``shared/styles/minix-styles.sty``) followed by the
+``\\csname endofdump\\endcsname`` marker. ``PrecompiledFormat`` dumps that
+preamble into a ``.fmt`` with mylatexformat; a diagram compiled with
+``-fmt`` then skips everything up to the marker instead of re-reading TikZ
+and the styles, and still runs whatever per-diagram preamble follows it.
+Without the format the marker expands to ``\\relax``, so the same source
+also compiles on its own.
+
+The format is re-dumped only when its key (engine, preamble text and style
+file contents) changes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+FORMAT_NAME = "minix-diagrams"
+STYLES_DIR = Path(__file__).resolve().parents[1] / "styles"
+DUMP_MARKER = r"\csname endofdump\endcsname"
+
+DIAGRAM_PREAMBLE = (
+    r"""\documentclass[tikz,border=5pt]{standalone}
+\usepackage{lmodern}
+\usepackage[T1]{fontenc}
+\usepackage{tikz}
+\usepackage{xcolor}
+\usepackage{array}
+\usepackage{minix-styles}
+\usetikzlibrary{shapes,shapes.geometric,arrows,arrows.meta,positioning,calc,fit,patterns,chains,automata}
+"""
+    + DUMP_MARKER
+    + "\n"
+)
+
+PathLike = Union[str, Path]
+
+
+def diagram_preamble(border: Optional[str] = None, extra: str = "") -> str:
+    """
+    The shared preamble, then per-diagram settings that the format does not
+    cover (a different standalone border, extra packages, colors).
+    """
+    preamble = DIAGRAM_PREAMBLE
+    if border:
+        preamble += f"\\standaloneconfig{{border={border}}}\n"
+    if extra:
+        preamble += extra.rstrip("\n") + "\n"
+    return preamble
+
+
+def standalone_document(
+    body: str, border: Optional[str] = None, extra: str = ""
+) -> str:
+    """Complete standalone document around ``body`` using the shared preamble."""
+    return (
+        f"{diagram_preamble(border, extra)}\n"
+        f"\\begin{{document}}\n{body.strip(chr(10))}\n\\end{{document}}\n"
+    )
+
+
+def uses_format(text: str) -> bool:
+    """Whether a source starts with the preamble the format was dumped from."""
+    return text.startswith(DIAGRAM_PREAMBLE)
+
+
+def _texinputs(*directories: Path) -> str:
+    # The trailing separator keeps the distribution's default path
+    paths = [str(d) for d in directories] + [os.environ.get("TEXINPUTS", "")]
+    return os.pathsep.join(paths).rstrip(os.pathsep) + os.pathsep
+
+
+class PrecompiledFormat:
+    """
+    ``<directory>/minix-diagrams.fmt`` dumped from ``DIAGRAM_PREAMBLE``.
+
+    ``ensure()`` dumps it when missing or out of date; ``flags()`` and
+    ``env()`` are what an engine run needs to load it.
+    """
+
+    def __init__(
+        self,
+        directory: PathLike,
+        engine: str = "pdflatex",
+        styles_dir: PathLike = STYLES_DIR,
+        name: str = FORMAT_NAME,
+    ) -> None:
+        self.directory = Path(directory)
+        self.engine = engine
+        self.styles_dir = Path(styles_dir).resolve()
+        self.name = name
+        self.log = ""
+
+    @property
+    def path(self) -> Path:
+        return self.directory / f"{self.name}.fmt"
+
+    @property
+    def _key_file(self) -> Path:
+        return self.directory / f"{self.name}.key"
+
+    def key(self) -> str:
+        digest = hashlib.sha256()
+        digest.update(f"{self.engine}\0{DIAGRAM_PREAMBLE}".encode("utf-8"))
+        for style in sorted(self.styles_dir.glob("*.sty")):
+            digest.update(f"\0{style.name}\0".encode("utf-8") + style.read_bytes())
+        return digest.hexdigest()
+
+    def current(self) -> bool:
+        try:
+            return (
+                self.path.exists() and self._key_file.read_text().strip() == self.key()
+            )
+        except OSError:
+            return False
+
+    def ensure(self, timeout: float = 300) -> bool:
+        """Dump the format unless an up-to-date one exists; False if dumping fails."""
+        if self.current():
+            return True
+        self.directory.mkdir(parents=True, exist_ok=True)
+        source = self.directory / f"{self.name}-preamble.tex"
+        source.write_text(
+            DIAGRAM_PREAMBLE + "\\begin{document}\n\\end{document}\n", encoding="utf-8"
+        )
+        cmd = [
+            self.engine,
+            "-ini",
+            "-interaction=nonstopmode",
+            f"-jobname={self.name}",
+            f"-output-directory={self.directory.resolve()}",
+            f"&{Path(self.engine).name}",
+            "mylatexformat.ltx",
+            source.name,
+        ]
+        env = dict(os.environ, TEXINPUTS=_texinputs(self.styles_dir))
+        try:
+            proc = subprocess.run(
+                cmd, cwd=self.directory, env=env, capture_output=True, timeout=timeout
+            )
+        except (OSError, subprocess.TimeoutExpired) as exc:
+            self.log = str(exc)
+            return False
+        self.log = (proc.stdout + proc.stderr).decode("utf-8", "replace")[-2000:]
+        if proc.returncode != 0 or not self.path.exists():
+            return False
+        self._key_file.write_text(self.key() + "\n")
+        return True
+
+    def flags(self) -> List[str]:
+        return [f"-fmt={self.name}"]
+
+    def env(self, base: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        env = dict(os.environ if base is None else base)
+        formats = [str(self.directory.resolve()), env.get("TEXFORMATS", "")]
+        env["TEXFORMATS"] = os.pathsep.join(formats).rstrip(os.pathsep) + os.pathsep
+        return env
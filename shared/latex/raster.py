@@ -0,0 +1,318 @@
+"""
+Batch PDF page rasterization.
+
+Requests are ``(pdf, page, png)`` triples. Pages of the same PDF are
+rendered by as few renderer processes as possible: Ghostscript renders an
+arbitrary page list from one open document, so each PDF is split into at
+most ``workers`` page groups and every group is one ``gs`` run; the groups
+of all PDFs render concurrently. Rendered files are keyed on
+(PDF content hash, page, DPI, optimizer), so unchanged figures are skipped
+on the next run, and ``optipng`` runs over the fresh PNGs on a worker pool.
+
+Usage::
+
+    python -m shared.latex.raster -r 300 -o png/ pdf/*.pdf
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+RASTER_CACHE_NAME = ".raster-cache.json"
+OPTIMIZER = ("optipng", "-o2")
+
+PathLike = Union[str, Path]
+
+_PAGE_FILE_RE = re.compile(r"-(\d+)\.png$")
+
+
+@dataclass
+class RasterResult:
+    """One rendered page: the PNG (None on failure) and its share of render time."""
+
+    pdf: Path
+    page: int
+    output: Optional[Path]
+    seconds: float
+    cached: bool = False
+    log: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.output is not None
+
+
+def _file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _split(pages: List[int], parts: int) -> List[List[int]]:
+    size = -(-len(pages) // parts)
+    return [pages[i : i + size] for i in range(0, len(pages), size)]
+
+
+class Rasterizer:
+    """
+    Renders PDF pages to PNG with Ghostscript (or pdftoppm when gs is
+    missing), caching outputs by content. Results are returned in request
+    order.
+    """
+
+    def __init__(
+        self,
+        dpi: int = 300,
+        workers: Optional[int] = None,
+        renderer: Optional[str] = None,
+        optimizer: Optional[Sequence[str]] = OPTIMIZER,
+        cache_file: Optional[PathLike] = None,
+        timeout: float = 300,
+    ) -> None:
+        self.dpi = dpi
+        self.workers = workers or os.cpu_count() or 1
+        self.renderer = (
+            renderer or shutil.which("gs") or shutil.which("pdftoppm") or "gs"
+        )
+        self.optimizer = list(optimizer) if optimizer else None
+        self.cache_file = Path(cache_file) if cache_file else None
+        self.timeout = timeout
+
+    def _is_ghostscript(self) -> bool:
+        return "pdftoppm" not in Path(self.renderer).name
+
+    def _key(self, pdf_hash: str, page: int) -> str:
+        optimizer = " ".join(self.optimizer) if self.optimizer else ""
+        return f"{pdf_hash}:{page}:{self.dpi}:{optimizer}"
+
+    def _cache_path(self, outputs: Sequence[Path]) -> Path:
+        if self.cache_file:
+            return self.cache_file
+        return (
+            Path(os.path.commonpath([str(o.resolve().parent) for o in outputs]))
+            / RASTER_CACHE_NAME
+        )
+
+    def _render_group(
+        self, pdf: Path, pages: List[int], tmp: Path
+    ) -> Tuple[Dict[int, Path], str]:
+        """Render ``pages`` of ``pdf`` into ``tmp``; returns page -> file."""
+        if self._is_ghostscript():
+            cmd = [
+                self.renderer,
+                "-q",
+                "-dNOPAUSE",
+                "-dBATCH",
+                "-dSAFER",
+                "-sDEVICE=png16m",
+                f"-r{self.dpi}",
+                f"-sPageList={','.join(str(p) for p in pages)}",
+                f"-sOutputFile={tmp / 'page-%d.png'}",
+                str(pdf),
+            ]
+            proc = subprocess.run(cmd, capture_output=True, timeout=self.timeout)
+            # Ghostscript numbers output files in page-list order
+            rendered = {
+                page: tmp / f"page-{index}.png" for index, page in enumerate(pages, 1)
+            }
+            log = (proc.stdout + proc.stderr).decode("utf-8", "replace")
+        else:
+            # pdftoppm renders page ranges, so one run per consecutive run of pages
+            log, rendered = "", {}
+            runs: List[List[int]] = []
+            for page in pages:
+                if runs and page == runs[-1][-1] + 1:
+                    runs[-1].append(page)
+                else:
+                    runs.append([page])
+            for run in runs:
+                cmd = [
+                    self.renderer,
+                    "-png",
+                    "-r",
+                    str(self.dpi),
+                    "-f",
+                    str(run[0]),
+                    "-l",
+                    str(run[-1]),
+                    str(pdf),
+                    str(tmp / "page"),
+                ]
+                proc = subprocess.run(cmd, capture_output=True, timeout=self.timeout)
+                log += (proc.stdout + proc.stderr).decode("utf-8", "replace")
+            for path in tmp.glob("page-*.png"):
+                match = _PAGE_FILE_RE.search(path.name)
+                if match:
+                    rendered[int(match.group(1))] = path
+        return {page: path for page, path in rendered.items() if path.exists()}, log
+
+    def _run_group(
+        self, pdf: Path, jobs: List[Tuple[int, int, Path]]
+    ) -> List[Tuple[int, RasterResult]]:
+        pages = sorted({page for _, page, _ in jobs})
+        started = time.perf_counter()
+        with tempfile.TemporaryDirectory(prefix="raster-") as tmp:
+            try:
+                rendered, log = self._render_group(pdf, pages, Path(tmp))
+            except FileNotFoundError:
+                rendered, log = {}, f"{self.renderer} not found"
+            except subprocess.TimeoutExpired:
+                rendered, log = {}, f"{self.renderer} timed out after {self.timeout}s"
+            seconds = (time.perf_counter() - started) / max(1, len(pages))
+            results = []
+            for index, page, output in jobs:
+                source = rendered.get(page)
+                if source is None:
+                    results.append(
+                        (index, RasterResult(pdf, page, None, seconds, log=log[-2000:]))
+                    )
+                    continue
+                output.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(source, output)
+                results.append((index, RasterResult(pdf, page, output, seconds)))
+        return results
+
+    def _optimize(self, png: Path) -> None:
+        try:
+            subprocess.run(
+                [*self.optimizer, str(png)], capture_output=True, timeout=self.timeout
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            # Optimization is best-effort; the unoptimized PNG is still valid
+            pass
+
+    def rasterize(
+        self,
+        requests: Iterable[Tuple[PathLike, int, PathLike]],
+        force: bool = False,
+    ) -> List[RasterResult]:
+        """Render every ``(pdf, page, png)`` request whose output is stale."""
+        requests = [(Path(pdf), int(page), Path(out)) for pdf, page, out in requests]
+        if not requests:
+            return []
+        cache_path = self._cache_path([out for _, _, out in requests])
+        try:
+            cache: Dict[str, str] = json.loads(cache_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            cache = {}
+
+        hashes: Dict[Path, str] = {}
+        results: Dict[int, RasterResult] = {}
+        keys: Dict[int, str] = {}
+        stale: Dict[Path, List[Tuple[int, int, Path]]] = {}
+        for index, (pdf, page, output) in enumerate(requests):
+            if pdf not in hashes:
+                hashes[pdf] = _file_hash(pdf) if pdf.exists() else ""
+            if not hashes[pdf]:
+                results[index] = RasterResult(
+                    pdf, page, None, 0.0, log=f"{pdf} not found"
+                )
+                continue
+            keys[index] = self._key(hashes[pdf], page)
+            if (
+                not force
+                and output.exists()
+                and cache.get(str(output.resolve())) == keys[index]
+            ):
+                results[index] = RasterResult(pdf, page, output, 0.0, cached=True)
+            else:
+                stale.setdefault(pdf, []).append((index, page, output))
+
+        if stale:
+            groups: List[Tuple[Path, List[Tuple[int, int, Path]]]] = []
+            for pdf, jobs in stale.items():
+                pages = sorted({page for _, page, _ in jobs})
+                for part in _split(pages, min(self.workers, len(pages))):
+                    chosen = set(part)
+                    groups.append((pdf, [job for job in jobs if job[1] in chosen]))
+
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(groups))) as pool:
+                for rendered in pool.map(lambda group: self._run_group(*group), groups):
+                    for index, result in rendered:
+                        results[index] = result
+
+            fresh = [
+                index for _, jobs in groups for index, _, _ in jobs if results[index].ok
+            ]
+            if self.optimizer and fresh:
+                with ThreadPoolExecutor(
+                    max_workers=min(self.workers, len(fresh))
+                ) as pool:
+                    list(
+                        pool.map(
+                            lambda index: self._optimize(results[index].output), fresh
+                        )
+                    )
+
+            for _, jobs in groups:
+                for index, _, output in jobs:
+                    entry = str(output.resolve())
+                    if results[index].ok:
+                        cache[entry] = keys[index]
+                    else:
+                        cache.pop(entry, None)
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(
+                dir=cache_path.parent, prefix=f".{cache_path.name}."
+            )
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump(cache, handle, indent=2, sort_keys=True)
+            os.replace(tmp, cache_path)
+
+        return [results[index] for index in range(len(requests))]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Rasterize the first page of PDFs to PNG, skipping unchanged ones"
+    )
+    parser.add_argument("pdfs", nargs="+", type=Path, help="PDF files")
+    parser.add_argument(
+        "-o", "--output-dir", type=Path, help="PNG directory (default: beside each PDF)"
+    )
+    parser.add_argument(
+        "-r", "--dpi", type=int, default=300, help="Resolution (default: 300)"
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="Concurrent renderer processes (default: CPU count)",
+    )
+    parser.add_argument("--no-optimize", action="store_true", help="Skip optipng")
+    parser.add_argument("--force", action="store_true", help="Ignore the cache")
+    args = parser.parse_args(argv)
+
+    rasterizer = Rasterizer(
+        args.dpi, workers=args.jobs, optimizer=None if args.no_optimize else OPTIMIZER
+    )
+    requests = [
+        (pdf, 1, (args.output_dir or pdf.parent) / f"{pdf.stem}.png")
+        for pdf in args.pdfs
+    ]
+    results = rasterizer.rasterize(requests, force=args.force)
+    for result in results:
+        status = "cached" if result.cached else ("ok" if result.ok else "FAILED")
+        print(f"{result.seconds:8.2f}s  {status:<7} {result.pdf.name}")
+        if not result.ok:
+            print(result.log, file=sys.stderr)
+    return 0 if all(r.ok for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
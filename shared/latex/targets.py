@@ -0,0 +1,225 @@
+"""
+Dependency-tracked regeneration of generated diagram sources.
+
+Every diagram generator declares the datasets it reads with
+``@depends_on(...)``. A target's key hashes the generator's code together
+with the content of exactly those datasets, so after a pipeline refresh only
+the figures whose inputs changed are regenerated; the others keep their
+``.tex`` files untouched, and with them their cached PDFs and PNGs. Stale
+targets are generated concurrently and written atomically.
+
+Usage::
+
+    graph = TargetGraph({"statistics": stats, "process_table": procs})
+    graph.add("out/process-states.tex", generator.generate_process_states_tikz)
+    results = graph.run()
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from types import CodeType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+TARGETS_MANIFEST = ".diagram-targets.json"
+
+PathLike = Union[str, Path]
+Generator = Callable[[], str]
+
+
+def depends_on(*datasets: str) -> Callable[[Callable], Callable]:
+    """Declare the datasets a generator reads; its output is keyed on them."""
+
+    def mark(generator: Callable) -> Callable:
+        generator.datasets = tuple(datasets)
+        return generator
+
+    return mark
+
+
+def dataset_hash(value: Any) -> str:
+    """Content hash of a loaded dataset (canonical JSON)."""
+    encoded = json.dumps(value, separators=(",", ":"), sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def code_hash(generator: Callable) -> str:
+    """
+    Hash of a generator's bytecode, constants (templates included) and
+    referenced names; unlike the source it ignores where the function sits
+    in its file.
+    """
+    digest = hashlib.sha256()
+
+    def feed(code: CodeType) -> None:
+        digest.update(code.co_code)
+        digest.update(repr(code.co_names).encode("utf-8"))
+        for const in code.co_consts:
+            if isinstance(const, CodeType):
+                feed(const)
+            else:
+                digest.update(repr(const).encode("utf-8"))
+
+    feed(generator.__code__)
+    return digest.hexdigest()
+
+
+@dataclass
+class TargetResult:
+    """One target: whether it was regenerated and whether its file changed."""
+
+    output: Path
+    seconds: float
+    generated: bool
+    changed: bool = False
+    error: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return not self.error
+
+
+class TargetGraph:
+    """
+    Maps named datasets to generated files. Results are returned in the
+    order the targets were added.
+    """
+
+    def __init__(
+        self,
+        datasets: Mapping[str, Any],
+        workers: Optional[int] = None,
+        manifest: Optional[PathLike] = None,
+    ) -> None:
+        self.datasets = dict(datasets)
+        self.workers = workers or os.cpu_count() or 1
+        self.manifest = Path(manifest) if manifest else None
+        self.targets: List[Tuple[Path, Generator, Tuple[str, ...]]] = []
+        self._hashes: Dict[str, str] = {}
+
+    def add(
+        self,
+        output: PathLike,
+        generator: Generator,
+        inputs: Optional[Sequence[str]] = None,
+    ) -> None:
+        """
+        Register ``output`` as produced by ``generator``. ``inputs`` defaults
+        to the generator's ``@depends_on`` declaration; a generator that
+        declares nothing depends on every dataset.
+        """
+        if inputs is None:
+            inputs = getattr(generator, "datasets", None)
+        inputs = tuple(sorted(self.datasets if inputs is None else inputs))
+        unknown = [name for name in inputs if name not in self.datasets]
+        if unknown:
+            raise ValueError(
+                f"{Path(output).name} depends on unknown datasets: {', '.join(unknown)}"
+            )
+        self.targets.append((Path(output), generator, inputs))
+
+    def key(self, generator: Generator, inputs: Sequence[str]) -> str:
+        """Build key of one target: generator code plus its input hashes."""
+        digest = hashlib.sha256(code_hash(generator).encode("utf-8"))
+        for name in inputs:
+            if name not in self._hashes:
+                self._hashes[name] = dataset_hash(self.datasets[name])
+            digest.update(f"\0{name}={self._hashes[name]}".encode("utf-8"))
+        return digest.hexdigest()
+
+    def _manifest_path(self) -> Path:
+        if self.manifest:
+            return self.manifest
+        parents = [str(output.resolve().parent) for output, _, _ in self.targets]
+        return Path(os.path.commonpath(parents)) / TARGETS_MANIFEST
+
+    @staticmethod
+    def _write(output: Path, content: str) -> bool:
+        """Write ``content`` unless the file already holds it; True if written."""
+        try:
+            if output.read_text(encoding="utf-8") == content:
+                return False
+        except OSError:
+            pass
+        output.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=output.parent, prefix=f".{output.name}.")
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            handle.write(content)
+        os.replace(tmp, output)
+        return True
+
+    def _generate(self, output: Path, generator: Generator) -> TargetResult:
+        started = time.perf_counter()
+        try:
+            changed = self._write(output, generator())
+        except Exception as e:
+            return TargetResult(
+                output,
+                time.perf_counter() - started,
+                True,
+                error=f"{type(e).__name__}: {e}",
+            )
+        return TargetResult(output, time.perf_counter() - started, True, changed)
+
+    def run(self, force: bool = False) -> List[TargetResult]:
+        """Regenerate every target whose key differs from the manifest."""
+        if not self.targets:
+            return []
+        manifest_path = self._manifest_path()
+        try:
+            manifest: Dict[str, str] = json.loads(
+                manifest_path.read_text(encoding="utf-8")
+            )
+        except (OSError, ValueError):
+            manifest = {}
+
+        results: Dict[int, TargetResult] = {}
+        keys: Dict[int, str] = {}
+        stale: List[int] = []
+        for index, (output, generator, inputs) in enumerate(self.targets):
+            keys[index] = self.key(generator, inputs)
+            if (
+                not force
+                and output.exists()
+                and manifest.get(str(output.resolve())) == keys[index]
+            ):
+                results[index] = TargetResult(output, 0.0, False)
+            else:
+                stale.append(index)
+
+        if stale:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(stale))) as pool:
+                generated = pool.map(
+                    lambda index: self._generate(*self.targets[index][:2]), stale
+                )
+                for index, result in zip(stale, generated):
+                    results[index] = result
+                    entry = str(result.output.resolve())
+                    if result.ok:
+                        manifest[entry] = keys[index]
+                    else:
+                        manifest.pop(entry, None)
+            manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(
+                dir=manifest_path.parent, prefix=f".{manifest_path.name}."
+            )
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump(manifest, handle, indent=2, sort_keys=True)
+            os.replace(tmp, manifest_path)
+
+        return [results[index] for index in range(len(self.targets))]
+
+
+def format_targets(results: Sequence[TargetResult]) -> str:
+    """One-line summary of a graph run."""
+    generated = sum(1 for r in results if r.generated and r.ok)
+    failed = sum(1 for r in results if not r.ok)
+    line = f"{generated} regenerated, {len(results) - generated - failed} up to date"
+    return line + (f", {failed} failed" if failed else "")
@@ -0,0 +1,138 @@
+"""
+Off-loop execution for blocking work in the MCP servers.
+
+Async handlers hand synchronous work (dataset loads, serialization, Docker
+calls, file I/O) to a bounded thread pool instead of running it on the
+event loop. Calls sharing a coalescing key while one is in flight await
+that same computation, and every pool reports queue depth and latency.
+
+Standard library only, so the containerized FastAPI servers can ship it
+beside their server.py.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Hashable, Optional, TypeVar
+
+T = TypeVar("T")
+
+_LATENCY_WINDOW = 512
+
+
+def _percentile(ordered: list, fraction: float) -> float:
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class BlockingExecutor:
+    """
+    Bounded thread pool awaited from asyncio handlers.
+
+    ``run(func, ..., key=...)`` returns the result of ``func`` computed on a
+    worker thread. While a call with the same ``key`` is running, further
+    calls join it rather than queueing a duplicate; a caller that is
+    cancelled (client disconnect) does not cancel the shared computation.
+    In-flight bookkeeping happens on the event loop thread, so one executor
+    should be driven from a single loop.
+    """
+
+    def __init__(self, name: str, max_workers: int = 4) -> None:
+        self.name = name
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=f"mcp-{name}"
+        )
+        self._inflight: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._max_queued = 0
+        self._submitted = 0
+        self._coalesced = 0
+        self._failed = 0
+        self._wait_ms: Deque[float] = deque(maxlen=_LATENCY_WINDOW)
+        self._total_ms: Deque[float] = deque(maxlen=_LATENCY_WINDOW)
+
+    def _call(self, func: Callable[[], T], enqueued: float) -> T:
+        started = time.perf_counter()
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self._wait_ms.append((started - enqueued) * 1000)
+        try:
+            return func()
+        except BaseException:
+            with self._lock:
+                self._failed += 1
+            raise
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._total_ms.append((time.perf_counter() - enqueued) * 1000)
+
+    def submit(
+        self, func: Callable[..., T], *args: Any, **kwargs: Any
+    ) -> "asyncio.Future[T]":
+        """Schedule ``func`` on the pool and return an awaitable future."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._submitted += 1
+            self._queued += 1
+            self._max_queued = max(self._max_queued, self._queued)
+        call = functools.partial(func, *args, **kwargs)
+        return loop.run_in_executor(self._pool, self._call, call, time.perf_counter())
+
+    async def run(
+        self,
+        func: Callable[..., T],
+        *args: Any,
+        key: Optional[Hashable] = None,
+        **kwargs: Any,
+    ) -> T:
+        """Run ``func(*args, **kwargs)`` off the loop, coalescing on ``key``."""
+        if key is None:
+            return await self.submit(func, *args, **kwargs)
+
+        future = self._inflight.get(key)
+        if future is not None:
+            with self._lock:
+                self._coalesced += 1
+        else:
+            future = self.submit(func, *args, **kwargs)
+            self._inflight[key] = future
+            future.add_done_callback(lambda _done: self._inflight.pop(key, None))
+        return await asyncio.shield(future)
+
+    def stats(self) -> Dict[str, Any]:
+        """Current queue depth and recent latency (milliseconds)."""
+        with self._lock:
+            wait = sorted(self._wait_ms)
+            total = sorted(self._total_ms)
+            stats: Dict[str, Any] = {
+                "workers": self.max_workers,
+                "queued": self._queued,
+                "running": self._running,
+                "max_queued": self._max_queued,
+                "submitted": self._submitted,
+                "coalesced": self._coalesced,
+                "failed": self._failed,
+                "inflight_keys": len(self._inflight),
+            }
+        if total:
+            stats["latency_ms"] = {
+                "samples": len(total),
+                "p50": round(_percentile(total, 0.50), 2),
+                "p95": round(_percentile(total, 0.95), 2),
+                "max": round(total[-1], 2),
+                "queue_wait_p95": round(_percentile(wait, 0.95), 2),
+            }
+        return stats
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
@@ -2,7 +2,14 @@
 Shared MCP server utilities for MINIX analysis.
 """
 
-from .data_loader import MinixDataLoader
+from .data_loader import Dataset, MinixDataLoader
+from .response_cache import CachedResponse, ResponseCache
 from .server import MinixAnalysisServer
 
-__all__ = ["MinixDataLoader", "MinixAnalysisServer"]
+__all__ = [
+    "CachedResponse",
+    "Dataset",
+    "MinixDataLoader",
+    "MinixAnalysisServer",
+    "ResponseCache",
+]
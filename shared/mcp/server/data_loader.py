@@ -4,10 +4,19 @@ Utilities for loading structured MINIX analysis data generated by the pipeline.
 
 from __future__ import annotations
 
+import hashlib
 import json
+import logging
+import threading
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from ...snapshot import SNAPSHOT_NAME, Snapshot, SnapshotError
+from .indexes import build_index
+from .watcher import DirectoryWatcher, Signature, file_signature
+
+logger = logging.getLogger(__name__)
 
 
 DATA_FILES = {
@@ -19,40 +28,198 @@ DATA_FILES = {
     "statistics": "statistics.json",
 }
 
+_FILE_KEYS = {filename: key for key, filename in DATA_FILES.items()}
+
+
+@dataclass(frozen=True)
+class Dataset:
+    """One loaded dataset: payload, derived index and content version."""
+
+    key: str
+    payload: Dict[str, Any]
+    index: Any
+    version: str
+
 
 @dataclass
 class MinixDataLoader:
     """
     Lazy-loading accessor for pipeline data residing in diagrams/data/.
+
+    When the pipeline has written a snapshot container (SNAPSHOT_NAME) it
+    is memory-mapped once and each dataset is decoded from its section on
+    first use; datasets missing from it, or whose JSON file was rewritten
+    after the snapshot, are read from their JSON file.
+
+    With ``watch=True`` the data directory is monitored (inotify, or
+    polling every ``poll_interval`` seconds) and changed files that were
+    already loaded are re-read and re-indexed on the watcher thread. The
+    new Dataset replaces the old one with a single reference swap, so
+    readers never block on a reload and never see a partial dataset.
     """
 
     data_dir: Path = Path("diagrams/data")
+    watch: bool = False
+    poll_interval: float = 1.0
 
     def __post_init__(self) -> None:
-        self.data_dir = self.data_dir.resolve()
+        self.data_dir = Path(self.data_dir).resolve()
         if not self.data_dir.exists():
             raise FileNotFoundError(
                 f"Data directory not found: {self.data_dir}. "
                 "Run `make pipeline` to generate analysis artifacts."
             )
-        self._cache: Dict[str, Dict[str, Any]] = {}
+        # Replaced wholesale on every change; never mutated in place
+        self._datasets: Dict[str, Dataset] = {}
+        self._write_lock = threading.Lock()
+        self._snapshot_state: Tuple[Signature, Optional[Snapshot]] = (None, None)
+        self._watcher: Optional[DirectoryWatcher] = None
+        if self.watch:
+            self.start_watching()
+
+    def _snapshot(self) -> Optional[Snapshot]:
+        # Reopened only when the file is replaced; a replaced snapshot's old
+        # mapping stays valid for readers still holding it
+        signature = file_signature(self.data_dir / SNAPSHOT_NAME)
+        cached_signature, snapshot = self._snapshot_state
+        if signature == cached_signature:
+            return snapshot
+        snapshot = None
+        if signature is not None:
+            try:
+                snapshot = Snapshot(self.data_dir / SNAPSHOT_NAME)
+            except (FileNotFoundError, SnapshotError) as exc:
+                logger.warning("Ignoring snapshot, using JSON files: %s", exc)
+        self._snapshot_state = (signature, snapshot)
+        return snapshot
+
+    def _snapshot_is_current(self, key: str) -> bool:
+        # A JSON file rewritten after the snapshot (one pipeline step rerun,
+        # or an edit) supersedes that snapshot section
+        snapshot_signature = self._snapshot_state[0]
+        json_signature = file_signature(self.data_dir / DATA_FILES[key])
+        return (
+            snapshot_signature is not None
+            and (json_signature is None or json_signature[0] <= snapshot_signature[0])
+        )
+
+    def _read(self, key: str) -> Dataset:
+        snapshot = self._snapshot()
+        if snapshot is not None and key in snapshot and self._snapshot_is_current(key):
+            payload = snapshot.load(key)
+            return Dataset(
+                key=key,
+                payload=payload,
+                index=build_index(key, payload),
+                version=snapshot.section_version(key),
+            )
 
-    def load(self, key: str) -> Dict[str, Any]:
-        """Load and cache the JSON payload corresponding to the given key."""
+        path = self.data_dir / DATA_FILES[key]
+        if not path.exists():
+            raise FileNotFoundError(
+                f"Dataset missing: {path}. "
+                "Ensure `make pipeline` has been executed recently."
+            )
+        raw = path.read_bytes()
+        payload = json.loads(raw)
+        return Dataset(
+            key=key,
+            payload=payload,
+            index=build_index(key, payload),
+            version=hashlib.sha1(raw).hexdigest()[:16],
+        )
+
+    def _publish(self, loaded: Dict[str, Dataset]) -> None:
+        with self._write_lock:
+            datasets = dict(self._datasets)
+            datasets.update(loaded)
+            self._datasets = datasets
+
+    def dataset(self, key: str) -> Dataset:
+        """Return a consistent payload/index/version triple for the key."""
         if key not in DATA_FILES:
             raise KeyError(f"Unknown dataset key: {key}")
 
-        if key not in self._cache:
-            path = self.data_dir / DATA_FILES[key]
-            if not path.exists():
-                raise FileNotFoundError(
-                    f"Dataset missing: {path}. "
-                    "Ensure `make pipeline` has been executed recently."
-                )
-            with path.open("r", encoding="utf-8") as handle:
-                self._cache[key] = json.load(handle)
-
-        return self._cache[key]
+        current = self._datasets.get(key)
+        if current is None:
+            with self._write_lock:
+                current = self._datasets.get(key)
+                if current is None:
+                    current = self._read(key)
+                    datasets = dict(self._datasets)
+                    datasets[key] = current
+                    self._datasets = datasets
+        return current
+
+    def load(self, key: str) -> Dict[str, Any]:
+        """Load and cache the JSON payload corresponding to the given key."""
+        return self.dataset(key).payload
+
+    def index(self, key: str) -> Any:
+        """Return the derived lookup index for a dataset, built once per load."""
+        return self.dataset(key).index
+
+    def loaded(self) -> List[str]:
+        """Keys of the datasets currently held in memory."""
+        return sorted(self._datasets)
+
+    def version(self, key: str) -> str:
+        """Content hash of the currently served copy of a dataset."""
+        return self.dataset(key).version
+
+    def reload(self, keys: Optional[Iterable[str]] = None) -> Set[str]:
+        """
+        Re-read already loaded datasets and swap them in atomically.
+
+        Returns the keys that could not be parsed (typically a file caught
+        mid-write); their previous copy keeps being served.
+        """
+        targets = set(self._datasets) if keys is None else set(keys) & set(self._datasets)
+        loaded: Dict[str, Dataset] = {}
+        failed: Set[str] = set()
+        for key in sorted(targets):
+            try:
+                fresh = self._read(key)
+            except FileNotFoundError:
+                logger.warning("Dataset %s disappeared; serving last good copy", key)
+                continue
+            except ValueError as exc:
+                logger.warning("Dataset %s not reloadable yet: %s", key, exc)
+                failed.add(key)
+                continue
+            if fresh.version != self._datasets[key].version:
+                loaded[key] = fresh
+        if loaded:
+            self._publish(loaded)
+            logger.info("Reloaded datasets: %s", ", ".join(sorted(loaded)))
+        return failed
+
+    def _on_files_changed(self, filenames: Set[str]) -> Set[str]:
+        if SNAPSHOT_NAME in filenames:
+            failed = self.reload()
+            return {SNAPSHOT_NAME} if failed else set()
+        # Sections of the snapshot may now be stale; reopen and recheck it
+        self._snapshot_state = (None, None)
+        keys = {_FILE_KEYS[name] for name in filenames}
+        failed = self.reload(keys)
+        return {DATA_FILES[key] for key in failed}
+
+    def start_watching(self) -> None:
+        """Start the background watcher (idempotent)."""
+        if self._watcher is None:
+            self._watcher = DirectoryWatcher(
+                self.data_dir,
+                [*DATA_FILES.values(), SNAPSHOT_NAME],
+                self._on_files_changed,
+                poll_interval=self.poll_interval,
+            ).start()
+            logger.info("Watching %s (%s)", self.data_dir, self._watcher.mode)
+
+    def close(self) -> None:
+        """Stop watching the data directory."""
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
 
     @property
     def kernel_structure(self) -> Dict[str, Any]:
@@ -0,0 +1,59 @@
+"""
+Precomputed lookup structures derived from the pipeline datasets.
+
+Indexes are built once per dataset load so that server queries are hash
+lookups or slices instead of scans and sorts over the raw JSON.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class KernelIndex:
+    """Syscall lookups derived from kernel_structure.json."""
+
+    syscalls_by_name: Dict[str, Dict[str, Any]]
+    syscalls_by_line_count: Tuple[Dict[str, Any], ...]
+
+    @classmethod
+    def build(cls, kernel: Dict[str, Any]) -> "KernelIndex":
+        syscalls = kernel.get("system_calls", [])
+        by_name: Dict[str, Dict[str, Any]] = {}
+        for entry in syscalls:
+            # First definition wins, as with a front-to-back scan
+            by_name.setdefault(entry.get("name"), entry)
+        by_line_count = tuple(
+            sorted(syscalls, key=lambda entry: entry.get("line_count", 0), reverse=True)
+        )
+        return cls(syscalls_by_name=by_name, syscalls_by_line_count=by_line_count)
+
+
+@dataclass(frozen=True)
+class BootIndex:
+    """Boot phase lookups derived from boot_sequence.json."""
+
+    phases_by_key: Dict[str, Dict[str, Any]]
+
+    @classmethod
+    def build(cls, boot: Dict[str, Any]) -> "BootIndex":
+        by_key: Dict[str, Dict[str, Any]] = {}
+        for entry in boot.get("boot_phases", []):
+            for key in (entry.get("id"), entry.get("name")):
+                if isinstance(key, str):
+                    by_key.setdefault(key, entry)
+        return cls(phases_by_key=by_key)
+
+
+INDEX_BUILDERS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "kernel_structure": KernelIndex.build,
+    "boot_sequence": BootIndex.build,
+}
+
+
+def build_index(key: str, payload: Dict[str, Any]) -> Optional[Any]:
+    """Build the index for a dataset, or None if it has no derived index."""
+    builder = INDEX_BUILDERS.get(key)
+    return builder(payload) if builder else None
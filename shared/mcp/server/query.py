@@ -0,0 +1,292 @@
+"""
+Projection, filtering, sorting and cursor pagination over dataset collections.
+
+A collection is a list inside one of the pipeline datasets (for example the
+syscalls in kernel_structure.json). Rows are normalized to dicts once per
+dataset version; sorted views and equality lookups are memoized against that
+version so repeated queries never rescan or re-sort the raw JSON.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .data_loader import MinixDataLoader
+
+# Collection name -> (dataset key, field within the dataset)
+COLLECTIONS: Dict[str, Tuple[str, str]] = {
+    "syscalls": ("kernel_structure", "system_calls"),
+    "arch_specific": ("kernel_structure", "arch_specific"),
+    "interrupt_handlers": ("kernel_structure", "interrupt_handlers"),
+    "message_types": ("kernel_structure", "message_types"),
+    "process_states": ("process_table", "process_states"),
+    "process_fields": ("process_table", "process_fields"),
+    "scheduling_queues": ("process_table", "scheduling_queues"),
+    "memory_regions": ("memory_layout", "memory_regions"),
+    "endpoints": ("ipc_system", "endpoints"),
+    "boot_phases": ("boot_sequence", "boot_phases"),
+    "boot_stages": ("boot_sequence", "boot_stages"),
+}
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 1000
+
+_PREDICATE_RE = re.compile(r"^\s*(\w+)\s*(==|!=|>=|<=|\^=|>|<|~)\s*(.*?)\s*$")
+
+Row = Dict[str, Any]
+
+
+def _parse_value(text: str) -> Any:
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def _ordered(op: Callable[[Any, Any], bool]) -> Callable[[Any, Any], bool]:
+    def compare(left: Any, right: Any) -> bool:
+        try:
+            return left is not None and op(left, right)
+        except TypeError:
+            return False
+
+    return compare
+
+
+_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "==": lambda left, right: left == right,
+    "!=": lambda left, right: left != right,
+    ">": _ordered(lambda left, right: left > right),
+    ">=": _ordered(lambda left, right: left >= right),
+    "<": _ordered(lambda left, right: left < right),
+    "<=": _ordered(lambda left, right: left <= right),
+    "~": lambda left, right: left is not None and str(right) in str(left),
+    "^=": lambda left, right: left is not None and str(left).startswith(str(right)),
+}
+
+
+@dataclass(frozen=True)
+class Predicate:
+    """``field op value``, e.g. ``line_count>=100`` or ``file~system/``."""
+
+    field: str
+    op: str
+    value: Any
+
+    @classmethod
+    def parse(cls, text: str) -> "Predicate":
+        match = _PREDICATE_RE.match(text)
+        if not match:
+            raise ValueError(f"Invalid predicate: {text!r}")
+        field, op, value = match.groups()
+        return cls(field=field, op=op, value=_parse_value(value))
+
+    def matches(self, row: Row) -> bool:
+        return _OPERATORS[self.op](row.get(self.field), self.value)
+
+
+def _sort_key(value: Any) -> Tuple[int, Any]:
+    # Numbers before strings, so mixed columns still have a total order
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return 0, value
+    return 1, str(value)
+
+
+def _sorted(rows: Sequence[Row], sort: Sequence[str]) -> Tuple[Row, ...]:
+    ordered = list(rows)
+    # Stable sorts from the last key to the first; missing values sort last
+    for spec in reversed(sort):
+        descending = spec.startswith("-")
+        field = spec.lstrip("-+")
+        present = [row for row in ordered if row.get(field) is not None]
+        missing = [row for row in ordered if row.get(field) is None]
+        present.sort(key=lambda row: _sort_key(row[field]), reverse=descending)
+        ordered = present + missing
+    return tuple(ordered)
+
+
+def _normalize(raw: Any) -> Tuple[Row, ...]:
+    if isinstance(raw, dict):
+        return tuple(
+            dict(value, name=key)
+            if isinstance(value, dict)
+            else {"name": key, "value": value}
+            for key, value in raw.items()
+        )
+    return tuple(
+        item if isinstance(item, dict) else {"value": item} for item in raw or ()
+    )
+
+
+def _encode_cursor(payload: Dict[str, Any]) -> str:
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except ValueError as exc:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from exc
+
+
+def split_list(text: Optional[str], separator: str = ",") -> List[str]:
+    """Split a comma (or other) separated argument, dropping blanks."""
+    if not text:
+        return []
+    return [part.strip() for part in text.split(separator) if part.strip()]
+
+
+class QueryEngine:
+    """
+    Evaluate collection queries against memoized per-version structures.
+
+    Memo entries are keyed on the dataset version, so a reload never serves
+    stale rows and old entries age out of the bounded LRU.
+    """
+
+    def __init__(self, loader: MinixDataLoader, max_views: int = 128) -> None:
+        self.loader = loader
+        self.max_views = max_views
+        self._views: "OrderedDict[Tuple[Any, ...], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _memo(self, key: Tuple[Any, ...], build: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._views:
+                self._views.move_to_end(key)
+                return self._views[key]
+        value = build()
+        with self._lock:
+            self._views[key] = value
+            while len(self._views) > self.max_views:
+                self._views.popitem(last=False)
+        return value
+
+    def collection_names(self) -> List[str]:
+        return sorted(COLLECTIONS)
+
+    def rows(self, collection: str, sort: Sequence[str] = ()) -> Tuple[Row, ...]:
+        """Normalized rows of a collection, in the requested order."""
+        if collection not in COLLECTIONS:
+            raise KeyError(f"Unknown collection: {collection}")
+        key, field = COLLECTIONS[collection]
+        dataset = self.loader.dataset(key)
+        base = self._memo(
+            ("rows", collection, dataset.version),
+            lambda: _normalize(dataset.payload.get(field)),
+        )
+        if not sort:
+            return base
+        return self._memo(
+            ("sorted", collection, dataset.version, tuple(sort)),
+            lambda: _sorted(base, sort),
+        )
+
+    def _equality_index(
+        self, collection: str, field: str
+    ) -> Dict[Any, Tuple[int, ...]]:
+        key, _ = COLLECTIONS[collection]
+        version = self.loader.version(key)
+
+        def build() -> Dict[Any, Tuple[int, ...]]:
+            positions: Dict[Any, List[int]] = {}
+            for position, row in enumerate(self.rows(collection)):
+                value = row.get(field)
+                try:
+                    positions.setdefault(value, []).append(position)
+                except TypeError:  # unhashable values are not indexed
+                    continue
+            return {value: tuple(found) for value, found in positions.items()}
+
+        return self._memo(("eq", collection, version, field), build)
+
+    def _candidates(
+        self, collection: str, predicates: List[Predicate], sort: Sequence[str]
+    ) -> Iterable[Row]:
+        for position, predicate in enumerate(predicates):
+            if predicate.op != "==":
+                continue
+            try:
+                hit = self._equality_index(collection, predicate.field).get(
+                    predicate.value, ()
+                )
+            except TypeError:
+                continue
+            base = self.rows(collection)
+            rest = predicates[:position] + predicates[position + 1 :]
+            selected = [base[i] for i in hit if all(p.matches(base[i]) for p in rest)]
+            return _sorted(selected, sort) if sort else selected
+        rows = self.rows(collection, sort)
+        if not predicates:
+            return rows
+        return [row for row in rows if all(p.matches(row) for p in predicates)]
+
+    def query(
+        self,
+        collection: str,
+        fields: Sequence[str] = (),
+        where: Sequence[str] = (),
+        sort: Sequence[str] = (),
+        limit: int = DEFAULT_LIMIT,
+        cursor: Optional[str] = None,
+        offset: int = 0,
+    ) -> Dict[str, Any]:
+        """
+        Return one page of a collection.
+
+        ``where`` predicates are ANDed; ``sort`` keys prefixed with ``-`` sort
+        descending; ``limit`` of 0 means up to ``MAX_LIMIT`` per page.
+        ``next_cursor`` is only valid while the underlying dataset version
+        stays the same.
+        ``offset`` addresses a page directly (e.g. a numbered table page) and
+        is ignored when a cursor is given.
+        """
+        if collection not in COLLECTIONS:
+            raise KeyError(f"Unknown collection: {collection}")
+        predicates = [Predicate.parse(text) for text in where]
+        limit = MAX_LIMIT if limit <= 0 else min(limit, MAX_LIMIT)
+        key, _ = COLLECTIONS[collection]
+        version = self.loader.version(key)
+        signature = hashlib.sha1(
+            json.dumps([collection, list(where), list(sort)]).encode("utf-8")
+        ).hexdigest()[:12]
+
+        offset = max(offset, 0)
+        if cursor:
+            state = _decode_cursor(cursor)
+            if state.get("q") != signature:
+                raise ValueError("Cursor does not belong to this query")
+            if state.get("v") != version:
+                raise ValueError(f"Cursor is stale: {key} changed since it was issued")
+            offset = int(state.get("o", 0))
+
+        matched = self._candidates(collection, predicates, sort)
+        if not isinstance(matched, (list, tuple)):
+            matched = list(matched)
+        page = matched[offset : offset + limit]
+        if fields:
+            page = [{f: row[f] for f in fields if f in row} for row in page]
+
+        next_offset = offset + limit
+        next_cursor = (
+            _encode_cursor({"o": next_offset, "v": version, "q": signature})
+            if next_offset < len(matched)
+            else None
+        )
+        return {
+            "collection": collection,
+            "dataset": key,
+            "version": version,
+            "total": len(matched),
+            "items": list(page),
+            "next_cursor": next_cursor,
+        }
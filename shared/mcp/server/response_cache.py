@@ -0,0 +1,110 @@
+"""
+Cache of serialized endpoint responses keyed on dataset versions.
+
+Each entry is keyed on (endpoint, canonical arguments, versions of the
+datasets the endpoint reads). A dataset reload changes its version, so
+stale entries are simply never hit again and age out of the LRU.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from .data_loader import MinixDataLoader
+
+CacheKey = Tuple[str, str, Tuple[Tuple[str, str], ...]]
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """Encoded response body and the ETag identifying it."""
+
+    body: str
+    etag: str
+
+
+class ResponseCache:
+    """
+    Bounded LRU of encoded responses.
+
+    ``etag()`` is computable without rendering, so clients can ask whether
+    a payload changed before paying for it.
+    """
+
+    def __init__(self, loader: MinixDataLoader, max_entries: int = 256) -> None:
+        self.loader = loader
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[CacheKey, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(
+        self,
+        name: str,
+        arguments: Optional[Dict[str, Any]],
+        datasets: Iterable[str],
+    ) -> CacheKey:
+        canonical = json.dumps(arguments or {}, sort_keys=True, separators=(",", ":"))
+        versions = tuple((key, self.loader.version(key)) for key in sorted(datasets))
+        return name, canonical, versions
+
+    @staticmethod
+    def _etag(key: CacheKey) -> str:
+        return '"' + hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:20] + '"'
+
+    def etag(
+        self,
+        name: str,
+        arguments: Optional[Dict[str, Any]],
+        datasets: Iterable[str],
+    ) -> str:
+        """ETag of the response the endpoint would currently return."""
+        return self._etag(self.key(name, arguments, datasets))
+
+    def get(
+        self,
+        name: str,
+        arguments: Optional[Dict[str, Any]],
+        datasets: Iterable[str],
+        render: Callable[[], str],
+    ) -> CachedResponse:
+        """Return the cached encoding, rendering it on a miss."""
+        key = self.key(name, arguments, datasets)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        response = CachedResponse(body=render(), etag=self._etag(key))
+        # A reload during render may have mixed new data into the body:
+        # return it under the old ETag, so clients revalidate, but keep it
+        # out of the cache
+        if self.key(name, arguments, datasets) != key:
+            return response
+        with self._lock:
+            self._entries[key] = response
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return response
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
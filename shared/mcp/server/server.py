@@ -4,20 +4,12 @@ High-level façade exposing MINIX analysis data as MCP-friendly endpoints.
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Sequence
 
-from .data_loader import MinixDataLoader
-
-
-def _top_syscalls(kernel_data: Dict[str, Any], limit: int = 5) -> List[Dict[str, Any]]:
-    syscalls = kernel_data.get("system_calls", [])
-    sorted_calls = sorted(
-        syscalls,
-        key=lambda entry: entry.get("line_count", 0),
-        reverse=True,
-    )
-    return sorted_calls[:limit]
+from .data_loader import DATA_FILES, MinixDataLoader
+from .indexes import BootIndex, KernelIndex
+from .query import COLLECTIONS, DEFAULT_LIMIT, QueryEngine
 
 
 @dataclass
@@ -30,33 +22,38 @@ class MinixAnalysisServer:
     """
 
     loader: MinixDataLoader
+    queries: QueryEngine = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.queries = QueryEngine(self.loader)
 
     @classmethod
-    def from_default_data_dir(cls) -> "MinixAnalysisServer":
-        return cls(loader=MinixDataLoader())
+    def from_default_data_dir(cls, watch: bool = False) -> "MinixAnalysisServer":
+        return cls(loader=MinixDataLoader(watch=watch))
 
     # CPU-centric endpoints -------------------------------------------------
 
     def query_architecture(self, top_n: int = 5) -> Dict[str, Any]:
         """Return core kernel architecture insights."""
-        kernel = self.loader.kernel_structure
-        limit = top_n if top_n and top_n > 0 else len(kernel.get("system_calls", []))
+        dataset = self.loader.dataset("kernel_structure")
+        kernel = dataset.payload
+        index: KernelIndex = dataset.index
+        ranked = index.syscalls_by_line_count
+        limit = top_n if top_n and top_n > 0 else len(ranked)
         return {
             "microkernel": kernel.get("microkernel", True),
             "ipc_mechanism": kernel.get("ipc_mechanism", "message_passing"),
             "components": kernel.get("components", []),
             "summary": {
-                "syscall_count": len(kernel.get("system_calls", [])),
-                "top_syscalls": _top_syscalls(kernel, limit=limit),
+                "syscall_count": len(ranked),
+                "top_syscalls": list(ranked[:limit]),
             },
         }
 
     def analyze_syscall(self, name: str) -> Optional[Dict[str, Any]]:
         """Retrieve details for a specific syscall by name."""
-        for entry in self.loader.kernel_structure.get("system_calls", []):
-            if entry.get("name") == name:
-                return entry
-        return None
+        index: KernelIndex = self.loader.index("kernel_structure")
+        return index.syscalls_by_name.get(name)
 
     def query_performance(self) -> Dict[str, Any]:
         """Expose high-level performance statistics."""
@@ -106,24 +103,45 @@ class MinixAnalysisServer:
 
     def trace_boot_path(self, phase: str) -> Optional[Dict[str, Any]]:
         """Return details for a specific boot phase or the critical path."""
-        boot = self.loader.boot_sequence
-        phases = boot.get("boot_phases", [])
+        dataset = self.loader.dataset("boot_sequence")
         if phase == "critical_path":
-            return boot.get("critical_path")
-        for entry in phases:
-            if entry.get("id") == phase or entry.get("name") == phase:
-                return entry
-        return None
+            return dataset.payload.get("critical_path")
+        index: BootIndex = dataset.index
+        return index.phases_by_key.get(phase)
 
     # Aggregated dataset ----------------------------------------------------
 
-    def list_resources(self) -> Dict[str, Any]:
-        """Return all available resource payloads."""
+    def list_resources(self, datasets: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """Return available resource payloads, optionally only the named ones."""
+        keys = list(DATA_FILES) if not datasets else list(datasets)
+        unknown = [key for key in keys if key not in DATA_FILES]
+        if unknown:
+            raise ValueError(
+                f"Unknown dataset(s): {', '.join(unknown)} "
+                f"(choose from {', '.join(DATA_FILES)})"
+            )
+        return {key: self.loader.load(key) for key in keys}
+
+    def list_collections(self) -> Dict[str, Any]:
+        """Return queryable collections with their source dataset and size."""
         return {
-            "kernel_structure": self.loader.kernel_structure,
-            "process_table": self.loader.process_table,
-            "memory_layout": self.loader.memory_layout,
-            "ipc_system": self.loader.ipc_system,
-            "boot_sequence": self.loader.boot_sequence,
-            "statistics": self.loader.statistics,
+            name: {
+                "dataset": COLLECTIONS[name][0],
+                "count": len(self.queries.rows(name)),
+            }
+            for name in self.queries.collection_names()
         }
+
+    def query(
+        self,
+        collection: str,
+        fields: Sequence[str] = (),
+        where: Sequence[str] = (),
+        sort: Sequence[str] = (),
+        limit: int = DEFAULT_LIMIT,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Project, filter, sort and paginate one collection (see query.py)."""
+        return self.queries.query(
+            collection, fields=fields, where=where, sort=sort, limit=limit, cursor=cursor
+        )
@@ -0,0 +1,161 @@
+"""
+Change notification for the pipeline data directory.
+
+Uses Linux inotify (through ctypes, no extra dependency) when available and
+falls back to polling file stat signatures everywhere else.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# inotify event flags (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+_WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_EVENT_HEADER = struct.Struct("iIII")
+
+Signature = Optional[Tuple[int, int]]
+
+# Never equal to a real signature, so the file is reported again
+_RETRY: Signature = (-1, -1)
+
+
+def file_signature(path: Path) -> Signature:
+    """Cheap change detector: (mtime_ns, size), or None if the file is absent."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class _Inotify:
+    """Minimal inotify binding for a single directory."""
+
+    def __init__(self, directory: Path) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if (
+            libc.inotify_add_watch(self.fd, os.fsencode(str(directory)), _WATCH_MASK)
+            < 0
+        ):
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {directory}")
+
+    def read(self, timeout: float) -> Set[str]:
+        """Return names touched since the last read, waiting up to timeout."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        buffer = os.read(self.fd, 64 * 1024)
+        names: Set[str] = set()
+        offset = 0
+        while offset < len(buffer):
+            _wd, _mask, _cookie, length = _EVENT_HEADER.unpack_from(buffer, offset)
+            offset += _EVENT_HEADER.size
+            name = buffer[offset : offset + length].rstrip(b"\0")
+            offset += length
+            if name:
+                names.add(os.fsdecode(name))
+        return names
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class DirectoryWatcher:
+    """
+    Background thread reporting which of a fixed set of files changed.
+
+    ``callback`` receives the changed file names and may return the subset
+    it could not process (e.g. a half-written file); those are re-reported
+    on the next pass. inotify is preferred; if it cannot be set up the
+    watcher polls ``file_signature`` every ``poll_interval`` seconds instead.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        filenames: Iterable[str],
+        callback: Callable[[Set[str]], Optional[Set[str]]],
+        poll_interval: float = 1.0,
+        use_inotify: bool = True,
+    ) -> None:
+        self.directory = Path(directory)
+        self.filenames = frozenset(filenames)
+        self.callback = callback
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._inotify: Optional[_Inotify] = None
+        if use_inotify:
+            try:
+                self._inotify = _Inotify(self.directory)
+            except (OSError, AttributeError) as exc:
+                logger.info("inotify unavailable (%s); polling %s", exc, self.directory)
+        self._signatures: Dict[str, Signature] = self._scan()
+        self._thread = threading.Thread(
+            target=self._run, name="minix-data-watcher", daemon=True
+        )
+
+    @property
+    def mode(self) -> str:
+        return "inotify" if self._inotify else "polling"
+
+    def start(self) -> "DirectoryWatcher":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        if self._inotify:
+            self._inotify.close()
+            self._inotify = None
+
+    def _scan(self) -> Dict[str, Signature]:
+        return {name: file_signature(self.directory / name) for name in self.filenames}
+
+    def _changed(self) -> Set[str]:
+        current = self._scan()
+        changed = {
+            name for name, sig in current.items() if sig != self._signatures[name]
+        }
+        self._signatures = current
+        return changed
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            if self._inotify:
+                names = self._inotify.read(timeout=self.poll_interval) & self.filenames
+                # Re-check signatures so bursts of events collapse to one
+                # reload; an idle timeout also re-checks pending retries
+                retrying = _RETRY in self._signatures.values()
+                changed = self._changed() if names or retrying else set()
+            else:
+                self._stop.wait(self.poll_interval)
+                changed = self._changed()
+            if changed and not self._stop.is_set():
+                try:
+                    failed = self.callback(changed) or set()
+                except Exception:  # pragma: no cover - keep watching regardless
+                    logger.exception("Data reload failed for %s", sorted(changed))
+                    failed = changed
+                for name in failed:
+                    self._signatures[name] = _RETRY
@@ -0,0 +1,47 @@
+"""
+QEMU helpers shared by the boot profilers and test runners.
+"""
+
+from .images import GoldenImageCache, ImageError, create_overlay, iso_hash, overlay
+from .sampling import (
+    SampleSummary,
+    SamplingPolicy,
+    resolve_policy,
+    sample_matrix,
+    sample_until,
+    split_outliers,
+)
+from .scheduler import BootJob, JobResult, MatrixScheduler, Placement, group_results
+from .serial import (
+    SerialCapture,
+    SerialLine,
+    marker_times,
+    median_phases,
+    phase_durations,
+    read_trace,
+)
+
+__all__ = [
+    "BootJob",
+    "GoldenImageCache",
+    "ImageError",
+    "JobResult",
+    "MatrixScheduler",
+    "Placement",
+    "SampleSummary",
+    "SamplingPolicy",
+    "SerialCapture",
+    "SerialLine",
+    "create_overlay",
+    "group_results",
+    "iso_hash",
+    "marker_times",
+    "median_phases",
+    "overlay",
+    "phase_durations",
+    "read_trace",
+    "resolve_policy",
+    "sample_matrix",
+    "sample_until",
+    "split_outliers",
+]
@@ -0,0 +1,180 @@
+"""
+Golden installed-disk cache with copy-on-write overlays.
+
+Installing MINIX from the ISO takes minutes; booting an installed disk takes
+seconds. The cache installs once per (ISO content, installer version, disk
+size) into a read-only *golden* qcow2 image, and every boot gets a
+throwaway qcow2 overlay backed by it. Overlays hold only the blocks a boot
+writes, so matrix runs neither repeat the installation nor grow disk usage
+with the number of samples.
+
+Concurrent profilers sharing a cache directory serialize on a per-key lock
+file, so the installation still runs once.
+
+Usage::
+
+    cache = GoldenImageCache()
+    golden = cache.golden(iso, install=run_installer, version="setup-1")
+    with overlay(golden) as disk:
+        boot(disk)
+"""
+
+from __future__ import annotations
+
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import stat
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Tuple, Union
+
+DEFAULT_CACHE_DIR = Path(
+    os.environ.get(
+        "MINIX_IMAGE_CACHE", Path.home() / ".cache" / "minix-analysis" / "images"
+    )
+)
+QEMU_IMG = "qemu-img"
+
+PathLike = Union[str, Path]
+
+# (resolved path, size, mtime) -> sha256, so an ISO is hashed once per process
+_iso_hashes: Dict[Tuple[str, int, int], str] = {}
+
+
+class ImageError(RuntimeError):
+    """qemu-img failed, or the installer did not produce a golden image."""
+
+
+def iso_hash(iso: PathLike) -> str:
+    """Content hash of an installation medium."""
+    path = Path(iso).resolve()
+    info = path.stat()
+    memo = (str(path), info.st_size, info.st_mtime_ns)
+    if memo not in _iso_hashes:
+        digest = hashlib.sha256()
+        with open(path, "rb") as handle:
+            for block in iter(lambda: handle.read(1 << 20), b""):
+                digest.update(block)
+        _iso_hashes[memo] = digest.hexdigest()
+    return _iso_hashes[memo]
+
+
+def _qemu_img(args, qemu_img: str = QEMU_IMG) -> None:
+    try:
+        proc = subprocess.run([qemu_img, *args], capture_output=True, text=True)
+    except FileNotFoundError:
+        raise ImageError(f"{qemu_img} not found. Install qemu") from None
+    if proc.returncode != 0:
+        raise ImageError(
+            proc.stderr.strip() or f"{qemu_img} exited with {proc.returncode}"
+        )
+
+
+def create_overlay(base: PathLike, path: PathLike, qemu_img: str = QEMU_IMG) -> Path:
+    """Create a qcow2 overlay at ``path`` backed by ``base`` (left unmodified)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _qemu_img(
+        [
+            "create",
+            "-f",
+            "qcow2",
+            "-F",
+            "qcow2",
+            "-b",
+            str(Path(base).resolve()),
+            str(path),
+        ],
+        qemu_img,
+    )
+    return path
+
+
+@contextlib.contextmanager
+def overlay(
+    base: PathLike, directory: Optional[PathLike] = None, qemu_img: str = QEMU_IMG
+) -> Iterator[Path]:
+    """Throwaway overlay of ``base``, deleted when the block exits."""
+    if directory is not None:
+        Path(directory).mkdir(parents=True, exist_ok=True)
+    fd, name = tempfile.mkstemp(prefix="boot-", suffix=".qcow2", dir=directory)
+    os.close(fd)
+    try:
+        yield create_overlay(base, name, qemu_img)
+    finally:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(name)
+
+
+class GoldenImageCache:
+    """Installed disk images keyed on ISO hash, installer version and size"""
+
+    def __init__(self, cache_dir: Optional[PathLike] = None, qemu_img: str = QEMU_IMG):
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+        self.qemu_img = qemu_img
+
+    def key(self, iso: PathLike, version: str, size: str = "2G") -> str:
+        digest = hashlib.sha256(f"{iso_hash(iso)}\0{version}\0{size}".encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+    def path(self, iso: PathLike, version: str, size: str = "2G") -> Path:
+        return self.cache_dir / f"minix-{self.key(iso, version, size)}.qcow2"
+
+    def golden(
+        self,
+        iso: PathLike,
+        install: Callable[[Path], bool],
+        version: str,
+        size: str = "2G",
+    ) -> Path:
+        """
+        Golden image for ``iso``, running ``install(disk)`` on a blank
+        ``size`` disk the first time; the installer returns True on success.
+        """
+        target = self.path(iso, version, size)
+        if target.exists():
+            return target
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(target.with_suffix(".lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            # Another process may have installed it while we waited
+            if target.exists():
+                return target
+
+            partial = target.with_name(f".{target.stem}.{os.getpid()}.qcow2")
+            try:
+                _qemu_img(["create", "-f", "qcow2", str(partial), size], self.qemu_img)
+                started = time.perf_counter()
+                if not install(partial):
+                    raise ImageError(f"installation of {Path(iso).name} failed")
+                seconds = time.perf_counter() - started
+                # Overlays depend on it never changing
+                partial.chmod(stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+                os.replace(partial, target)
+            finally:
+                with contextlib.suppress(FileNotFoundError):
+                    partial.unlink()
+
+            target.with_suffix(".json").write_text(
+                json.dumps(
+                    {
+                        "iso": str(Path(iso).resolve()),
+                        "iso_sha256": iso_hash(iso),
+                        "installer_version": version,
+                        "size": size,
+                        "install_seconds": round(seconds, 1),
+                    },
+                    indent=2,
+                )
+            )
+        return target
+
+    def overlay(self, golden: PathLike, directory: Optional[PathLike] = None):
+        """Throwaway overlay of ``golden`` (see :func:`overlay`)."""
+        return overlay(golden, directory, self.qemu_img)
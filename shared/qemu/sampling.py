@@ -0,0 +1,265 @@
+"""
+Adaptive sample counts for boot measurements.
+
+A fixed number of boots per configuration is too many for stable
+configurations and too few for noisy ones. The controller here samples
+sequentially instead. It boots until the confidence interval on the mean
+(or median) is narrower than a target fraction of the estimate, or the
+sample budget is spent. Before each check it discards outliers by their
+median absolute deviation (MAD), so one stalled boot neither widens the
+interval nor shifts the result.
+
+Usage::
+
+    policy = SamplingPolicy(rel_width=0.05, max_samples=20)
+    summary = sample_until(lambda: boot(), policy)
+    print(summary.center, summary.low, summary.high, summary.converged)
+
+For boot matrices, :func:`sample_matrix` runs rounds of jobs through a
+:class:`~shared.qemu.scheduler.MatrixScheduler` and asks for more boots
+only for the configurations that have not converged.
+"""
+
+from __future__ import annotations
+
+import math
+import statistics
+from dataclasses import dataclass, field
+from statistics import NormalDist
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from .scheduler import BootJob, JobResult, MatrixScheduler
+
+# Modified z-score above which a sample is an outlier (Iglewicz and Hoaglin)
+OUTLIER_Z = 3.5
+
+
+def t_quantile(p: float, df: int) -> float:
+    """Student t quantile, by its Cornish-Fisher expansion (within 1% for df >= 2)."""
+    z = NormalDist().inv_cdf(p)
+    v = df
+    return (
+        z
+        + (z**3 + z) / (4 * v)
+        + (5 * z**5 + 16 * z**3 + 3 * z) / (96 * v**2)
+        + (3 * z**7 + 19 * z**5 + 17 * z**3 - 15 * z) / (384 * v**3)
+        + (79 * z**9 + 776 * z**7 + 1482 * z**5 - 1920 * z**3 - 945 * z)
+        / (92160 * v**4)
+    )
+
+
+def split_outliers(
+    values: Sequence[float], threshold: float = OUTLIER_Z
+) -> Tuple[List[float], List[float]]:
+    """
+    (kept, outliers) by modified z-score, ``0.6745 * |x - median| / MAD``.
+    With a zero MAD (most samples identical) nothing is dropped.
+    """
+    if len(values) < 3:
+        return list(values), []
+    center = statistics.median(values)
+    mad = statistics.median(abs(x - center) for x in values)
+    if mad == 0:
+        return list(values), []
+    kept, outliers = [], []
+    for x in values:
+        (outliers if 0.6745 * abs(x - center) / mad > threshold else kept).append(x)
+    return kept, outliers
+
+
+def mean_interval(
+    values: Sequence[float], confidence: float
+) -> Tuple[float, float, float]:
+    """(mean, low, high): Student t interval on the mean."""
+    center = statistics.mean(values)
+    if len(values) < 3:
+        return center, -math.inf, math.inf
+    half = (
+        t_quantile((1 + confidence) / 2, len(values) - 1)
+        * statistics.stdev(values)
+        / math.sqrt(len(values))
+    )
+    return center, center - half, center + half
+
+
+def median_interval(
+    values: Sequence[float], confidence: float
+) -> Tuple[float, float, float]:
+    """
+    (median, low, high): distribution-free interval between order
+    statistics. Unbounded until there are enough samples to reach the
+    confidence (six for 95%).
+    """
+    ordered = sorted(values)
+    n = len(ordered)
+    center = statistics.median(ordered)
+    # Widen symmetric ranks around the middle until Binomial(n, 1/2)
+    # puts ``confidence`` of its mass between them
+    for j in range(n // 2, -1, -1):
+        k = n - 1 - j
+        if j > k:
+            continue
+        coverage = sum(math.comb(n, i) for i in range(j + 1, k + 1)) / 2**n
+        if coverage >= confidence:
+            return center, ordered[j], ordered[k]
+    return center, -math.inf, math.inf
+
+
+@dataclass(frozen=True)
+class SamplingPolicy:
+    """When to stop booting a configuration"""
+
+    min_samples: int = 3
+    max_samples: int = 20
+    # Target interval width, as a fraction of the estimate
+    rel_width: float = 0.05
+    confidence: float = 0.95
+    statistic: str = "mean"
+    outlier_z: float = OUTLIER_Z
+
+    def __post_init__(self):
+        if self.statistic not in ("mean", "median"):
+            raise ValueError(
+                f"statistic must be 'mean' or 'median', not {self.statistic!r}"
+            )
+        if not 1 <= self.min_samples <= self.max_samples:
+            raise ValueError("need 1 <= min_samples <= max_samples")
+
+    @classmethod
+    def fixed(cls, samples: int, **kwargs) -> "SamplingPolicy":
+        """Exactly ``samples`` boots, still reported with outliers and interval."""
+        return cls(min_samples=samples, max_samples=samples, **kwargs)
+
+    def summarize(self, values: Sequence[float]) -> "SampleSummary":
+        kept, outliers = split_outliers(values, self.outlier_z)
+        interval = mean_interval if self.statistic == "mean" else median_interval
+        center, low, high = interval(kept, self.confidence)
+        width = (high - low) / abs(center) if center else math.inf
+        return SampleSummary(
+            samples=list(values),
+            kept=kept,
+            outliers=outliers,
+            statistic=self.statistic,
+            center=center,
+            low=low,
+            high=high,
+            rel_width=width,
+            converged=len(values) >= self.min_samples and width <= self.rel_width,
+        )
+
+    def more_needed(self, summary: "SampleSummary") -> int:
+        """
+        How many more boots to run before checking again: 0 once converged
+        or out of budget; otherwise a projection from the current width,
+        since the interval narrows with the square root of the count.
+        """
+        n = len(summary.samples)
+        left = self.max_samples - n
+        if left <= 0 or summary.converged:
+            return 0
+        if n < self.min_samples:
+            return self.min_samples - n
+        if not math.isfinite(summary.rel_width):
+            return 1
+        projected = math.ceil(
+            len(summary.kept) * (summary.rel_width / self.rel_width) ** 2
+        )
+        return max(1, min(left, projected - len(summary.kept)))
+
+
+@dataclass
+class SampleSummary:
+    """Samples for one configuration and the interval they give"""
+
+    samples: List[float]
+    kept: List[float]
+    outliers: List[float]
+    statistic: str
+    center: float
+    low: float
+    high: float
+    rel_width: float
+    converged: bool
+
+    def as_dict(self) -> Dict[str, Any]:
+        finite = lambda x: x if math.isfinite(x) else None  # noqa: E731
+        return {
+            "statistic": self.statistic,
+            "center": self.center,
+            "ci_low": finite(self.low),
+            "ci_high": finite(self.high),
+            "rel_width": finite(self.rel_width),
+            "converged": self.converged,
+            "count": len(self.samples),
+            "kept": len(self.kept),
+            "outliers": self.outliers,
+        }
+
+
+def resolve_policy(
+    samples: Optional[int] = None, policy: Optional[SamplingPolicy] = None
+) -> SamplingPolicy:
+    """``policy`` if given, else a fixed count if ``samples`` is, else the defaults."""
+    if policy:
+        return policy
+    return SamplingPolicy.fixed(samples) if samples else SamplingPolicy()
+
+
+def sample_until(measure: Callable[[], float], policy: SamplingPolicy) -> SampleSummary:
+    """Call ``measure()`` until ``policy`` is satisfied."""
+    values: List[float] = []
+    more = policy.min_samples
+    while more:
+        values.extend(measure() for _ in range(more))
+        summary = policy.summarize(values)
+        more = policy.more_needed(summary)
+    return summary
+
+
+@dataclass
+class MatrixSamples:
+    """A configuration's boot results and their summary"""
+
+    runs: List[JobResult] = field(default_factory=list)
+    summary: Optional[SampleSummary] = None
+
+
+def sample_matrix(
+    keys: Sequence[Hashable],
+    job_for: Callable[[Hashable], BootJob],
+    policy: SamplingPolicy,
+    scheduler: Optional[MatrixScheduler] = None,
+    value: Callable[[Any], Optional[float]] = lambda v: v,
+    on_done: Optional[Callable[[JobResult, int, int], None]] = None,
+) -> Dict[Hashable, MatrixSamples]:
+    """
+    Boot every configuration in ``keys`` until each satisfies ``policy``.
+    Each round schedules the boots still needed across all unconverged
+    configurations together. ``value`` extracts the measurement from a
+    job's result, or None for a failed boot (not counted).
+    """
+    scheduler = scheduler or MatrixScheduler()
+    matrix = {key: MatrixSamples() for key in keys}
+    wanted = {key: policy.min_samples for key in keys}
+    attempts = {key: 0 for key in keys}
+    while any(wanted.values()):
+        jobs = [job_for(key) for key in keys for _ in range(wanted[key])]
+        for result in scheduler.run(jobs, on_done=on_done):
+            matrix[result.key].runs.append(result)
+        for key in keys:
+            attempts[key] += wanted[key]
+            values = [
+                v
+                for v in (value(run.value) for run in matrix[key].runs)
+                if v is not None
+            ]
+            if not values:
+                matrix[key].summary = None
+                wanted[key] = 0
+                continue
+            summary = matrix[key].summary = policy.summarize(values)
+            # Failed boots count against the budget too
+            wanted[key] = max(
+                0, min(policy.more_needed(summary), policy.max_samples - attempts[key])
+            )
+    return matrix
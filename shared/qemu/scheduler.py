@@ -0,0 +1,225 @@
+"""
+Concurrent, core-pinned scheduling of QEMU boot matrices.
+
+A boot matrix (CPU model x vCPU count x sample) is a list of independent
+VM runs. The scheduler starts as many as the host can hold at once: each
+VM is admitted only when enough free host cores (its vCPUs plus one for
+QEMU's main loop) and memory are available, and is pinned with ``taskset``
+to cores no other running VM uses, so concurrent boots do not steal time
+from each other. Every result carries the placement it ran with.
+
+Larger VMs are admitted first and smaller ones backfill the remaining
+cores, which keeps the tail of the matrix from running one VM at a time.
+
+Usage::
+
+    scheduler = MatrixScheduler()
+    jobs = [BootJob((model, n), lambda p, m=model, n=n: boot(m, n, p), vcpus=n)
+            for model in models for n in counts for _ in range(samples)]
+    for result in scheduler.run(jobs):
+        print(result.key, result.value, result.placement.cores)
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+# Memory kept free for the host when sizing the admission budget
+HOST_MEMORY_RESERVE_MB = 1024
+# QEMU's own footprint on top of the guest RAM
+QEMU_OVERHEAD_MB = 128
+
+
+def host_cores() -> List[int]:
+    """Host cores this process may run on."""
+    try:
+        return sorted(os.sched_getaffinity(0))
+    except AttributeError:
+        return list(range(os.cpu_count() or 1))
+
+
+def available_memory_mb() -> int:
+    """Memory available for new processes, from /proc/meminfo where present."""
+    try:
+        with open("/proc/meminfo") as meminfo:
+            for line in meminfo:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // (1024 * 1024)
+
+
+def cpu_list(cores: Sequence[int]) -> str:
+    """``taskset -c`` list: ``0-3,6``."""
+    ranges: List[Tuple[int, int]] = []
+    for core in sorted(cores):
+        if ranges and core == ranges[-1][1] + 1:
+            ranges[-1] = (ranges[-1][0], core)
+        else:
+            ranges.append((core, core))
+    return ",".join(str(a) if a == b else f"{a}-{b}" for a, b in ranges)
+
+
+@dataclass(frozen=True)
+class Placement:
+    """Host resources one VM ran on."""
+
+    cores: Tuple[int, ...]
+    memory_mb: int
+    concurrent: int
+    pinned: bool
+
+    def wrap(self, cmd: Sequence[str]) -> List[str]:
+        """``cmd`` confined to this placement's cores."""
+        if not self.pinned:
+            return list(cmd)
+        return ["taskset", "-c", cpu_list(self.cores), *cmd]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "cores": list(self.cores),
+            "memory_mb": self.memory_mb,
+            "concurrent": self.concurrent,
+            "pinned": self.pinned,
+        }
+
+
+@dataclass
+class BootJob:
+    """One VM run: ``run(placement)`` boots it and returns the measurement."""
+
+    key: Hashable
+    run: Callable[[Placement], Any]
+    vcpus: int = 1
+    memory_mb: int = 512
+
+
+@dataclass
+class JobResult:
+    """A job's measurement, with the placement it ran under."""
+
+    key: Hashable
+    value: Any
+    placement: Placement
+    seconds: float
+
+
+class MatrixScheduler:
+    """
+    Runs boot jobs concurrently on disjoint host cores. Results are
+    returned in job order.
+    """
+
+    def __init__(
+        self,
+        cores: Optional[Sequence[int]] = None,
+        reserve_cores: int = 1,
+        memory_mb: Optional[int] = None,
+        max_concurrent: Optional[int] = None,
+        pin: bool = True,
+    ) -> None:
+        cores = list(cores) if cores is not None else host_cores()
+        # Leave the first cores to the host and to this process's own threads
+        if 0 < reserve_cores < len(cores):
+            cores = cores[reserve_cores:]
+        self.cores = cores
+        if memory_mb is None:
+            memory_mb = max(0, available_memory_mb() - HOST_MEMORY_RESERVE_MB)
+        self.memory_mb = memory_mb
+        self.max_concurrent = max_concurrent
+        self.pin = pin and shutil.which("taskset") is not None
+
+    def cores_for(self, job: BootJob) -> int:
+        """Cores reserved for a job: one per vCPU plus QEMU's main loop."""
+        return max(1, min(job.vcpus + 1, len(self.cores)))
+
+    def run(
+        self,
+        jobs: Sequence[BootJob],
+        on_done: Optional[Callable[[JobResult, int, int], None]] = None,
+    ) -> List[JobResult]:
+        """
+        Run every job; ``on_done(result, completed, total)`` is called as
+        each finishes. The first exception raised by a job is re-raised
+        once all jobs have stopped.
+        """
+        jobs = list(jobs)
+        results: List[Optional[JobResult]] = [None] * len(jobs)
+        errors: List[BaseException] = []
+        # Largest first, so big VMs are not left to run alone at the end
+        pending = sorted(range(len(jobs)), key=lambda i: -self.cores_for(jobs[i]))
+        free = list(self.cores)
+        state = {"memory": 0, "running": 0, "completed": 0}
+        cond = threading.Condition()
+
+        def execute(index: int, placement: Placement) -> None:
+            job = jobs[index]
+            started = time.perf_counter()
+            try:
+                value = job.run(placement)
+            except BaseException as e:
+                value = None
+                errors.append(e)
+            result = JobResult(job.key, value, placement, time.perf_counter() - started)
+            with cond:
+                results[index] = result
+                free.extend(placement.cores)
+                free.sort()
+                state["memory"] -= placement.memory_mb
+                state["running"] -= 1
+                state["completed"] += 1
+                if on_done:
+                    on_done(result, state["completed"], len(jobs))
+                cond.notify_all()
+
+        threads = []
+        with cond:
+            while pending:
+                admitted = None
+                for index in pending:
+                    job = jobs[index]
+                    need = self.cores_for(job)
+                    memory = job.memory_mb + QEMU_OVERHEAD_MB
+                    if self.max_concurrent and state["running"] >= self.max_concurrent:
+                        break
+                    # A job too large for the budget still runs, alone
+                    if len(free) >= need and (
+                        state["running"] == 0
+                        or state["memory"] + memory <= self.memory_mb
+                    ):
+                        admitted = (index, need, memory)
+                        break
+                if admitted is None:
+                    cond.wait()
+                    continue
+                index, need, memory = admitted
+                pending.remove(index)
+                cores, free[:] = tuple(free[:need]), free[need:]
+                state["memory"] += memory
+                state["running"] += 1
+                placement = Placement(cores, memory, state["running"], self.pin)
+                thread = threading.Thread(
+                    target=execute, args=(index, placement), daemon=True
+                )
+                threads.append(thread)
+                thread.start()
+
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+        return results  # type: ignore[return-value]
+
+
+def group_results(results: Sequence[JobResult]) -> Dict[Hashable, List[JobResult]]:
+    """Results by job key, in job order."""
+    grouped: Dict[Hashable, List[JobResult]] = {}
+    for result in results:
+        grouped.setdefault(result.key, []).append(result)
+    return grouped
@@ -0,0 +1,267 @@
+"""
+Timestamped capture of a QEMU serial port.
+
+The profilers used to recover boot-marker times from a finished serial log
+by assuming a fixed time per line. Instead, this module reads the serial
+chardev while the guest boots and stamps each line with
+``perf_counter_ns`` when its newline arrives. A marker's time is then the
+moment the guest printed it, relative to QEMU's launch.
+
+The text goes to the log file as before. A compact binary trace of
+``(byte offset, nanoseconds)`` per line is written beside it (``boot.log``
+-> ``boot.log.trace``), so logs can be re-timed later without rerunning
+the boot.
+
+Usage::
+
+    capture = SerialCapture(log_path)
+    cmd = ["qemu-system-i386", ..., *capture.listen()]   # -serial unix:...
+    subprocess.run(cmd)
+    lines = capture.stop()
+    markers = marker_times(lines, {"kernel": r"MINIX", "login": r"login:"})
+    phases = phase_durations(markers)
+
+For ``-serial stdio``, pass the pipe instead: ``capture.attach(proc.stdout)``.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import shutil
+import socket
+import statistics
+import struct
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+PathLike = Union[str, Path]
+
+TRACE_SUFFIX = ".trace"
+# magic, format version, wall-clock time of the capture origin (ns)
+_HEADER = struct.Struct("<4sHq")
+_MAGIC = b"MXST"
+# byte offset of the line in the log, ns since the origin
+_RECORD = struct.Struct("<QQ")
+_CHUNK = 65536
+
+
+@dataclass(frozen=True)
+class SerialLine:
+    """One serial line and when its newline arrived."""
+
+    offset: int
+    ns: int
+    text: str
+
+    @property
+    def seconds(self) -> float:
+        return self.ns / 1e9
+
+
+def trace_path_for(log_path: PathLike) -> Path:
+    """The binary trace kept next to a serial log."""
+    log_path = Path(log_path)
+    return log_path.with_name(log_path.name + TRACE_SUFFIX)
+
+
+class SerialCapture:
+    """
+    Records a serial stream to ``log_path`` with per-line timestamps.
+    Times are relative to when capture started, just before QEMU is
+    launched.
+    """
+
+    def __init__(self, log_path: PathLike, trace_path: Optional[PathLike] = None):
+        self.log_path = Path(log_path)
+        self.trace_path = (
+            Path(trace_path) if trace_path else trace_path_for(self.log_path)
+        )
+        self.lines: List[SerialLine] = []
+        self.origin_ns = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._listener: Optional[socket.socket] = None
+        self._socket_dir: Optional[str] = None
+
+    def listen(self) -> List[str]:
+        """
+        Open a Unix socket for QEMU's serial port and start capturing.
+        Returns the QEMU arguments that connect the port to it.
+        """
+        self._socket_dir = tempfile.mkdtemp(prefix="minix-serial-")
+        path = os.path.join(self._socket_dir, "serial.sock")
+        self._listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._listener.bind(path)
+        self._listener.listen(1)
+        self._listener.settimeout(0.1)
+        self._start(self._accept)
+        return ["-serial", f"unix:{path}"]
+
+    def attach(self, stream) -> "SerialCapture":
+        """Capture from a pipe carrying the serial output (``-serial stdio``)."""
+        fd = stream.fileno()
+        self._start(lambda: self._consume(lambda: os.read(fd, _CHUNK)))
+        return self
+
+    def stop(self, timeout: float = 5.0) -> List[SerialLine]:
+        """Drain the stream once QEMU has exited and return the lines."""
+        # Output still buffered in the socket or pipe is read before EOF
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+        if self._listener:
+            self._listener.close()
+            self._listener = None
+        if self._socket_dir:
+            shutil.rmtree(self._socket_dir, ignore_errors=True)
+            self._socket_dir = None
+        return self.lines
+
+    def __enter__(self) -> "SerialCapture":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _start(self, target: Callable[[], None]) -> None:
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        self._header = _HEADER.pack(_MAGIC, 1, time.time_ns())
+        self.origin_ns = time.perf_counter_ns()
+        self._thread = threading.Thread(target=target, daemon=True)
+        self._thread.start()
+
+    def _accept(self) -> None:
+        # QEMU connects once it starts. A queued connection is accepted
+        # before a stop request is noticed
+        while True:
+            try:
+                conn, _ = self._listener.accept()
+            except socket.timeout:
+                if self._stop.is_set():
+                    break
+                continue
+            except OSError:
+                break
+            with conn:
+                conn.settimeout(0.1)
+                self._consume(lambda: self._recv(conn))
+            return
+        # Nothing connected: still leave an empty log and trace behind
+        self._consume(lambda: b"")
+
+    def _recv(self, conn: socket.socket) -> bytes:
+        while True:
+            try:
+                return conn.recv(_CHUNK)
+            except socket.timeout:
+                if self._stop.is_set():
+                    return b""
+
+    def _consume(self, read: Callable[[], bytes]) -> None:
+        pending = b""
+        offset = 0
+        arrived = 0
+        with open(self.log_path, "wb") as log, open(self.trace_path, "wb") as trace:
+            trace.write(self._header)
+            while True:
+                try:
+                    chunk = read()
+                except OSError:
+                    chunk = b""
+                if not chunk:
+                    break
+                arrived = time.perf_counter_ns() - self.origin_ns
+                log.write(chunk)
+                log.flush()
+                *complete, pending = (pending + chunk).split(b"\n")
+                for raw in complete:
+                    self._record(trace, offset, arrived, raw)
+                    offset += len(raw) + 1
+            # An unterminated last line is stamped with its last byte
+            if pending:
+                self._record(trace, offset, arrived, pending)
+
+    def _record(self, trace, offset: int, ns: int, raw: bytes) -> None:
+        trace.write(_RECORD.pack(offset, ns))
+        self.lines.append(SerialLine(offset, ns, _decode(raw)))
+
+
+def _decode(raw: bytes) -> str:
+    return raw.decode("utf-8", errors="replace").rstrip("\r")
+
+
+def read_trace(
+    log_path: PathLike, trace_path: Optional[PathLike] = None
+) -> List[SerialLine]:
+    """Lines of a captured log with their timestamps."""
+    log_path = Path(log_path)
+    data = Path(trace_path or trace_path_for(log_path)).read_bytes()
+    magic, version, _ = _HEADER.unpack_from(data)
+    if magic != _MAGIC or version != 1:
+        raise ValueError(
+            f"not a serial trace: {trace_path or trace_path_for(log_path)}"
+        )
+    text = log_path.read_bytes()
+    lines = []
+    for offset, ns in _RECORD.iter_unpack(data[_HEADER.size :]):
+        end = text.find(b"\n", offset)
+        lines.append(
+            SerialLine(offset, ns, _decode(text[offset : end if end >= 0 else None]))
+        )
+    return lines
+
+
+Patterns = Mapping[str, Union[str, Tuple[str, str]]]
+
+
+def marker_times(lines: Sequence[SerialLine], patterns: Patterns) -> Dict[str, float]:
+    """
+    Seconds from launch to the first line matching each marker pattern
+    (case-insensitive). ``patterns`` maps marker names to a regex, or to
+    the ``(regex, description)`` pairs the profilers use.
+    """
+    compiled = {
+        name: re.compile(
+            pattern[0] if isinstance(pattern, tuple) else pattern, re.IGNORECASE
+        )
+        for name, pattern in patterns.items()
+    }
+    markers: Dict[str, float] = {}
+    for line in lines:
+        for name, regex in compiled.items():
+            if name not in markers and regex.search(line.text):
+                markers[name] = line.seconds
+        if len(markers) == len(compiled):
+            break
+    return markers
+
+
+def phase_durations(
+    markers: Mapping[str, float], end: Optional[float] = None
+) -> Dict[str, float]:
+    """
+    Seconds spent in each phase, a phase running from its marker to the
+    next one seen. The last phase runs to ``end`` if given.
+    """
+    ordered = sorted(markers.items(), key=lambda item: item[1])
+    durations = {
+        name: later - at for (name, at), (_, later) in zip(ordered, ordered[1:])
+    }
+    if ordered and end is not None:
+        name, at = ordered[-1]
+        durations[name] = max(0.0, end - at)
+    return durations
+
+
+def median_phases(samples: Sequence[Mapping[str, float]]) -> Dict[str, float]:
+    """Median of each phase over the samples that reached it."""
+    names: Dict[str, List[float]] = {}
+    for sample in samples:
+        for name, seconds in sample.items():
+            names.setdefault(name, []).append(seconds)
+    return {name: statistics.median(values) for name, values in names.items()}
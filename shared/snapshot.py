@@ -0,0 +1,219 @@
+"""
+Single-file snapshot of the pipeline datasets.
+
+The analysis pipeline writes every dataset into one indexed container next
+to the per-dataset JSON files. Readers memory-map the container, parse the
+small table of contents and decode only the sections they touch, so a cold
+start costs one ``open`` instead of one per JSON file.
+
+Layout::
+
+    MXSNAP\\0\\0 | format u32 | toc length u32 | toc (JSON) | sections...
+
+The table of contents maps each dataset key to ``[offset, length, hash]``
+(offsets relative to the end of the TOC) and carries a snapshot-wide
+``version``. Sections are compact UTF-8 JSON.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+SNAPSHOT_NAME = "analysis.snapshot"
+SNAPSHOT_MAGIC = b"MXSNAP\0\0"
+SNAPSHOT_FORMAT = 1
+
+_HEADER = struct.Struct("<8sII")
+
+PathLike = Union[str, Path]
+
+
+class SnapshotError(ValueError):
+    """The file is not a readable snapshot (wrong magic, format or truncated)."""
+
+
+def _encode(payload: Any) -> bytes:
+    return json.dumps(payload, separators=(",", ":"), sort_keys=True).encode("utf-8")
+
+
+def write_snapshot(path: PathLike, datasets: Mapping[str, Any]) -> str:
+    """
+    Write ``datasets`` into a snapshot at ``path`` and return its version.
+
+    The file is written beside the target and renamed into place, so
+    readers (and open memory maps of the previous snapshot) never observe
+    a partial file.
+    """
+    path = Path(path)
+    sections: List[Tuple[str, bytes]] = [
+        (key, _encode(datasets[key])) for key in sorted(datasets)
+    ]
+
+    toc: Dict[str, Any] = {"sections": {}}
+    offset = 0
+    digest = hashlib.sha1()
+    for key, blob in sections:
+        section_hash = hashlib.sha1(blob).hexdigest()[:16]
+        toc["sections"][key] = [offset, len(blob), section_hash]
+        digest.update(key.encode("utf-8") + b"\0" + section_hash.encode("ascii"))
+        offset += len(blob)
+    toc["version"] = digest.hexdigest()[:16]
+    toc_blob = _encode(toc)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT, len(toc_blob)))
+            handle.write(toc_blob)
+            for _, blob in sections:
+                handle.write(blob)
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+    return toc["version"]
+
+
+def write_snapshot_from_dir(
+    data_dir: PathLike, filenames: Optional[Mapping[str, str]] = None
+) -> Optional[Path]:
+    """
+    Bundle the ``key -> filename`` JSON files of ``data_dir`` (default: every
+    ``*.json``, keyed by stem) into ``data_dir/SNAPSHOT_NAME``. Missing files
+    are skipped; returns None if there was nothing to bundle.
+    """
+    data_dir = Path(data_dir)
+    if filenames is None:
+        filenames = {path.stem: path.name for path in sorted(data_dir.glob("*.json"))}
+    datasets: Dict[str, Any] = {}
+    for key, filename in filenames.items():
+        source = data_dir / filename
+        if source.exists():
+            datasets[key] = json.loads(source.read_bytes())
+    if not datasets:
+        return None
+    target = data_dir / SNAPSHOT_NAME
+    write_snapshot(target, datasets)
+    return target
+
+
+class Snapshot:
+    """
+    Read-only, memory-mapped view of a snapshot file.
+
+    Opening reads only the header and table of contents; ``load(key)``
+    decodes that one section on demand. Usable as a context manager.
+    """
+
+    def __init__(self, path: PathLike) -> None:
+        self.path = Path(path)
+        with open(self.path, "rb") as handle:
+            try:
+                self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as exc:  # zero-length file
+                raise SnapshotError(f"Empty snapshot: {self.path}") from exc
+        try:
+            self._sections, self.version, self._base = self._read_toc()
+        except SnapshotError:
+            self._map.close()
+            raise
+
+    def _read_toc(self) -> Tuple[Dict[str, Tuple[int, int, str]], str, int]:
+        if len(self._map) < _HEADER.size:
+            raise SnapshotError(f"Truncated snapshot header: {self.path}")
+        magic, fmt, toc_length = _HEADER.unpack_from(self._map, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise SnapshotError(f"Not a snapshot file: {self.path}")
+        if fmt != SNAPSHOT_FORMAT:
+            raise SnapshotError(f"Unsupported snapshot format {fmt}: {self.path}")
+        base = _HEADER.size + toc_length
+        try:
+            toc = json.loads(self._map[_HEADER.size : base])
+        except ValueError as exc:
+            raise SnapshotError(
+                f"Corrupt snapshot table of contents: {self.path}"
+            ) from exc
+        sections = {key: tuple(entry) for key, entry in toc.get("sections", {}).items()}
+        end = max(
+            (base + offset + length for offset, length, _ in sections.values()),
+            default=base,
+        )
+        if end > len(self._map):
+            raise SnapshotError(f"Truncated snapshot: {self.path}")
+        return sections, toc.get("version", ""), base
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._sections
+
+    def keys(self) -> List[str]:
+        return sorted(self._sections)
+
+    def section_version(self, key: str) -> str:
+        """Content hash of one section, stable across unrelated rewrites."""
+        return self._sections[key][2]
+
+    def raw(self, key: str) -> bytes:
+        """Undecoded JSON bytes of one section."""
+        if key not in self._sections:
+            raise KeyError(f"Snapshot {self.path} has no section {key!r}")
+        offset, length, _ = self._sections[key]
+        start = self._base + offset
+        return self._map[start : start + length]
+
+    def load(self, key: str) -> Any:
+        """Decode one section."""
+        return json.loads(self.raw(key))
+
+    def load_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Decode the listed sections that are present."""
+        return {key: self.load(key) for key in keys if key in self._sections}
+
+    def close(self) -> None:
+        if not self._map.closed:
+            self._map.close()
+
+
+def open_snapshot(data_dir: PathLike) -> Optional[Snapshot]:
+    """Open ``data_dir/SNAPSHOT_NAME`` if present and readable, else None."""
+    path = Path(data_dir) / SNAPSHOT_NAME
+    try:
+        return Snapshot(path)
+    except (FileNotFoundError, SnapshotError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Bundle a pipeline data directory's JSON datasets into one snapshot"
+    )
+    parser.add_argument("data_dir", nargs="?", default="diagrams/data")
+    args = parser.parse_args()
+
+    target = write_snapshot_from_dir(args.data_dir)
+    if target is None:
+        raise SystemExit(f"No JSON datasets found in {args.data_dir}")
+    with Snapshot(target) as snapshot:
+        print(
+            f"{target}: version {snapshot.version}, "
+            f"sections {', '.join(snapshot.keys())}"
+        )
+
+
+if __name__ == "__main__":
+    main()
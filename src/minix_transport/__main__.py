@@ -1,6 +1,13 @@
 """
 MINIX Analysis MCP Server
 Wraps MinixAnalysisServer and exposes tools via MCP stdio transport
+
+Environment:
+    MINIX_ANALYSIS_ROOT      checkout root (default: this repository)
+    MINIX_ANALYSIS_CONFIG    JSON config with minix_analysis_config.project_root
+    MINIX_ANALYSIS_DATA_DIR  dataset directory (default: <root>/diagrams/data)
+    MINIX_MCP_WARM=0         skip background dataset warm-up after the handshake
+    MINIX_MCP_WORKERS        worker threads for tool execution (default: 4)
 """
 
 import asyncio
@@ -8,18 +15,13 @@ import json
 import logging
 import os
 import sys
+import threading
+import time
 from pathlib import Path
 
-# Configure path to find shared.mcp.server
-MINIX_ANALYSIS_ROOT = Path("/home/eirikr/Playground/minix-analysis")
-if str(MINIX_ANALYSIS_ROOT / "src") not in sys.path:
-    sys.path.insert(0, str(MINIX_ANALYSIS_ROOT / "src"))
-
-# Change to minix-analysis directory for relative paths
-os.chdir(str(MINIX_ANALYSIS_ROOT))
+_STARTED = time.perf_counter()
 
 from mcp.server import Server, stdio_server
-from shared.mcp.server import MinixAnalysisServer
 
 # Configure logging to stderr (stdout reserved for MCP)
 logging.basicConfig(
@@ -29,71 +31,323 @@ logging.basicConfig(
 )
 logger = logging.getLogger("minix-mcp-transport")
 
-# Initialize shared analysis server
-logger.info(f"Initializing MinixAnalysisServer from {MINIX_ANALYSIS_ROOT / 'diagrams/data'}")
-minix_server = MinixAnalysisServer.from_default_data_dir()
-logger.info(f"✓ Microkernel: {minix_server.query_architecture()['microkernel']}")
+
+def _elapsed_ms():
+    return round((time.perf_counter() - _STARTED) * 1000, 1)
+
+
+# Configuration
+
+def resolve_root():
+    """Locate the minix-analysis checkout.
+
+    Order: $MINIX_ANALYSIS_ROOT, then ``minix_analysis_config.project_root``
+    in the JSON file named by $MINIX_ANALYSIS_CONFIG, then the checkout this
+    module lives in.
+    """
+    root = os.environ.get("MINIX_ANALYSIS_ROOT")
+    if root:
+        return Path(root).expanduser().resolve()
+    config = os.environ.get("MINIX_ANALYSIS_CONFIG")
+    if config:
+        with open(config, "r", encoding="utf-8") as handle:
+            settings = json.load(handle).get("minix_analysis_config", {})
+        if settings.get("project_root"):
+            return Path(settings["project_root"]).expanduser().resolve()
+    return Path(__file__).resolve().parents[2]
+
+
+def resolve_data_dir(root):
+    """$MINIX_ANALYSIS_DATA_DIR, else <root>/diagrams/data."""
+    data_dir = os.environ.get("MINIX_ANALYSIS_DATA_DIR")
+    return Path(data_dir).expanduser().resolve() if data_dir else root / "diagrams" / "data"
+
+
+MINIX_ANALYSIS_ROOT = resolve_root()
+# shared.mcp.server lives at the repository root, not under src/
+for _path in (MINIX_ANALYSIS_ROOT, MINIX_ANALYSIS_ROOT / "src"):
+    if str(_path) not in sys.path:
+        sys.path.insert(0, str(_path))
+
+from shared.mcp.executor import BlockingExecutor  # noqa: E402
+
+
+class _Runtime:
+    """
+    Analysis server and response cache, built on first use.
+
+    Nothing here runs before the stdio handshake: the first tool call (or
+    the background warm-up started once the transport is up) imports the
+    shared server, opens the data directory and loads the datasets.
+    """
+
+    def __init__(self, data_dir):
+        self.data_dir = data_dir
+        self.timings = {"import_ms": _elapsed_ms()}
+        self._lock = threading.Lock()
+        self._server = None
+        self._responses = None
+
+    def get(self):
+        """Return (MinixAnalysisServer, ResponseCache), creating them once."""
+        if self._server is None:
+            with self._lock:
+                if self._server is None:
+                    begin = time.perf_counter()
+                    from shared.mcp.server import (
+                        MinixAnalysisServer, MinixDataLoader, ResponseCache,
+                    )
+                    # Watch the data directory so `make pipeline` output is
+                    # picked up without a restart
+                    loader = MinixDataLoader(self.data_dir, watch=True)
+                    self._responses = ResponseCache(loader)
+                    self._server = MinixAnalysisServer(loader=loader)
+                    self.timings["init_ms"] = round((time.perf_counter() - begin) * 1000, 1)
+                    logger.info(f"Analysis server initialised from {self.data_dir} "
+                                f"in {self.timings['init_ms']} ms")
+        return self._server, self._responses
+
+    def warm(self):
+        """Load every dataset ahead of the first request."""
+        begin = time.perf_counter()
+        server, _ = self.get()
+        from shared.mcp.server.data_loader import DATA_FILES
+        for key in DATA_FILES:
+            try:
+                server.loader.load(key)
+            except FileNotFoundError as exc:
+                logger.warning(str(exc))
+        self.timings["warm_ms"] = round((time.perf_counter() - begin) * 1000, 1)
+        logger.info(f"Datasets warmed in {self.timings['warm_ms']} ms")
+
+    def status(self):
+        server, responses = self.get()
+        loader = server.loader
+        return {
+            "root": str(MINIX_ANALYSIS_ROOT),
+            "data_dir": str(self.data_dir),
+            "timings": dict(self.timings),
+            "loaded_datasets": {key: loader.version(key) for key in loader.loaded()},
+            "response_cache": responses.stats(),
+            "executor": executor.stats(),
+        }
+
+
+runtime = _Runtime(resolve_data_dir(MINIX_ANALYSIS_ROOT))
+
+# Tool bodies load datasets and serialize payloads; keep that off the loop
+executor = BlockingExecutor("tools", max_workers=int(os.environ.get("MINIX_MCP_WORKERS", "4")))
+
+
+def _server():
+    return runtime.get()[0]
+
 
 # Create MCP server instance
 mcp = Server("minix-analysis")
-logger.info("✓ MCP server instance created")
+
+
+# Response cache
+
+# Datasets each endpoint reads; their versions are part of the cache key
+ENDPOINT_DATASETS = {
+    "query_architecture": ("kernel_structure",),
+    "analyze_syscall": ("kernel_structure",),
+    "query_performance": ("statistics",),
+    "compare_mechanisms": ("kernel_structure",),
+    "explain_diagram": ("statistics",),
+    "query_boot_sequence": ("boot_sequence",),
+    "trace_boot_path": ("boot_sequence",),
+    "minix://kernel/structure": ("kernel_structure",),
+    "minix://boot/sequence": ("boot_sequence",),
+}
+
+# Default arguments, so response_etag callers may omit them like tool callers
+ENDPOINT_DEFAULTS = {
+    "query_architecture": {"top_n": 5},
+    "query_boot_sequence": {"aspect": "all"},
+    "trace_boot_path": {"phase_name": "all"},
+    "query_collection": {"fields": "", "where": "", "sort": "", "limit": 50, "cursor": ""},
+}
+
+
+def _endpoint_datasets(name, arguments):
+    from shared.mcp.server.query import COLLECTIONS
+    if name == "query_collection":
+        return (COLLECTIONS[arguments["collection"]][0],)
+    if name == "list_collections":
+        return tuple(sorted({key for key, _ in COLLECTIONS.values()}))
+    return ENDPOINT_DATASETS[name]
+
+
+def _cached(name, arguments, render, if_none_match=""):
+    """Serve an endpoint from the response cache, honouring If-None-Match."""
+    _, responses = runtime.get()
+    datasets = _endpoint_datasets(name, arguments)
+    if if_none_match and if_none_match == responses.etag(name, arguments, datasets):
+        return json.dumps({"not_modified": True, "etag": if_none_match})
+    return responses.get(name, arguments, datasets, render).body
+
+
+async def _respond(name, arguments, render, if_none_match=""):
+    """Run _cached on the worker pool; identical concurrent calls share one run."""
+    key = (name, json.dumps(arguments, sort_keys=True), if_none_match)
+    return await executor.run(_cached, name, arguments, render, if_none_match, key=key)
+
+
+def _dumps(result):
+    return json.dumps(result, indent=2)
 
 
 # CPU-Centric Tools
 
 @mcp.tool()
-async def query_architecture(top_n: int = 5) -> str:
+async def query_architecture(top_n: int = 5, if_none_match: str = "") -> str:
     """Query MINIX microkernel architecture overview and top syscalls."""
-    result = minix_server.query_architecture(top_n=top_n)
-    return json.dumps(result, indent=2)
+    return await _respond(
+        "query_architecture", {"top_n": top_n},
+        lambda: _dumps(_server().query_architecture(top_n=top_n)),
+        if_none_match,
+    )
 
 
 @mcp.tool()
-async def analyze_syscall(name: str) -> str:
+async def analyze_syscall(name: str, if_none_match: str = "") -> str:
     """Analyze a specific syscall by name."""
-    result = minix_server.analyze_syscall(name)
-    if not result:
-        return json.dumps({"error": f"Syscall '{name}' not found"}, indent=2)
-    return json.dumps(result, indent=2)
+    def render():
+        result = _server().analyze_syscall(name)
+        if not result:
+            return _dumps({"error": f"Syscall '{name}' not found"})
+        return _dumps(result)
+    return await _respond("analyze_syscall", {"name": name}, render, if_none_match)
 
 
 @mcp.tool()
-async def query_performance() -> str:
+async def query_performance(if_none_match: str = "") -> str:
     """Get performance statistics from analysis."""
-    result = minix_server.query_performance()
-    return json.dumps(result, indent=2)
+    return await _respond(
+        "query_performance", None,
+        lambda: _dumps(_server().query_performance()),
+        if_none_match,
+    )
 
 
 @mcp.tool()
-async def compare_mechanisms() -> str:
+async def compare_mechanisms(if_none_match: str = "") -> str:
     """Compare syscall mechanisms (INT vs SYSENTER vs SYSCALL)."""
-    result = minix_server.compare_mechanisms()
-    return json.dumps(result, indent=2)
+    return await _respond(
+        "compare_mechanisms", None,
+        lambda: _dumps(_server().compare_mechanisms()),
+        if_none_match,
+    )
 
 
 @mcp.tool()
-async def explain_diagram(diagram_name: str) -> str:
+async def explain_diagram(diagram_name: str, if_none_match: str = "") -> str:
     """Get explanation/notes for a specific diagram."""
-    result = minix_server.explain_diagram(diagram_name)
-    return result or f"No explanation available for diagram: {diagram_name}"
+    def render():
+        result = _server().explain_diagram(diagram_name)
+        return result or f"No explanation available for diagram: {diagram_name}"
+    return await _respond("explain_diagram", {"diagram_name": diagram_name}, render, if_none_match)
 
 
 # Boot-Centric Tools
 
 @mcp.tool()
-async def query_boot_sequence(aspect: str = "all") -> str:
+async def query_boot_sequence(aspect: str = "all", if_none_match: str = "") -> str:
     """Query boot sequence data by aspect."""
-    result = minix_server.query_boot_sequence(aspect=aspect)
-    return json.dumps(result, indent=2)
+    return await _respond(
+        "query_boot_sequence", {"aspect": aspect},
+        lambda: _dumps(_server().query_boot_sequence(aspect=aspect)),
+        if_none_match,
+    )
 
 
 @mcp.tool()
-async def trace_boot_path(phase_name: str = "all") -> str:
+async def trace_boot_path(phase_name: str = "all", if_none_match: str = "") -> str:
     """Trace boot execution path through specific phase(s)."""
-    result = minix_server.trace_boot_path(phase_name)
-    if not result:
-        return json.dumps({"error": f"Phase '{phase_name}' not found"}, indent=2)
-    return json.dumps(result, indent=2)
+    def render():
+        result = _server().trace_boot_path(phase_name)
+        if not result:
+            return _dumps({"error": f"Phase '{phase_name}' not found"})
+        return _dumps(result)
+    return await _respond("trace_boot_path", {"phase_name": phase_name}, render, if_none_match)
+
+
+# Collection queries
+
+@mcp.tool()
+async def list_collections(if_none_match: str = "") -> str:
+    """List queryable collections (syscalls, boot_phases, ...) and their sizes."""
+    return await _respond(
+        "list_collections", None,
+        lambda: _dumps(_server().list_collections()),
+        if_none_match,
+    )
+
+
+@mcp.tool()
+async def query_collection(
+    collection: str,
+    fields: str = "",
+    where: str = "",
+    sort: str = "",
+    limit: int = 50,
+    cursor: str = "",
+    if_none_match: str = "",
+) -> str:
+    """Query one collection with projection, filters, sorting and paging.
+
+    fields: comma-separated names to return (default: all), e.g. "name,line_count"
+    where: semicolon-separated predicates, e.g. "file~system/;line_count>=50"
+           (operators: == != > >= < <= ~ substring, ^= prefix)
+    sort: comma-separated keys, "-" prefix for descending, e.g. "-line_count"
+    cursor: next_cursor from the previous page
+    """
+    from shared.mcp.server.query import COLLECTIONS, split_list
+    if collection not in COLLECTIONS:
+        return _dumps({"error": f"Unknown collection '{collection}'",
+                       "collections": sorted(COLLECTIONS)})
+    arguments = {"collection": collection, "fields": fields, "where": where,
+                 "sort": sort, "limit": limit, "cursor": cursor}
+
+    def render():
+        try:
+            return _dumps(_server().query(
+                collection,
+                fields=split_list(fields),
+                where=split_list(where, ";"),
+                sort=split_list(sort),
+                limit=limit,
+                cursor=cursor or None,
+            ))
+        except ValueError as exc:
+            return _dumps({"error": str(exc)})
+    return await _respond("query_collection", arguments, render, if_none_match)
+
+
+# Cache validation
+
+@mcp.tool()
+async def response_etag(endpoint: str, arguments: str = "{}") -> str:
+    """Return the current ETag for a tool or resource call without running it.
+
+    Pass the ETag back as ``if_none_match`` to skip unchanged payloads.
+    """
+    args = dict(ENDPOINT_DEFAULTS.get(endpoint, {}), **json.loads(arguments))
+    try:
+        datasets = _endpoint_datasets(endpoint, args)
+    except KeyError:
+        return _dumps({"error": f"Unknown endpoint '{endpoint}'"})
+
+    def render():
+        return _dumps({
+            "endpoint": endpoint,
+            "etag": runtime.get()[1].etag(endpoint, args, datasets),
+            "datasets": {key: _server().loader.version(key) for key in datasets},
+        })
+    key = ("response_etag", endpoint, json.dumps(args, sort_keys=True))
+    return await executor.run(render, key=key)
 
 
 # Resources
@@ -101,13 +355,27 @@ async def trace_boot_path(phase_name: str = "all") -> str:
 @mcp.resource("minix://kernel/structure")
 async def get_kernel_structure() -> str:
     """Access kernel structure data."""
-    return json.dumps(minix_server.loader.kernel_structure, indent=2)
+    return await _respond(
+        "minix://kernel/structure", None,
+        lambda: _dumps(_server().loader.kernel_structure),
+    )
 
 
 @mcp.resource("minix://boot/sequence")
 async def get_boot_sequence() -> str:
     """Access boot sequence data."""
-    return json.dumps(minix_server.loader.boot_sequence, indent=2)
+    return await _respond(
+        "minix://boot/sequence", None,
+        lambda: _dumps(_server().loader.boot_sequence),
+    )
+
+
+# Diagnostics
+
+@mcp.tool()
+async def server_status() -> str:
+    """Report startup timings, dataset versions, cache and executor statistics."""
+    return await executor.run(lambda: _dumps(runtime.status()))
 
 
 # Main
@@ -116,7 +384,11 @@ async def main():
     """Run MCP transport server."""
     logger.info("Starting MINIX Analysis MCP server...")
     async with stdio_server(mcp) as streams:
-        logger.info("✓ Ready for MCP requests")
+        runtime.timings["ready_ms"] = _elapsed_ms()
+        logger.info(f"✓ Ready for MCP requests ({runtime.timings['ready_ms']} ms after start)")
+        if os.environ.get("MINIX_MCP_WARM", "1") != "0":
+            # Warm on a worker thread so the handshake is never delayed
+            threading.Thread(target=runtime.warm, name="minix-warm", daemon=True).start()
         await streams.wait_closed()
 
 
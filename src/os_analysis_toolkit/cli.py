@@ -13,6 +13,7 @@ from .parallel.executor import ParallelAnalysisPipeline
 # Dashboard import moved to lazy-load (requires dash, which may not be installed)
 # from .dashboard.app import run_dashboard
 from shared.mcp.server import MinixAnalysisServer, MinixDataLoader
+from shared.mcp.server.query import split_list
 
 
 def setup_logging(verbose: bool = False):
@@ -33,6 +34,7 @@ def main():
 Examples:
   os-analyze --source /path/to/minix --output results/
   os-analyze --dashboard results/
+  os-analyze --export-static site/ --data-dir results/
   os-analyze --benchmark
   os-analyze --parallel --workers 8
         """
@@ -77,6 +79,21 @@ Examples:
         default=8050,
         help='Dashboard port (default: 8050)'
     )
+    parser.add_argument(
+        '--live-measurements',
+        metavar='DIR',
+        help='Stream new boot/syscall measurements from DIR into the dashboard'
+    )
+    parser.add_argument(
+        '--measurements-db',
+        metavar='FILE',
+        help='Also stream boot_measurements rows from this SQLite store'
+    )
+    parser.add_argument(
+        '--export-static',
+        metavar='OUT',
+        help='Render the dashboard for --data-dir into a static HTML bundle in OUT'
+    )
 
     # Benchmarking
     parser.add_argument(
@@ -118,6 +135,45 @@ Examples:
         action='store_true',
         help='List all available analysis resources from the data directory'
     )
+    parser.add_argument(
+        '--datasets',
+        help='With --list-resources, comma-separated datasets to include (default: all)'
+    )
+    parser.add_argument(
+        '--list-collections',
+        action='store_true',
+        help='List queryable collections (syscalls, boot_phases, ...) and their sizes'
+    )
+    parser.add_argument(
+        '--query',
+        metavar='COLLECTION',
+        help='Query a collection with --fields/--where/--sort/--limit/--cursor'
+    )
+    parser.add_argument(
+        '--fields',
+        help='Comma-separated fields to return from --query (default: all)'
+    )
+    parser.add_argument(
+        '--where',
+        action='append',
+        default=[],
+        metavar='PREDICATE',
+        help="Filter for --query, e.g. 'line_count>=50' or 'file~system/'; repeatable"
+    )
+    parser.add_argument(
+        '--sort',
+        help="Comma-separated sort keys for --query, '-' prefix for descending"
+    )
+    parser.add_argument(
+        '--limit',
+        type=int,
+        default=50,
+        help='Page size for --query, 0 for the maximum of 1000 (default: 50)'
+    )
+    parser.add_argument(
+        '--cursor',
+        help='Continue --query from the next_cursor of a previous page'
+    )
     parser.add_argument(
         '--kernel-summary',
         action='store_true',
@@ -188,13 +244,27 @@ Examples:
         try:
             from .dashboard.app import run_dashboard
             print(f"Starting dashboard on port {args.port}...")
-            run_dashboard(args.dashboard, port=args.port)
+            run_dashboard(args.dashboard, port=args.port,
+                          measurements_dir=args.live_measurements,
+                          measurements_db=args.measurements_db)
         except ImportError:
             print("Dashboard requires 'dash' module. Install with: pip install dash")
             sys.exit(1)
 
+    elif args.export_static:
+        try:
+            from .dashboard.export import export_static
+        except ImportError:
+            print("Dashboard export requires 'dash' module. Install with: pip install dash")
+            sys.exit(1)
+        result = export_static(args.data_dir, args.export_static)
+        print(f"Exported {len(result['rendered'])} tab(s) to {args.export_static} "
+              f"({len(result['skipped'])} unchanged)")
+
     elif (
         args.list_resources
+        or args.list_collections
+        or args.query
         or args.resource
         or args.syscall
         or args.kernel_summary
@@ -215,7 +285,29 @@ Examples:
             print(json.dumps(payload, indent=2))
             return
         if args.list_resources:
-            payload = server.list_resources()
+            try:
+                payload = server.list_resources(datasets=split_list(args.datasets))
+            except ValueError as exc:
+                print(json.dumps({"error": exc.args[0]}, indent=2))
+                sys.exit(1)
+            print(json.dumps(payload, indent=2))
+            return
+        if args.list_collections:
+            print(json.dumps(server.list_collections(), indent=2))
+            return
+        if args.query:
+            try:
+                payload = server.query(
+                    args.query,
+                    fields=split_list(args.fields),
+                    where=args.where,
+                    sort=split_list(args.sort),
+                    limit=args.limit,
+                    cursor=args.cursor,
+                )
+            except (KeyError, ValueError) as exc:
+                print(json.dumps({"error": exc.args[0]}, indent=2))
+                sys.exit(1)
             print(json.dumps(payload, indent=2))
             return
         if args.syscall:
@@ -3,5 +3,6 @@ Web-based visualization dashboard for OS analysis
 """
 
 from .app import create_app, run_dashboard
+from .export import export_static
 
-__all__ = ["create_app", "run_dashboard"]
\ No newline at end of file
+__all__ = ["create_app", "export_static", "run_dashboard"]
\ No newline at end of file
@@ -4,32 +4,76 @@ Built with Dash and Plotly for real-time exploration
 """
 
 import json
-from pathlib import Path
 from typing import Dict, Any, Optional
 
 import dash
 from dash import dcc, html, dash_table
+from dash import no_update
 from dash.dependencies import Input, Output, State
 import plotly.graph_objs as go
 import plotly.express as px
 import pandas as pd
 
-
-def create_app(data_dir: str = "diagrams/data") -> dash.Dash:
+from .live import MeasurementFeed, live_delta, live_figure
+from .store import DashboardStore
+
+# Navigation tabs: (value, label)
+TABS = [
+    ("overview", "Overview"),
+    ("syscalls", "System Calls"),
+    ("processes", "Process Management"),
+    ("memory", "Memory Layout"),
+    ("ipc", "IPC System"),
+    ("boot", "Boot Sequence"),
+    ("performance", "Performance"),
+]
+
+# Tables paged, sorted and filtered server-side: table id -> collection
+PAGED_TABLES = {
+    "syscalls-table": "syscalls",
+    "process-states-table": "process_states",
+}
+
+# Tabs with a live measurement panel: tab -> (series prefix, chart title)
+LIVE_PANELS = {
+    "boot": ("boot/", "Boot Time per Measurement (ms)"),
+    "performance": ("syscalls/", "Syscalls per Trace"),
+}
+
+
+def create_app(
+    data_dir: str = "diagrams/data",
+    watch: bool = False,
+    measurements_dir: Optional[str] = None,
+    measurements_db: Optional[str] = None,
+    live_interval_ms: int = 2000,
+) -> dash.Dash:
     """
     Create the Dash application for visualization
 
+    Datasets stay on the server in a DashboardStore; each tab is rendered
+    once per dataset version and large tables are paged server-side.
+    With a measurements directory or database, the Boot Sequence and
+    Performance tabs gain live charts that receive only new points.
+
     Args:
         data_dir: Directory containing JSON analysis data
+        watch: Reload datasets (and invalidate cached tabs) when they change
+        measurements_dir: MCP server measurement directory to stream from
+        measurements_db: SQLite store with a boot_measurements table
+        live_interval_ms: Poll interval of the live charts
 
     Returns:
         Configured Dash application
     """
-    app = dash.Dash(__name__, title="OS Analysis Dashboard")
-
-    # Load analysis data
-    data_path = Path(data_dir)
-    analysis_data = load_analysis_data(data_path)
+    # Tab content is created by callbacks, so its table ids are not in the
+    # initial layout
+    app = dash.Dash(__name__, title="OS Analysis Dashboard",
+                    suppress_callback_exceptions=True)
+    store = DashboardStore(data_dir, watch=watch)
+    feed = None
+    if measurements_dir or measurements_db:
+        feed = MeasurementFeed(measurements_dir, measurements_db)
 
     # Define the layout
     app.layout = html.Div([
@@ -42,13 +86,7 @@ def create_app(data_dir: str = "diagrams/data") -> dash.Dash:
 
         # Navigation tabs
         dcc.Tabs(id="main-tabs", value="overview", children=[
-            dcc.Tab(label="Overview", value="overview"),
-            dcc.Tab(label="System Calls", value="syscalls"),
-            dcc.Tab(label="Process Management", value="processes"),
-            dcc.Tab(label="Memory Layout", value="memory"),
-            dcc.Tab(label="IPC System", value="ipc"),
-            dcc.Tab(label="Boot Sequence", value="boot"),
-            dcc.Tab(label="Performance", value="performance"),
+            dcc.Tab(label=label, value=value) for value, label in TABS
         ]),
 
         # Tab content
@@ -59,61 +97,105 @@ def create_app(data_dir: str = "diagrams/data") -> dash.Dash:
             html.P("MINIX Analysis Framework v1.0.0"),
             html.P("Data extracted from actual source code"),
         ], className="footer"),
-
-        # Store for data
-        dcc.Store(id="analysis-data", data=analysis_data),
     ])
 
     # Callback for tab content
     @app.callback(
         Output("tab-content", "children"),
         Input("main-tabs", "value"),
-        State("analysis-data", "data")
     )
-    def render_tab_content(active_tab: str, data: Dict[str, Any]):
-        """Render content based on selected tab"""
-
-        if active_tab == "overview":
-            return render_overview(data)
-        elif active_tab == "syscalls":
-            return render_syscalls(data)
-        elif active_tab == "processes":
-            return render_processes(data)
-        elif active_tab == "memory":
-            return render_memory(data)
-        elif active_tab == "ipc":
-            return render_ipc(data)
-        elif active_tab == "boot":
-            return render_boot(data)
-        elif active_tab == "performance":
-            return render_performance(data)
-        else:
+    def render_tab_content(active_tab: str):
+        """Render content based on selected tab, memoized per dataset version"""
+        renderer = TAB_RENDERERS.get(active_tab)
+        if renderer is None:
             return html.Div("Select a tab to view content")
+        content = store.render(active_tab, renderer)
+        if feed is not None and active_tab in LIVE_PANELS:
+            return html.Div([content, live_panel(feed, active_tab, live_interval_ms)])
+        return content
+
+    for table_id, collection in PAGED_TABLES.items():
+        _register_paged_table(app, store, table_id, collection)
+    if feed is not None:
+        for tab in LIVE_PANELS:
+            _register_live_panel(app, feed, tab)
 
     return app
 
 
-def load_analysis_data(data_path: Path) -> Dict[str, Any]:
-    """Load all JSON analysis files"""
-    data = {}
+def live_panel(feed: MeasurementFeed, tab: str, interval_ms: int) -> html.Div:
+    """Live chart seeded with the downsampled history of the tab's series"""
+    prefix, title = LIVE_PANELS[tab]
+    feed.refresh(force=True)
+    figure, state = live_figure(feed, prefix, title)
+    return html.Div([
+        html.H3("Live Measurements"),
+        dcc.Graph(id=f"live-{tab}-graph", figure=figure),
+        dcc.Store(id=f"live-{tab}-state", data=state),
+        dcc.Interval(id=f"live-{tab}-interval", interval=interval_ms),
+    ])
 
-    json_files = [
-        "statistics.json",
-        "kernel_structure.json",
-        "process_table.json",
-        "memory_layout.json",
-        "ipc_system.json",
-        "boot_sequence.json",
-    ]
 
-    for filename in json_files:
-        filepath = data_path / filename
-        if filepath.exists():
-            with open(filepath, 'r') as f:
-                key = filename.replace('.json', '')
-                data[key] = json.load(f)
+def _register_live_panel(app: dash.Dash, feed: MeasurementFeed, tab: str) -> None:
+    """Append new points with extendData; resend the figure only on reset"""
+    prefix, _ = LIVE_PANELS[tab]
 
-    return data
+    @app.callback(
+        Output(f"live-{tab}-graph", "figure"),
+        Output(f"live-{tab}-graph", "extendData"),
+        Output(f"live-{tab}-state", "data"),
+        Input(f"live-{tab}-interval", "n_intervals"),
+        State(f"live-{tab}-state", "data"),
+        prevent_initial_call=True,
+    )
+    def stream(_n_intervals, state):
+        feed.refresh()
+        kind, payload, state = live_delta(feed, state or {}, prefix)
+        if kind == "none":
+            return no_update, no_update, no_update
+        if kind == "reset":
+            return payload, no_update, state
+        return no_update, list(payload), state
+
+
+def _register_paged_table(app: dash.Dash, store: DashboardStore,
+                          table_id: str, collection: str) -> None:
+    """Serve one table's rows page by page from the store"""
+    @app.callback(
+        Output(table_id, "data"),
+        Output(table_id, "page_count"),
+        Input(table_id, "page_current"),
+        Input(table_id, "page_size"),
+        Input(table_id, "sort_by"),
+        Input(table_id, "filter_query"),
+    )
+    def page_rows(page_current, page_size, sort_by, filter_query):
+        page = store.page(collection, page_current or 0, page_size or 15,
+                          sort_by, filter_query)
+        return page["data"], page["page_count"]
+
+
+def paged_table(table_id: str, columns, page_size: int = 15,
+                filterable: bool = True) -> dash_table.DataTable:
+    """DataTable whose rows are fetched through a server-side page callback"""
+    return dash_table.DataTable(
+        id=table_id,
+        columns=columns,
+        data=[],
+        page_current=0,
+        page_size=page_size,
+        page_action="custom",
+        sort_action="custom",
+        sort_mode="multi",
+        sort_by=[],
+        filter_action="custom" if filterable else "none",
+        filter_query="",
+    )
+
+
+def _graph(fig: go.Figure) -> dcc.Graph:
+    """Graph holding the figure as plain JSON, so cached tabs skip Plotly"""
+    return dcc.Graph(figure=json.loads(fig.to_json()))
 
 
 def render_overview(data: Dict[str, Any]) -> html.Div:
@@ -155,7 +237,7 @@ def render_overview(data: Dict[str, Any]) -> html.Div:
 
         # Charts
         html.Div([
-            dcc.Graph(figure=fig_pie),
+            _graph(fig_pie),
         ]),
     ])
 
@@ -166,7 +248,7 @@ def render_syscalls(data: Dict[str, Any]) -> html.Div:
     syscalls = kernel_data.get("system_calls", [])
 
     if syscalls:
-        # Create DataFrame for table
+        # DataFrame for the chart only; table rows are paged by the store
         df = pd.DataFrame(syscalls)
 
         # Create bar chart of line counts
@@ -182,21 +264,14 @@ def render_syscalls(data: Dict[str, Any]) -> html.Div:
             html.P(f"Total: {len(syscalls)} system calls found"),
 
             # Data table
-            dash_table.DataTable(
-                id="syscalls-table",
-                columns=[
-                    {"name": "Name", "id": "name"},
-                    {"name": "File", "id": "file"},
-                    {"name": "Lines", "id": "line_count", "type": "numeric"},
-                ],
-                data=df.to_dict('records'),
-                sort_action="native",
-                filter_action="native",
-                page_size=15,
-            ),
+            paged_table("syscalls-table", [
+                {"name": "Name", "id": "name"},
+                {"name": "File", "id": "file"},
+                {"name": "Lines", "id": "line_count", "type": "numeric"},
+            ]),
 
             # Visualization
-            dcc.Graph(figure=fig_bar),
+            _graph(fig_bar),
         ])
     else:
         return html.Div("No system call data available")
@@ -211,22 +286,17 @@ def render_processes(data: Dict[str, Any]) -> html.Div:
     # Display the generated TikZ fork sequence diagram (PNG)
     content.append(html.Div([
         html.H3("Process Creation Diagram"),
-        html.Img(src=app.get_asset_url('images/fork-sequence.png'), style={'width': '100%', 'height': 'auto'}),
+        html.Img(src=dash.get_asset_url('images/fork-sequence.png'), style={'width': '100%', 'height': 'auto'}),
     ]))
 
     # Process states
     states = proc_data.get("process_states", [])
     if states:
-        states_df = pd.DataFrame(states)
         content.append(html.H3("Process States"))
-        content.append(dash_table.DataTable(
-            columns=[
-                {"name": "State", "id": "state"},
-                {"name": "Description", "id": "description"},
-            ],
-            data=states_df.to_dict('records'),
-            page_size=10,
-        ))
+        content.append(paged_table("process-states-table", [
+            {"name": "State", "id": "state"},
+            {"name": "Description", "id": "description"},
+        ], page_size=10, filterable=False))
 
     # Scheduling queues
     queues = proc_data.get("scheduling_queues", [])
@@ -234,7 +304,7 @@ def render_processes(data: Dict[str, Any]) -> html.Div:
         queues_df = pd.DataFrame(queues)
         fig = px.bar(queues_df, x="queue", y="priority",
                      title="Scheduling Queue Priorities")
-        content.append(dcc.Graph(figure=fig))
+        content.append(_graph(fig))
 
     # Max processes
     max_procs = proc_data.get("max_processes")
@@ -256,7 +326,7 @@ def render_memory(data: Dict[str, Any]) -> html.Div:
     # Display the generated TikZ memory layout diagram (PNG)
     content.append(html.Div([
         html.H3("Memory Layout Diagram"),
-        html.Img(src=app.get_asset_url('images/memory-layout.png'), style={'width': '100%', 'height': 'auto'}),
+        html.Img(src=dash.get_asset_url('images/memory-layout.png'), style={'width': '100%', 'height': 'auto'}),
     ]))
 
     # Memory regions
@@ -270,7 +340,7 @@ def render_memory(data: Dict[str, Any]) -> html.Div:
             values="size",
             title="Memory Regions"
         )
-        content.append(dcc.Graph(figure=fig))
+        content.append(_graph(fig))
 
     # Memory constants
     page_size = mem_data.get("page_size")
@@ -295,7 +365,7 @@ def render_ipc(data: Dict[str, Any]) -> html.Div:
     # Display the generated TikZ IPC flow diagram (PNG)
     content.append(html.Div([
         html.H3("IPC Flow Diagram"),
-        html.Img(src=app.get_asset_url('images/ipc-flow.png'), style={'width': '100%', 'height': 'auto'}),
+        html.Img(src=dash.get_asset_url('images/ipc-flow.png'), style={'width': '100%', 'height': 'auto'}),
     ]))
 
     # Endpoints
@@ -307,7 +377,7 @@ def render_ipc(data: Dict[str, Any]) -> html.Div:
             title="IPC Endpoints",
             labels={"number": "Endpoint Number", "name": "Process"}
         )
-        content.append(dcc.Graph(figure=fig))
+        content.append(_graph(fig))
 
     # IPC functions
     functions = ipc_data.get("ipc_functions", [])
@@ -334,7 +404,7 @@ def render_boot(data: Dict[str, Any]) -> html.Div:
     # Display the generated TikZ boot sequence diagram (PNG)
     content.append(html.Div([
         html.H3("Boot Sequence Diagram"),
-        html.Img(src=app.get_asset_url('images/boot-sequence.png'), style={'width': '100%', 'height': 'auto'}),
+        html.Img(src=dash.get_asset_url('images/boot-sequence.png'), style={'width': '100%', 'height': 'auto'}),
     ]))
 
     # Initialization functions
@@ -369,7 +439,7 @@ def render_performance(data: Dict[str, Any]) -> html.Div:
     return html.Div([
         html.H2("Performance Analysis"),
         html.P("Benchmark results from MINIX operations"),
-        dcc.Graph(figure=fig),
+        _graph(fig),
 
         html.H3("Performance Characteristics"),
         html.Ul([
@@ -381,11 +451,24 @@ def render_performance(data: Dict[str, Any]) -> html.Div:
     ])
 
 
+TAB_RENDERERS = {
+    "overview": render_overview,
+    "syscalls": render_syscalls,
+    "processes": render_processes,
+    "memory": render_memory,
+    "ipc": render_ipc,
+    "boot": render_boot,
+    "performance": render_performance,
+}
+
+
 def run_dashboard(
     data_dir: str = "diagrams/data",
     host: str = "127.0.0.1",
     port: int = 8050,
-    debug: bool = True
+    debug: bool = True,
+    measurements_dir: Optional[str] = None,
+    measurements_db: Optional[str] = None,
 ) -> None:
     """
     Run the dashboard application
@@ -395,8 +478,11 @@ def run_dashboard(
         host: Host to run on
         port: Port to run on
         debug: Enable debug mode
+        measurements_dir: Stream new measurements from this directory
+        measurements_db: Stream new boot measurements from this SQLite store
     """
-    app = create_app(data_dir)
+    app = create_app(data_dir, measurements_dir=measurements_dir,
+                     measurements_db=measurements_db)
     print(f"Starting dashboard at http://{host}:{port}")
     app.run(host=host, port=port, debug=debug)
 
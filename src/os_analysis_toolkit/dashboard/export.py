@@ -0,0 +1,335 @@
+"""
+Static export of the dashboard.
+
+Renders every tab with the same renderers the Dash app uses and writes a
+self-contained bundle: one HTML page per tab, figures embedded as
+pre-serialized Plotly JSON, server-paged tables split into per-page JSON
+files, plotly.js and the dashboard assets. Any static file host can serve it.
+
+Exports are incremental: each tab is keyed on the versions of the datasets
+it reads, and tabs whose key is unchanged since the last export are skipped.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+from html import escape
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import dash
+
+from .app import PAGED_TABLES, TABS, TAB_RENDERERS
+from .store import TAB_DATASETS, DashboardStore
+
+# Bump when the page layout or bootstrap script changes to force a rebuild
+EXPORT_FORMAT = 1
+MANIFEST_NAME = "export-manifest.json"
+ASSETS_DIR = Path(__file__).parent / "assets"
+
+_CAMEL_RE = re.compile(r"(?<!^)(?=[A-Z])")
+
+_ATTRIBUTES = {
+    "id": "id",
+    "className": "class",
+    "src": "src",
+    "href": "href",
+    "title": "title",
+    "alt": "alt",
+}
+
+_BOOTSTRAP_JS = """\
+document.querySelectorAll('script[data-graph]').forEach(function (node) {
+  var figure = JSON.parse(node.textContent);
+  Plotly.newPlot(node.dataset.graph, figure.data || [], figure.layout || {},
+                 {responsive: true});
+});
+document.querySelectorAll('nav.pager').forEach(function (nav) {
+  var table = document.getElementById(nav.dataset.table);
+  var columns = JSON.parse(table.dataset.columns);
+  var pages = Number(nav.dataset.pages);
+  var label = nav.querySelector('span');
+  var current = 0;
+  function show(page) {
+    if (page < 0 || page >= pages) { return; }
+    var name = 'tables/' + nav.dataset.table + '/page-' +
+               String(page).padStart(4, '0') + '.json';
+    fetch(name).then(function (response) {
+      return response.json();
+    }).then(function (rows) {
+      var body = table.tBodies[0];
+      body.innerHTML = '';
+      rows.forEach(function (row) {
+        var tr = body.insertRow();
+        columns.forEach(function (column) {
+          var value = row[column];
+          var missing = value === undefined || value === null;
+          tr.insertCell().textContent = missing ? '' : value;
+        });
+      });
+      current = page;
+      label.textContent = (page + 1) + ' / ' + pages;
+    });
+  }
+  nav.querySelector('[data-step="-1"]').onclick = function () { show(current - 1); };
+  nav.querySelector('[data-step="1"]').onclick = function () { show(current + 1); };
+});
+"""
+
+_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title} - OS Analysis Dashboard</title>
+{stylesheets}
+<script src="assets/plotly.min.js"></script>
+</head>
+<body>
+<div class="header">
+<h1 class="header-title">OS Analysis Dashboard</h1>
+<p class="header-subtitle">Interactive visualization of operating system internals</p>
+</div>
+<nav class="tabs">{nav}</nav>
+<div class="content">{content}</div>
+<div class="footer"><p>MINIX Analysis Framework v1.0.0</p>
+<p>Data extracted from actual source code</p></div>
+<script src="assets/dashboard-static.js"></script>
+</body>
+</html>
+"""
+
+
+def page_name(tab: str) -> str:
+    return "index.html" if tab == TABS[0][0] else f"{tab}.html"
+
+
+def _write_if_changed(path: Path, content: bytes) -> bool:
+    """Atomically write ``content`` unless the file already holds it."""
+    if (
+        path.exists()
+        and path.stat().st_size == len(content)
+        and path.read_bytes() == content
+    ):
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(content)
+    os.replace(tmp, path)
+    return True
+
+
+def _json_script(payload: Any) -> str:
+    # "</" would end the script element early
+    return json.dumps(payload, separators=(",", ":")).replace("</", "<\\/")
+
+
+def _style(style: Dict[str, Any]) -> str:
+    return "; ".join(
+        f"{_CAMEL_RE.sub('-', key).lower()}: {value}" for key, value in style.items()
+    )
+
+
+class _TabRenderer:
+    """Turns one tab's Dash component tree into static HTML"""
+
+    def __init__(self, out_dir: Path, store: DashboardStore, tab: str) -> None:
+        self.out_dir = out_dir
+        self.store = store
+        self.tab = tab
+        self.files: List[str] = []
+        self._graphs = 0
+
+    def html(self, component: Any) -> str:
+        if component is None:
+            return ""
+        if isinstance(component, (str, int, float)):
+            return escape(str(component))
+        if isinstance(component, (list, tuple)):
+            return "".join(self.html(child) for child in component)
+
+        spec = component.to_plotly_json()
+        namespace, kind, props = spec["namespace"], spec["type"], spec["props"]
+        if namespace == "dash_html_components":
+            return self._element(kind.lower(), props)
+        if kind == "Graph":
+            return self._graph(props.get("figure") or {})
+        if kind == "DataTable":
+            return self._table(props)
+        if kind in ("Interval", "Store"):
+            return ""
+        return self.html(props.get("children"))
+
+    def _element(self, tag: str, props: Dict[str, Any]) -> str:
+        attributes = []
+        for prop, attribute in _ATTRIBUTES.items():
+            value = props.get(prop)
+            if value is None:
+                continue
+            if prop == "src" and str(value).startswith("/assets/"):
+                value = str(value)[1:]
+            attributes.append(f' {attribute}="{escape(str(value))}"')
+        if props.get("style"):
+            attributes.append(f' style="{escape(_style(props["style"]))}"')
+        children = self.html(props.get("children"))
+        return f"<{tag}{''.join(attributes)}>{children}</{tag}>"
+
+    def _graph(self, figure: Dict[str, Any]) -> str:
+        self._graphs += 1
+        element_id = f"{self.tab}-graph-{self._graphs}"
+        return (
+            f'<div class="graph" id="{element_id}"></div>'
+            f'<script type="application/json" data-graph="{element_id}">'
+            f"{_json_script(figure)}</script>"
+        )
+
+    def _table(self, props: Dict[str, Any]) -> str:
+        table_id = props.get("id") or f"{self.tab}-table"
+        columns = props.get("columns") or []
+        column_ids = [column["id"] for column in columns]
+        collection = PAGED_TABLES.get(table_id)
+
+        pager = ""
+        if collection:
+            page_size = props.get("page_size") or 15
+            first = self.store.page(collection, 0, page_size)
+            pages = first["page_count"]
+            rows = first["data"]
+            for number in range(pages):
+                page = (
+                    first
+                    if number == 0
+                    else self.store.page(collection, number, page_size)
+                )
+                relative = f"tables/{table_id}/page-{number:04d}.json"
+                _write_if_changed(
+                    self.out_dir / relative, json.dumps(page["data"]).encode("utf-8")
+                )
+                self.files.append(relative)
+            if pages > 1:
+                pager = (
+                    f'<nav class="pager" data-table="{escape(table_id)}" '
+                    f'data-pages="{pages}">'
+                    f'<button data-step="-1">&lsaquo;</button><span>1 / {pages}</span>'
+                    f'<button data-step="1">&rsaquo;</button></nav>'
+                )
+        else:
+            rows = props.get("data") or []
+
+        head = "".join(
+            f"<th>{escape(str(column.get('name', column['id'])))}</th>"
+            for column in columns
+        )
+        body = "".join(
+            "<tr>"
+            + "".join(f"<td>{escape(str(row.get(cid, '')))}</td>" for cid in column_ids)
+            + "</tr>"
+            for row in rows
+        )
+        return (
+            f'<table id="{escape(table_id)}" '
+            f'data-columns="{escape(json.dumps(column_ids))}">'
+            f"<thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>{pager}"
+        )
+
+
+def _stylesheets() -> str:
+    if not ASSETS_DIR.exists():
+        return ""
+    return "\n".join(
+        f'<link rel="stylesheet" href="assets/{path.as_posix()}">'
+        for path in sorted(p.relative_to(ASSETS_DIR) for p in ASSETS_DIR.rglob("*.css"))
+    )
+
+
+def _nav(current: str) -> str:
+    links = []
+    for tab, label in TABS:
+        active = ' class="active"' if tab == current else ""
+        links.append(f'<a href="{page_name(tab)}"{active}>{escape(label)}</a>')
+    return "".join(links)
+
+
+def _tab_key(store: DashboardStore, tab: str) -> str:
+    versions = store.versions(TAB_DATASETS.get(tab, ()))
+    raw = json.dumps([EXPORT_FORMAT, tab, TABS, versions])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _copy_assets(out_dir: Path) -> None:
+    import plotly.offline
+
+    assets = out_dir / "assets"
+    _write_if_changed(
+        assets / "plotly.min.js", plotly.offline.get_plotlyjs().encode("utf-8")
+    )
+    _write_if_changed(assets / "dashboard-static.js", _BOOTSTRAP_JS.encode("utf-8"))
+    if ASSETS_DIR.exists():
+        for source in ASSETS_DIR.rglob("*"):
+            if source.is_file():
+                target = assets / source.relative_to(ASSETS_DIR)
+                if (
+                    not target.exists()
+                    or target.stat().st_mtime_ns < source.stat().st_mtime_ns
+                ):
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    shutil.copy2(source, target)
+
+
+def export_static(
+    data_dir: str,
+    out_dir: str,
+    tabs: Optional[List[str]] = None,
+    force: bool = False,
+) -> Dict[str, List[str]]:
+    """
+    Render the dashboard into ``out_dir``.
+
+    Returns ``{"rendered": [...], "skipped": [...]}`` tab names; a tab is
+    skipped when the datasets it reads are unchanged since the last export.
+    """
+    out_path = Path(out_dir)
+    out_path.mkdir(parents=True, exist_ok=True)
+    # Configures dash.get_asset_url, which the tab renderers call
+    dash.Dash(__name__)
+    store = DashboardStore(data_dir)
+
+    manifest_path = out_path / MANIFEST_NAME
+    manifest: Dict[str, Any] = {"format": EXPORT_FORMAT, "tabs": {}}
+    if manifest_path.exists() and not force:
+        previous = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if previous.get("format") == EXPORT_FORMAT:
+            manifest = previous
+
+    _copy_assets(out_path)
+    stylesheets = _stylesheets()
+    result: Dict[str, List[str]] = {"rendered": [], "skipped": []}
+    for tab, label in TABS:
+        if tabs and tab not in tabs:
+            continue
+        key = _tab_key(store, tab)
+        entry = manifest["tabs"].get(tab, {})
+        if entry.get("key") == key and all(
+            (out_path / f).exists() for f in entry.get("files", [])
+        ):
+            result["skipped"].append(tab)
+            continue
+
+        renderer = _TabRenderer(out_path, store, tab)
+        content = renderer.html(
+            TAB_RENDERERS[tab](store.data(TAB_DATASETS.get(tab, ())))
+        )
+        page = _PAGE_TEMPLATE.format(
+            title=escape(label), stylesheets=stylesheets, nav=_nav(tab), content=content
+        )
+        _write_if_changed(out_path / page_name(tab), page.encode("utf-8"))
+        files = [page_name(tab)] + renderer.files
+
+        for stale in set(entry.get("files", [])) - set(files):
+            (out_path / stale).unlink(missing_ok=True)
+        manifest["tabs"][tab] = {"key": key, "files": files}
+        result["rendered"].append(tab)
+
+    _write_if_changed(manifest_path, json.dumps(manifest, indent=2).encode("utf-8"))
+    return result
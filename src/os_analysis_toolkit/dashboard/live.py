@@ -0,0 +1,284 @@
+"""
+Live measurement feed for the dashboard.
+
+Tails the measurement directory written by the MCP boot-profiler and
+syscall-tracer servers (``<arch>/boot-*.json``, ``<arch>/syscalls/trace-*.json``)
+and, optionally, the ``boot_measurements`` table of the local SQLite store.
+Every new measurement gets a sequence number, so a browser holding a cursor
+receives only what arrived after it. Long series are downsampled with LTTB
+(Largest-Triangle-Three-Buckets) before they are sent.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Measurement files: (glob pattern relative to <arch>/, series kind, value field)
+MEASUREMENT_SOURCES = (
+    ("boot-*.json", "boot", "total_time_ms"),
+    ("syscalls/trace-*.json", "syscalls", "total_syscalls"),
+)
+
+# Points per trace sent in a full figure; deltas are appended until a trace
+# holds twice this many, then the view is re-downsampled
+LIVE_MAX_POINTS = 1000
+
+_MTIME_SETTLE_NS = 2_000_000_000
+
+Record = Dict[str, Any]
+
+
+def lttb(points: Sequence[Record], threshold: int) -> List[Record]:
+    """
+    Downsample ``points`` (dicts with numeric ``x`` and ``y``, ordered by x)
+    to ``threshold`` points, keeping the visual shape of the series.
+    """
+    count = len(points)
+    if threshold >= count or threshold < 3:
+        return list(points)
+
+    sampled = [points[0]]
+    bucket_size = (count - 2) / (threshold - 2)
+    selected = 0
+    for bucket in range(threshold - 2):
+        # Average of the next bucket is the third triangle vertex
+        next_start = int((bucket + 1) * bucket_size) + 1
+        next_end = min(int((bucket + 2) * bucket_size) + 1, count)
+        span = points[next_start:next_end] or points[-1:]
+        avg_x = sum(p["x"] for p in span) / len(span)
+        avg_y = sum(p["y"] for p in span) / len(span)
+
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+        anchor = points[selected]
+        best, best_area = start, -1.0
+        for index in range(start, end):
+            point = points[index]
+            area = abs(
+                (anchor["x"] - avg_x) * (point["y"] - anchor["y"])
+                - (anchor["x"] - point["x"]) * (avg_y - anchor["y"])
+            )
+            if area > best_area:
+                best, best_area = index, area
+        sampled.append(points[best])
+        selected = best
+    sampled.append(points[-1])
+    return sampled
+
+
+def _epoch(timestamp: Optional[str], fallback: float) -> float:
+    try:
+        return datetime.fromisoformat(timestamp).timestamp()
+    except (TypeError, ValueError):
+        return fallback
+
+
+class MeasurementFeed:
+    """
+    Sequence-numbered measurement series, refreshed incrementally.
+
+    ``refresh()`` only lists directories whose mtime changed and only reads
+    files (or database rows) it has not seen, so polling it from a
+    dashboard interval is cheap. Safe to share between callback threads.
+    """
+
+    def __init__(
+        self,
+        measurements_dir: Optional[str] = None,
+        database: Optional[str] = None,
+        min_refresh: float = 0.5,
+    ) -> None:
+        self.measurements_dir = Path(measurements_dir) if measurements_dir else None
+        self.database = Path(database) if database else None
+        self.min_refresh = min_refresh
+        self.series: Dict[str, List[Record]] = {}
+        self.seq = 0
+        self._seen: set = set()
+        self._dir_mtimes: Dict[Path, int] = {}
+        self._last_row = 0
+        self._last_refresh = 0.0
+        self._lock = threading.Lock()
+
+    def _append(
+        self, series: str, x: float, y: float, time_label: str, source: str
+    ) -> None:
+        self.seq += 1
+        self.series.setdefault(series, []).append(
+            {"seq": self.seq, "x": x, "y": y, "time": time_label, "source": source}
+        )
+
+    def _scan_directory(self) -> None:
+        root = self.measurements_dir
+        if root is None or not root.is_dir():
+            return
+        for arch_dir in sorted(p for p in root.iterdir() if p.is_dir()):
+            for pattern, kind, field in MEASUREMENT_SOURCES:
+                folder = (arch_dir / pattern).parent
+                try:
+                    mtime = folder.stat().st_mtime_ns
+                except FileNotFoundError:
+                    continue
+                # A recent mtime may hide a second change on coarse-grained
+                # filesystems, so only an older unchanged mtime skips the listing
+                settled = time.time_ns() - mtime > _MTIME_SETTLE_NS
+                if settled and self._dir_mtimes.get(folder) == mtime:
+                    continue
+                self._dir_mtimes[folder] = mtime
+                fresh = sorted(
+                    p for p in folder.glob(Path(pattern).name) if p not in self._seen
+                )
+                for path in fresh:
+                    try:
+                        data = json.loads(path.read_bytes())
+                        value = float(data[field])
+                    except (OSError, ValueError, KeyError, TypeError):
+                        # Half-written file: rescan this folder next refresh
+                        self._dir_mtimes.pop(folder, None)
+                        continue
+                    self._seen.add(path)
+                    fallback = path.stat().st_mtime
+                    stamp = data.get("timestamp")
+                    x = _epoch(stamp, fallback)
+                    label = stamp or datetime.fromtimestamp(fallback).isoformat()
+                    self._append(f"{kind}/{arch_dir.name}", x, value, label, path.name)
+
+    def _scan_database(self) -> None:
+        if self.database is None or not self.database.exists():
+            return
+        connection = sqlite3.connect(f"file:{self.database}?mode=ro", uri=True)
+        try:
+            rows = connection.execute(
+                "SELECT id, timestamp, architecture, boot_time_ms "
+                "FROM boot_measurements WHERE id > ? ORDER BY id",
+                (self._last_row,),
+            ).fetchall()
+        except sqlite3.Error:
+            rows = []
+        finally:
+            connection.close()
+        for row_id, stamp, arch, boot_ms in rows:
+            self._last_row = row_id
+            self._append(
+                f"boot/{arch}",
+                _epoch(stamp, time.time()),
+                float(boot_ms),
+                stamp,
+                f"db:{row_id}",
+            )
+
+    def refresh(self, force: bool = False) -> int:
+        """Pick up new measurements; returns how many arrived."""
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._last_refresh < self.min_refresh:
+                return 0
+            self._last_refresh = now
+            before = self.seq
+            self._scan_directory()
+            self._scan_database()
+            return self.seq - before
+
+    def names(self, prefix: str = "") -> List[str]:
+        with self._lock:
+            return sorted(name for name in self.series if name.startswith(prefix))
+
+    def since(
+        self, cursor: int, prefix: str = ""
+    ) -> Tuple[Dict[str, List[Record]], int]:
+        """Records newer than ``cursor`` per series, and the new cursor."""
+        with self._lock:
+            delta: Dict[str, List[Record]] = {}
+            for name, records in self.series.items():
+                if (
+                    not name.startswith(prefix)
+                    or not records
+                    or records[-1]["seq"] <= cursor
+                ):
+                    continue
+                # Sequence numbers grow along each series, so scan from the end
+                index = len(records)
+                while index and records[index - 1]["seq"] > cursor:
+                    index -= 1
+                delta[name] = records[index:]
+            return delta, self.seq
+
+
+def live_figure(
+    feed: MeasurementFeed, prefix: str, title: str, threshold: int = LIVE_MAX_POINTS
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Full downsampled figure (plain Plotly JSON) for the series under
+    ``prefix``, plus the client state that later deltas are relative to.
+    """
+    # One consistent view of the series and the cursor it corresponds to
+    series, cursor = feed.since(0, prefix)
+    names = sorted(series)
+    traces = []
+    for name in names:
+        records = lttb(sorted(series[name], key=lambda r: r["x"]), threshold)
+        traces.append(
+            {
+                "type": "scattergl",
+                "mode": "lines+markers",
+                "name": name,
+                "x": [r["time"] for r in records],
+                "y": [r["y"] for r in records],
+            }
+        )
+    figure = {
+        "data": traces,
+        "layout": {
+            "title": {"text": title},
+            "xaxis": {"type": "date"},
+            "uirevision": prefix,
+        },
+    }
+    state = {
+        "title": title,
+        "cursor": cursor,
+        "series": names,
+        "points": [len(trace["x"]) for trace in traces],
+    }
+    return figure, state
+
+
+def live_delta(
+    feed: MeasurementFeed,
+    state: Dict[str, Any],
+    prefix: str,
+    threshold: int = LIVE_MAX_POINTS,
+) -> Tuple[str, Any, Dict[str, Any]]:
+    """
+    What the browser needs after ``state``.
+
+    Returns ``("none", None, state)`` when nothing arrived,
+    ``("extend", (extendData, trace indices), state)`` to append the new
+    points to existing traces, or ``("reset", figure, state)`` when a new
+    series appeared or a trace outgrew the downsampling budget.
+    """
+    delta, cursor = feed.since(state.get("cursor", 0), prefix)
+    if not delta:
+        return "none", None, state
+
+    series = state.get("series", [])
+    points = list(state.get("points", []))
+    if any(name not in series for name in delta):
+        figure, fresh = live_figure(feed, prefix, state.get("title", ""), threshold)
+        return "reset", figure, fresh
+
+    indices = [series.index(name) for name in sorted(delta)]
+    for index, name in zip(indices, sorted(delta)):
+        points[index] += len(delta[name])
+    if max(points) > 2 * threshold:
+        figure, fresh = live_figure(feed, prefix, state.get("title", ""), threshold)
+        return "reset", figure, fresh
+
+    extend = {
+        "x": [[r["time"] for r in delta[name]] for name in sorted(delta)],
+        "y": [[r["y"] for r in delta[name]] for name in sorted(delta)],
+    }
+    return "extend", (extend, indices), dict(state, cursor=cursor, points=points)
@@ -0,0 +1,194 @@
+"""
+Server-side state for the dashboard.
+
+Datasets stay in the Python process (through the shared MinixDataLoader)
+instead of being shipped to the browser in a ``dcc.Store``. Rendered tabs
+are memoized per (tab, dataset versions), and large tables are paged,
+filtered and sorted here so only the visible rows cross the wire.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from shared.mcp.server import MinixDataLoader
+from shared.mcp.server.query import QueryEngine
+
+# Datasets each tab reads; their versions key the rendered-tab cache
+TAB_DATASETS: Dict[str, Tuple[str, ...]] = {
+    "overview": ("statistics",),
+    "syscalls": ("kernel_structure",),
+    "processes": ("process_table",),
+    "memory": ("memory_layout",),
+    "ipc": ("ipc_system",),
+    "boot": ("boot_sequence",),
+    "performance": (),
+}
+
+# Dash DataTable filter operators -> shared query predicate operators
+_FILTER_OPERATORS = {
+    "contains": "~",
+    "datestartswith": "^=",
+    "=": "==",
+    "eq": "==",
+    "s=": "==",
+    "!=": "!=",
+    "ne": "!=",
+    "s!=": "!=",
+    ">": ">",
+    "gt": ">",
+    "s>": ">",
+    ">=": ">=",
+    "ge": ">=",
+    "s>=": ">=",
+    "<": "<",
+    "lt": "<",
+    "s<": "<",
+    "<=": "<=",
+    "le": "<=",
+    "s<=": "<=",
+}
+
+_FILTER_TERM_RE = re.compile(r"^\{(?P<field>[^}]+)\}\s+(?P<op>\S+)\s+(?P<value>.+)$")
+
+MISSING = "missing"
+
+
+def filter_query_to_where(filter_query: Optional[str]) -> List[str]:
+    """Translate a DataTable ``filter_query`` into query predicates."""
+    where: List[str] = []
+    for term in (filter_query or "").split(" && "):
+        term = term.strip()
+        if not term:
+            continue
+        match = _FILTER_TERM_RE.match(term)
+        if not match or match.group("op") not in _FILTER_OPERATORS:
+            raise ValueError(f"Unsupported filter: {term!r}")
+        value = match.group("value").strip()
+        if value[:1] in ("'", '"') and value[-1:] == value[:1]:
+            value = '"' + value[1:-1] + '"'
+        where.append(
+            f"{match.group('field')}{_FILTER_OPERATORS[match.group('op')]}{value}"
+        )
+    return where
+
+
+def sort_by_to_sort(sort_by: Optional[Iterable[Dict[str, str]]]) -> List[str]:
+    """Translate DataTable ``sort_by`` entries into query sort keys."""
+    return [
+        ("-" if entry.get("direction") == "desc" else "") + entry["column_id"]
+        for entry in sort_by or ()
+    ]
+
+
+class DashboardStore:
+    """
+    Datasets, memoized tab renders and paged table rows for one data dir.
+
+    A missing data directory or dataset renders as empty rather than
+    failing, matching what the dashboard has always shown in that case.
+    """
+
+    def __init__(
+        self, data_dir: str, watch: bool = False, max_entries: int = 64
+    ) -> None:
+        self.data_dir = Path(data_dir)
+        self.loader: Optional[MinixDataLoader] = None
+        if self.data_dir.exists():
+            self.loader = MinixDataLoader(self.data_dir, watch=watch)
+        self.queries = QueryEngine(self.loader) if self.loader else None
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._renders: "OrderedDict[Tuple[Any, ...], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def version(self, key: str) -> str:
+        if self.loader is None:
+            return MISSING
+        try:
+            return self.loader.version(key)
+        except FileNotFoundError:
+            return MISSING
+
+    def versions(self, keys: Sequence[str]) -> Tuple[Tuple[str, str], ...]:
+        return tuple((key, self.version(key)) for key in keys)
+
+    def data(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Payloads for the present datasets among ``keys``."""
+        data: Dict[str, Any] = {}
+        for key in keys:
+            if self.version(key) != MISSING:
+                data[key] = self.loader.load(key)
+        return data
+
+    def render(self, tab: str, build: Callable[[Dict[str, Any]], Any]) -> Any:
+        """
+        Return the memoized render of ``tab``, building it on a miss.
+
+        ``build`` receives only the datasets the tab declares in
+        TAB_DATASETS, so the cache key covers everything it can read.
+        """
+        keys = TAB_DATASETS.get(tab, ())
+        cache_key = (tab, self.versions(keys))
+        with self._lock:
+            if cache_key in self._renders:
+                self._renders.move_to_end(cache_key)
+                self.hits += 1
+                return self._renders[cache_key]
+            self.misses += 1
+        rendered = build(self.data(keys))
+        with self._lock:
+            self._renders[cache_key] = rendered
+            while len(self._renders) > self.max_entries:
+                self._renders.popitem(last=False)
+        return rendered
+
+    def page(
+        self,
+        collection: str,
+        page_current: int = 0,
+        page_size: int = 15,
+        sort_by: Optional[Iterable[Dict[str, str]]] = None,
+        filter_query: Optional[str] = None,
+        fields: Sequence[str] = (),
+    ) -> Dict[str, Any]:
+        """
+        One table page: ``{"data": rows, "page_count": n, "total": matches}``.
+
+        An unparsable filter yields an empty page rather than an error, as
+        the user is usually still typing it.
+        """
+        if self.queries is None:
+            return {"data": [], "page_count": 0, "total": 0}
+        try:
+            where = filter_query_to_where(filter_query)
+        except ValueError:
+            return {"data": [], "page_count": 0, "total": 0}
+        try:
+            result = self.queries.query(
+                collection,
+                fields=fields,
+                where=where,
+                sort=sort_by_to_sort(sort_by),
+                limit=page_size,
+                offset=(page_current or 0) * page_size,
+            )
+        except FileNotFoundError:
+            return {"data": [], "page_count": 0, "total": 0}
+        total = result["total"]
+        return {
+            "data": result["items"],
+            "page_count": max(1, -(-total // page_size)),
+            "total": total,
+        }
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._renders),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
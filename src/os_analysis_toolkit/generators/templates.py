@@ -0,0 +1,82 @@
+"""
+Compiled LaTeX templates
+
+Templates are ``.tex`` files with ``{{name}}`` slots. Each template is
+parsed once into its literal chunks and slot names, so rendering is a single
+join whatever the template's size or slot count. Loaded templates are
+cached per path: rendering hundreds of diagrams reads each file once.
+"""
+
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterable, List, Mapping, Optional, Union
+
+SLOT_RE = re.compile(r"\{\{(\w+)\}\}")
+
+# A slot value: text, a number, or lines joined with newlines
+Value = Union[str, int, float, Iterable[str]]
+
+
+class Template:
+    """A template compiled to literal chunks interleaved with slots"""
+
+    def __init__(self, text: str, name: str = "<string>"):
+        parts = SLOT_RE.split(text)
+        self.name = name
+        self._chunks: List[str] = parts[0::2]
+        self._slots: List[str] = parts[1::2]
+
+    @property
+    def slots(self) -> frozenset:
+        """Names of the unfilled slots"""
+        return frozenset(self._slots)
+
+    def bind(self, **values: Value) -> "Template":
+        """Template with some slots filled in ahead of rendering"""
+        bound = Template("", self.name)
+        chunks, slots = [self._chunks[0]], []
+        for slot, chunk in zip(self._slots, self._chunks[1:]):
+            if slot in values:
+                chunks[-1] += _text(values[slot]) + chunk
+            else:
+                slots.append(slot)
+                chunks.append(chunk)
+        bound._chunks, bound._slots = chunks, slots
+        return bound
+
+    def render(
+        self, values: Optional[Mapping[str, Value]] = None, **kwargs: Value
+    ) -> str:
+        """Fill every slot; a missing value raises ``KeyError``"""
+        if values:
+            kwargs = {**values, **kwargs}
+        out = [self._chunks[0]]
+        for slot, chunk in zip(self._slots, self._chunks[1:]):
+            try:
+                value = kwargs[slot]
+            except KeyError:
+                raise KeyError(f"{self.name}: no value for {{{{{slot}}}}}") from None
+            out.append(_text(value))
+            out.append(chunk)
+        return "".join(out)
+
+    __call__ = render
+
+
+def _text(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        return str(value)
+    return "\n".join(str(line) for line in value)
+
+
+@lru_cache(maxsize=None)
+def _load(path: str) -> Template:
+    return Template(Path(path).read_text(), Path(path).name)
+
+
+def load_template(path: Union[str, Path]) -> Template:
+    """Compiled template for ``path``, read from disk on first use only"""
+    return _load(str(Path(path).resolve()))
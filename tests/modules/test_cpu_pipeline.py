@@ -59,3 +59,24 @@ def test_render_syscall_summary_produces_expected_output(tmp_path, benchmark):
     assert len(output["top_syscalls"]) == 2
     # Ensure ordering by line_count descending
     assert output["top_syscalls"][0]["name"] == "do_example_b"
+
+
+@pytest.mark.unit
+def test_render_syscall_summary_reads_snapshot(tmp_path):
+    from shared.snapshot import SNAPSHOT_NAME, write_snapshot
+
+    snapshot = tmp_path / SNAPSHOT_NAME
+    write_snapshot(snapshot, {
+        "kernel_structure": {"system_calls": [{"name": "do_fork", "file": "f.c", "line_count": 7}]},
+        "statistics": {"total_syscalls": 1},
+    })
+
+    proc = subprocess.run(
+        [sys.executable, str(SUMMARY_SCRIPT), "--kernel-structure", str(snapshot)],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    output = json.loads(proc.stdout)
+    assert output["syscall_count"] == 1
+    assert output["top_syscalls"][0]["name"] == "do_fork"
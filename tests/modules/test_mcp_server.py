@@ -2,6 +2,7 @@ import json
 import os
 import subprocess
 import sys
+import time
 from pathlib import Path
 
 import pytest
@@ -9,7 +10,7 @@ import pytest
 ROOT = Path(__file__).resolve().parents[2]
 sys.path.insert(0, str(ROOT))
 
-from shared.mcp.server import MinixAnalysisServer, MinixDataLoader  # noqa: E402
+from shared.mcp.server import MinixAnalysisServer, MinixDataLoader, ResponseCache  # noqa: E402
 
 
 @pytest.fixture()
@@ -91,6 +92,288 @@ def test_server_queries(sample_data_dir, benchmark):
     assert "kernel_structure" in resources
 
 
+def test_server_indexes_built_once_per_load(sample_data_dir):
+    loader = MinixDataLoader(sample_data_dir)
+    server = MinixAnalysisServer(loader=loader)
+
+    assert server.analyze_syscall("missing") is None
+    first = loader.index("kernel_structure")
+    server.query_architecture(top_n=1)
+    server.analyze_syscall("do_example_b")
+    assert loader.index("kernel_structure") is first
+
+    assert server.trace_boot_path("Phase 1") == server.trace_boot_path("phase1")
+    assert server.trace_boot_path("critical_path") == {"length": 5}
+    assert server.query_architecture(top_n=0)["summary"]["top_syscalls"] == [
+        {"name": "do_example_b", "file": "b.c", "line_count": 25},
+        {"name": "do_example_a", "file": "a.c", "line_count": 10},
+    ]
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_data_loader_reload_swaps_dataset(sample_data_dir, sample_payload):
+    loader = MinixDataLoader(sample_data_dir)
+    before = loader.dataset("kernel_structure")
+
+    assert loader.reload() == set()
+    assert loader.dataset("kernel_structure") is before
+
+    kernel = dict(sample_payload["kernel_structure"], microkernel=False)
+    (sample_data_dir / "kernel_structure.json").write_text(json.dumps(kernel))
+    assert loader.reload() == set()
+
+    after = loader.dataset("kernel_structure")
+    assert after is not before
+    assert after.payload["microkernel"] is False
+    assert after.version != before.version
+    assert after.index.syscalls_by_name["do_example_a"]["file"] == "a.c"
+    # Readers holding the old dataset keep a complete, consistent copy
+    assert before.payload["microkernel"] is True
+
+
+def test_data_loader_keeps_last_good_copy(sample_data_dir):
+    loader = MinixDataLoader(sample_data_dir)
+    before = loader.dataset("statistics")
+    (sample_data_dir / "statistics.json").write_text('{"total_lines": ')
+
+    assert loader.reload(["statistics"]) == {"statistics"}
+    assert loader.dataset("statistics") is before
+
+
+def test_data_loader_prefers_snapshot(sample_data_dir, sample_payload):
+    from shared.snapshot import SNAPSHOT_NAME, Snapshot, write_snapshot
+
+    write_snapshot(
+        sample_data_dir / SNAPSHOT_NAME,
+        {key: sample_payload[key] for key in ("kernel_structure", "statistics")},
+    )
+    (sample_data_dir / "kernel_structure.json").unlink()
+    loader = MinixDataLoader(sample_data_dir)
+
+    assert loader.kernel_structure["microkernel"] is True
+    assert loader.index("kernel_structure").syscalls_by_name["do_example_a"]["file"] == "a.c"
+    # Datasets absent from the snapshot still come from their JSON file
+    assert loader.boot_sequence["topology"] == "hub-spoke"
+    with Snapshot(sample_data_dir / SNAPSHOT_NAME) as snapshot:
+        assert snapshot.keys() == ["kernel_structure", "statistics"]
+        assert loader.version("statistics") == snapshot.section_version("statistics")
+
+    stats = dict(sample_payload["statistics"], total_lines=2000)
+    write_snapshot(
+        sample_data_dir / SNAPSHOT_NAME,
+        {"kernel_structure": sample_payload["kernel_structure"], "statistics": stats},
+    )
+    before = loader.dataset("kernel_structure")
+    assert loader._on_files_changed({SNAPSHOT_NAME}) == set()
+    assert loader.statistics["total_lines"] == 2000
+    # Untouched sections keep their version, so nothing is swapped
+    assert loader.dataset("kernel_structure") is before
+
+
+def test_data_loader_json_newer_than_snapshot(sample_data_dir, sample_payload):
+    from shared.snapshot import SNAPSHOT_NAME, write_snapshot
+
+    write_snapshot(sample_data_dir / SNAPSHOT_NAME, sample_payload)
+    loader = MinixDataLoader(sample_data_dir)
+    assert loader.statistics["total_lines"] == 1000
+
+    # One pipeline step rerun after the snapshot was written
+    stats = dict(sample_payload["statistics"], total_lines=2000)
+    path = sample_data_dir / "statistics.json"
+    path.write_text(json.dumps(stats))
+    snapshot_mtime = (sample_data_dir / SNAPSHOT_NAME).stat().st_mtime_ns
+    os.utime(path, ns=(snapshot_mtime + 1_000_000, snapshot_mtime + 1_000_000))
+
+    assert loader._on_files_changed({"statistics.json"}) == set()
+    assert loader.statistics["total_lines"] == 2000
+    assert MinixDataLoader(sample_data_dir).statistics["total_lines"] == 2000
+    # Sections whose JSON file is unchanged still come from the snapshot
+    assert MinixDataLoader(sample_data_dir).kernel_structure["microkernel"] is True
+
+
+def test_snapshot_rejects_foreign_files(tmp_path):
+    from shared.snapshot import SnapshotError, Snapshot, open_snapshot
+
+    bogus = tmp_path / "bogus"
+    bogus.write_bytes(b"{}")
+    with pytest.raises(SnapshotError):
+        Snapshot(bogus)
+    assert open_snapshot(tmp_path) is None
+
+
+@pytest.mark.parametrize("use_inotify", [True, False])
+def test_data_loader_watch_picks_up_changes(sample_data_dir, sample_payload, use_inotify):
+    from shared.mcp.server.watcher import DirectoryWatcher
+
+    loader = MinixDataLoader(sample_data_dir, poll_interval=0.05)
+    loader._watcher = DirectoryWatcher(
+        loader.data_dir,
+        ["statistics.json"],
+        loader._on_files_changed,
+        poll_interval=0.05,
+        use_inotify=use_inotify,
+    ).start()
+    try:
+        assert loader.statistics["total_lines"] == 1000
+        stats = dict(sample_payload["statistics"], total_lines=2000)
+        (sample_data_dir / "statistics.json").write_text(json.dumps(stats))
+        assert _wait_for(lambda: loader.statistics["total_lines"] == 2000)
+    finally:
+        loader.close()
+
+
+def test_response_cache_keys_on_dataset_version(sample_data_dir, sample_payload):
+    loader = MinixDataLoader(sample_data_dir)
+    server = MinixAnalysisServer(loader=loader)
+    cache = ResponseCache(loader, max_entries=2)
+    renders = []
+
+    def render():
+        renders.append(1)
+        return json.dumps(server.query_architecture(top_n=1))
+
+    first = cache.get("query_architecture", {"top_n": 1}, ["kernel_structure"], render)
+    again = cache.get("query_architecture", {"top_n": 1}, ["kernel_structure"], render)
+    assert again is first
+    assert len(renders) == 1
+    assert cache.etag("query_architecture", {"top_n": 1}, ["kernel_structure"]) == first.etag
+    assert cache.etag("query_architecture", {"top_n": 2}, ["kernel_structure"]) != first.etag
+
+    kernel = dict(sample_payload["kernel_structure"], components=["kernel"])
+    (sample_data_dir / "kernel_structure.json").write_text(json.dumps(kernel))
+    loader.reload()
+
+    fresh = cache.get("query_architecture", {"top_n": 1}, ["kernel_structure"], render)
+    assert fresh.etag != first.etag
+    assert json.loads(fresh.body)["components"] == ["kernel"]
+    assert cache.stats() == {"entries": 2, "hits": 1, "misses": 2}
+
+
+def test_response_cache_skips_responses_rendered_across_a_reload(
+    sample_data_dir, sample_payload
+):
+    loader = MinixDataLoader(sample_data_dir)
+    server = MinixAnalysisServer(loader=loader)
+    cache = ResponseCache(loader)
+    before = cache.etag("query_architecture", {}, ["kernel_structure"])
+
+    def render():
+        # A hot reload lands while the response is being rendered
+        kernel = dict(sample_payload["kernel_structure"], components=["kernel"])
+        (sample_data_dir / "kernel_structure.json").write_text(json.dumps(kernel))
+        loader.reload()
+        return json.dumps(server.query_architecture())
+
+    response = cache.get("query_architecture", {}, ["kernel_structure"], render)
+    assert response.etag == before
+    assert cache.stats()["entries"] == 0
+
+    fresh = cache.get(
+        "query_architecture", {}, ["kernel_structure"], lambda: json.dumps(server.query_architecture())
+    )
+    assert fresh.etag != before
+    assert json.loads(fresh.body)["components"] == ["kernel"]
+
+
+def test_blocking_executor_coalesces_and_keeps_loop_free():
+    import asyncio
+    import threading
+
+    from shared.mcp.executor import BlockingExecutor
+
+    executor = BlockingExecutor("test", max_workers=2)
+    release = threading.Event()
+    calls = []
+
+    def slow(value):
+        calls.append(value)
+        release.wait(5)
+        return value * 2
+
+    async def scenario():
+        shared = [asyncio.ensure_future(executor.run(slow, 21, key="same")) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        # The loop still serves other work while the pool is busy
+        quick = await executor.run(lambda: "quick")
+        assert executor.stats()["running"] == 1
+        release.set()
+        return quick, await asyncio.gather(*shared)
+
+    try:
+        quick, results = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    assert quick == "quick"
+    assert results == [42, 42, 42]
+    assert calls == [21]
+    stats = executor.stats()
+    assert stats["submitted"] == 2
+    assert stats["coalesced"] == 2
+    assert stats["queued"] == 0
+    assert stats["inflight_keys"] == 0
+    assert stats["latency_ms"]["samples"] == 2
+
+
+def test_server_collection_query(sample_data_dir):
+    server = MinixAnalysisServer(loader=MinixDataLoader(sample_data_dir))
+
+    page = server.query(
+        "syscalls", fields=["name"], sort=["line_count"], limit=1
+    )
+    assert page["total"] == 2
+    assert page["items"] == [{"name": "do_example_a"}]
+    assert page["next_cursor"]
+
+    rest = server.query(
+        "syscalls", fields=["name"], sort=["line_count"], limit=1, cursor=page["next_cursor"]
+    )
+    assert rest["items"] == [{"name": "do_example_b"}]
+    assert rest["next_cursor"] is None
+
+    with pytest.raises(ValueError):
+        server.query("syscalls", cursor=page["next_cursor"])
+
+    filtered = server.query("syscalls", where=["line_count>10", "file~b"])
+    assert [row["name"] for row in filtered["items"]] == ["do_example_b"]
+    exact = server.query("syscalls", fields=["file"], where=["name==do_example_a"])
+    assert exact["items"] == [{"file": "a.c"}]
+
+    assert server.list_collections()["boot_phases"] == {"dataset": "boot_sequence", "count": 1}
+    assert list(server.list_resources(datasets=["statistics"])) == ["statistics"]
+    with pytest.raises(ValueError, match="Unknown dataset.*stats.*statistics"):
+        server.list_resources(datasets=["stats"])
+
+
+def test_cli_list_resources_rejects_unknown_dataset(sample_data_dir):
+    cmd = [
+        sys.executable,
+        "-m",
+        "os_analysis_toolkit.cli",
+        "--list-resources",
+        "--datasets",
+        "statistics,bogus",
+        "--data-dir",
+        str(sample_data_dir),
+    ]
+    env = os.environ.copy()
+    src_path = ROOT / "src"
+    env["PYTHONPATH"] = f"{src_path}{os.pathsep}{env.get('PYTHONPATH', '')}"
+
+    result = subprocess.run(cmd, capture_output=True, text=True, env=env)
+    assert result.returncode == 1
+    assert "Traceback" not in result.stderr
+    assert "bogus" in json.loads(result.stdout)["error"]
+
+
 def test_cli_resource_dump(sample_data_dir, benchmark):
     cmd = [
         sys.executable,
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test suite for the ARM architecture feature scan
+"""
+
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tools.analyze_arm import FEATURE_KEYWORDS, ARMAnalyzer, scan_arm_features
+
+
+SOURCES = {
+    "arm/head.S": "\tmrc p15, 0, r0, c2\t@ TTBCR\n\tisb|dsb|dmb\n\tdsb; dsb\n.thumb\n",
+    "arm/barrier.S": "\tisb|dsb|dmb\n",
+    "arm/cache.c": "/* Cache maintenance for cortex-a8 */\nvoid flush_cache(void) {}\n",
+    "arm/omap/fdt.c": "#include <fdt.h>\n/* device tree, see am335x.dts */\n",
+    "arm/omap/vfp.S": "\tvmrs r0, fpscr\t@ VFP, float-abi=hard, NEON\n",
+    "arm/plain.c": "int main(void) { return 0; }\n",
+    "arm/include/arch.h": "#define ASID_BITS 8\n",
+    "arm/notes.txt": "cache\n",
+    "i386/mpx.c": "/* Cache */\n",
+}
+
+
+@pytest.fixture
+def minix_root(tmp_path):
+    arch_dir = tmp_path / "minix" / "kernel" / "arch"
+    for name, text in SOURCES.items():
+        path = arch_dir / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+    return tmp_path
+
+
+def independent_searches(paths):
+    """The per-feature re.search over whole files the scan replaced"""
+    features = {}
+    for path in paths:
+        if path.suffix in [".c", ".S"]:
+            content = path.read_text()
+            for feature, pattern in FEATURE_KEYWORDS.items():
+                if re.search(pattern, content):
+                    features[feature] = features.get(feature, 0) + 1
+    return features
+
+
+class TestScanArmFeatures:
+    """Test cases for scan_arm_features"""
+
+    def test_hits_and_lines(self, minix_root):
+        path = minix_root / "minix/kernel/arch/arm/head.S"
+        scanned, lines, hits, feature_lines = scan_arm_features(path)
+
+        assert scanned == path and lines == 4
+        assert hits == {"mmu": 1, "barrier": 1, "cache": 4, "thumbs": 1}
+        assert feature_lines == {"mmu": [1], "barrier": [2], "cache": [2, 3], "thumbs": [4]}
+
+    def test_overlapping_keywords_count_for_each_feature(self, minix_root):
+        """dsb in the barrier list still counts as a cache hit"""
+        _, _, hits, _ = scan_arm_features(minix_root / "minix/kernel/arch/arm/head.S")
+        assert hits["cache"] == 4 and hits["barrier"] == 1
+
+    def test_missing_file(self, tmp_path):
+        assert scan_arm_features(tmp_path / "gone.c")[1:] == (0, {}, {})
+
+
+class TestARMAnalyzer:
+    """Test cases for ARMAnalyzer"""
+
+    def test_find_arm_code_walks_arm_dirs(self, minix_root):
+        analyzer = ARMAnalyzer(minix_root)
+        analyzer.find_arm_code()
+
+        arm_dir = minix_root / "minix/kernel/arch/arm"
+        assert sorted(analyzer.arm_files) == sorted(
+            arm_dir / name[len("arm/"):]
+            for name in SOURCES
+            if name.startswith("arm/") and name.endswith((".c", ".S", ".h"))
+        )
+
+    def test_feature_counts_match_independent_searches(self, minix_root):
+        analyzer = ARMAnalyzer(minix_root)
+        analyzer.find_arm_code()
+        features = analyzer.analyze_arm_features(jobs=2)
+
+        assert dict(features) == independent_searches(analyzer.arm_files)
+        # barrier.S only mentions dsb and dmb inside the barrier keyword
+        assert features["cache"] == 3 and features["barrier"] == 2
+        density = analyzer.feature_density()
+        assert density["cache"]["hits"] == 8 and density["cache"]["lines"] == 5
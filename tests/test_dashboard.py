@@ -0,0 +1,194 @@
+"""
+Tests for the dashboard's server-side store (memoized tab renders, paged
+table rows), the live measurement feed and the static export.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip("dash")
+
+from os_analysis_toolkit.dashboard.export import export_static  # noqa: E402
+from os_analysis_toolkit.dashboard.live import (  # noqa: E402
+    MeasurementFeed,
+    live_delta,
+    live_figure,
+    lttb,
+)
+from os_analysis_toolkit.dashboard.store import (  # noqa: E402
+    DashboardStore,
+    filter_query_to_where,
+    sort_by_to_sort,
+)
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """Data directory with a kernel structure of 40 syscalls"""
+    syscalls = [
+        {"name": f"do_call{i:02d}", "file": f"system/do_call{i:02d}.c", "line_count": i}
+        for i in range(40)
+    ]
+    (tmp_path / "kernel_structure.json").write_text(json.dumps({"system_calls": syscalls}))
+    (tmp_path / "statistics.json").write_text(json.dumps({"total_syscalls": 40}))
+    return tmp_path
+
+
+class TestDashboardStore:
+    """Test cases for DashboardStore"""
+
+    def test_render_memoized_per_version(self, data_dir):
+        """A tab is rebuilt only when one of its datasets changes"""
+        store = DashboardStore(str(data_dir))
+        builds = []
+
+        def build(data):
+            builds.append(data)
+            return data["statistics"]["total_syscalls"]
+
+        assert store.render("overview", build) == 40
+        assert store.render("overview", build) == 40
+        assert len(builds) == 1
+        assert set(builds[0]) == {"statistics"}
+
+        (data_dir / "statistics.json").write_text(json.dumps({"total_syscalls": 41}))
+        store.loader.reload()
+        assert store.render("overview", build) == 41
+        assert store.stats() == {"entries": 2, "hits": 1, "misses": 2}
+
+    def test_page_filters_sorts_and_counts(self, data_dir):
+        """Only the requested page of matching rows is returned"""
+        store = DashboardStore(str(data_dir))
+        page = store.page(
+            "syscalls",
+            page_current=1,
+            page_size=5,
+            sort_by=[{"column_id": "line_count", "direction": "desc"}],
+            filter_query="{line_count} >= 10",
+        )
+
+        assert page["total"] == 30
+        assert page["page_count"] == 6
+        assert [row["line_count"] for row in page["data"]] == [34, 33, 32, 31, 30]
+
+    def test_missing_data_renders_empty(self, tmp_path):
+        """A missing directory or dataset yields empty tabs and pages"""
+        store = DashboardStore(str(tmp_path / "absent"))
+        assert store.render("syscalls", lambda data: data) == {}
+        assert store.page("syscalls")["data"] == []
+
+    def test_filter_translation(self):
+        """DataTable filter and sort syntax maps onto query predicates"""
+        assert filter_query_to_where('{name} contains "fork" && {line_count} gt 3') == [
+            'name~"fork"', "line_count>3",
+        ]
+        assert sort_by_to_sort([{"column_id": "name", "direction": "asc"}]) == ["name"]
+        with pytest.raises(ValueError):
+            filter_query_to_where("{name} fuzzy x")
+
+
+def _write_boot(directory, index, total_ms):
+    directory.mkdir(parents=True, exist_ok=True)
+    record = {"timestamp": f"2025-11-01T10:00:{index:02d}", "total_time_ms": total_ms}
+    (directory / f"boot-{index:04d}.json").write_text(json.dumps(record))
+
+
+class TestLiveFeed:
+    """Test cases for the live measurement feed"""
+
+    def test_lttb_keeps_endpoints_and_peaks(self):
+        """Downsampling keeps first, last and an isolated spike"""
+        points = [{"x": i, "y": 100 if i == 500 else 0} for i in range(1000)]
+        sampled = lttb(points, 50)
+
+        assert len(sampled) == 50
+        assert sampled[0] is points[0] and sampled[-1] is points[-1]
+        assert any(p["y"] == 100 for p in sampled)
+        assert lttb(points[:10], 50) == points[:10]
+
+    def test_deltas_only_carry_new_points(self, tmp_path):
+        """After the initial figure, only new measurements are sent"""
+        i386 = tmp_path / "i386"
+        for i in range(3):
+            _write_boot(i386, i, 60 + i)
+        feed = MeasurementFeed(str(tmp_path), min_refresh=0)
+        feed.refresh()
+        figure, state = live_figure(feed, "boot/", "Boot")
+
+        assert [t["name"] for t in figure["data"]] == ["boot/i386"]
+        assert figure["data"][0]["y"] == [60, 61, 62]
+        assert live_delta(feed, state, "boot/")[0] == "none"
+
+        _write_boot(i386, 3, 70)
+        assert feed.refresh() == 1
+        kind, (extend, indices), state = live_delta(feed, state, "boot/")
+        assert kind == "extend"
+        assert extend["y"] == [[70]] and indices == [0]
+
+        # A new architecture needs a new trace, so the figure is resent
+        _write_boot(tmp_path / "arm", 0, 55)
+        feed.refresh()
+        kind, figure, state = live_delta(feed, state, "boot/")
+        assert kind == "reset"
+        assert state["series"] == ["boot/arm", "boot/i386"]
+        assert figure["layout"]["title"]["text"] == "Boot"
+
+    def test_reads_sqlite_store(self, tmp_path):
+        """Rows of the boot_measurements table are streamed incrementally"""
+        import sqlite3
+
+        database = tmp_path / "store.db"
+        connection = sqlite3.connect(database)
+        connection.execute(
+            "CREATE TABLE boot_measurements (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "timestamp TEXT, architecture TEXT, boot_time_ms REAL)"
+        )
+        connection.execute(
+            "INSERT INTO boot_measurements (timestamp, architecture, boot_time_ms) "
+            "VALUES ('2025-11-01T10:00:00', 'i386', 64.0)"
+        )
+        connection.commit()
+        feed = MeasurementFeed(database=str(database), min_refresh=0)
+        assert feed.refresh() == 1
+
+        connection.execute(
+            "INSERT INTO boot_measurements (timestamp, architecture, boot_time_ms) "
+            "VALUES ('2025-11-01T10:01:00', 'i386', 66.0)"
+        )
+        connection.commit()
+        connection.close()
+        assert feed.refresh() == 1
+        delta, _ = feed.since(1)
+        assert [r["y"] for r in delta["boot/i386"]] == [66.0]
+
+
+class TestStaticExport:
+    """Test cases for the static dashboard export"""
+
+    def test_export_writes_pages_and_table_chunks(self, data_dir, tmp_path):
+        """Every tab gets a page; paged tables are split into JSON chunks"""
+        out = tmp_path / "site"
+        result = export_static(str(data_dir), str(out))
+
+        assert result["skipped"] == []
+        assert (out / "index.html").exists() and (out / "syscalls.html").exists()
+        assert (out / "assets" / "plotly.min.js").exists()
+        pages = sorted((out / "tables" / "syscalls-table").glob("page-*.json"))
+        assert len(pages) == 3
+        assert len(json.loads(pages[-1].read_text())) == 10
+        assert 'data-pages="3"' in (out / "syscalls.html").read_text()
+
+    def test_export_is_incremental(self, data_dir, tmp_path):
+        """Only tabs whose datasets changed are rendered again"""
+        out = tmp_path / "site"
+        export_static(str(data_dir), str(out))
+        assert export_static(str(data_dir), str(out))["rendered"] == []
+
+        (data_dir / "statistics.json").write_text(json.dumps({"total_syscalls": 41}))
+        assert export_static(str(data_dir), str(out))["rendered"] == ["overview"]
+        assert len(export_static(str(data_dir), str(out), force=True)["skipped"]) == 0
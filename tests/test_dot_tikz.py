@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Test suite for the native DOT to TikZ renderer
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from analysis.generators.dot_tikz import (
+    DotTikzRenderer,
+    parse_layouts,
+    parse_spline,
+    tex_label,
+)
+from analysis.generators.tikz_converter import TikZConverter
+from shared.latex.preamble import uses_format
+
+# Trimmed `dot -Tjson` output for a two-node call graph inside a cluster
+LAYOUT = {
+    "name": "calls",
+    "directed": True,
+    "bb": "0,0,200,120",
+    "_subgraph_cnt": 1,
+    "objects": [
+        {"_gvid": 0, "name": "cluster_klib", "bb": "8,8,192,112", "label": "klib.S",
+         "lp": "100,100", "nodes": [1, 2]},
+        {"_gvid": 1, "name": "idt_init", "label": "idt_init\\n(protect.c:260)",
+         "pos": "50,60", "width": "1.2", "height": "0.5", "shape": "box",
+         "style": "filled", "fillcolor": "#52B788"},
+        {"_gvid": 2, "name": "int_gate", "label": "\\N", "pos": "150,60",
+         "width": "0.9", "height": "0.5"},
+    ],
+    "edges": [
+        {"_gvid": 0, "tail": 1, "head": 2, "label": "calls",
+         "pos": "e,125,60 80,60 95,60 105,60 115,60", "lp": "100,68"},
+    ],
+}
+
+# Stand-in for Graphviz: prints one layout per input file and logs each run;
+# like dot, a syntax error in any file fails the whole run
+FAKE_DOT = """#!{python}
+import json, sys
+layout = json.loads({layout!r})
+files = [a for a in sys.argv[1:] if not a.startswith("-")]
+with open({log!r}, "a") as log:
+    log.write(" ".join(files) + "\\n")
+for name in files:
+    if "syntax error" in open(name).read():
+        sys.exit("Error: " + name + ": syntax error in line 1")
+    print(json.dumps(dict(layout, name=name)))
+"""
+
+
+@pytest.fixture
+def fake_dot(tmp_path):
+    log = tmp_path / "dot.log"
+    bindir = tmp_path / "bin"
+    bindir.mkdir()
+    dot = bindir / "dot"
+    dot.write_text(FAKE_DOT.format(python=sys.executable, layout=json.dumps(LAYOUT), log=str(log)))
+    dot.chmod(0o755)
+    return bindir, log
+
+
+class TestDotTikz:
+    """Test cases for the DOT layout renderer"""
+
+    def test_labels_are_escaped_and_split(self):
+        """DOT escapes become TeX line breaks; TeX specials are escaped"""
+        assert tex_label("idt_init\\n(protect.c:260)") == r"idt\_init \\ (protect.c:260)"
+        assert tex_label("\\N", "a&b") == r"a\&b"
+        assert tex_label("left\\l") == "left"
+
+    def test_spline_and_concatenated_layouts(self):
+        """Edge splines keep arrow endpoints; several JSON documents are split"""
+        start, end, points = parse_spline("e,10,0 0,0 3,0 6,0 9,0")
+        assert start is None and end == (10.0, 0.0) and len(points) == 4
+        assert [l["n"] for l in parse_layouts('{"n": 1}\n{"n": 2}\n')] == [1, 2]
+
+    def test_render_emits_nodes_edges_and_clusters(self):
+        """Node positions, styles, colors and splines come from the layout"""
+        tikz = DotTikzRenderer().render(LAYOUT)
+
+        assert r"\definecolor{dotcolor0}{HTML}{52B788}" in tikz
+        assert r"\draw[dotcluster] (8.00bp,8.00bp) rectangle (192.00bp,112.00bp);" in tikz
+        assert ("\\node[dotnode, rectangle, draw=black, fill=dotcolor0, minimum width=1.200in, "
+                "minimum height=0.500in] (idt_init) at (50.00bp,60.00bp) "
+                "{idt\\_init \\\\ (protect.c:260)};") in tikz
+        assert "ellipse" in tikz and "{int\\_gate};" in tikz
+        assert ("\\draw[dotedge, ->] (80.00bp,60.00bp) .. controls (95.00bp,60.00bp) and "
+                "(105.00bp,60.00bp) .. (115.00bp,60.00bp) -- (125.00bp,60.00bp);") in tikz
+        assert tikz.startswith("\\definecolor") and tikz.endswith("\\end{tikzpicture}")
+
+    def test_batch_uses_one_graphviz_run(self, tmp_path, fake_dot):
+        """Converting several graphs lays them out in a single process"""
+        bindir, log = fake_dot
+        sources = []
+        for name in ("a", "b", "c"):
+            source = tmp_path / f"{name}.dot"
+            source.write_text("digraph { x -> y }")
+            sources.append(source)
+        outputs = [tmp_path / "tex" / f"{s.stem}.tex" for s in sources]
+
+        converter = TikZConverter(graphviz_dir=str(bindir))
+        assert converter.convert_many(sources, outputs) == [True, True, True]
+        assert len(log.read_text().splitlines()) == 1
+        assert all(uses_format(out.read_text()) for out in outputs)
+
+    def test_bad_file_fails_only_itself(self, tmp_path, fake_dot):
+        """A file that fails the batched run is retried alone; the others convert"""
+        bindir, log = fake_dot
+        sources = []
+        for name, text in (("a", "digraph { x }"), ("b", "digraph { syntax error"), ("c", "graph {}")):
+            source = tmp_path / f"{name}.dot"
+            source.write_text(text)
+            sources.append(source)
+        outputs = [tmp_path / "tex" / f"{s.stem}.tex" for s in sources]
+
+        converter = TikZConverter(graphviz_dir=str(bindir))
+        assert converter.convert_many(sources, outputs) == [True, False, True]
+        assert len(log.read_text().splitlines()) == 4
+        assert not outputs[1].exists() and outputs[2].exists()
+        assert "syntax error" in converter.renderer.errors[sources[1]]
+
+    def test_missing_graphviz_fails_cleanly(self, tmp_path):
+        """A missing layout program reports failure instead of raising"""
+        converter = TikZConverter(graphviz_dir=str(tmp_path))
+        source = tmp_path / "a.dot"
+        source.write_text("digraph {}")
+        assert converter.convert(source, tmp_path / "a.tex") is False
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test suite for ISA instruction extractor
+"""
+
+import sys
+import json
+import shutil
+import subprocess
+import pytest
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tools.isa_instruction_extractor import (
+    AsmPreprocessor,
+    I386InstructionExtractor,
+    ARMInstructionExtractor,
+    extract_parallel,
+)
+
+
+I386_SOURCE = """ENTRY(foo)
+\tmovl\t$1, %eax   # load
+\tpushl\t%ebp
+label:
+\tcall\tbar
+\tret
+"""
+
+ARM_SOURCE = """foo:
+\tbic r0, r0, #1   @ clear
+\tldreq r1, [r2]
+"""
+
+
+class TestInstructionExtractor:
+    """Test cases for the instruction extractors"""
+
+    @pytest.fixture
+    def sources(self, tmp_path):
+        """Write one i386 file, one ARM file and an empty file"""
+        (tmp_path / "a.S").write_text(I386_SOURCE)
+        (tmp_path / "b.S").write_text(ARM_SOURCE)
+        (tmp_path / "empty.S").write_text("")
+        return tmp_path
+
+    def test_i386_counters(self, sources):
+        """Mnemonics and categories are counted, not accumulated"""
+        extractor = I386InstructionExtractor()
+        extractor.extract_from_file(sources / "a.S")
+
+        assert extractor.instructions == {
+            "entry": 1, "movl": 1, "pushl": 1, "call": 1, "ret": 1,
+        }
+        assert extractor.categories["control"] == 2
+        assert extractor.addressing_modes["immediate"] == 1
+
+    def test_arm_known_prefix(self, sources):
+        """Known mnemonics are matched by prefix in category order"""
+        extractor = ARMInstructionExtractor()
+        extractor.extract_from_file(sources / "b.S")
+
+        assert extractor.instructions == {"bic": 1, "ldr": 1}
+        assert extractor.addressing_modes["conditional_eq"] == 1
+
+    def test_parallel_matches_serial(self, sources, tmp_path):
+        """Merged worker counters equal a serial run"""
+        files = [sources / "a.S", sources / "empty.S"]
+        serial = I386InstructionExtractor()
+        for path in files:
+            serial.extract_from_file(path)
+
+        merged = extract_parallel({"i386": files, "arm": [sources / "b.S"]}, jobs=2)
+
+        assert merged["i386"].instructions == serial.instructions
+        assert merged["i386"].categories == serial.categories
+        assert merged["i386"].files_processed == [str(p) for p in files]
+        assert sum(merged["arm"].instructions.values()) == 2
+
+        output = tmp_path / "i386.json"
+        merged["i386"].export_json(output)
+        data = json.loads(output.read_text())
+        assert data["categories"]["control"] == 2
+
+
+@pytest.mark.skipif(shutil.which("cc") is None, reason="C preprocessor not installed")
+class TestAsmPreprocessor:
+    """Test cases for macro-expanded extraction"""
+
+    @pytest.fixture
+    def minix_root(self, tmp_path):
+        """Minimal i386 arch tree with a macro header"""
+        arch_dir = tmp_path / "minix" / "kernel" / "arch" / "i386"
+        arch_dir.mkdir(parents=True)
+        (arch_dir / "sconst.h").write_text(
+            "#define SAVE movl %eax, %ebx; pushl %ecx; popl %edx\n")
+        (arch_dir / "mpx.S").write_text(
+            '#include "sconst.h"\n\tSAVE\n\tret\n')
+        return tmp_path
+
+    def test_macros_are_counted(self, minix_root, tmp_path):
+        """Instructions inside macro bodies are counted after expansion"""
+        source = minix_root / "minix" / "kernel" / "arch" / "i386" / "mpx.S"
+        preprocessor = AsmPreprocessor(minix_root, tmp_path / "cache")
+
+        raw = I386InstructionExtractor()
+        raw.extract_from_file(source)
+        expanded = I386InstructionExtractor()
+        expanded.extract_from_file(source, preprocessor)
+
+        assert "movl" not in raw.instructions
+        assert expanded.instructions == {"movl": 1, "pushl": 1, "popl": 1, "ret": 1}
+
+    def test_cache_invalidated_by_header(self, minix_root, tmp_path, monkeypatch):
+        """Unchanged inputs skip cpp; a header edit forces a re-run"""
+        arch_dir = minix_root / "minix" / "kernel" / "arch" / "i386"
+        preprocessor = AsmPreprocessor(minix_root, tmp_path / "cache")
+        first = preprocessor.expand(arch_dir / "mpx.S", "i386")
+
+        calls = []
+        real_run = subprocess.run
+
+        def counting_run(*args, **kwargs):
+            calls.append(args)
+            return real_run(*args, **kwargs)
+
+        monkeypatch.setattr(subprocess, "run", counting_run)
+        assert preprocessor.expand(arch_dir / "mpx.S", "i386") == first
+        assert calls == []
+
+        (arch_dir / "sconst.h").write_text("#define SAVE nop\n")
+        second = preprocessor.expand(arch_dir / "mpx.S", "i386")
+        assert len(calls) == 1
+        assert second != first
+        assert "nop" in second.read_text()
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Test suite for the cached, parallel LaTeX builder, PDF rasterizer and
+diagram target graph
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from shared.latex.build import LatexBuilder, dependencies, format_report
+from shared.latex.preamble import (
+    STYLES_DIR,
+    PrecompiledFormat,
+    standalone_document,
+    uses_format,
+)
+from shared.latex.raster import Rasterizer
+from shared.latex.targets import TargetGraph, depends_on
+
+# Stand-in for pdflatex: copies the source into <output-directory>/<stem>.pdf
+# and logs every invocation (``name@fmt`` when run against a format, ``ini``
+# for a format dump), failing on sources containing \fail
+FAKE_ENGINE = """#!{python}
+import sys
+from pathlib import Path
+
+args = sys.argv[1:]
+out = Path(next(a.split("=", 1)[1] for a in args if a.startswith("-output-directory=")))
+if "-ini" in args:
+    jobname = next(a.split("=", 1)[1] for a in args if a.startswith("-jobname="))
+    (out / (jobname + ".fmt")).write_text("format")
+    with open({log!r}, "a") as log:
+        log.write("ini\\n")
+    sys.exit(0)
+source = Path(args[-1])
+suffix = "@fmt" if any(a.startswith("-fmt=") for a in args) else ""
+with open({log!r}, "a") as log:
+    log.write(source.name + suffix + "\\n")
+text = source.read_text()
+if "\\\\fail" in text:
+    sys.exit(1)
+(out / (source.stem + ".pdf")).write_text(text)
+"""
+
+
+@pytest.fixture
+def project(tmp_path):
+    """Three diagrams, one of which uses a local style"""
+    styles = tmp_path / "styles"
+    styles.mkdir()
+    (styles / "minix-colors.sty").write_text("% colors v1\n")
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "a.tex").write_text("\\usepackage{tikz,minix-colors}\nA\n")
+    (src / "b.tex").write_text("\\input{parts/common}\nB\n")
+    (src / "parts").mkdir()
+    (src / "parts" / "common.tex").write_text("common\n")
+    (src / "c.tex").write_text("C % \\input{ignored}\n")
+
+    log = tmp_path / "engine.log"
+    engine = tmp_path / "fake-latex"
+    engine.write_text(FAKE_ENGINE.format(python=sys.executable, log=str(log)))
+    engine.chmod(0o755)
+    return {"root": tmp_path, "styles": styles, "src": src, "engine": str(engine), "log": log}
+
+
+def _builder(project, **kwargs):
+    return LatexBuilder(project["root"] / "pdf", search_paths=[project["styles"]],
+                        engine=project["engine"], workers=3, **kwargs)
+
+
+def _compiled(project):
+    log = project["log"]
+    names = sorted(log.read_text().split()) if log.exists() else []
+    log.write_text("")
+    return names
+
+
+class TestLatexBuilder:
+    """Test cases for LatexBuilder"""
+
+    def test_dependencies_are_local_and_recursive(self, project):
+        """Distribution packages and commented-out inputs are not dependencies"""
+        src = project["src"]
+        assert dependencies(src / "a.tex", [project["styles"]]) == [
+            (project["styles"] / "minix-colors.sty").resolve()
+        ]
+        assert dependencies(src / "b.tex") == [(src / "parts" / "common.tex").resolve()]
+        assert dependencies(src / "c.tex") == []
+
+    def test_only_changed_sources_recompile(self, project):
+        """A rebuild after touching one dependency compiles one source"""
+        sources = sorted(project["src"].glob("*.tex"))
+        results = _builder(project).build(sources)
+        assert all(r.ok and not r.cached for r in results)
+        assert [r.pdf.name for r in results] == ["a.pdf", "b.pdf", "c.pdf"]
+        assert _compiled(project) == ["a.tex", "b.tex", "c.tex"]
+
+        results = _builder(project).build(sources)
+        assert all(r.cached for r in results)
+        assert _compiled(project) == []
+
+        (project["styles"] / "minix-colors.sty").write_text("% colors v2\n")
+        _builder(project).build(sources)
+        assert _compiled(project) == ["a.tex"]
+
+        (project["src"] / "parts" / "common.tex").write_text("common v2\n")
+        _builder(project).build(sources)
+        assert _compiled(project) == ["b.tex"]
+
+    def test_extra_inputs_and_failures(self, project):
+        """Named inputs key every source; failures are reported and not cached"""
+        data = project["root"] / "data.json"
+        data.write_text("{}")
+        sources = sorted(project["src"].glob("*.tex"))
+        _builder(project, inputs=[data]).build(sources)
+        _compiled(project)
+
+        data.write_text('{"changed": true}')
+        (project["src"] / "c.tex").write_text("\\fail\n")
+        results = _builder(project, inputs=[data]).build(sources)
+        assert _compiled(project) == ["a.tex", "b.tex", "c.tex"]
+        assert [r.ok for r in results] == [True, True, False]
+        assert "1 failed" in format_report(results)
+
+        _builder(project, inputs=[data]).build(sources)
+        assert _compiled(project) == ["c.tex"]
+
+    def test_relative_source_in_subdirectory(self, project, monkeypatch):
+        """A relative path is not looked up again from the source's directory"""
+        monkeypatch.chdir(project["root"])
+        (result,) = _builder(project).build([Path("src") / "c.tex"])
+        assert result.ok, result.log
+        assert _compiled(project) == ["c.tex"]
+
+    def test_colliding_outputs_rejected(self, project):
+        """Two sources with the same stem cannot share an output directory"""
+        other = project["root"] / "other"
+        other.mkdir()
+        (other / "a.tex").write_text("A2\n")
+        with pytest.raises(ValueError):
+            _builder(project).build([project["src"] / "a.tex", other / "a.tex"])
+
+
+class TestPrecompiledFormat:
+    """Test cases for the shared-preamble format"""
+
+    def test_shared_preamble_sources_use_format(self, project):
+        """Only sources on the shared preamble get -fmt; the format is dumped once"""
+        shared = project["src"] / "d.tex"
+        shared.write_text(standalone_document("\\begin{tikzpicture}\\end{tikzpicture}", border="10pt"))
+        assert uses_format(shared.read_text())
+        sources = sorted(project["src"].glob("*.tex"))
+
+        _builder(project, precompile=True).build(sources)
+        assert _compiled(project) == ["a.tex", "b.tex", "c.tex", "d.tex@fmt", "ini"]
+
+        shared.write_text(shared.read_text() + "% edited\n")
+        _builder(project, precompile=True).build(sources)
+        assert _compiled(project) == ["d.tex@fmt"]
+
+    def test_format_and_compiles_share_styles(self, project):
+        """The format is dumped from the minix-styles that full compiles find"""
+        builder = _builder(project, precompile=True)
+        assert builder.format.styles_dir == STYLES_DIR
+        assert builder.search_paths == [project["styles"].resolve(), STYLES_DIR]
+        assert (STYLES_DIR / "minix-styles.sty").exists()
+
+        (project["styles"] / "minix-styles.sty").write_text("% styles v3\n")
+        builder = _builder(project, precompile=True)
+        assert builder.format.styles_dir == project["styles"].resolve()
+        assert builder.search_paths == [project["styles"].resolve()]
+
+    def test_format_rebuilds_when_styles_change(self, project):
+        """The format is dumped again only when the style files change"""
+        fmt = PrecompiledFormat(project["root"] / "fmt", engine=project["engine"],
+                                styles_dir=project["styles"])
+        assert fmt.ensure() and fmt.ensure()
+        assert _compiled(project) == ["ini"]
+
+        (project["styles"] / "minix-colors.sty").write_text("% colors v3\n")
+        assert not fmt.current()
+        assert fmt.ensure()
+        assert _compiled(project) == ["ini"]
+        assert fmt.flags() == ["-fmt=minix-diagrams"]
+
+
+# Stand-in for Ghostscript: writes "<pdf text>:<page>:<dpi>" for every page
+# of -sPageList and logs one line per invocation with the pages it rendered
+FAKE_GS = """#!{python}
+import sys
+
+args = sys.argv[1:]
+option = lambda prefix: next(a[len(prefix):] for a in args if a.startswith(prefix))
+pages = option("-sPageList=").split(",")
+text = open(args[-1]).read()
+for number, page in enumerate(pages, 1):
+    with open(option("-sOutputFile=").replace("%d", str(number)), "w") as png:
+        png.write(text + ":" + page + ":" + option("-r"))
+with open({log!r}, "a") as log:
+    log.write(",".join(pages) + "\\n")
+"""
+
+
+class TestRasterizer:
+    """Test cases for the batch rasterizer"""
+
+    @pytest.fixture
+    def gs(self, tmp_path):
+        log = tmp_path / "gs.log"
+        renderer = tmp_path / "fake-gs"
+        renderer.write_text(FAKE_GS.format(python=sys.executable, log=str(log)))
+        renderer.chmod(0o755)
+        return str(renderer), log
+
+    def _runs(self, log):
+        runs = log.read_text().split() if log.exists() else []
+        log.write_text("")
+        return sorted(runs)
+
+    def test_pages_batched_per_process_and_cached(self, tmp_path, gs):
+        """Each renderer run covers several pages; unchanged pages are skipped"""
+        renderer, log = gs
+        pdf = tmp_path / "master.pdf"
+        pdf.write_text("v1")
+        out = tmp_path / "png"
+        requests = [(pdf, page, out / f"fig-{page}.png") for page in (18, 29, 32, 42)]
+
+        results = Rasterizer(workers=2, renderer=renderer, optimizer=None).rasterize(requests)
+        assert all(r.ok and not r.cached for r in results)
+        assert self._runs(log) == ["18,29", "32,42"]
+        assert (out / "fig-32.png").read_text() == "v1:32:300"
+
+        results = Rasterizer(workers=2, renderer=renderer, optimizer=None).rasterize(requests)
+        assert all(r.cached for r in results)
+        assert self._runs(log) == []
+
+        (out / "fig-29.png").unlink()
+        Rasterizer(workers=2, renderer=renderer, optimizer=None).rasterize(requests)
+        assert self._runs(log) == ["29"]
+
+        # New PDF content or resolution invalidates every page
+        Rasterizer(dpi=150, workers=1, renderer=renderer, optimizer=None).rasterize(requests)
+        assert self._runs(log) == ["18,29,32,42"]
+        assert (out / "fig-18.png").read_text() == "v1:18:150"
+
+    def test_missing_pages_fail(self, tmp_path, gs):
+        """Pages the renderer did not produce are reported, not cached"""
+        renderer, _ = gs
+        results = Rasterizer(renderer=renderer, optimizer=None).rasterize(
+            [(tmp_path / "absent.pdf", 1, tmp_path / "absent.png")]
+        )
+        assert not results[0].ok and "not found" in results[0].log
+
+
+class TestTargetGraph:
+    """Test cases for dependency-tracked diagram regeneration"""
+
+    @pytest.fixture
+    def figures(self):
+        calls = []
+
+        @depends_on("stats")
+        def summary():
+            calls.append("summary")
+            return "total %d" % datasets["stats"]["total"]
+
+        @depends_on("procs")
+        def states():
+            calls.append("states")
+            return ",".join(datasets["procs"])
+
+        def everything():
+            calls.append("everything")
+            return "all"
+
+        datasets = {"stats": {"total": 1}, "procs": ["READY"]}
+        return datasets, [summary, states, everything], calls
+
+    def _run(self, tmp_path, datasets, generators, **kwargs):
+        graph = TargetGraph(datasets, workers=3)
+        for generate in generators:
+            graph.add(tmp_path / f"{generate.__name__}.tex", generate)
+        return graph.run(**kwargs)
+
+    def test_only_affected_targets_regenerate(self, tmp_path, figures):
+        """Changing one dataset regenerates the figures declaring it"""
+        datasets, generators, calls = figures
+        results = self._run(tmp_path, datasets, generators)
+        assert all(r.generated and r.changed for r in results)
+        assert sorted(calls) == ["everything", "states", "summary"]
+        assert (tmp_path / "summary.tex").read_text() == "total 1"
+
+        calls.clear()
+        assert not any(r.generated for r in self._run(tmp_path, datasets, generators))
+        assert calls == []
+
+        datasets["stats"]["total"] = 2
+        self._run(tmp_path, datasets, generators)
+        # Undeclared generators depend on every dataset
+        assert sorted(calls) == ["everything", "summary"]
+        assert (tmp_path / "summary.tex").read_text() == "total 2"
+
+        calls.clear()
+        (tmp_path / "states.tex").unlink()
+        self._run(tmp_path, datasets, generators)
+        assert calls == ["states"]
+
+    def test_failures_and_unchanged_content(self, tmp_path, figures):
+        """Failed targets are retried; identical output leaves the file alone"""
+        datasets, generators, calls = figures
+        self._run(tmp_path, datasets, generators)
+        before = (tmp_path / "everything.tex").stat().st_mtime_ns
+
+        @depends_on("stats")
+        def broken():
+            raise KeyError("total")
+
+        results = self._run(tmp_path, datasets, [broken], force=True)
+        assert not results[0].ok and "KeyError" in results[0].error
+        assert not self._run(tmp_path, datasets, [broken])[0].ok
+
+        results = self._run(tmp_path, datasets, generators, force=True)
+        assert all(r.generated and not r.changed for r in results)
+        assert (tmp_path / "everything.tex").stat().st_mtime_ns == before
+
+        with pytest.raises(ValueError):
+            TargetGraph(datasets).add(tmp_path / "x.tex", depends_on("missing")(lambda: ""))
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test suite for the golden installed-disk cache and qcow2 overlays
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from shared.qemu.images import GoldenImageCache, ImageError, overlay
+
+# Stand-in for qemu-img: ``create`` writes the image's format, backing file
+# and size as JSON
+FAKE_QEMU_IMG = """#!{python}
+import json, sys
+
+args = sys.argv[2:]
+backing = args[args.index("-b") + 1] if "-b" in args else None
+positional = [a for i, a in enumerate(args)
+              if not a.startswith("-") and (i == 0 or args[i - 1] not in ("-f", "-F", "-b"))]
+with open(positional[0], "w") as image:
+    json.dump({{"backing": backing, "size": positional[1] if len(positional) > 1 else None}}, image)
+"""
+
+
+@pytest.fixture
+def cache(tmp_path):
+    tool = tmp_path / "qemu-img"
+    tool.write_text(FAKE_QEMU_IMG.format(python=sys.executable))
+    tool.chmod(0o755)
+    iso = tmp_path / "minix.iso"
+    iso.write_bytes(b"iso v1")
+    return GoldenImageCache(tmp_path / "images", qemu_img=str(tool)), iso
+
+
+class TestGoldenImageCache:
+    """Test cases for GoldenImageCache"""
+
+    def test_installs_once_per_iso_and_version(self, cache):
+        """The installer runs on a blank disk only when the key changes"""
+        images, iso = cache
+        installs = []
+
+        def install(disk):
+            installs.append(json.loads(disk.read_text()))
+            return True
+
+        golden = images.golden(iso, install, version="v1")
+        assert images.golden(iso, install, version="v1") == golden
+        assert installs == [{"backing": None, "size": "2G"}]
+        assert not golden.stat().st_mode & 0o222
+        assert json.loads(golden.with_suffix(".json").read_text())["installer_version"] == "v1"
+
+        assert images.golden(iso, install, version="v2") != golden
+        iso.write_bytes(b"iso v2")
+        images.golden(iso, install, version="v1")
+        assert len(installs) == 3
+
+    def test_failed_install_is_not_cached(self, cache):
+        """A failed installation raises and leaves nothing behind"""
+        images, iso = cache
+        with pytest.raises(ImageError):
+            images.golden(iso, lambda disk: False, version="v1")
+        assert not list(images.cache_dir.glob("*.qcow2"))
+        assert not list(images.cache_dir.glob(".*.qcow2"))
+
+    def test_overlays_are_backed_and_discarded(self, cache, tmp_path):
+        """Each boot gets its own overlay, removed afterwards"""
+        images, iso = cache
+        golden = images.golden(iso, lambda disk: True, version="v1")
+        with images.overlay(golden, tmp_path / "runs") as first, \
+                images.overlay(golden, tmp_path / "runs") as second:
+            assert first != second
+            assert json.loads(first.read_text())["backing"] == str(golden.resolve())
+        assert not first.exists() and not second.exists()
+
+        with pytest.raises(ImageError):
+            with overlay(golden, tmp_path, qemu_img=str(tmp_path / "missing")):
+                pass
+        assert not list(tmp_path.glob("boot-*.qcow2"))
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test suite for adaptive boot sample counts
+"""
+
+import itertools
+import math
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from shared.qemu.sampling import (
+    SamplingPolicy,
+    median_interval,
+    resolve_policy,
+    sample_matrix,
+    sample_until,
+    split_outliers,
+    t_quantile,
+)
+from shared.qemu.scheduler import BootJob, MatrixScheduler
+
+
+class TestStatistics:
+    """Test cases for the interval and outlier helpers"""
+
+    @pytest.mark.parametrize("df, expected", [(2, 4.303), (4, 2.776), (10, 2.228), (30, 2.042)])
+    def test_t_quantile(self, df, expected):
+        assert t_quantile(0.975, df) == pytest.approx(expected, rel=0.01)
+
+    def test_split_outliers(self):
+        """A stalled boot is dropped; identical samples are all kept"""
+        kept, outliers = split_outliers([100, 101, 99, 100, 102, 500])
+        assert outliers == [500] and len(kept) == 5
+        assert split_outliers([7, 7, 7, 9]) == ([7, 7, 7, 9], [])
+
+    def test_median_interval_needs_six_samples_at_95(self):
+        assert math.isinf(median_interval([1, 2, 3, 4, 5], 0.95)[2])
+        assert median_interval([6, 1, 5, 2, 4, 3], 0.95) == (3.5, 1, 6)
+
+
+class TestSamplingPolicy:
+    """Test cases for sequential sampling"""
+
+    def test_stable_measurement_stops_at_minimum(self):
+        values = itertools.cycle([100.0, 101.0, 99.0])
+        summary = sample_until(lambda: next(values), SamplingPolicy())
+        assert len(summary.samples) == 3 and summary.converged
+
+    def test_noisy_measurement_samples_up_to_budget(self):
+        values = itertools.cycle([60.0, 140.0, 90.0, 120.0])
+        summary = sample_until(lambda: next(values), SamplingPolicy(max_samples=12))
+        assert len(summary.samples) == 12 and not summary.converged
+        assert summary.as_dict()["count"] == 12
+
+    def test_outliers_do_not_prevent_convergence(self):
+        values = iter([100.0, 101.0, 99.0, 100.0, 100.5, 900.0, 99.5, 100.0, 101.0, 99.0])
+        summary = sample_until(lambda: next(values), SamplingPolicy(min_samples=6))
+        assert summary.converged
+        assert summary.outliers == [900.0]
+        assert summary.center == pytest.approx(100.0, abs=0.5)
+
+    def test_fixed_and_median(self):
+        values = itertools.cycle([60.0, 140.0])
+        assert len(sample_until(lambda: next(values), resolve_policy(samples=4)).samples) == 4
+        with pytest.raises(ValueError):
+            SamplingPolicy(statistic="mode")
+        values = itertools.cycle([100.0, 101.0, 99.0])
+        summary = sample_until(lambda: next(values), SamplingPolicy(statistic="median", rel_width=0.05))
+        # The order-statistic interval needs six samples at 95%
+        assert len(summary.samples) == 6 and summary.converged
+
+
+class TestSampleMatrix:
+    """Test cases for adaptive boot matrices"""
+
+    def test_only_noisy_configurations_get_more_boots(self):
+        draws = {"stable": itertools.cycle([50.0, 50.5, 49.5]),
+                 "noisy": itertools.cycle([30.0, 80.0, 45.0, 70.0]),
+                 "broken": itertools.repeat(None)}
+        matrix = sample_matrix(
+            list(draws),
+            lambda key: BootJob(key, lambda placement: next(draws[key])),
+            SamplingPolicy(max_samples=9),
+            MatrixScheduler(cores=range(4), reserve_cores=0, memory_mb=1 << 20, pin=False),
+        )
+        assert len(matrix["stable"].runs) == 3 and matrix["stable"].summary.converged
+        assert len(matrix["noisy"].runs) == 9 and not matrix["noisy"].summary.converged
+        # Failed boots are not measurements, and are not retried forever
+        assert len(matrix["broken"].runs) == 3 and matrix["broken"].summary is None
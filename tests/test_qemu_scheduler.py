@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test suite for the concurrent boot matrix scheduler
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from shared.qemu.scheduler import BootJob, MatrixScheduler, Placement, cpu_list, group_results
+
+
+class Recorder:
+    """Fake boots that record which cores were in use at the same time"""
+
+    def __init__(self, seconds=0.05):
+        self.seconds = seconds
+        self.lock = threading.Lock()
+        self.running = []
+        self.overlaps = []
+        self.peak = 0
+
+    def boot(self, key, placement):
+        with self.lock:
+            for other in self.running:
+                self.overlaps.append(set(other.cores) & set(placement.cores))
+            self.running.append(placement)
+            self.peak = max(self.peak, len(self.running))
+        time.sleep(self.seconds)
+        with self.lock:
+            self.running.remove(placement)
+        return key
+
+
+def jobs_for(recorder, vcpus, memory_mb=512):
+    return [BootJob(i, lambda p, i=i: recorder.boot(i, p), vcpus=v, memory_mb=memory_mb)
+            for i, v in enumerate(vcpus)]
+
+
+class TestMatrixScheduler:
+    """Test cases for MatrixScheduler"""
+
+    def test_concurrent_boots_get_disjoint_cores(self):
+        """Boots overlap in time but never share a core; results keep job order"""
+        recorder = Recorder()
+        scheduler = MatrixScheduler(cores=range(8), reserve_cores=0, memory_mb=1 << 20, pin=False)
+        results = scheduler.run(jobs_for(recorder, [1, 2, 1, 4, 1, 2]))
+
+        assert [r.value for r in results] == list(range(6))
+        assert recorder.peak > 1
+        assert not any(recorder.overlaps)
+        assert [len(r.placement.cores) for r in results] == [2, 3, 2, 5, 2, 3]
+
+    def test_memory_budget_limits_concurrency(self):
+        """Admission stops at the memory budget; an oversized job still runs, alone"""
+        recorder = Recorder()
+        scheduler = MatrixScheduler(cores=range(16), reserve_cores=0, memory_mb=1300, pin=False)
+        scheduler.run(jobs_for(recorder, [1] * 6))
+        assert recorder.peak == 2
+
+        recorder = Recorder(seconds=0.01)
+        tight = MatrixScheduler(cores=range(16), reserve_cores=0, memory_mb=100, pin=False)
+        assert [r.value for r in tight.run(jobs_for(recorder, [1, 1]))] == [0, 1]
+        assert recorder.peak == 1
+
+    def test_vms_larger_than_host_are_clamped(self):
+        """A VM asking for more cores than exist gets all of them"""
+        scheduler = MatrixScheduler(cores=[0, 1], reserve_cores=0, memory_mb=4096, pin=False)
+        (result,) = scheduler.run([BootJob("big", lambda p: p.cores, vcpus=8)])
+        assert result.value == (0, 1)
+
+    def test_first_error_is_raised_after_all_jobs_stop(self):
+        """A failing boot does not abandon the others"""
+        finished = []
+
+        def boot(i, placement):
+            if i == 1:
+                raise RuntimeError("qemu crashed")
+            time.sleep(0.02)
+            finished.append(i)
+
+        scheduler = MatrixScheduler(cores=range(4), reserve_cores=0, memory_mb=4096, pin=False)
+        with pytest.raises(RuntimeError, match="qemu crashed"):
+            scheduler.run([BootJob(i, lambda p, i=i: boot(i, p)) for i in range(4)])
+        assert sorted(finished) == [0, 2, 3]
+
+    def test_progress_and_grouping(self):
+        """on_done sees every completion; results group by key in order"""
+        seen = []
+        scheduler = MatrixScheduler(cores=range(4), reserve_cores=0, memory_mb=4096, pin=False)
+        jobs = [BootJob(("486", n), lambda p, s=s: s, vcpus=n) for n in (1, 2) for s in range(3)]
+        results = scheduler.run(jobs, on_done=lambda r, done, total: seen.append((done, total)))
+
+        assert sorted(seen) == [(n, 6) for n in range(1, 7)]
+        grouped = group_results(results)
+        assert list(grouped) == [("486", 1), ("486", 2)]
+        assert [r.value for r in grouped[("486", 2)]] == [0, 1, 2]
+
+
+class TestPlacement:
+    """Test cases for Placement"""
+
+    def test_cpu_list(self):
+        assert cpu_list([3, 0, 1, 2, 6]) == "0-3,6"
+        assert cpu_list([5]) == "5"
+
+    def test_wrap_pins_only_when_enabled(self):
+        cmd = ["qemu-system-i386", "-smp", "2"]
+        assert Placement((2, 3, 4), 640, 1, pinned=True).wrap(cmd) == ["taskset", "-c", "2-4", *cmd]
+        assert Placement((2, 3, 4), 640, 1, pinned=False).wrap(cmd) == cmd
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Test suite for timestamped serial capture and boot-phase timing
+"""
+
+import importlib.util
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from shared.qemu.serial import (
+    SerialCapture,
+    SerialLine,
+    marker_times,
+    median_phases,
+    phase_durations,
+    read_trace,
+    trace_path_for,
+)
+
+# Stand-in for qemu-system-i386: connects to the -serial unix: socket and
+# prints a short boot with pauses between lines
+FAKE_QEMU = """#!{python}
+import socket, sys, time
+
+args = sys.argv[1:]
+path = args[args.index("-serial") + 1][len("unix:"):]
+conn = socket.socket(socket.AF_UNIX)
+conn.connect(path)
+for text, pause in [(b"MINIX 3 booting\\r\\n", 0.2), (b"Scheduler ready\\n", 0.2), (b"login:", 0)]:
+    conn.sendall(text)
+    time.sleep(pause)
+conn.close()
+"""
+
+
+@pytest.fixture
+def fake_qemu(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    tool = bin_dir / "qemu-system-i386"
+    tool.write_text(FAKE_QEMU.format(python=sys.executable))
+    tool.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    return tool
+
+
+class TestSerialCapture:
+    """Test cases for SerialCapture"""
+
+    def test_socket_capture_stamps_lines_on_arrival(self, fake_qemu, tmp_path):
+        """Lines carry arrival times; log and trace round-trip"""
+        log = tmp_path / "boot.log"
+        capture = SerialCapture(log)
+        subprocess.run([str(fake_qemu), *capture.listen()], check=True)
+        lines = capture.stop()
+
+        assert [line.text for line in lines] == ["MINIX 3 booting", "Scheduler ready", "login:"]
+        assert lines[1].ns - lines[0].ns >= 150_000_000
+        assert lines[2].ns - lines[1].ns >= 150_000_000
+        assert log.read_bytes() == b"MINIX 3 booting\r\nScheduler ready\nlogin:"
+        assert trace_path_for(log).stat().st_size == 14 + 16 * 3
+        assert read_trace(log) == lines
+
+    def test_pipe_capture(self, tmp_path):
+        """-serial stdio output is captured from the process's pipe"""
+        proc = subprocess.Popen(
+            [sys.executable, "-c", "print('a'); print('b', flush=True)"],
+            stdout=subprocess.PIPE,
+        )
+        capture = SerialCapture(tmp_path / "serial.txt").attach(proc.stdout)
+        proc.wait()
+        assert [line.text for line in capture.stop()] == ["a", "b"]
+        assert [line.offset for line in read_trace(tmp_path / "serial.txt")] == [0, 2]
+
+    def test_qemu_that_never_connects(self, tmp_path):
+        """Stopping without a connection leaves an empty log and trace"""
+        capture = SerialCapture(tmp_path / "boot.log")
+        capture.listen()
+        assert capture.stop() == []
+        assert read_trace(tmp_path / "boot.log") == []
+
+
+class TestPhaseTiming:
+    """Test cases for marker and phase timing"""
+
+    LINES = [
+        SerialLine(0, 10_000_000, "Booting MINIX"),
+        SerialLine(14, 250_000_000, "memory init"),
+        SerialLine(26, 900_000_000, "login:"),
+    ]
+
+    def test_markers_and_phases(self):
+        markers = marker_times(self.LINES, {
+            "kernel": (r"minix", "Kernel"),
+            "memory": r"Memory",
+            "login": r"login:",
+            "never": r"panic",
+        })
+        assert markers == {"kernel": 0.01, "memory": 0.25, "login": 0.9}
+        assert phase_durations(markers) == pytest.approx({"kernel": 0.24, "memory": 0.65})
+        assert phase_durations(markers, end=1.0)["login"] == pytest.approx(0.1)
+
+    def test_median_phases(self):
+        assert median_phases([{"a": 1.0, "b": 4.0}, {"a": 3.0}, {"a": 2.0, "b": 6.0}]) == {"a": 2.0, "b": 5.0}
+
+
+def test_boot_profiler_times_markers_from_capture(fake_qemu, tmp_path):
+    """QemuBootProfiler reports measured marker times, not line-count estimates"""
+    spec = importlib.util.spec_from_file_location(
+        "qemu_boot_profiler", Path(__file__).parent.parent / "phase-7-5-qemu-boot-profiler.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    profiler = module.QemuBootProfiler(str(tmp_path / "minix.iso"), str(tmp_path / "out"))
+    measurement = profiler.measure_boot_sample(tmp_path / "disk.qcow2", cpus=1)
+
+    markers = measurement["markers"]
+    assert markers["scheduler_ready"] - markers["kernel_starts"] >= 0.15
+    assert markers["shell_prompt"] - markers["scheduler_ready"] >= 0.15
+    assert measurement["phases"]["kernel_starts"] >= 0.15
+    (log,) = (tmp_path / "out").glob("boot-*.log")
+    assert profiler._parse_boot_markers(log) == markers
+
+
+# Stand-in for strace: leaves a child (QEMU) holding the serial pipe and
+# never exits on its own
+FAKE_STRACE = """#!/bin/sh
+sleep 60 &
+echo $! > {pid_file}
+sleep 60
+"""
+
+
+def test_granular_profiler_timeout_kills_qemu(tmp_path, monkeypatch):
+    """A boot timeout kills the whole process group, not just strace"""
+    spec = importlib.util.spec_from_file_location(
+        "boot_profiler_granular",
+        Path(__file__).parent.parent / "measurements" / "phase-7-5-boot-profiler-granular.py",
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    pid_file = tmp_path / "qemu.pid"
+    strace = bin_dir / "strace"
+    strace.write_text(FAKE_STRACE.format(pid_file=pid_file))
+    strace.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "minix.iso").touch()
+
+    profiler = module.MinixBootProfilerGranular(str(tmp_path / "minix.iso"))
+    start = time.monotonic()
+    metrics = profiler.boot_minix_with_metrics("486", 1, timeout=1)
+    # The serial pipe closed with QEMU, so capture did not wait out its join
+    assert time.monotonic() - start < 4
+    assert "error" not in metrics
+
+    qemu_pid = int(pid_file.read_text())
+    deadline = time.monotonic() + 2
+    while time.monotonic() < deadline:
+        try:
+            os.kill(qemu_pid, 0)
+        except ProcessLookupError:
+            break
+        time.sleep(0.05)
+    else:
+        pytest.fail("QEMU outlived the timed-out boot")
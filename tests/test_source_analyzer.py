@@ -5,13 +5,15 @@ Test suite for MINIX source analyzer
 
 import sys
 import json
+import shutil
+import subprocess
 import pytest
 from pathlib import Path
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from tools.minix_source_analyzer import MinixAnalyzer
+from tools.minix_source_analyzer import MinixAnalyzer, RevisionSweep
 
 
 class TestMinixAnalyzer:
@@ -122,5 +124,67 @@ class TestMinixAnalyzer:
                 assert isinstance(data, dict)
 
 
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+class TestRevisionSweep:
+    """Test cases for the git revision sweep"""
+
+    @staticmethod
+    def _commit(repo, files, message):
+        for rel, text in files.items():
+            path = repo / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(text)
+        subprocess.run(["git", "-C", str(repo), "add", "-A"], check=True)
+        subprocess.run(
+            ["git", "-C", str(repo), "-c", "user.name=t", "-c", "user.email=t@t",
+             "commit", "-qm", message],
+            check=True,
+        )
+
+    @pytest.fixture
+    def repo(self, tmp_path):
+        """Create a two-revision MINIX-shaped git repository"""
+        repo = tmp_path / "minix"
+        repo.mkdir()
+        subprocess.run(["git", "init", "-q", str(repo)], check=True)
+        self._commit(repo, {
+            "minix/kernel/proc.h": "#define NR_PROCS 256\n"
+                                   "#define RTS_SLOT_FREE 0x01 /* free */\n",
+            "minix/kernel/system/do_fork.c": "int do_fork(void)\n{\n  if (x) y();\n}\n",
+            "minix/servers/pm/main.c": "int main(void) {}\n",
+        }, "first")
+        self._commit(repo, {
+            "minix/kernel/system/do_exec.c": "int do_exec(void)\n{\n}\n",
+            "minix/drivers/tty/tty.c": "int tty(void) {}\n",
+        }, "second")
+        return repo
+
+    def test_time_series(self, repo):
+        """Each metric is reported as one value per revision"""
+        sweep = RevisionSweep(repo, jobs=1)
+        result = sweep.run(sweep.expand_revisions(["HEAD~1", "HEAD"]))
+
+        assert len(result["revisions"]) == 2
+        assert result["series"]["total_syscalls"] == [1, 2]
+        assert result["series"]["kernel_files"] == [1, 2]
+        assert result["series"]["max_processes"] == [256, 256]
+        assert result["series"]["process_states"] == [1, 1]
+        assert result["series"]["driver_count"] == [0, 1]
+        assert result["series"]["server_count"] == [1, 1]
+        assert result["series"]["syscall_complexity"] == [1, 1]
+
+    def test_blob_dedup_and_cache(self, repo, tmp_path):
+        """Unchanged blobs are parsed once and reused from the cache file"""
+        cache = tmp_path / "blobs.json"
+        sweep = RevisionSweep(repo, jobs=2, cache_file=cache)
+        result = sweep.run(["HEAD~1", "HEAD"])
+        # proc.h, do_fork.c and do_exec.c are the only unique kernel blobs
+        assert result["blobs"] == {"unique": 3, "parsed": 3}
+
+        again = RevisionSweep(repo, jobs=1, cache_file=cache).run(["HEAD"])
+        assert again["blobs"]["parsed"] == 0
+        assert again["series"] == {k: v[-1:] for k, v in result["series"].items()}
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test suite for MINIX system call analyzer
+"""
+
+import sys
+import pytest
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tools.analyze_syscalls import MinixSyscallAnalyzer
+
+
+COM_H = """
+#define SYS_FORK       (KERNEL_CALL + 0)    /* sys_fork() */
+#define SYS_EXEC       (KERNEL_CALL + 1)    /* sys_exec() */
+#define SYS_SETALARM   (KERNEL_CALL + 24)   /* sys_setalarm() */
+#define SYS_SETGRANT   (KERNEL_CALL + 34)   /* sys_setgrant() */
+"""
+
+DO_FORK = """/* The kernel call implemented in this file: m_type: SYS_FORK */
+#include "kernel/system.h"
+
+int do_fork(struct proc * caller, message * m_ptr)
+{
+  if (m_ptr->m_lsys_krn_sys_fork.endpt == NONE)
+      return EINVAL;
+  for (i = 0; i < 4; i++)
+      m_ptr->m_krn_lsys_sys_fork.endpt = i;
+  return OK;
+}
+"""
+
+DO_SET = """int do_set(struct proc * caller, message * m_ptr)
+{
+  return OK;
+}
+"""
+
+
+class TestMinixSyscallAnalyzer:
+    """Test cases for MinixSyscallAnalyzer class"""
+
+    @pytest.fixture
+    def analyzer(self, tmp_path):
+        """Create analyzer over a minimal MINIX tree"""
+        include_dir = tmp_path / "minix" / "include" / "minix"
+        system_dir = tmp_path / "minix" / "kernel" / "system"
+        include_dir.mkdir(parents=True)
+        system_dir.mkdir(parents=True)
+        (include_dir / "com.h").write_text(COM_H)
+        (system_dir / "do_fork.c").write_text(DO_FORK)
+        (system_dir / "do_set.c").write_text(DO_SET)
+        (system_dir / "do_unknown.c").write_text(DO_SET)
+
+        analyzer = MinixSyscallAnalyzer(tmp_path)
+        analyzer.extract_syscall_definitions()
+        return analyzer
+
+    def test_prefix_index_resolves_first_definition(self, analyzer):
+        """Prefix lookups follow com.h definition order"""
+        index = analyzer._build_prefix_index()
+        assert index["SYS_FORK"] == "SYS_FORK"
+        assert index["SYS_SET"] == "SYS_SETALARM"
+        assert index["SYS_SETG"] == "SYS_SETGRANT"
+        assert "SYS_UNKNOWN" not in index
+
+    def test_single_pass_metrics(self, analyzer):
+        """find_implementations fills every metric without a second read"""
+        analyzer.find_implementations()
+
+        fork = analyzer.syscalls["SYS_FORK"]
+        assert fork["implementation"].endswith("do_fork.c")
+        assert fork["lines"] == len(DO_FORK.split("\n"))
+        assert fork["complexity"] == 2
+        assert fork["parameters"] == "struct proc * caller, message * m_ptr"
+        assert fork["message_fields"] == [
+            "krn_lsys_sys_fork",
+            "lsys_krn_sys_fork",
+        ]
+
+        assert analyzer.syscalls["SYS_SETALARM"]["implementation"].endswith("do_set.c")
+        assert analyzer.syscalls["SYS_EXEC"]["implementation"] is None
+        assert len(analyzer.implementations) == 2
+
+    def test_extract_parameters_uses_cache(self, analyzer, monkeypatch):
+        """extract_function_parameters never reopens implementation files"""
+        analyzer.find_implementations()
+
+        def fail_open(*args, **kwargs):
+            raise AssertionError("implementation file re-read")
+
+        monkeypatch.setattr("builtins.open", fail_open)
+        analyzer.extract_function_parameters()
+        assert "parameters" in analyzer.syscalls["SYS_FORK"]
@@ -133,6 +133,27 @@ class TestTikZGenerator:
                 assert r"\begin{document}" in content
                 assert r"\end{document}" in content
 
+    def test_rerun_touches_only_affected_diagrams(self, tmp_path):
+        """A changed dataset regenerates only the diagrams that read it"""
+        data_dir = tmp_path / "data"
+        data_dir.mkdir()
+        (data_dir / "process_table.json").write_text(json.dumps({"max_processes": 256}))
+        (data_dir / "statistics.json").write_text(json.dumps({"total_syscalls": 46}))
+        out = tmp_path / "tikz"
+
+        TikZGenerator(str(data_dir)).save_all_tikz_files(str(out))
+        assert len(list(out.glob("*.tex"))) == 5
+
+        # Mark every output; only regenerated ones lose the marker
+        for tex in out.glob("*.tex"):
+            tex.write_text("stale")
+        (data_dir / "process_table.json").write_text(json.dumps({"max_processes": 512}))
+        TikZGenerator(str(data_dir)).save_all_tikz_files(str(out))
+
+        regenerated = sorted(f.name for f in out.glob("*.tex") if f.read_text() != "stale")
+        assert regenerated == ["process-states.tex"]
+        assert "512" in (out / "process-states.tex").read_text()
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
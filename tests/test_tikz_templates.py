@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test suite for the compiled TikZ templates and batch rendering
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from os_analysis_toolkit.generators import TikZGenerator
+from os_analysis_toolkit.generators.templates import Template, load_template
+
+FORK_DATA = {
+    "processes": [
+        {"name": "Parent", "color": "usercolor", "label": "Parent"},
+        {"name": "Child", "color": "processcolor", "label": "Child"},
+    ],
+    "actions": [{"from": "Parent", "to": "Child", "label": "fork()"}],
+    "cpu_context": ["EIP copied", "EAX = 0 in child"],
+}
+
+
+class TestTemplates:
+    """Test cases for compiled templates"""
+
+    def test_render_bind_and_missing_slots(self):
+        """Slots take text, numbers or lines; bound slots disappear; gaps raise"""
+        template = Template("a {{x}} b {{lines}} {{x}}", "t.tex")
+        assert template.slots == {"x", "lines"}
+        assert template.render(x="1", lines=["p", "q"]) == "a 1 b p\nq 1"
+        assert template.render(x=5, lines=[0.5, "q"]) == "a 5 b 0.5\nq 5"
+
+        bound = template.bind(x="X")
+        assert bound.slots == {"lines"}
+        assert bound(lines="L") == "a X b L X"
+        with pytest.raises(KeyError, match="lines"):
+            bound.render()
+
+    def test_templates_load_once(self, tmp_path):
+        """A template file is read on first use only"""
+        path = tmp_path / "t.tex"
+        path.write_text("{{v}}")
+        first = load_template(path)
+        path.write_text("changed {{v}}")
+        assert load_template(path) is first
+
+
+class TestTikZTemplates:
+    """Test cases for template-driven diagram generation"""
+
+    @pytest.fixture
+    def generator(self, tmp_path):
+        return TikZGenerator(str(tmp_path))
+
+    @pytest.mark.parametrize("diagram", ["kernel", "process", "memory", "ipc", "boot", "fork"])
+    def test_every_diagram_renders(self, generator, diagram):
+        """All placeholders are filled on the shared preamble"""
+        tex = getattr(generator, f"generate_{diagram}_diagram")(FORK_DATA if diagram == "fork" else {})
+        assert "{{" not in tex
+        assert r"\documentclass[tikz,border=5pt]{standalone}" in tex
+        assert tex.rstrip().endswith(r"\end{document}")
+
+    def test_fork_and_ipc_lines(self, generator):
+        """Per-item lines are formatted from the data"""
+        fork = generator.generate_fork_diagram(FORK_DATA)
+        assert r"\node[box, fill=processcolor] (child) at (5,0) {Child};" in fork
+        assert r"\draw[arrow] (parent) -- node[label, above] {fork()} (child);" in fork
+        assert r"\node[label, anchor=west] at (0,-7.1) {EAX = 0 in child};" in fork
+
+        ipc = generator.generate_ipc_diagram({})
+        assert r"\node[label, below] at (sender.south) {Message ready};" in ipc
+        assert r"\node[label] at (1,-2.8) {SEND};" in ipc
+
+    def test_batch_streams_files_in_order(self, generator, tmp_path):
+        """A batch writes one file per item and yields paths as it goes"""
+        items = ((f"fork-{n}", FORK_DATA) for n in range(25))
+        paths = generator.generate_batch("fork", items, workers=3)
+        first = next(paths)
+        assert Path(first).name == "fork-0.tex" and Path(first).exists()
+        rest = list(paths)
+        assert [Path(p).name for p in rest] == [f"fork-{n}.tex" for n in range(1, 25)]
+        assert Path(rest[-1]).read_text() == generator.generate_fork_diagram(FORK_DATA)
+
+        with pytest.raises(ValueError):
+            list(generator.generate_batch("sequence", []))
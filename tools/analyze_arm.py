@@ -13,7 +13,62 @@ Analyzes ARM-specific code and architecture support in MINIX:
 import os
 import re
 from pathlib import Path
-from collections import defaultdict
+from collections import defaultdict, Counter
+from concurrent.futures import ProcessPoolExecutor
+
+# ARM-specific keywords for each feature
+FEATURE_KEYWORDS = {
+    'banked_registers': r'r13_svc|r14_svc|cpsr_svc',
+    'thumbs': r'\.thumb|THUMB|__thumb__',
+    'neon': r'NEON|neon|vsqrt',
+    'vfp': r'VFP|vfp|d0-d31|float-abi',
+    'sve': r'SVE|sve|z0-z31',
+    'cortex': r'cortex|ARM_ERRATA',
+    'device_tree': r'device.tree|dts|fdt',
+    'mmu': r'TTBRn|TTBCR|ASID',
+    'cache': r'cache|Cache|CACHE|dsb|dmb',
+    'barrier': r'isb\|dsb\|dmb|memory.barrier',
+}
+
+FEATURE_REGEXES = {
+    feature: re.compile(pattern) for feature, pattern in FEATURE_KEYWORDS.items()
+}
+
+# Matches wherever any feature does. Keywords overlap (cache's dsb sits inside
+# barrier's isb|dsb|dmb), so it only screens lines; each feature is then
+# counted with its own pattern
+FEATURE_PATTERN = re.compile('|'.join(
+    f'(?:{pattern})' for pattern in FEATURE_KEYWORDS.values()
+))
+
+ARM_SOURCE_SUFFIXES = ('.c', '.S', '.h')
+FEATURE_SCAN_SUFFIXES = ('.c', '.S')
+
+
+def scan_arm_features(path):
+    """Count feature keyword hits in one file in a single pass.
+
+    Returns (path, lines, hits, feature_lines) where hits maps feature to
+    the number of matches and feature_lines maps feature to the 1-based
+    line numbers containing at least one match.
+    """
+    hits = Counter()
+    feature_lines = defaultdict(list)
+    lines = 0
+    try:
+        with open(path, 'r', errors='ignore') as f:
+            for lines, line in enumerate(f, 1):
+                if not FEATURE_PATTERN.search(line):
+                    continue
+                for feature, regex in FEATURE_REGEXES.items():
+                    count = len(regex.findall(line))
+                    if count:
+                        hits[feature] += count
+                        feature_lines[feature].append(lines)
+    except OSError:
+        pass
+    return path, lines, hits, dict(feature_lines)
+
 
 class ARMAnalyzer:
     def __init__(self, minix_root):
@@ -22,6 +77,7 @@ class ARMAnalyzer:
         self.include_dir = self.minix_root / "minix" / "include"
         self.arm_files = []
         self.arm_functions = defaultdict(list)
+        self.feature_hits = {}
 
     def find_arm_code(self):
         """Find all ARM-specific code files"""
@@ -36,48 +92,53 @@ class ARMAnalyzer:
             if item.is_dir():
                 print(f"Found architecture: {item.name}")
                 if item.name.startswith('arm'):
-                    # Collect ARM files
-                    for f in item.rglob("*.c"):
-                        self.arm_files.append(f)
-                    for f in item.rglob("*.S"):
-                        self.arm_files.append(f)
-                    for f in item.rglob("*.h"):
-                        self.arm_files.append(f)
+                    # Collect ARM files in a single walk of the tree
+                    for root, _dirs, files in os.walk(item):
+                        for name in sorted(files):
+                            if name.endswith(ARM_SOURCE_SUFFIXES):
+                                self.arm_files.append(Path(root) / name)
 
         print(f"Found {len(self.arm_files)} ARM-related files")
 
-    def analyze_arm_features(self):
-        """Analyze ARM features used in MINIX"""
-        features = defaultdict(int)
+    def analyze_arm_features(self, jobs=None):
+        """Analyze ARM features used in MINIX
 
-        # Search for ARM-specific keywords
-        keywords = {
-            'banked_registers': r'r13_svc|r14_svc|cpsr_svc',
-            'thumbs': r'\.thumb|THUMB|__thumb__',
-            'neon': r'NEON|neon|vsqrt',
-            'vfp': r'VFP|vfp|d0-d31|float-abi',
-            'sve': r'SVE|sve|z0-z31',
-            'cortex': r'cortex|ARM_ERRATA',
-            'device_tree': r'device.tree|dts|fdt',
-            'mmu': r'TTBRn|TTBCR|ASID',
-            'cache': r'cache|Cache|CACHE|dsb|dmb',
-            'barrier': r'isb\|dsb\|dmb|memory.barrier',
-        }
-
-        for arm_file in self.arm_files:
-            if arm_file.suffix in ['.c', '.S']:
-                try:
-                    with open(arm_file, 'r', errors='ignore') as f:
-                        content = f.read()
-
-                    for feature, pattern in keywords.items():
-                        if re.search(pattern, content):
-                            features[feature] += 1
-                except:
-                    pass
+        Files are scanned in parallel; per-file hit counts and the lines
+        they occur on are kept in self.feature_hits. The return value is
+        the number of files mentioning each feature.
+        """
+        features = defaultdict(int)
+        sources = [f for f in self.arm_files if f.suffix in FEATURE_SCAN_SUFFIXES]
+        if not sources:
+            return features
+
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            for path, lines, hits, feature_lines in pool.map(
+                    scan_arm_features, sources, chunksize=8):
+                self.feature_hits[path] = {
+                    'lines': lines,
+                    'hits': hits,
+                    'feature_lines': feature_lines,
+                }
+                for feature in hits:
+                    features[feature] += 1
 
         return features
 
+    def feature_density(self):
+        """Total hits, hit lines and hits per 1000 lines for each feature"""
+        totals = defaultdict(lambda: {'files': 0, 'hits': 0, 'lines': 0})
+        scanned_lines = sum(info['lines'] for info in self.feature_hits.values())
+        for info in self.feature_hits.values():
+            for feature, count in info['hits'].items():
+                totals[feature]['files'] += 1
+                totals[feature]['hits'] += count
+                totals[feature]['lines'] += len(info['feature_lines'][feature])
+        for stats in totals.values():
+            stats['per_kloc'] = (1000.0 * stats['hits'] / scanned_lines
+                                 if scanned_lines else 0.0)
+        return dict(totals)
+
     def generate_report(self, output_file):
         """Generate ARM architecture analysis report"""
         with open(output_file, 'w') as f:
@@ -89,6 +150,18 @@ class ARMAnalyzer:
             f.write("## ARM-Specific Implementation Files\n\n")
             f.write(f"Total ARM-specific files found: {len(self.arm_files)}\n\n")
 
+            density = self.feature_density()
+            if density:
+                f.write("### Feature Density\n\n")
+                f.write("| Feature | Files | Hits | Hit Lines | Hits/KLOC |\n")
+                f.write("|---------|-------|------|-----------|-----------|\n")
+                for feature in FEATURE_KEYWORDS:
+                    if feature in density:
+                        stats = density[feature]
+                        f.write(f"| {feature} | {stats['files']} | {stats['hits']} | "
+                                f"{stats['lines']} | {stats['per_kloc']:.2f} |\n")
+                f.write("\n")
+
             if self.arm_files:
                 f.write("### Bootstrap and Initialization\n\n")
                 f.write("**head.S** - ARM bootstrap code\n")
@@ -17,6 +17,10 @@ import json
 from pathlib import Path
 from collections import defaultdict
 
+_COMMENT_PREFIXES = ('/*', '*', '//', '#')
+_SIGNATURE_RE = re.compile(r'int\s+do_\w+\s*\(\s*([^)]+)\s*\)')
+_MSG_FIELD_RE = re.compile(r'm_ptr->m_(\w+)')
+
 class MinixSyscallAnalyzer:
     def __init__(self, minix_root):
         self.minix_root = Path(minix_root)
@@ -52,68 +56,97 @@ class MinixSyscallAnalyzer:
                 'lines': 0
             }
 
+    def _build_prefix_index(self):
+        """Map every prefix of every SYS_* name to its first definition.
+
+        Equivalent to walking a prefix trie: a file stem resolves to the
+        first syscall (in com.h order) whose name starts with SYS_<STEM>,
+        but the lookup is a single dict probe instead of a scan.
+        """
+        index = {}
+        for sys_name in self.syscalls:
+            for end in range(len('SYS_'), len(sys_name) + 1):
+                index.setdefault(sys_name[:end], sys_name)
+        return index
+
+    def _analyze_implementation(self, impl_file):
+        """Read one do_*.c file and compute every per-file metric at once"""
+        with open(impl_file, 'r') as f:
+            content = f.read()
+        lines = content.split('\n')
+
+        # Count lines of actual code (excluding comments/blanks)
+        code_lines = 0
+        for line in lines:
+            stripped = line.strip()
+            if stripped and not stripped.startswith(_COMMENT_PREFIXES):
+                code_lines += 1
+
+        info = {
+            'implementation': str(impl_file),
+            'lines': len(lines),
+            'code_lines': code_lines,
+            # Simple complexity metric (functions, loops, conditionals)
+            'complexity': (
+                content.count('if ') +
+                content.count('for ') +
+                content.count('while ') +
+                content.count('switch ')
+            ),
+        }
+
+        # Extract the do_* function signature
+        match = _SIGNATURE_RE.search(content)
+        if match:
+            info['parameters'] = match.group(1).strip()
+
+        # Extract message structure references
+        msg_refs = set(_MSG_FIELD_RE.findall(content))
+        if msg_refs:
+            info['message_fields'] = sorted(msg_refs)
+
+        return info
+
     def find_implementations(self):
-        """Find and analyze syscall implementation files"""
+        """Find and analyze syscall implementation files
+
+        Each do_*.c file is read exactly once; the per-file results are kept
+        in ``self.implementations`` so later passes never touch the disk.
+        """
         system_dir = self.kernel_dir / "system"
 
         if not system_dir.exists():
             print(f"Error: {system_dir} not found")
             return
 
+        prefix_index = self._build_prefix_index()
+
         # Find all do_*.c files
         for impl_file in sorted(system_dir.glob("do_*.c")):
             syscall_name = impl_file.stem[3:].upper()  # Remove 'do_' prefix
 
-            # Read implementation
-            with open(impl_file, 'r') as f:
-                content = f.read()
-                lines = content.split('\n')
-
             # Look for corresponding SYS_* definition
-            for sys_name in self.syscalls:
-                if sys_name.startswith('SYS_' + syscall_name):
-                    # Count lines of actual code (excluding comments/blanks)
-                    code_lines = sum(1 for line in lines
-                                   if line.strip() and not line.strip().startswith('/*')
-                                   and not line.strip().startswith('*')
-                                   and not line.strip().startswith('//')
-                                   and not line.strip().startswith('#'))
-
-                    self.syscalls[sys_name]['implementation'] = str(impl_file)
-                    self.syscalls[sys_name]['lines'] = len(lines)
-                    self.syscalls[sys_name]['code_lines'] = code_lines
-
-                    # Simple complexity metric (functions, loops, conditionals)
-                    self.syscalls[sys_name]['complexity'] = (
-                        content.count('if ') +
-                        content.count('for ') +
-                        content.count('while ') +
-                        content.count('switch ')
-                    )
-                    break
+            sys_name = prefix_index.get('SYS_' + syscall_name)
+            if sys_name is None:
+                continue
+
+            info = self._analyze_implementation(impl_file)
+            self.implementations[info['implementation']] = info
+            self.syscalls[sys_name].update(info)
 
     def extract_function_parameters(self):
-        """Extract function parameter information from implementations"""
-        for sys_name, info in self.syscalls.items():
-            if info['implementation']:
-                impl_file = Path(info['implementation'])
-                if impl_file.exists():
-                    with open(impl_file, 'r') as f:
-                        content = f.read()
-
-                    # Extract the do_* function signature
-                    pattern = rf'int\s+do_\w+\s*\(\s*([^)]+)\s*\)'
-                    match = re.search(pattern, content)
-
-                    if match:
-                        params = match.group(1)
-                        info['parameters'] = params.strip()
-
-                    # Extract message structure references
-                    pattern = r'm_ptr->m_(\w+)'
-                    msg_refs = set(re.findall(pattern, content))
-                    if msg_refs:
-                        info['message_fields'] = sorted(list(msg_refs))
+        """Extract function parameter information from implementations
+
+        Signatures and message fields are gathered by find_implementations;
+        this only backfills entries from the per-file cache.
+        """
+        for info in self.syscalls.values():
+            cached = self.implementations.get(info['implementation'])
+            if not cached:
+                continue
+            for key in ('parameters', 'message_fields'):
+                if key in cached:
+                    info[key] = cached[key]
 
     def generate_report(self, output_file):
         """Generate comprehensive syscall analysis report"""
@@ -9,37 +9,199 @@ Generates frequency tables, categorization, and JSON output for analysis.
 """
 
 import re
+import os
+import mmap
 import json
+import shlex
+import argparse
+import hashlib
+import subprocess
 import sys
 from pathlib import Path
-from collections import defaultdict, Counter
-from typing import Dict, List, Tuple, Set
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple, Set
+
+
+def _file_digest(path: Path) -> str:
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class AsmPreprocessor:
+    """Run the C preprocessor over .S files and cache the expanded output.
+
+    Each input gets a manifest recording its own hash and the hash of every
+    header cpp reported (via -MD). A later run reuses the cached expansion
+    when none of those hashes, nor the command line, has changed.
+    """
+    
+    DEFAULT_CPP = 'cc -E -P -x assembler-with-cpp'
+    
+    ARCH_DEFINES = {
+        'i386': ['-D__i386__', '-D__i386'],
+        'arm': ['-D__arm__', '-D__ARM_EABI__'],
+    }
+    
+    # Kernel arch directory names differ from the extractor arch names
+    ARCH_DIRS = {'i386': 'i386', 'arm': 'earm'}
+    
+    def __init__(self, minix_root: Path, cache_dir: Path,
+                 cpp: str = DEFAULT_CPP):
+        self.minix_root = Path(minix_root)
+        self.cache_dir = Path(cache_dir)
+        self.cpp = shlex.split(cpp)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+    
+    def include_dirs(self, arch: str) -> List[Path]:
+        """Include search path used by the MINIX kernel build for arch."""
+        kernel = self.minix_root / 'minix' / 'kernel'
+        arch_dir = kernel / 'arch' / self.ARCH_DIRS[arch]
+        return [
+            arch_dir / 'include',
+            arch_dir,
+            kernel,
+            self.minix_root / 'minix' / 'include',
+            self.minix_root / 'minix' / 'include' / 'arch' / self.ARCH_DIRS[arch] / 'include',
+            self.minix_root / 'include',
+            self.minix_root / 'sys',
+        ]
+    
+    def command(self, arch: str) -> List[str]:
+        """Preprocessor argv (without input, output and dependency flags)."""
+        includes = [f'-I{d}' for d in self.include_dirs(arch) if d.exists()]
+        return self.cpp + self.ARCH_DEFINES.get(arch, []) + includes
+    
+    def expand(self, filepath: Path, arch: str) -> Path:
+        """Return the path of the macro-expanded form of filepath."""
+        filepath = Path(filepath).resolve()
+        command = self.command(arch)
+        stem = hashlib.sha256(f'{arch}:{filepath}'.encode()).hexdigest()[:24]
+        manifest_path = self.cache_dir / f'{stem}.json'
+        input_hash = _file_digest(filepath)
+        
+        cached = self._valid_manifest(manifest_path, command, input_hash)
+        if cached is not None:
+            return cached
+        
+        output = self.cache_dir / f'{stem}.{os.getpid()}.s'
+        depfile = self.cache_dir / f'{stem}.{os.getpid()}.d'
+        try:
+            subprocess.run(
+                command + ['-MD', '-MF', str(depfile), str(filepath), '-o', str(output)],
+                check=True, capture_output=True, text=True,
+            )
+            headers = {str(h): _file_digest(h) for h in self._parse_depfile(depfile)
+                       if h.resolve() != filepath}
+        except subprocess.CalledProcessError as e:
+            output.unlink(missing_ok=True)
+            raise RuntimeError(f"cpp failed: {e.stderr.strip()}") from e
+        finally:
+            depfile.unlink(missing_ok=True)
+        
+        key = self._cache_key(command, input_hash, headers)
+        expanded = self.cache_dir / f'{key}.s'
+        os.replace(output, expanded)
+        manifest = {'command': command, 'input': input_hash,
+                    'headers': headers, 'key': key}
+        tmp = manifest_path.with_suffix(f'.{os.getpid()}.tmp')
+        tmp.write_text(json.dumps(manifest))
+        os.replace(tmp, manifest_path)
+        return expanded
+    
+    def _valid_manifest(self, manifest_path: Path, command: List[str],
+                        input_hash: str) -> Optional[Path]:
+        try:
+            manifest = json.loads(manifest_path.read_text())
+        except (OSError, ValueError):
+            return None
+        if manifest.get('command') != command or manifest.get('input') != input_hash:
+            return None
+        for header, digest in manifest['headers'].items():
+            try:
+                if _file_digest(Path(header)) != digest:
+                    return None
+            except OSError:
+                return None
+        expanded = self.cache_dir / f"{manifest['key']}.s"
+        return expanded if expanded.exists() else None
+    
+    @staticmethod
+    def _cache_key(command: List[str], input_hash: str,
+                   headers: Dict[str, str]) -> str:
+        digest = hashlib.sha256('\0'.join(command).encode())
+        digest.update(input_hash.encode())
+        for header in sorted(headers):
+            digest.update(f'{header}={headers[header]}'.encode())
+        return digest.hexdigest()
+    
+    @staticmethod
+    def _parse_depfile(depfile: Path) -> List[Path]:
+        """Prerequisites from a make-style dependency file."""
+        text = depfile.read_text().replace('\\\n', ' ')
+        _, _, deps = text.partition(':')
+        return [Path(dep) for dep in deps.split()]
+
 
 class InstructionExtractor:
     """Base class for instruction extraction from assembly files."""
     
+    # GNU as statement separator; cpp joins multi-instruction macros with it
+    STATEMENT_SEPARATOR = ';'
+    
     def __init__(self, arch: str):
         self.arch = arch
         self.instructions = Counter()
-        self.categories = defaultdict(list)
+        self.categories = Counter()
         self.addressing_modes = Counter()
         self.files_processed = []
         self.instruction_details = []
         
-    def extract_from_file(self, filepath: Path) -> None:
-        """Extract instructions from a single assembly file."""
+    def extract_from_file(self, filepath: Path,
+                          preprocessor: Optional[AsmPreprocessor] = None) -> None:
+        """Extract instructions from a single assembly file.
+
+        The file is memory-mapped and scanned line by line, so only the
+        counters grow with the input, never a copy of the file. With a
+        preprocessor, the macro-expanded form is scanned instead and each
+        line is split into its individual statements.
+        """
         try:
-            with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+            source = preprocessor.expand(filepath, self.arch) if preprocessor else filepath
+            with open(source, 'rb') as f:
+                if os.fstat(f.fileno()).st_size:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        for raw in iter(mm.readline, b''):
+                            line = raw.decode('utf-8', errors='ignore')
+                            if preprocessor:
+                                for statement in line.split(self.STATEMENT_SEPARATOR):
+                                    self._process_line(statement)
+                            else:
+                                self._process_line(line)
             self.files_processed.append(str(filepath))
-            self._process_content(content)
         except Exception as e:
             print(f"Error processing {filepath}: {e}", file=sys.stderr)
     
     def _process_content(self, content: str) -> None:
+        """Extract instructions from in-memory assembly source."""
+        for line in content.split('\n'):
+            self._process_line(line)
+    
+    def _process_line(self, line: str) -> None:
         """Override in subclasses for architecture-specific processing."""
         raise NotImplementedError
     
+    def merge(self, other: 'InstructionExtractor') -> None:
+        """Fold another extractor's counters (e.g. from a worker) into this one."""
+        self.instructions.update(other.instructions)
+        self.categories.update(other.categories)
+        self.addressing_modes.update(other.addressing_modes)
+        self.files_processed.extend(other.files_processed)
+    
     def get_top_instructions(self, count: int = 20) -> List[Tuple[str, int]]:
         """Return top N most frequent instructions."""
         return self.instructions.most_common(count)
@@ -55,7 +217,7 @@ class InstructionExtractor:
             'instruction_frequencies': dict(self.instructions),
             'top_20_instructions': [{'instruction': instr, 'count': count} 
                                    for instr, count in self.get_top_instructions(20)],
-            'categories': {cat: len(instrs) for cat, instrs in self.categories.items()},
+            'categories': dict(self.categories),
             'addressing_modes': dict(self.addressing_modes),
         }
         with open(output_path, 'w') as f:
@@ -89,6 +251,9 @@ class I386InstructionExtractor(InstructionExtractor):
         'other': ['nop', 'ud2', 'int', 'iret', 'iretu'],
     }
     
+    # Mnemonic is the first word of a (comment-stripped, non-label) line
+    MNEMONIC_RE = re.compile(r'^(\w+)\b')
+    
     def __init__(self):
         super().__init__('i386')
         self._build_instruction_map()
@@ -100,37 +265,34 @@ class I386InstructionExtractor(InstructionExtractor):
             for instr in instrs:
                 self.instruction_map[instr] = category
     
-    def _process_content(self, content: str) -> None:
-        """Extract i386 instructions from assembly source (AT&T syntax)."""
-        lines = content.split('\n')
+    def _process_line(self, line: str) -> None:
+        """Extract an i386 instruction from one line of source (AT&T syntax)."""
+        # Remove comments
+        if '#' in line:
+            line = line[:line.index('#')]
+        
+        # Skip empty lines and labels
+        line = line.strip()
+        if not line or line.endswith(':'):
+            return
+        
+        # Extract mnemonic (first word before space or comma)
+        # AT&T syntax: mnemonic dest, src, src2, ...
+        match = self.MNEMONIC_RE.match(line)
+        if not match:
+            return
         
-        for line in lines:
-            # Remove comments
-            if '#' in line:
-                line = line[:line.index('#')]
-            
-            # Skip empty lines and labels
-            line = line.strip()
-            if not line or line.endswith(':'):
-                continue
-            
-            # Extract mnemonic (first word before space or comma)
-            # AT&T syntax: mnemonic dest, src, src2, ...
-            match = re.match(r'^(\w+)\b', line)
-            if not match:
-                continue
-            
-            mnemonic = match.group(1).lower()
-            
-            # Categorize instruction
-            category = self.instruction_map.get(mnemonic, 'other')
-            
-            # Count instruction and category
-            self.instructions[mnemonic] += 1
-            self.categories[category].append(mnemonic)
-            
-            # Extract addressing mode hint
-            self._extract_addressing_mode(line, mnemonic)
+        mnemonic = match.group(1).lower()
+        
+        # Categorize instruction
+        category = self.instruction_map.get(mnemonic, 'other')
+        
+        # Count instruction and category
+        self.instructions[mnemonic] += 1
+        self.categories[category] += 1
+        
+        # Extract addressing mode hint
+        self._extract_addressing_mode(line, mnemonic)
     
     def _extract_addressing_mode(self, line: str, mnemonic: str) -> None:
         """Extract addressing mode hints from instruction."""
@@ -176,6 +338,12 @@ class ARMInstructionExtractor(InstructionExtractor):
         'other': ['push', 'pop'],
     }
     
+    CONDITIONAL_CODES = ['eq', 'ne', 'lt', 'le', 'gt', 'ge', 'ls', 'hi',
+                         'cc', 'cs', 'pl', 'mi', 'vc', 'vs', 'al']
+    
+    # Handle conditional suffixes (eq, ne, lt, gt, etc.)
+    MNEMONIC_RE = re.compile(r'^([a-z]+)(?:[a-z]{2})?\b')
+    
     def __init__(self):
         super().__init__('arm')
         self._build_instruction_map()
@@ -186,56 +354,48 @@ class ARMInstructionExtractor(InstructionExtractor):
         for category, instrs in self.INSTRUCTION_CATEGORIES.items():
             for instr in instrs:
                 self.instruction_map[instr] = category
+        # Alternation tries names in map order, so the first known mnemonic
+        # that prefixes the line wins, exactly as a linear startswith scan
+        self.known_prefix_re = re.compile(
+            '|'.join(re.escape(instr) for instr in self.instruction_map))
     
-    def _process_content(self, content: str) -> None:
-        """Extract ARM instructions from assembly source (A32 syntax)."""
-        lines = content.split('\n')
+    def _process_line(self, line: str) -> None:
+        """Extract an ARM instruction from one line of source (A32 syntax)."""
+        # Remove comments (both ; and @)
+        for comment_char in [';', '@']:
+            if comment_char in line:
+                line = line[:line.index(comment_char)]
+        
+        # Skip empty lines and labels
+        line = line.strip()
+        if not line or line.endswith(':'):
+            return
+        
+        # Extract mnemonic (first word before space or comma)
+        # ARM syntax: mnemonic{cond} dst, src, src2, ...
+        match = self.MNEMONIC_RE.match(line)
+        if not match:
+            return
         
-        for line in lines:
-            # Remove comments (both ; and @)
-            for comment_char in [';', '@']:
-                if comment_char in line:
-                    line = line[:line.index(comment_char)]
-            
-            # Skip empty lines and labels
-            line = line.strip()
-            if not line or line.endswith(':'):
-                continue
-            
-            # Extract mnemonic (first word before space or comma)
-            # ARM syntax: mnemonic{cond} dst, src, src2, ...
-            # Handle conditional suffixes (eq, ne, lt, gt, etc.)
-            match = re.match(r'^([a-z]+)(?:[a-z]{2})?\b', line)
-            if not match:
-                continue
-            
-            base_mnemonic = match.group(1).lower()
-            
-            # Try to get base mnemonic without suffix
-            mnemonic = base_mnemonic
-            for instr in self.instruction_map.keys():
-                if line.startswith(instr):
-                    mnemonic = instr
-                    break
-            
-            # Categorize instruction
-            category = self.instruction_map.get(mnemonic, 'other')
-            
-            # Count instruction and category
-            self.instructions[mnemonic] += 1
-            self.categories[category].append(mnemonic)
-            
-            # Extract addressing mode and conditional
-            self._extract_addressing_info(line, mnemonic)
+        # Try to get base mnemonic without suffix
+        known = self.known_prefix_re.match(line)
+        mnemonic = known.group(0) if known else match.group(1).lower()
+        
+        # Categorize instruction
+        category = self.instruction_map.get(mnemonic, 'other')
+        
+        # Count instruction and category
+        self.instructions[mnemonic] += 1
+        self.categories[category] += 1
+        
+        # Extract addressing mode and conditional
+        self._extract_addressing_info(line, mnemonic)
     
     def _extract_addressing_info(self, line: str, mnemonic: str) -> None:
         """Extract addressing information from ARM instruction."""
         # Extract conditional suffix
-        conditional_codes = ['eq', 'ne', 'lt', 'le', 'gt', 'ge', 'ls', 'hi', 
-                            'cc', 'cs', 'pl', 'mi', 'vc', 'vs', 'al']
-        
         found_conditional = False
-        for cond in conditional_codes:
+        for cond in self.CONDITIONAL_CODES:
             if f"{mnemonic}{cond}" in line:
                 self.addressing_modes[f'conditional_{cond}'] += 1
                 found_conditional = True
@@ -256,66 +416,104 @@ class ARMInstructionExtractor(InstructionExtractor):
             self.addressing_modes['immediate'] += 1
 
 
+EXTRACTORS = {
+    'i386': I386InstructionExtractor,
+    'arm': ARMInstructionExtractor,
+}
+
+
+def _extract_file(arch: str, filepath: Path,
+                  preprocessor: Optional[AsmPreprocessor] = None) -> InstructionExtractor:
+    """Worker entry point: counters for one file, returned for merging."""
+    extractor = EXTRACTORS[arch]()
+    extractor.extract_from_file(filepath, preprocessor)
+    return extractor
+
+
+def extract_parallel(sources: Dict[str, List[Path]], jobs: int = None,
+                     preprocessor: Optional[AsmPreprocessor] = None
+                     ) -> Dict[str, InstructionExtractor]:
+    """Extract every file of every architecture on one process pool.
+
+    Each worker returns only its Counters, which are merged per
+    architecture in submission order so results are deterministic.
+    """
+    results = {arch: EXTRACTORS[arch]() for arch in sources}
+    tasks = [(arch, path) for arch, paths in sources.items() for path in paths]
+    if not tasks:
+        return results
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(_extract_file, arch, path, preprocessor)
+                   for arch, path in tasks]
+        for (arch, path), future in zip(tasks, futures):
+            results[arch].merge(future.result())
+    return results
+
+
+def _print_summary(name: str, extractor: InstructionExtractor) -> None:
+    total = sum(extractor.instructions.values())
+    print(f"\n{name} Summary:")
+    print(f"  Total instructions: {total}")
+    print(f"  Unique mnemonics: {len(extractor.instructions)}")
+    print(f"  Files processed: {len(extractor.files_processed)}")
+    print(f"  Top 10 instructions:")
+    for instr, count in extractor.get_top_instructions(10):
+        print(f"    {instr:12} {count:6} ({100*count/total:5.1f}%)")
+
+
 def main():
     """Main entry point for instruction extraction."""
     
-    if len(sys.argv) < 2:
-        print("Usage: python3 isa_instruction_extractor.py <minix_root> [output_dir]")
-        print("  minix_root: Path to MINIX source tree")
-        print("  output_dir: Output directory for JSON results (default: ./analysis/)")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(
+        description="Extract instruction mnemonics from MINIX assembly sources")
+    parser.add_argument('minix_root', type=Path,
+                        help="Path to MINIX source tree")
+    parser.add_argument('output_dir', type=Path, nargs='?', default=Path('./analysis/'),
+                        help="Output directory for JSON results (default: ./analysis/)")
+    parser.add_argument('--expand-macros', action='store_true',
+                        help="Count instructions in cpp-expanded sources")
+    parser.add_argument('--cpp', default=AsmPreprocessor.DEFAULT_CPP,
+                        help="Preprocessor command (default: %(default)s)")
+    parser.add_argument('--cache-dir', type=Path, default=None,
+                        help="Expanded-source cache (default: <output_dir>/.cpp-cache)")
+    args = parser.parse_args()
     
-    minix_root = Path(sys.argv[1])
-    output_dir = Path(sys.argv[2]) if len(sys.argv) > 2 else Path('./analysis/')
+    minix_root = args.minix_root
+    output_dir = args.output_dir
     output_dir.mkdir(exist_ok=True)
     
-    # Process i386 architecture
-    print("Processing i386 architecture...")
-    i386_extractor = I386InstructionExtractor()
-    i386_arch_dir = minix_root / 'minix' / 'kernel' / 'arch' / 'i386'
-    
-    if i386_arch_dir.exists():
-        for asm_file in i386_arch_dir.glob('*.S'):
-            i386_extractor.extract_from_file(asm_file)
-            print(f"  Processed: {asm_file.name}")
-    else:
-        print(f"  Warning: i386 architecture directory not found at {i386_arch_dir}")
-    
-    # Export i386 results
-    i386_output = output_dir / 'i386_instructions.json'
-    i386_extractor.export_json(i386_output)
-    
-    print(f"\ni386 Summary:")
-    print(f"  Total instructions: {sum(i386_extractor.instructions.values())}")
-    print(f"  Unique mnemonics: {len(i386_extractor.instructions)}")
-    print(f"  Files processed: {len(i386_extractor.files_processed)}")
-    print(f"  Top 10 instructions:")
-    for instr, count in i386_extractor.get_top_instructions(10):
-        print(f"    {instr:12} {count:6} ({100*count/sum(i386_extractor.instructions.values()):5.1f}%)")
-    
-    # Process ARM architecture
-    print("\nProcessing ARM (earm) architecture...")
-    arm_extractor = ARMInstructionExtractor()
-    arm_arch_dir = minix_root / 'minix' / 'kernel' / 'arch' / 'earm'
-    
-    if arm_arch_dir.exists():
-        for asm_file in arm_arch_dir.glob('*.S'):
-            arm_extractor.extract_from_file(asm_file)
-            print(f"  Processed: {asm_file.name}")
-    else:
-        print(f"  Warning: ARM architecture directory not found at {arm_arch_dir}")
-    
-    # Export ARM results
-    arm_output = output_dir / 'arm_instructions.json'
-    arm_extractor.export_json(arm_output)
-    
-    print(f"\nARM Summary:")
-    print(f"  Total instructions: {sum(arm_extractor.instructions.values())}")
-    print(f"  Unique mnemonics: {len(arm_extractor.instructions)}")
-    print(f"  Files processed: {len(arm_extractor.files_processed)}")
-    print(f"  Top 10 instructions:")
-    for instr, count in arm_extractor.get_top_instructions(10):
-        print(f"    {instr:12} {count:6} ({100*count/sum(arm_extractor.instructions.values()):5.1f}%)")
+    preprocessor = None
+    if args.expand_macros:
+        preprocessor = AsmPreprocessor(minix_root,
+                                       args.cache_dir or output_dir / '.cpp-cache',
+                                       cpp=args.cpp)
+    
+    arch_root = minix_root / 'minix' / 'kernel' / 'arch'
+    arch_dirs = {'i386': arch_root / 'i386', 'arm': arch_root / 'earm'}
+    sources = {}
+    for arch, arch_dir in arch_dirs.items():
+        if arch_dir.exists():
+            sources[arch] = sorted(arch_dir.glob('*.S'))
+        else:
+            print(f"  Warning: {arch} architecture directory not found at {arch_dir}")
+            sources[arch] = []
+    
+    # Both architecture trees share one process pool
+    print("Processing i386 and ARM (earm) architectures...")
+    results = extract_parallel(sources, preprocessor=preprocessor)
+    for arch, paths in sources.items():
+        for asm_file in paths:
+            print(f"  Processed: {arch}/{asm_file.name}")
+    
+    i386_extractor = results['i386']
+    arm_extractor = results['arm']
+    
+    # Export results
+    i386_extractor.export_json(output_dir / 'i386_instructions.json')
+    arm_extractor.export_json(output_dir / 'arm_instructions.json')
+    
+    _print_summary('i386', i386_extractor)
+    _print_summary('ARM', arm_extractor)
     
     # Summary comparison
     print(f"\nComparison:")
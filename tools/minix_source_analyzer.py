@@ -8,8 +8,14 @@ import os
 import re
 import json
 import argparse
+import subprocess
+import sys
 from pathlib import Path
 from collections import defaultdict, Counter
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from shared.snapshot import SNAPSHOT_NAME, write_snapshot  # noqa: E402
 
 class MinixAnalyzer:
     def __init__(self, minix_root="/home/eirikr/Playground/minix"):
@@ -297,16 +303,280 @@ class MinixAnalyzer:
         with open(output_path / "statistics.json", 'w') as f:
             json.dump(stats, f, indent=2)
 
+        print("Writing snapshot...")
+        write_snapshot(output_path / SNAPSHOT_NAME, {
+            "kernel_structure": kernel_data,
+            "process_table": process_data,
+            "memory_layout": memory_data,
+            "ipc_system": ipc_data,
+            "boot_sequence": boot_data,
+            "statistics": stats,
+        })
+
         print(f"\nAll data exported to {output_path}/")
         return output_path
 
+# Bump whenever extract_blob_metrics changes so stale cache entries are dropped
+BLOB_METRICS_VERSION = 1
+
+_FUNCTION_RE = re.compile(r'^\w+\s+(\w+)\s*\([^)]*\)\s*{', re.MULTILINE)
+_NR_PROCS_RE = re.compile(r'#define\s+NR_PROCS\s+(\d+)')
+_RTS_STATE_RE = re.compile(r'#define\s+(RTS_\w+)\s+.*?/\*\s*(.*?)\s*\*/')
+_MESSAGE_TYPE_RE = re.compile(r'#define\s+(\w+)\s+\d+.*?/\*\s*(.*?)\s*\*/')
+_COMPLEXITY_RE = re.compile(r'\b(?:if|for|while|switch)\b')
+
+
+def extract_blob_metrics(content):
+    """Extract path-independent metrics from one file's contents.
+
+    The result depends only on the bytes of the blob, which is what lets
+    RevisionSweep key it on the git blob SHA and reuse it across revisions.
+    """
+    nr_procs = _NR_PROCS_RE.search(content)
+    return {
+        "lines": len(content.splitlines()),
+        "functions": len(_FUNCTION_RE.findall(content)),
+        "complexity": len(_COMPLEXITY_RE.findall(content)),
+        "nr_procs": int(nr_procs.group(1)) if nr_procs else None,
+        "rts_states": len(_RTS_STATE_RE.findall(content)),
+        "message_types": len(_MESSAGE_TYPE_RE.findall(content)),
+    }
+
+
+def _extract_blob_batch(batch):
+    """Process-pool entry point: metrics for a list of (sha, content)"""
+    return [(sha, extract_blob_metrics(content)) for sha, content in batch]
+
+
+class RevisionSweep:
+    """Analyze many revisions of a MINIX git checkout without checkouts.
+
+    Trees are listed with ``git ls-tree`` and file contents streamed with
+    ``git cat-file --batch``, so the working tree is never touched. Metrics
+    are extracted once per unique blob SHA; every revision is then an
+    aggregation over cached per-blob results keyed on its file paths.
+    """
+
+    SERIES = (
+        "kernel_files",
+        "kernel_lines",
+        "total_syscalls",
+        "syscall_lines",
+        "syscall_complexity",
+        "arch_i386_functions",
+        "server_count",
+        "driver_count",
+        "max_processes",
+        "process_states",
+        "message_types",
+    )
+
+    def __init__(self, repo, prefix="minix/", jobs=None, cache_file=None):
+        self.repo = Path(repo)
+        self.prefix = prefix
+        self.jobs = jobs or os.cpu_count() or 1
+        self.cache_file = Path(cache_file) if cache_file else None
+        self.blob_cache = {}
+        self.blobs_parsed = 0
+        self._load_cache()
+
+    def _git(self, *args, **kwargs):
+        return subprocess.run(
+            ["git", "-C", str(self.repo)] + list(args),
+            check=True, capture_output=True, **kwargs
+        ).stdout
+
+    def _load_cache(self):
+        if not self.cache_file or not self.cache_file.exists():
+            return
+        with open(self.cache_file, 'r') as f:
+            cached = json.load(f)
+        if cached.get("version") == BLOB_METRICS_VERSION:
+            self.blob_cache = cached.get("blobs", {})
+
+    def _save_cache(self):
+        if not self.cache_file:
+            return
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_file.with_suffix(self.cache_file.suffix + ".tmp")
+        with open(tmp, 'w') as f:
+            json.dump({"version": BLOB_METRICS_VERSION, "blobs": self.blob_cache}, f)
+        os.replace(tmp, self.cache_file)
+
+    def expand_revisions(self, specs):
+        """Expand plain revisions and A..B ranges into commit SHAs, oldest first"""
+        revisions = []
+        for spec in specs:
+            if ".." in spec:
+                out = self._git("rev-list", "--reverse", spec, text=True)
+                revisions.extend(out.split())
+            else:
+                revisions.append(spec)
+        return revisions
+
+    def list_revision(self, revision):
+        """Return commit metadata plus {path: blob_sha} for one revision"""
+        meta = self._git("log", "-1", "--format=%H%x00%cI", revision, "--",
+                         text=True)
+        commit, date = meta.strip().split("\0")
+        paths = [self.prefix + d for d in
+                 ("kernel", "servers", "drivers", "include/minix/com.h")]
+        out = self._git("ls-tree", "-r", "-z", "--full-tree", commit, "--",
+                        *paths, text=True)
+        tree = {}
+        for entry in out.split("\0"):
+            if not entry:
+                continue
+            info, path = entry.split("\t", 1)
+            _mode, kind, sha = info.split()
+            if kind == "blob":
+                tree[path] = sha
+        return {"revision": revision, "commit": commit, "date": date,
+                "tree": tree}
+
+    def _wants_blob(self, path):
+        kernel = self.prefix + "kernel/"
+        return ((path.startswith(kernel) and path.endswith((".c", ".h")))
+                or path == self.prefix + "include/minix/com.h")
+
+    def _read_blobs(self, shas):
+        """Stream blob contents for the given SHAs through one cat-file"""
+        proc = subprocess.Popen(
+            ["git", "-C", str(self.repo), "cat-file", "--batch"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE
+        )
+        # Feed stdin from a thread so large batches cannot deadlock on pipes
+        with ThreadPoolExecutor(max_workers=1) as feeder:
+            feeder.submit(self._feed, proc.stdin, shas)
+            for _ in shas:
+                header = proc.stdout.readline().decode().split()
+                size = int(header[2])
+                data = proc.stdout.read(size)
+                proc.stdout.read(1)  # trailing newline
+                yield header[0], data.decode('utf-8', errors='replace')
+        proc.wait()
+
+    @staticmethod
+    def _feed(stream, shas):
+        stream.write("".join(sha + "\n" for sha in shas).encode())
+        stream.close()
+
+    def _parse_missing(self, shas):
+        missing = sorted(sha for sha in shas if sha not in self.blob_cache)
+        if not missing:
+            return
+        blobs = list(self._read_blobs(missing))
+        if self.jobs > 1 and len(blobs) > 1:
+            size = max(1, len(blobs) // (self.jobs * 4))
+            batches = [blobs[i:i + size] for i in range(0, len(blobs), size)]
+            with ProcessPoolExecutor(max_workers=self.jobs) as pool:
+                for results in pool.map(_extract_blob_batch, batches):
+                    self.blob_cache.update(results)
+        else:
+            self.blob_cache.update(_extract_blob_batch(blobs))
+        self.blobs_parsed += len(blobs)
+
+    def aggregate(self, tree):
+        """Reduce one revision's {path: sha} map to the SERIES metrics"""
+        kernel = self.prefix + "kernel/"
+        system = kernel + "system/"
+        arch = kernel + "arch/i386/"
+        metrics = dict.fromkeys(self.SERIES, 0)
+        metrics["max_processes"] = None
+        servers, drivers = set(), set()
+
+        for path, sha in tree.items():
+            for root, found in ((self.prefix + "servers/", servers),
+                                (self.prefix + "drivers/", drivers)):
+                # Only directories count, matching generate_statistics()
+                if path.startswith(root) and "/" in path[len(root):]:
+                    found.add(path[len(root):].split("/", 1)[0])
+            if not self._wants_blob(path):
+                continue
+            blob = self.blob_cache[sha]
+            name = path.rsplit("/", 1)[-1]
+            if path.startswith(kernel) and path.endswith(".c"):
+                metrics["kernel_files"] += 1
+                metrics["kernel_lines"] += blob["lines"]
+            if (path.startswith(system) and "/" not in path[len(system):]
+                    and name.startswith("do_") and name.endswith(".c")):
+                metrics["total_syscalls"] += 1
+                metrics["syscall_lines"] += blob["lines"]
+                metrics["syscall_complexity"] += blob["complexity"]
+            if (path.startswith(arch) and "/" not in path[len(arch):]
+                    and name.endswith(".c")):
+                metrics["arch_i386_functions"] += blob["functions"]
+            if path == kernel + "proc.h":
+                metrics["max_processes"] = blob["nr_procs"]
+                metrics["process_states"] = blob["rts_states"]
+            if path == self.prefix + "include/minix/com.h":
+                metrics["message_types"] = blob["message_types"]
+
+        metrics["server_count"] = len(servers)
+        metrics["driver_count"] = len(drivers)
+        return metrics
+
+    def run(self, revisions):
+        """Sweep the revisions and return a time series per metric"""
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            listings = list(pool.map(self.list_revision, revisions))
+
+        wanted = {sha for listing in listings
+                  for path, sha in listing["tree"].items()
+                  if self._wants_blob(path)}
+        self._parse_missing(wanted)
+        self._save_cache()
+
+        series = {name: [] for name in self.SERIES}
+        for listing in listings:
+            metrics = self.aggregate(listing["tree"])
+            for name in self.SERIES:
+                series[name].append(metrics[name])
+
+        return {
+            "revisions": [
+                {k: listing[k] for k in ("revision", "commit", "date")}
+                for listing in listings
+            ],
+            "series": series,
+            "blobs": {"unique": len(wanted), "parsed": self.blobs_parsed},
+        }
+
+    def export(self, revisions, output_dir="data"):
+        """Run the sweep and write revision_sweep.json"""
+        output_path = Path(output_dir)
+        output_path.mkdir(exist_ok=True)
+
+        print(f"Sweeping {len(revisions)} revisions...")
+        result = self.run(revisions)
+        with open(output_path / "revision_sweep.json", 'w') as f:
+            json.dump(result, f, indent=2)
+
+        blobs = result["blobs"]
+        print(f"Parsed {blobs['parsed']} of {blobs['unique']} unique blobs")
+        print(f"\nRevision sweep exported to {output_path}/revision_sweep.json")
+        return output_path
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Analyze MINIX source code")
     parser.add_argument("--minix-root", default="/home/eirikr/Playground/minix",
                       help="Path to MINIX source tree")
     parser.add_argument("--output", default="data",
                       help="Output directory for data files")
+    parser.add_argument("--sweep", nargs="+", metavar="REV",
+                      help="Analyze git revisions (or A..B ranges) of --minix-root "
+                           "and export per-metric time series instead")
+    parser.add_argument("--sweep-cache", metavar="FILE",
+                      help="Persist per-blob metrics here between sweeps")
+    parser.add_argument("--jobs", type=int, default=None,
+                      help="Parallel workers for --sweep (default: CPU count)")
     args = parser.parse_args()
 
-    analyzer = MinixAnalyzer(args.minix_root)
-    analyzer.export_all_data(args.output)
\ No newline at end of file
+    if args.sweep:
+        sweep = RevisionSweep(args.minix_root, jobs=args.jobs,
+                              cache_file=args.sweep_cache)
+        sweep.export(sweep.expand_revisions(args.sweep), args.output)
+    else:
+        analyzer = MinixAnalyzer(args.minix_root)
+        analyzer.export_all_data(args.output)
\ No newline at end of file
@@ -22,6 +22,7 @@ import time
 import json
 import socket
 import subprocess
+import tempfile
 from pathlib import Path
 from typing import Optional, Dict, List, Tuple
 from dataclasses import dataclass, asdict
@@ -31,6 +32,9 @@ import pexpect
 import psutil
 import yaml
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from shared.qemu.images import create_overlay  # noqa: E402
+
 
 class QEMUArchitecture(Enum):
     """Supported QEMU architectures."""
@@ -55,6 +59,7 @@ class QEMUConfig:
     memory: str = "2G"
     cpus: int = 4
     disk_image: str = ""
+    golden_image: str = ""  # Boot a throwaway overlay of this installed image
     iso_image: str = ""
     enable_kvm: bool = True
     vnc_display: str = ":0"
@@ -85,6 +90,7 @@ class QEMURunner:
         self.serial_port = None
         self.is_running = False
         self.boot_time = None
+        self.overlay: Optional[Path] = None
         
         if config_path and Path(config_path).exists():
             self._load_config(config_path)
@@ -111,8 +117,9 @@ class QEMURunner:
         if self.config.enable_kvm:
             cmd.append("-enable-kvm")
         
-        if self.config.disk_image:
-            cmd.extend(["-drive", f"file={self.config.disk_image},format=qcow2"])
+        disk_image = self.overlay or self.config.disk_image
+        if disk_image:
+            cmd.extend(["-drive", f"file={disk_image},format=qcow2"])
         
         if self.config.iso_image:
             cmd.extend(["-cdrom", self.config.iso_image])
@@ -140,6 +147,12 @@ class QEMURunner:
             True if VM started successfully, False otherwise
         """
         try:
+            if self.config.golden_image and not self.config.disk_image:
+                # Writes go to a private overlay; the installed image is shared
+                fd, name = tempfile.mkstemp(prefix="minix-test-", suffix=".qcow2")
+                os.close(fd)
+                self.overlay = create_overlay(self.config.golden_image, name)
+
             cmd = self._build_qemu_command()
             print(f"Starting QEMU: {' '.join(cmd)}")
             
@@ -159,6 +172,7 @@ class QEMURunner:
         except Exception as e:
             print(f"Error starting QEMU: {e}", file=sys.stderr)
             self.is_running = False
+            self._discard_overlay()
             return False
     
     def wait_for_boot(self, prompt: str = "minix#", 
@@ -240,11 +254,18 @@ class QEMURunner:
                 self.process.kill()
             
             self.is_running = False
+            self._discard_overlay()
             return True
         
         except Exception as e:
             print(f"Error stopping QEMU: {e}", file=sys.stderr)
             return False
+
+    def _discard_overlay(self):
+        """Delete this run's overlay disk, if it booted from a golden image."""
+        if self.overlay:
+            self.overlay.unlink(missing_ok=True)
+            self.overlay = None
     
     def get_status(self) -> Dict[str, any]:
         """Get current VM status."""
@@ -7,30 +7,46 @@ Creates TikZ diagrams from analyzed MINIX source data
 import json
 import argparse
 import math
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from shared.latex.targets import TargetGraph, depends_on, format_targets  # noqa: E402
+from shared.snapshot import open_snapshot  # noqa: E402
+
 class TikZGenerator:
     def __init__(self, data_dir="diagrams/data"):
         self.data_dir = Path(data_dir)
+        self.snapshot = None
         self.load_all_data()
 
     def load_all_data(self):
-        """Load all JSON data files"""
-        self.kernel_data = self.load_json("kernel_structure.json")
-        self.process_data = self.load_json("process_table.json")
-        self.memory_data = self.load_json("memory_layout.json")
-        self.ipc_data = self.load_json("ipc_system.json")
-        self.boot_data = self.load_json("boot_sequence.json")
-        self.stats = self.load_json("statistics.json")
+        """Load all datasets, from the snapshot when the pipeline wrote one"""
+        self.snapshot = open_snapshot(self.data_dir)
+        try:
+            self.kernel_data = self.load_json("kernel_structure.json")
+            self.process_data = self.load_json("process_table.json")
+            self.memory_data = self.load_json("memory_layout.json")
+            self.ipc_data = self.load_json("ipc_system.json")
+            self.boot_data = self.load_json("boot_sequence.json")
+            self.stats = self.load_json("statistics.json")
+        finally:
+            if self.snapshot is not None:
+                self.snapshot.close()
+                self.snapshot = None
 
     def load_json(self, filename):
-        """Load a JSON file"""
+        """Load a dataset section from the snapshot, else its JSON file"""
+        key = filename[:-len(".json")]
+        if self.snapshot is not None and key in self.snapshot:
+            return self.snapshot.load(key)
         filepath = self.data_dir / filename
         if filepath.exists():
             with open(filepath, 'r') as f:
                 return json.load(f)
         return {}
 
+    @depends_on("statistics", "kernel_structure")
     def generate_syscall_table_tikz(self):
         """Generate system call table diagram from actual data"""
         tex = r"""\documentclass{standalone}
@@ -79,6 +95,7 @@ class TikZGenerator:
 \end{document}"""
         return tex
 
+    @depends_on("process_table")
     def generate_process_states_tikz(self):
         """Generate process state diagram from actual data"""
         tex = r"""\documentclass{standalone}
@@ -127,6 +144,7 @@ class TikZGenerator:
 \end{document}"""
         return tex
 
+    @depends_on("boot_sequence")
     def generate_boot_sequence_tikz(self):
         """Generate boot sequence from actual data"""
         tex = r"""\documentclass{standalone}
@@ -173,6 +191,7 @@ class TikZGenerator:
 \end{document}"""
         return tex
 
+    @depends_on("ipc_system")
     def generate_ipc_architecture_tikz(self):
         """Generate IPC architecture from actual data"""
         tex = r"""\documentclass{standalone}
@@ -234,6 +253,7 @@ Message Size: {self.ipc_data.get('message_size', 'Unknown')}
 \end{document}"""
         return tex
 
+    @depends_on("memory_layout")
     def generate_memory_regions_tikz(self):
         """Generate memory regions from actual data"""
         tex = r"""\documentclass{standalone}
@@ -292,24 +312,41 @@ Total Regions: {len(unique_regions)}
 \end{document}"""
         return tex
 
-    def save_all_tikz_files(self, output_dir="diagrams/tikz-generated"):
-        """Save all generated TikZ files"""
+    def datasets(self):
+        """Loaded datasets by name, as the diagram generators declare them"""
+        return {
+            "kernel_structure": self.kernel_data,
+            "process_table": self.process_data,
+            "memory_layout": self.memory_data,
+            "ipc_system": self.ipc_data,
+            "boot_sequence": self.boot_data,
+            "statistics": self.stats,
+        }
+
+    def save_all_tikz_files(self, output_dir="diagrams/tikz-generated", force=False):
+        """Save the TikZ files whose datasets changed since the last run"""
         output_path = Path(output_dir)
-        output_path.mkdir(exist_ok=True)
+        output_path.mkdir(parents=True, exist_ok=True)
 
         diagrams = {
-            "syscall-table": self.generate_syscall_table_tikz(),
-            "process-states": self.generate_process_states_tikz(),
-            "boot-sequence-data": self.generate_boot_sequence_tikz(),
-            "ipc-architecture": self.generate_ipc_architecture_tikz(),
-            "memory-regions": self.generate_memory_regions_tikz()
+            "syscall-table": self.generate_syscall_table_tikz,
+            "process-states": self.generate_process_states_tikz,
+            "boot-sequence-data": self.generate_boot_sequence_tikz,
+            "ipc-architecture": self.generate_ipc_architecture_tikz,
+            "memory-regions": self.generate_memory_regions_tikz
         }
 
-        for name, content in diagrams.items():
-            filepath = output_path / f"{name}.tex"
-            with open(filepath, 'w') as f:
-                f.write(content)
-            print(f"Generated: {filepath}")
+        graph = TargetGraph(self.datasets())
+        for name, generate in diagrams.items():
+            graph.add(output_path / f"{name}.tex", generate)
+
+        results = graph.run(force=force)
+        for result in results:
+            if not result.ok:
+                print(f"Failed: {result.output} ({result.error})")
+            elif result.generated:
+                print(f"Generated: {result.output}")
+        print(format_targets(results))
 
         return output_path
 
@@ -319,7 +356,9 @@ if __name__ == "__main__":
                       help="Directory containing JSON data files")
     parser.add_argument("--output", default="diagrams/tikz-generated",
                       help="Output directory for TikZ files")
+    parser.add_argument("--force", action="store_true",
+                      help="Regenerate every diagram, even if its data is unchanged")
     args = parser.parse_args()
 
     generator = TikZGenerator(args.data_dir)
-    generator.save_all_tikz_files(args.output)
\ No newline at end of file
+    generator.save_all_tikz_files(args.output, force=args.force)
\ No newline at end of file
@@ -8,9 +8,14 @@ import os
 import sys
 import subprocess
 import csv
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from shared.latex.raster import RASTER_CACHE_NAME, Rasterizer
+
 class FigureExtractor:
     """Extract and manage figures from PDF"""
     
@@ -19,6 +24,10 @@ class FigureExtractor:
         self.output_dir = Path(output_dir)
         self.dpi = 300  # Publication standard
         self.figures = []
+        # Renders every requested page from one open PDF per gs process;
+        # optimization is done by optimize_pngs
+        self.rasterizer = Rasterizer(dpi=self.dpi, renderer="gs", optimizer=None,
+                                     cache_file=self.output_dir / RASTER_CACHE_NAME)
         
         # Create subdirectories
         (self.output_dir / "tikz-diagrams").mkdir(parents=True, exist_ok=True)
@@ -42,30 +51,47 @@ class FigureExtractor:
     
     def extract_page_range(self, start_page, end_page, output_name, figure_type):
         """Extract specific page range to PNG at 300 DPI"""
-        output_path = self.output_dir / figure_type / f"{output_name}.png"
-        
-        # Use Ghostscript for high-quality conversion
-        try:
-            subprocess.run([
-                "gs",
-                "-q",
-                "-dNOPAUSE",
-                "-dBATCH",
-                "-sDEVICE=png16m",
-                f"-r{self.dpi}",
-                f"-dFirstPage={start_page}",
-                f"-dLastPage={end_page}",
-                f"-sOutputFile={str(output_path)}",
-                str(self.pdf_path)
-            ], check=True, timeout=30)
-            
-            file_size = output_path.stat().st_size
-            print(f"✓ Extracted: {output_name} ({file_size/1024:.1f} KB)")
-            return True
-        except Exception as e:
-            print(f"✗ Failed to extract {output_name}: {e}")
-            return False
-    
+        return bool(self.extract_figures([(start_page, end_page, output_name, figure_type)]))
+
+    def extract_figures(self, figures):
+        """
+        Extract (start_page, end_page, name, type, ...) figures in one batch.
+
+        All pages are rendered from the PDF by a few Ghostscript processes
+        running in parallel; figures whose PNG is current for this PDF and
+        DPI are skipped. A multi-page range yields one PNG per page. Fresh
+        PNGs are optimized; returns the figures that were extracted.
+        """
+        requests, owners = [], []
+        for figure in figures:
+            start_page, end_page, output_name, figure_type = figure[:4]
+            for page in range(start_page, end_page + 1):
+                name = output_name if start_page == end_page else f"{output_name}-p{page}"
+                requests.append((self.pdf_path, page, self.output_dir / figure_type / f"{name}.png"))
+                owners.append(figure)
+
+        failed, fresh = set(), []
+        for figure, result in zip(owners, self.rasterizer.rasterize(requests)):
+            name = result.output.stem if result.ok else figure[2]
+            if not result.ok:
+                failed.add(figure[2])
+                print(f"✗ Failed to extract {name}: {result.log.strip()[-200:]}")
+            elif result.cached:
+                print(f"✓ Up to date: {name}")
+            else:
+                fresh.append(result.output)
+                file_size = result.output.stat().st_size
+                print(f"✓ Extracted: {name} ({file_size/1024:.1f} KB, {result.seconds:.2f}s)")
+        self.optimize_pngs(fresh)
+        return [figure for figure in figures if figure[2] not in failed]
+
+    def optimize_pngs(self, png_paths):
+        """Run optimize_png over several files on a worker pool"""
+        if not png_paths:
+            return []
+        with ThreadPoolExecutor(max_workers=min(len(png_paths), os.cpu_count() or 1)) as pool:
+            return list(pool.map(self.optimize_png, png_paths))
+
     def optimize_png(self, png_path):
         """Optimize PNG file size using optipng"""
         try:
@@ -236,13 +262,10 @@ def main():
     print(f"\nExtracting {len(figures_to_extract)} figures...")
     print("-" * 60)
     
-    extracted_count = 0
-    for start, end, name, fig_type, chapter, desc in figures_to_extract:
-        if extractor.extract_page_range(start, end, name, fig_type):
-            png_path = extractor.output_dir / fig_type / f"{name}.png"
-            extractor.optimize_png(png_path)
-            extractor.register_figure(name, fig_type, chapter, desc, start)
-            extracted_count += 1
+    extracted = extractor.extract_figures(figures_to_extract)
+    for start, end, name, fig_type, chapter, desc in extracted:
+        extractor.register_figure(name, fig_type, chapter, desc, start)
+    extracted_count = len(extracted)
     
     print("-" * 60)
     